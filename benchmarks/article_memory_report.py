@@ -0,0 +1,101 @@
+"""Report the memory held by formatted articles, as dicts and as Articles.
+
+Parses pages of the test fixtures scaled up to full pages, the way search
+responses arrive, formats them and measures with tracemalloc the memory still
+held once every raw page has been released.
+
+Usage:
+    python benchmarks/article_memory_report.py --articles 100000
+"""
+
+import os
+import sys
+import json
+import argparse
+import tracemalloc
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from src.article import Article  # noqa: E402
+from tests.test_data import unformated_results  # noqa: E402
+
+
+def format_dict(response: dict, preview_length: int | None = 500) -> dict:
+    """Format one search result as a dict, as format_results used to."""
+    return {
+        "webPublicationDate": response["webPublicationDate"],
+        "webTitle": response["webTitle"],
+        "webUrl": response["webUrl"],
+        "content_preview": response["fields"]["bodyText"][:preview_length],
+        "keywords": [tag["webTitle"] for tag in response["tags"]],
+    }
+
+
+FORMATTERS = {"dict": format_dict, "Article": Article.from_response}
+
+
+def measure(formatter, articles: int, page_size: int = 200) -> int:
+    """Format articles from freshly parsed pages and measure what is kept.
+
+    Args:
+        formatter (Callable): Function formatting one search result
+        articles (int): Number of articles to format
+        page_size (int): Number of articles per parsed page. Defaults to 200.
+
+    Returns:
+        int: Bytes held by the formatted articles
+    """
+    repeats = -(-page_size // len(unformated_results))
+    page_json = json.dumps((unformated_results * repeats)[:page_size])
+
+    tracemalloc.start()
+    try:
+        formatted = []
+        while len(formatted) < articles:
+            page = json.loads(page_json)[: articles - len(formatted)]
+            formatted.extend(formatter(response) for response in page)
+            del page
+        held, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return held
+
+
+def report(articles: int = 100_000, page_size: int = 200) -> dict:
+    """Measure the memory held by each article representation.
+
+    Args:
+        articles (int): Number of articles to format. Defaults to 100,000.
+        page_size (int): Number of articles per parsed page. Defaults to 200.
+
+    Returns:
+        dict: Bytes held by the formatted articles of each representation
+    """
+    return {
+        name: measure(formatter, articles, page_size)
+        for name, formatter in FORMATTERS.items()
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=200)
+    args = parser.parse_args()
+
+    result = report(articles=args.articles, page_size=args.page_size)
+    baseline = result["dict"]
+    print(f"{args.articles} formatted articles")
+    print(f"{'representation':<20}{'MB':>10}{'bytes each':>12}{'saved':>8}")
+    for name, held in result.items():
+        print(
+            f"{name:<20}{held / 1024**2:>10.1f}{held / args.articles:>12.0f}"
+            f"{1 - held / baseline:>8.0%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
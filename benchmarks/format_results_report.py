@@ -0,0 +1,88 @@
+"""Compare row and columnar formatting of Guardian search results.
+
+Formats the test fixtures scaled up to full pages, timing format_results
+against format_results_columnar alone and with its row view.
+
+Usage:
+    python benchmarks/format_results_report.py --page-size 200 --pages 50
+"""
+
+import os
+import sys
+import argparse
+import timeit
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from src.utils import format_results  # noqa: E402
+from src.columnar import format_results_columnar  # noqa: E402
+from tests.test_data import unformated_results  # noqa: E402
+
+
+def make_page(page_size: int = 200) -> list[dict]:
+    """Build a search results page by repeating the test fixtures.
+
+    Args:
+        page_size (int): Number of articles in the page. Defaults to 200.
+
+    Returns:
+        list[dict]: Search results as returned by the Guardian API
+    """
+    repeats = -(-page_size // len(unformated_results))
+    return (unformated_results * repeats)[:page_size]
+
+
+def report(page_size: int = 200, pages: int = 50, repeat: int = 5) -> dict:
+    """Time each formatter over a number of pages.
+
+    Args:
+        page_size (int): Number of articles per page. Defaults to 200.
+        pages (int): Pages formatted per timing. Defaults to 50.
+        repeat (int): Timings taken, the fastest is kept. Defaults to 5.
+
+    Raises:
+        AssertionError: Raised when the row view differs from format_results
+
+    Returns:
+        dict: Fastest milliseconds per page of each formatter
+    """
+    page = make_page(page_size)
+    assert format_results_columnar(page).to_rows() == format_results(page)
+
+    formatters = {
+        "format_results": lambda: format_results(page),
+        "format_results_columnar": lambda: format_results_columnar(page),
+        "format_results_columnar rows": lambda: format_results_columnar(
+            page
+        ).to_rows(),
+    }
+    return {
+        name: min(timeit.repeat(formatter, number=pages, repeat=repeat))
+        * 1000
+        / pages
+        for name, formatter in formatters.items()
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    result = report(
+        page_size=args.page_size, pages=args.pages, repeat=args.repeat
+    )
+    baseline = result["format_results"]
+    print(f"{args.page_size} articles per page, fastest of {args.repeat}")
+    print(f"{'formatter':<35}{'ms per page':>15}{'speedup':>10}")
+    for name, page_ms in result.items():
+        print(f"{name:<35}{page_ms:>15.3f}{baseline / page_ms:>9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
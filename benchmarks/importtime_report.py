@@ -0,0 +1,192 @@
+"""Report the cold start import time of the Lambda handler.
+
+Imports lambda_main the way the Lambda runtime does, from inside src/ with
+AWS_LAMBDA_FUNCTION_NAME set, in fresh interpreters using python -X importtime,
+then creates the SQS client the first invocation needs, which imports boto3.
+
+Usage:
+    python benchmarks/importtime_report.py --runs 5 --top 15
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+from textwrap import dedent
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Cold start budget for importing the handler, in milliseconds. Importing boto3
+# and dotenv eagerly took around 245ms, deferring them around 160ms. Timings
+# vary with the machine, so only the report and opt-in benchmarks enforce it.
+IMPORT_BUDGET_MS = 220
+# Heavy modules that must only be imported when first used
+DEFERRED_MODULES = ("boto3", "botocore.config", "dotenv")
+# Written to stderr between the phases of a cold start
+PHASE_MARKER = "importtime_report phase"
+
+COLD_START = dedent(
+    """
+    import sys, time
+    sys.stderr.write("{marker} import\\n")
+    start = time.perf_counter()
+    import {module}
+    imported = time.perf_counter()
+    sys.stderr.write("{marker} client\\n")
+    {module}.get_boto3_client("{client}")
+    created = time.perf_counter()
+    sys.stderr.write(
+        f"{marker} done {{imported - start}} {{created - imported}}\\n"
+    )
+    """
+)
+
+
+def measure_cold_start(
+    module: str = "lambda_main", client: str = "sqs"
+) -> dict:
+    """Import a module and create its first client in a fresh interpreter.
+
+    Args:
+        module (str): Module to import from src/. Defaults to "lambda_main".
+        client (str): AWS service of the client the first invocation creates
+            through the module's get_boto3_client. Defaults to "sqs".
+
+    Raises:
+        RuntimeError: Raised when the module fails to import or the client
+            cannot be created
+
+    Returns:
+        dict: Milliseconds spent importing the module and creating the client,
+        and the self and cumulative microseconds of every module imported by
+        each phase, excluding interpreter startup
+    """
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if not key.startswith("COV_CORE")
+    }
+    env["AWS_LAMBDA_FUNCTION_NAME"] = "importtime_report"
+    env.setdefault("AWS_DEFAULT_REGION", "eu-west-2")
+    env.pop("PYTHONPATH", None)
+    code = COLD_START.format(marker=PHASE_MARKER, module=module, client=client)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Cold starting {module} failed:\n{result.stderr}")
+
+    phases = {}
+    timings = None
+    for line in result.stderr.splitlines():
+        if line.startswith(PHASE_MARKER):
+            phase, *elapsed = line[len(PHASE_MARKER) :].split()
+            timings = phases.setdefault(phase, {})
+            continue
+        # Anything before the first marker belongs to interpreter startup
+        if (
+            timings is None
+            or not line.startswith("import time:")
+            or "self [us]" in line
+        ):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    import_s, client_s = (float(seconds) for seconds in elapsed)
+    return {
+        "import_ms": import_s * 1000,
+        "client_ms": client_s * 1000,
+        "imported": phases["import"],
+        "client_imported": phases["client"],
+    }
+
+
+def measure_import(module: str = "lambda_main") -> dict[str, tuple[int, int]]:
+    """Import a module in a fresh interpreter and parse its import times.
+
+    Args:
+        module (str): Module to import from src/. Defaults to "lambda_main".
+
+    Returns:
+        dict[str, tuple[int, int]]: Self and cumulative microseconds of the
+        module and every module it imported, excluding interpreter startup
+    """
+    return measure_cold_start(module)["imported"]
+
+
+def report(module: str = "lambda_main", runs: int = 5, top: int = 15) -> dict:
+    """Measure a module's import time over several runs.
+
+    Args:
+        module (str): Module to import from src/. Defaults to "lambda_main".
+        runs (int): Number of fresh interpreters to measure. Defaults to 5.
+        top (int): Number of slowest modules to list. Defaults to 15.
+
+    Returns:
+        dict: Median import time and median first client creation time in
+        milliseconds, the slowest modules imported by the handler by
+        cumulative time and any deferred modules that were imported with it
+    """
+    measurements = [measure_cold_start(module) for _ in range(runs)]
+    totals = [run["imported"][module][1] / 1000 for run in measurements]
+    median_run = measurements[totals.index(sorted(totals)[len(totals) // 2])]
+    imported = median_run["imported"]
+    slowest = sorted(
+        (
+            (name, cumulative / 1000)
+            for name, (_, cumulative) in imported.items()
+            if name != module
+        ),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+    return {
+        "median_ms": statistics.median(totals),
+        "client_ms": statistics.median(
+            run["client_ms"] for run in measurements
+        ),
+        "slowest": slowest,
+        "deferred_imported": [
+            name for name in DEFERRED_MODULES if name in imported
+        ],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="lambda_main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args()
+
+    result = report(module=args.module, runs=args.runs, top=args.top)
+    print(f"{args.module}: {result['median_ms']:.1f}ms median of {args.runs}")
+    print(
+        f"First client creation: {result['client_ms']:.1f}ms median, "
+        "paid by the first invocation"
+    )
+    print(f"{'module':<50}{'cumulative ms':>15}")
+    for name, cumulative_ms in result["slowest"]:
+        print(f"{name:<50}{cumulative_ms:>15.1f}")
+
+    failed = False
+    if result["median_ms"] > args.budget_ms:
+        print(f"Over the {args.budget_ms:.0f}ms import budget")
+        failed = True
+    if result["deferred_imported"]:
+        print(
+            "Deferred modules imported eagerly: "
+            + ", ".join(result["deferred_imported"])
+        )
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Report how many requests multiplexed search terms need.
+
+Builds search terms from the keyword tags of the test fixtures, packs them
+into combined OR searches for each URL length limit and reports the number of
+requests against searching every term on its own, and the time taken to route
+a page of results back to the terms.
+
+Usage:
+    python benchmarks/multiplex_report.py --terms 300 --limits 1000 2000 4000
+"""
+
+import os
+import sys
+import argparse
+import timeit
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from src.multiplex import pack_terms, TermMatcher  # noqa: E402
+from src.projection import Projection  # noqa: E402
+from tests.test_data import unformated_results  # noqa: E402
+
+
+def make_terms(terms: int = 300) -> list[str]:
+    """Build distinct search terms from the fixture tag titles.
+
+    Args:
+        terms (int): Number of terms. Defaults to 300.
+
+    Returns:
+        list[str]: Search terms, tag titles numbered to keep them distinct
+    """
+    titles = list(
+        dict.fromkeys(
+            tag["webTitle"]
+            for article in unformated_results
+            for tag in article["tags"]
+        )
+    )
+    return [
+        f"{titles[index % len(titles)]} {index // len(titles)}"
+        if index >= len(titles)
+        else titles[index]
+        for index in range(terms)
+    ]
+
+
+def report(
+    terms: int = 300,
+    limits: tuple[int, ...] = (1000, 2000, 4000),
+    repeat: int = 5,
+) -> dict:
+    """Pack terms for each URL length limit and time routing a page.
+
+    Args:
+        terms (int): Number of search terms. Defaults to 300.
+        limits (tuple[int, ...]): URL length limits to pack for. Defaults to
+        (1000, 2000, 4000).
+        repeat (int): Timings taken, the fastest is kept. Defaults to 5.
+
+    Returns:
+        dict: Per limit, the number of requests, the terms per request and the
+        fastest milliseconds to route 200 results to each group of terms
+    """
+    search_terms = make_terms(terms)
+    page = (unformated_results * 20)[:200]
+    result = {}
+    for limit in limits:
+        groups = pack_terms(
+            search_terms, max_url_length=limit, projection=Projection()
+        )
+        matcher = TermMatcher(max(groups, key=len))
+        route_s = min(
+            timeit.repeat(
+                lambda matcher=matcher: matcher.route(page),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        result[limit] = {
+            "requests": len(groups),
+            "packing_factor": len(search_terms) / len(groups),
+            "route_ms": route_s * 1000,
+        }
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, default=300)
+    parser.add_argument(
+        "--limits", type=int, nargs="+", default=[1000, 2000, 4000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    result = report(
+        terms=args.terms, limits=tuple(args.limits), repeat=args.repeat
+    )
+    print(f"{args.terms} terms, {args.terms} requests searched one at a time")
+    print(f"{'URL limit':<12}{'requests':>10}{'terms/req':>11}{'route ms':>10}")
+    for limit, packed in result.items():
+        print(
+            f"{limit:<12}{packed['requests']:>10}"
+            f"{packed['packing_factor']:>11.1f}{packed['route_ms']:>10.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
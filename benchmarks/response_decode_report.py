@@ -0,0 +1,140 @@
+"""Compare full and streamed decoding of Guardian /search responses.
+
+Builds a 200 result response from the test fixtures, with body text scaled up
+to tens of KB per article, and measures the parse time and peak memory of
+json.loads against SearchResponseDecoder fed the body in chunks.
+
+Usage:
+    python benchmarks/response_decode_report.py --results 200 --body-scale 8
+"""
+
+import os
+import sys
+import json
+import argparse
+import timeit
+import tracemalloc
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from src.response_decoder import decode_search_response, ijson  # noqa: E402
+from tests.test_data import unformated_results  # noqa: E402
+
+CHUNK_BYTES = 64 * 1024
+
+
+def make_chunks(results: int = 200, body_scale: int = 8) -> list[bytes]:
+    """Build a /search response body split into network sized chunks.
+
+    Args:
+        results (int): Number of results in the response. Defaults to 200.
+        body_scale (int): Times each fixture bodyText is repeated. Defaults
+        to 8.
+
+    Returns:
+        list[bytes]: Response body in chunks of 64KB
+    """
+    articles = []
+    for index in range(results):
+        article = dict(unformated_results[index % len(unformated_results)])
+        article["fields"] = {
+            "bodyText": article["fields"]["bodyText"] * body_scale
+        }
+        articles.append(article)
+    body = json.dumps(
+        {
+            "response": {
+                "status": "ok",
+                "total": results,
+                "pages": 1,
+                "currentPage": 1,
+                "results": articles,
+            }
+        }
+    ).encode()
+    return [
+        body[start : start + CHUNK_BYTES]
+        for start in range(0, len(body), CHUNK_BYTES)
+    ]
+
+
+def decode_full(chunks: list[bytes]) -> dict:
+    """Decode the way response.json() does, reading the whole body first."""
+    return json.loads(b"".join(chunks))["response"]
+
+
+def decode_streamed(chunks: list[bytes]) -> dict:
+    """Decode with SearchResponseDecoder, trimming to 500 characters."""
+    return decode_search_response(chunks, preview_length=500)
+
+
+DECODERS = {"json.loads": decode_full, "streamed": decode_streamed}
+
+
+def peak_memory(decoder, chunks: list[bytes]) -> int:
+    """Return the peak bytes allocated while decoding, including the result."""
+    tracemalloc.start()
+    try:
+        decoder(chunks)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def report(results: int = 200, body_scale: int = 8, repeat: int = 5) -> dict:
+    """Measure parse time and peak memory of each decoder.
+
+    Args:
+        results (int): Number of results in the response. Defaults to 200.
+        body_scale (int): Times each fixture bodyText is repeated. Defaults
+        to 8.
+        repeat (int): Timings taken, the fastest is kept. Defaults to 5.
+
+    Returns:
+        dict: Response size in bytes and, per decoder, the fastest parse time
+        in milliseconds and peak memory in bytes
+    """
+    chunks = make_chunks(results, body_scale)
+    result = {"response_bytes": sum(len(chunk) for chunk in chunks)}
+    for name, decoder in DECODERS.items():
+        parse_s = min(
+            timeit.repeat(
+                lambda decoder=decoder: decoder(chunks), number=1, repeat=repeat
+            )
+        )
+        result[name] = {
+            "parse_ms": parse_s * 1000,
+            "peak_bytes": peak_memory(decoder, chunks),
+        }
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--results", type=int, default=200)
+    parser.add_argument("--body-scale", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    result = report(
+        results=args.results, body_scale=args.body_scale, repeat=args.repeat
+    )
+    print(
+        f"{args.results} results, {result['response_bytes'] / 1024**2:.1f}MB "
+        f"response, streamed with {'ijson' if ijson else 'json.loads'}"
+    )
+    print(f"{'decoder':<15}{'parse ms':>10}{'peak MB':>10}")
+    for name in DECODERS:
+        timings = result[name]
+        print(
+            f"{name:<15}{timings['parse_ms']:>10.1f}"
+            f"{timings['peak_bytes'] / 1024**2:>10.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Compare the message serializers on formatted articles.
+
+Formats the test fixtures scaled up to a large batch and times packing them
+into queue messages and decoding them again with each installed serializer.
+
+Usage:
+    python benchmarks/serializer_report.py --articles 10000 --repeat 5
+"""
+
+import os
+import sys
+import argparse
+import timeit
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from src.utils import format_results, encode_messages  # noqa: E402
+from src.serializers import get_serializer, available_serializers  # noqa: E402
+from tests.test_data import unformated_results  # noqa: E402
+
+
+def make_articles(articles: int = 10_000) -> list:
+    """Build formatted articles by repeating the test fixtures.
+
+    Args:
+        articles (int): Number of articles. Defaults to 10,000.
+
+    Returns:
+        list: Formatted articles
+    """
+    repeats = -(-articles // len(unformated_results))
+    return format_results((unformated_results * repeats)[:articles])
+
+
+def report(articles: int = 10_000, repeat: int = 5) -> dict:
+    """Time each installed serializer packing and decoding articles.
+
+    Args:
+        articles (int): Number of articles to serialise. Defaults to 10,000.
+        repeat (int): Timings taken, the fastest is kept. Defaults to 5.
+
+    Returns:
+        dict: Per serializer, the fastest milliseconds to pack the articles
+        into messages and to decode every message, and the total payload bytes
+    """
+    formatted = make_articles(articles)
+    result = {}
+    for name in available_serializers():
+        serializer = get_serializer(name)
+        encode_ms = min(
+            timeit.repeat(
+                lambda serializer=serializer: encode_messages(
+                    formatted, serializer=serializer
+                ),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        payloads = [
+            serializer.dumps(formatted[start : start + 100])
+            for start in range(0, len(formatted), 100)
+        ]
+        decode_ms = min(
+            timeit.repeat(
+                lambda serializer=serializer, payloads=payloads: [
+                    serializer.decode(payload) for payload in payloads
+                ],
+                number=1,
+                repeat=repeat,
+            )
+        )
+        result[name] = {
+            "encode_ms": encode_ms * 1000,
+            "decode_ms": decode_ms * 1000,
+            "bytes": sum(len(payload) for payload in payloads),
+        }
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    result = report(articles=args.articles, repeat=args.repeat)
+    print(f"{args.articles} articles, fastest of {args.repeat}")
+    print(f"{'serializer':<12}{'pack ms':>10}{'decode ms':>12}{'MB':>8}")
+    for name, timings in result.items():
+        print(
+            f"{name:<12}{timings['encode_ms']:>10.1f}"
+            f"{timings['decode_ms']:>12.1f}{timings['bytes'] / 1024**2:>8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
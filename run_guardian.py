@@ -1,27 +1,142 @@
 from src.lambda_main import guardian_lambda
+from src.daemon import PollDaemon, poll_incremental, stop_on_signals
+from src.guardian_api import reset_http_client
+from functools import partial
+import sys
 import argparse
 import json
 import logging
 
 # logging.basicConfig(level=logging.INFO)
 
+COMMANDS = ("run", "backfill", "daemon")
 
-def parse_arguments():
+
+def parse_arguments(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(
         description="Run the Guardian API function"
     )
-    parser.add_argument(
+    subparsers = parser.add_subparsers(dest="command")
+
+    run_parser = subparsers.add_parser(
+        "run", help="Send the newest articles for a query (default)"
+    )
+    run_parser.add_argument(
         "--query", required=True, help="Search terms for the Guardian API"
     )
-    parser.add_argument(
+    run_parser.add_argument(
         "--from-date", help="Optional start date in YYYY-MM-DD format"
     )
-    parser.add_argument("--queue-url", required=True, help="SQS queue URL")
-    return parser.parse_args()
+    run_parser.add_argument("--queue-url", required=True, help="SQS queue URL")
+    run_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only send articles published since the previous run of the query",
+    )
+    run_parser.add_argument(
+        "--lookback-days",
+        type=float,
+        help="Days searched by the first incremental run of a query without "
+        "--from-date (default 1)",
+    )
 
+    backfill_parser = subparsers.add_parser(
+        "backfill", help="Send every article for a query between two dates"
+    )
+    backfill_parser.add_argument(
+        "--query", required=True, help="Search terms for the Guardian API"
+    )
+    backfill_parser.add_argument(
+        "--from-date", required=True, help="Start date in YYYY-MM-DD format"
+    )
+    backfill_parser.add_argument(
+        "--to-date", required=True, help="End date in YYYY-MM-DD format"
+    )
+    backfill_parser.add_argument(
+        "--queue-url", required=True, help="SQS queue URL"
+    )
+    backfill_parser.add_argument(
+        "--checkpoint",
+        default="guardian_backfill.json",
+        help="Progress file, a stopped backfill resumes from it",
+    )
+    backfill_parser.add_argument(
+        "--page-budget",
+        type=int,
+        default=10,
+        help="Maximum pages of results per date range shard",
+    )
+    backfill_parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=4,
+        help="Maximum number of concurrent requests",
+    )
 
-if __name__ == "__main__":
-    args = parse_arguments()
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        help="Keep polling queries, sending articles published since each poll",
+    )
+    daemon_parser.add_argument(
+        "--query",
+        action="append",
+        dest="queries",
+        required=True,
+        help="Search terms for the Guardian API, repeat for each query",
+    )
+    daemon_parser.add_argument(
+        "--queue-url", required=True, help="SQS queue URL"
+    )
+    daemon_parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=60,
+        help="Shortest seconds between polls of a query",
+    )
+    daemon_parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=3600,
+        help="Longest seconds between polls of a query",
+    )
+    daemon_parser.add_argument(
+        "--target-articles",
+        type=float,
+        default=5,
+        help="New articles each poll should find",
+    )
+    daemon_parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=4,
+        help="Maximum polls running at once across all queries",
+    )
+    daemon_parser.add_argument(
+        "--lookback-days",
+        type=float,
+        help="Days searched by the first poll of a query with no previous run "
+        "(default 1)",
+    )
+
+    argv = sys.argv[1:] if argv is None else argv
+    # Without a command the newest articles are sent, as before subcommands
+    if argv and argv[0] not in (*COMMANDS, "-h", "--help"):
+        argv = ["run", *argv]
+    return parser.parse_args(argv)
+
+
+def build_event(args) -> dict:
+    if args.command == "backfill":
+        return {
+            "query": args.query,
+            "from_date": args.from_date,
+            "to_date": args.to_date,
+            "queue_url": args.queue_url,
+            "backfill": True,
+            "checkpoint": args.checkpoint,
+            "page_budget": args.page_budget,
+            "max_workers": args.max_workers,
+        }
 
     event = {"query": args.query, "queue_url": args.queue_url}
 
@@ -31,6 +146,44 @@ if __name__ == "__main__":
     else:
         event["from_date"] = None
 
+    if args.incremental:
+        event["incremental"] = True
+        if args.lookback_days is not None:
+            event["lookback_days"] = args.lookback_days
+    return event
+
+
+def run_daemon(args) -> None:
+    daemon = PollDaemon(
+        queries=args.queries,
+        poll=partial(
+            poll_incremental,
+            queue_url=args.queue_url,
+            lookback_days=args.lookback_days,
+        ),
+        max_concurrency=args.max_concurrency,
+        min_interval=args.min_interval,
+        max_interval=args.max_interval,
+        target_articles=args.target_articles,
+    )
+    stop_on_signals(daemon)
+    print(f"Polling {len(daemon.intervals)} queries, stop with SIGTERM")
+    try:
+        daemon.run()
+    finally:
+        reset_http_client()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    if args.command is None:
+        parse_arguments(["--help"])
+    if args.command == "daemon":
+        run_daemon(args)
+        sys.exit(0)
+
+    event = build_event(args)
+
     context = {}
 
     print(f"Running guardian_main with event: {json.dumps(event, indent=2)}\n")
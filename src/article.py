@@ -0,0 +1,114 @@
+"""Compact record type for formatted Guardian articles"""
+
+import sys
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+
+try:
+    from src.projection import Projection
+except ImportError:
+    from projection import Projection
+
+# Output keys of a formatted article and the Article attribute holding each
+ARTICLE_KEYS = {
+    "webPublicationDate": "published",
+    "webTitle": "title",
+    "webUrl": "url",
+    "content_preview": "content_preview",
+    "keywords": "keywords",
+}
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Article(Mapping):
+    """A formatted article, read only and without a per-article dict.
+
+    Reads like the dict format_results used to return, with the keys
+    webPublicationDate, webTitle, webUrl, content_preview and keywords, and
+    compares equal to that dict. Keywords are held as a tuple of interned
+    strings, shared between every article with the same keyword, and read
+    back as a list. Pass json_default to json.dumps to serialise articles.
+    """
+
+    published: str
+    title: str
+    url: str
+    content_preview: str
+    keywords: tuple[str, ...]
+
+    @classmethod
+    def from_response(
+        cls,
+        response: dict,
+        preview_length: int | None = 500,
+        projection: Projection | None = None,
+    ) -> "Article":
+        """Create an article from one Guardian search result.
+
+        Args:
+            response (dict): Search result from the Guardian API
+            preview_length (int | None): Characters of body text kept as the
+            content preview, None keeps the full body text. Defaults to 500.
+            projection (Projection | None): Preview field, length and keywords
+            to keep, overriding preview_length. Defaults to None.
+
+        Raises:
+            KeyError: Raised when the search result is missing a required key
+
+        Returns:
+            Article: Formatted article
+        """
+        projection = projection or Projection(preview_length=preview_length)
+        return cls(
+            published=response["webPublicationDate"],
+            title=response["webTitle"],
+            url=response["webUrl"],
+            content_preview=projection.preview(response),
+            keywords=tuple(
+                sys.intern(keyword) for keyword in projection.keywords(response)
+            ),
+        )
+
+    def __getitem__(self, key: str):
+        if key == "keywords":
+            return list(self.keywords)
+        return getattr(self, ARTICLE_KEYS[key])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(ARTICLE_KEYS)
+
+    def __len__(self) -> int:
+        return len(ARTICLE_KEYS)
+
+    def to_dict(self) -> dict:
+        """Return the article as a plain dict.
+
+        Returns:
+            dict: Article in the format_results output format
+        """
+        return {
+            "webPublicationDate": self.published,
+            "webTitle": self.title,
+            "webUrl": self.url,
+            "content_preview": self.content_preview,
+            "keywords": list(self.keywords),
+        }
+
+
+def json_default(obj: object) -> dict:
+    """Serialise articles with json.dumps(..., default=json_default).
+
+    Args:
+        obj (object): Object json could not serialise
+
+    Raises:
+        TypeError: Raised when obj is not an Article
+
+    Returns:
+        dict: Article as a plain dict
+    """
+    if isinstance(obj, Article):
+        return obj.to_dict()
+    raise TypeError(
+        f"Object of type {type(obj).__name__} is not JSON serializable"
+    )
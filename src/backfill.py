@@ -0,0 +1,465 @@
+"""Date range sharded backfill of historical Guardian articles"""
+
+import os
+import json
+import queue
+import tempfile
+import httpx
+from collections import deque
+from collections.abc import Callable, Generator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import islice
+
+try:
+    from src.utils import logger
+    from src.projection import Projection
+    from src.guardian_api import (
+        MAX_PAGE_SIZE,
+        build_search_params,
+        search,
+        get_article_pages,
+    )
+except ImportError:
+    from utils import logger
+    from projection import Projection
+    from guardian_api import (
+        MAX_PAGE_SIZE,
+        build_search_params,
+        search,
+        get_article_pages,
+    )
+
+# Shards with more than this many pages of results are split in two
+DEFAULT_PAGE_BUDGET = 10
+
+# Counting a shard's articles requests no fields or tags
+COUNT_PROJECTION = Projection(preview_length=0, tag_types=())
+
+
+@dataclass(frozen=True)
+class Shard:
+    """An inclusive range of publication dates in YYYY-MM-DD format."""
+
+    from_date: str
+    to_date: str
+
+    @property
+    def days(self) -> int:
+        """Number of days the shard covers."""
+        start = date.fromisoformat(self.from_date)
+        return (date.fromisoformat(self.to_date) - start).days + 1
+
+    def bisect(self) -> tuple["Shard", "Shard"]:
+        """Split the shard into two halves of whole days.
+
+        Raises:
+            ValueError: Raised when the shard covers a single day
+
+        Returns:
+            tuple[Shard, Shard]: Earlier and later halves
+        """
+        if self.days < 2:
+            raise ValueError(f"Cannot split the single day {self.from_date}")
+        middle = date.fromisoformat(self.from_date) + timedelta(
+            days=self.days // 2 - 1
+        )
+        return (
+            Shard(self.from_date, middle.isoformat()),
+            Shard((middle + timedelta(days=1)).isoformat(), self.to_date),
+        )
+
+
+def count_articles(query: str, client: httpx.Client, shard: Shard) -> int:
+    """Return the number of articles matching query within a shard.
+
+    Args:
+        query (str): Terms to search for
+        client (httpx.Client): HTTPX Client object
+        shard (Shard): Publication dates to count within
+
+    Returns:
+        int: Total reported by the API
+    """
+    params = build_search_params(
+        query=query,
+        from_date=shard.from_date,
+        to_date=shard.to_date,
+        page=1,
+        page_size=1,
+        projection=COUNT_PROJECTION,
+    )
+    return search(client=client, params=params)["total"]
+
+
+def plan_shards(
+    query: str,
+    client: httpx.Client,
+    from_date: str,
+    to_date: str,
+    page_budget: int = DEFAULT_PAGE_BUDGET,
+    page_size: int = MAX_PAGE_SIZE,
+    max_workers: int = 4,
+) -> list[Shard]:
+    """Split a date range into shards of at most page_budget pages each.
+
+    The whole range is counted first and any shard with more articles than
+    page_budget pages hold is bisected and its halves counted, in parallel,
+    until every shard fits or covers a single day.
+
+    Args:
+        query (str): Terms to search for
+        client (httpx.Client): HTTPX Client object, shared between threads
+        from_date (str): First publication date YYYY-MM-DD format
+        to_date (str): Last publication date YYYY-MM-DD format
+        page_budget (int): Maximum pages of results per shard. Defaults to 10.
+        page_size (int): Number of results per page. Defaults to 200.
+        max_workers (int): Maximum number of concurrent requests. Defaults
+        to 4.
+
+    Raises:
+        ValueError: Raised when from_date is after to_date
+
+    Returns:
+        list[Shard]: Shards holding articles, in date order
+    """
+    if from_date > to_date:
+        raise ValueError(
+            f"from_date must not be after to_date, got {from_date} > {to_date}"
+        )
+    max_articles = page_budget * page_size
+    planned = []
+    pending = [Shard(from_date, to_date)]
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="guardian-shard"
+    ) as executor:
+        while pending:
+            totals = executor.map(
+                lambda shard: count_articles(query, client, shard), pending
+            )
+            split = []
+            for shard, total in zip(pending, totals, strict=True):
+                if total > max_articles and shard.days > 1:
+                    split.extend(shard.bisect())
+                    continue
+                if total > max_articles:
+                    logger.warning(
+                        "%(total)s articles published on %(date)s exceed the "
+                        "page budget, paging through all of them",
+                        {"total": total, "date": shard.from_date},
+                    )
+                if total:
+                    planned.append(shard)
+            pending = split
+    logger.info(
+        "Planned %(shards)s shards of articles mentioning %(query)s from "
+        "%(from_date)s to %(to_date)s",
+        {
+            "shards": len(planned),
+            "query": query,
+            "from_date": from_date,
+            "to_date": to_date,
+        },
+    )
+    return sorted(planned, key=lambda shard: shard.from_date)
+
+
+def fetch_shard(
+    query: str,
+    client: httpx.Client,
+    shard: Shard,
+    page_size: int = MAX_PAGE_SIZE,
+    start_page: int = 1,
+    should_stop: Callable[[], bool] | None = None,
+) -> Generator[list[dict], None, int | None]:
+    """Lazily retrieve a shard's articles one page at a time, oldest first.
+
+    Args:
+        query (str): Terms to search for
+        client (httpx.Client): HTTPX Client object
+        shard (Shard): Publication dates to retrieve
+        page_size (int): Number of results per page. Defaults to 200.
+        start_page (int): First page to retrieve. Defaults to 1.
+        should_stop (Callable[[], bool] | None): Checked before each further
+        page is requested, returning True stops iteration early. Defaults to
+        None.
+
+    Yields:
+        list[dict]: Guardian articles of each page in publication order
+
+    Returns:
+        int | None: Page to resume from when stopped early by should_stop,
+        otherwise None
+    """
+    return (
+        yield from get_article_pages(
+            query=query,
+            client=client,
+            from_date=shard.from_date,
+            to_date=shard.to_date,
+            page_size=page_size,
+            start_page=start_page,
+            should_stop=should_stop,
+            order_by="oldest",
+        )
+    )
+
+
+def fetch_shards(
+    query: str,
+    client: httpx.Client,
+    shards: list[Shard],
+    page_size: int = MAX_PAGE_SIZE,
+    max_workers: int = 4,
+    should_stop: Callable[[], bool] | None = None,
+    start_page: int = 1,
+) -> Generator[tuple[Shard, list[dict], int | None], None, None]:
+    """Retrieve shards on a worker pool, yielding their pages in date order.
+
+    Each worker pages through its shard oldest first, and the pages of the
+    earliest shard are yielded as they arrive while later shards are fetched.
+    Workers check should_stop before each further page, so a stopped run
+    returns within a page request. Iteration ends after the first shard left
+    incomplete, as only the earliest unfinished shard can be resumed.
+
+    Args:
+        query (str): Terms to search for
+        client (httpx.Client): HTTPX Client object, shared between threads
+        shards (list[Shard]): Shards in date order
+        page_size (int): Number of results per page. Defaults to 200.
+        max_workers (int): Maximum number of shards fetched at once. Defaults
+        to 4.
+        should_stop (Callable[[], bool] | None): Checked before each further
+        page or shard is requested, returning True stops requesting them and
+        yields the pages already retrieved of the earliest shard. Defaults to
+        None.
+        start_page (int): Page to resume the first shard from. Defaults to 1.
+
+    Raises:
+        ValueError: Raised when max_workers is less than 1.
+
+    Yields:
+        tuple[Shard, list[dict], int | None]: Each shard, the articles of one
+        of its pages in publication order and the page the shard resumes from
+        after them, None once the shard is complete. A shard without articles
+        is yielded once with none.
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="guardian-shard"
+    )
+
+    def fetch(shard: Shard, first_page: int, pages: queue.Queue) -> None:
+        shard_pages = fetch_shard(
+            query=query,
+            client=client,
+            shard=shard,
+            page_size=page_size,
+            start_page=first_page,
+            should_stop=should_stop,
+        )
+        try:
+            while True:
+                pages.put(("page", next(shard_pages)))
+        except StopIteration as stop:
+            pages.put(("done", stop.value))
+        except BaseException as exc:
+            pages.put(("error", exc))
+
+    def submit(shard: Shard, first_page: int = 1):
+        pages = queue.Queue()
+        executor.submit(fetch, shard, first_page, pages)
+        return shard, first_page, pages
+
+    try:
+        pending = iter(shards)
+        in_flight = deque()
+        if should_stop is None or not should_stop():
+            first_shard = next(pending, None)
+            if first_shard is not None:
+                in_flight.append(submit(first_shard, start_page))
+            in_flight.extend(
+                submit(shard) for shard in islice(pending, max_workers - 1)
+            )
+        stopped = False
+        while in_flight:
+            shard, next_page, pages = in_flight.popleft()
+            articles = None
+            while True:
+                kind, value = pages.get()
+                if kind == "error":
+                    raise value
+                if kind == "done":
+                    break
+                # Held until the next page arrives or the shard ends
+                if articles is not None:
+                    yield shard, articles, next_page
+                articles = value
+                next_page += 1
+            if not stopped and should_stop is not None and should_stop():
+                stopped = True
+            if not stopped and value is None:
+                next_shard = next(pending, None)
+                if next_shard is not None:
+                    in_flight.append(submit(next_shard))
+            yield shard, articles or [], value
+            if value is not None:
+                return
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class BackfillCheckpoint:
+    """Backfill progress persisted to a JSON file.
+
+    The file is replaced atomically on every save, so a crash leaves either
+    the previous or the new progress, never a partial file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Checkpoint file path
+        """
+        self.path = path
+
+    def load(self) -> dict | None:
+        """Return the saved progress, None when there is none."""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, encoding="utf-8") as checkpoint_file:
+            return json.load(checkpoint_file)
+
+    def save(self, state: dict) -> None:
+        """Replace the saved progress with state."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, suffix=".tmp", delete=False, encoding="utf-8"
+        ) as temp_file:
+            json.dump(state, temp_file)
+        os.replace(temp_file.name, self.path)
+
+    def clear(self) -> None:
+        """Remove the saved progress."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def run_backfill(
+    query: str,
+    from_date: str,
+    to_date: str,
+    send: Callable[[Shard, list[dict]], None],
+    client: httpx.Client,
+    checkpoint: BackfillCheckpoint | None = None,
+    shards: list[Shard] | None = None,
+    page_budget: int = DEFAULT_PAGE_BUDGET,
+    page_size: int = MAX_PAGE_SIZE,
+    max_workers: int = 4,
+    should_stop: Callable[[], bool] | None = None,
+    start_page: int = 1,
+) -> dict:
+    """Retrieve every article matching query between two dates.
+
+    The range is planned into shards, see plan_shards, which are fetched on a
+    worker pool and passed to send a page at a time in date order, each
+    shard's articles oldest first. Progress is saved to the checkpoint after
+    every page is sent, so running the same backfill again after a crash
+    resumes from the first unsent page. The checkpoint is removed once every
+    shard is sent.
+
+    Args:
+        query (str): Terms to search for
+        from_date (str): First publication date YYYY-MM-DD format
+        to_date (str): Last publication date YYYY-MM-DD format
+        send (Callable[[Shard, list[dict]], None]): Called with each shard and
+        the articles of each of its pages, in date order
+        client (httpx.Client): HTTPX Client object, shared between threads
+        checkpoint (BackfillCheckpoint | None): Progress to resume from and
+        save to. Defaults to None.
+        shards (list[Shard] | None): Remaining shards of a stopped backfill,
+        skipping planning. Defaults to None.
+        page_budget (int): Maximum pages of results per shard. Defaults to 10.
+        page_size (int): Number of results per page. Defaults to 200.
+        max_workers (int): Maximum number of concurrent requests. Defaults
+        to 4.
+        should_stop (Callable[[], bool] | None): Checked before each further
+        page or shard is requested, returning True stops the backfill once the
+        pages retrieved are sent. Defaults to None.
+        start_page (int): Page to resume the first of shards from. Defaults
+        to 1.
+
+    Returns:
+        dict: Number of planned and sent shards, the articles sent, the
+        "remaining" shards as [from_date, to_date] pairs and the "page" to
+        resume the first of them from
+    """
+    state = checkpoint.load() if checkpoint is not None else None
+    backfill = {"query": query, "from_date": from_date, "to_date": to_date}
+    if state is not None and {key: state[key] for key in backfill} != backfill:
+        logger.warning(
+            "Ignoring checkpoint %s of a different backfill", checkpoint.path
+        )
+        state = None
+    if state is None:
+        if shards is None:
+            shards = plan_shards(
+                query=query,
+                client=client,
+                from_date=from_date,
+                to_date=to_date,
+                page_budget=page_budget,
+                page_size=page_size,
+                max_workers=max_workers,
+            )
+        state = {
+            **backfill,
+            "shards": [[shard.from_date, shard.to_date] for shard in shards],
+            "completed": 0,
+            "page": start_page,
+            "articles": 0,
+        }
+        if checkpoint is not None:
+            checkpoint.save(state)
+    else:
+        logger.info(
+            "Resuming backfill of %(query)s from shard %(shard)s of %(shards)s",
+            {
+                "query": query,
+                "shard": state["completed"] + 1,
+                "shards": len(state["shards"]),
+            },
+        )
+
+    shards = [Shard(*shard) for shard in state["shards"]]
+    for shard, articles, next_page in fetch_shards(
+        query=query,
+        client=client,
+        shards=shards[state["completed"] :],
+        page_size=page_size,
+        max_workers=max_workers,
+        should_stop=should_stop,
+        start_page=state.get("page", 1),
+    ):
+        if articles:
+            send(shard, articles)
+        state["articles"] += len(articles)
+        if next_page is None:
+            state["completed"] += 1
+            state["page"] = 1
+        else:
+            state["page"] = next_page
+        if checkpoint is not None:
+            checkpoint.save(state)
+
+    if checkpoint is not None and state["completed"] == len(shards):
+        checkpoint.clear()
+    return {
+        "shards": len(shards),
+        "completed": state["completed"],
+        "articles": state["articles"],
+        "remaining": state["shards"][state["completed"] :],
+        "page": state.get("page", 1),
+    }
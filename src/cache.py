@@ -0,0 +1,252 @@
+"""Response caches for repeated Guardian API searches"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+def cache_key(url: str, params: dict) -> str:
+    """Build a cache key from a request, ignoring the API key.
+
+    Parameters are sorted and stripped so equivalent requests share a key.
+
+    Args:
+        url (str): Request URL
+        params (dict): Request query parameters
+
+    Returns:
+        str: Normalised cache key
+    """
+    normalised = {
+        key: str(value).strip()
+        for key, value in params.items()
+        if key != "api-key" and value is not None
+    }
+    return f"{url}?{json.dumps(normalised, sort_keys=True)}"
+
+
+class ResponseCache(ABC):
+    """Base class for response caches with TTL expiry and hit/miss counters.
+
+    Subclasses implement load, store and delete for their storage backend.
+    """
+
+    def __init__(
+        self, ttl: float = 300, max_entries: int = 256, clock=time.time
+    ):
+        """
+        Args:
+            ttl (float): Seconds a cached response stays valid. Defaults to 300.
+            max_entries (int): Maximum number of cached responses. Defaults to 256.
+            clock (Callable): Clock in seconds. Defaults to time.time.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.stats_lock = threading.Lock()
+
+    @abstractmethod
+    def load(self, key: str) -> tuple[float, dict] | None:
+        """Return the expiry time and value stored for key, if any."""
+
+    @abstractmethod
+    def store(self, key: str, expires_at: float, value: dict) -> None:
+        """Store value for key until expires_at, evicting entries if required."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove key from the cache if present."""
+
+    def get(self, key: str) -> dict | None:
+        """Retrieve an unexpired cached response.
+
+        Args:
+            key (str): Cache key from cache_key
+
+        Returns:
+            dict | None: Cached response, None on a miss
+        """
+        entry = self.load(key)
+        if entry is not None and entry[0] <= self.clock():
+            self.delete(key)
+            entry = None
+        with self.stats_lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: dict) -> None:
+        """Cache a response for the cache's TTL.
+
+        Args:
+            key (str): Cache key from cache_key
+            value (dict): JSON serialisable response to cache
+        """
+        self.store(key, self.clock() + self.ttl, value)
+
+    def stats(self) -> dict:
+        """Return the hit and miss counts since the last reset_stats."""
+        with self.stats_lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self) -> None:
+        """Reset the hit and miss counters."""
+        with self.stats_lock:
+            self.hits = 0
+            self.misses = 0
+
+
+class MemoryCache(ResponseCache):
+    """In-memory least recently used response cache."""
+
+    def __init__(
+        self, ttl: float = 300, max_entries: int = 256, clock=time.time
+    ):
+        super().__init__(ttl=ttl, max_entries=max_entries, clock=clock)
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def load(self, key: str) -> tuple[float, dict] | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def store(self, key: str, expires_at: float, value: dict) -> None:
+        with self.lock:
+            self.entries[key] = (expires_at, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+class FileCache(ResponseCache):
+    """Response cache stored as JSON files, surviving warm Lambda containers.
+
+    Entries are evicted least recently used first once either max_entries or
+    max_bytes is exceeded.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        ttl: float = 300,
+        max_entries: int = 256,
+        max_bytes: int = 50 * 1024 * 1024,
+        clock=time.time,
+    ):
+        """
+        Args:
+            directory (str | None): Directory to store responses in. Defaults
+            to guardian_cache in the system temporary directory.
+            ttl (float): Seconds a cached response stays valid. Defaults to 300.
+            max_entries (int): Maximum number of cached responses. Defaults to 256.
+            max_bytes (int): Maximum total size of cached responses. Defaults to 50MB.
+            clock (Callable): Clock in seconds. Defaults to time.time.
+        """
+        super().__init__(ttl=ttl, max_entries=max_entries, clock=clock)
+        self.directory = directory or os.path.join(
+            tempfile.gettempdir(), "guardian_cache"
+        )
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """Return the file path for key."""
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def load(self, key: str) -> tuple[float, dict] | None:
+        path = self.path(key)
+        try:
+            with open(path, encoding="utf-8") as cache_file:
+                entry = json.load(cache_file)
+            # Mark as recently used for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key:
+            return None
+        return entry["expires_at"], entry["value"]
+
+    def store(self, key: str, expires_at: float, value: dict) -> None:
+        path = self.path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(
+                {"key": key, "expires_at": expires_at, "value": value},
+                cache_file,
+            )
+        os.replace(temp_path, path)
+        self.evict()
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> None:
+        """Remove least recently used files until within the size limits."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and (
+            len(entries) > self.max_entries or total_bytes > self.max_bytes
+        ):
+            _, size, path = entries.pop(0)
+            total_bytes -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def create_cache_from_env() -> ResponseCache | None:
+    """Create the response cache configured by environment variables.
+
+    GUARDIAN_CACHE_BACKEND selects "memory", "file" or "none" (the default),
+    GUARDIAN_CACHE_TTL sets the expiry in seconds, GUARDIAN_CACHE_MAX_ENTRIES
+    the number of entries and GUARDIAN_CACHE_DIR the file cache directory.
+
+    Raises:
+        ValueError: Raised for an unknown cache backend
+
+    Returns:
+        ResponseCache | None: Configured cache, None when caching is disabled
+    """
+    backend = os.getenv("GUARDIAN_CACHE_BACKEND", "none").lower()
+    ttl = float(os.getenv("GUARDIAN_CACHE_TTL", "300"))
+    max_entries = int(os.getenv("GUARDIAN_CACHE_MAX_ENTRIES", "256"))
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryCache(ttl=ttl, max_entries=max_entries)
+    if backend == "file":
+        return FileCache(
+            directory=os.getenv("GUARDIAN_CACHE_DIR"),
+            ttl=ttl,
+            max_entries=max_entries,
+        )
+    raise ValueError(f"Unknown GUARDIAN_CACHE_BACKEND: {backend}")
@@ -0,0 +1,150 @@
+"""Columnar formatting of Guardian search results for large pages"""
+
+from collections.abc import Iterator
+
+try:
+    from src.projection import Projection
+except ImportError:
+    from projection import Projection
+
+
+class ColumnarResults:
+    """Formatted search results held as one list per output field.
+
+    Keywords of every article are stored in a single flat list, the keywords
+    of article i being keywords[keyword_offsets[i]:keyword_offsets[i + 1]].
+    Rows are only built as dicts when requested, see row and to_rows.
+    """
+
+    __slots__ = (
+        "dates",
+        "titles",
+        "urls",
+        "previews",
+        "keywords",
+        "keyword_offsets",
+    )
+
+    def __init__(self):
+        self.dates = []
+        self.titles = []
+        self.urls = []
+        self.previews = []
+        self.keywords = []
+        self.keyword_offsets = [0]
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in range(len(self.dates)):
+            yield self.row(index)
+
+    def article_keywords(self, index: int) -> list[str]:
+        """Return the keywords of one article.
+
+        Args:
+            index (int): Position of the article in the page
+
+        Returns:
+            list[str]: Keyword titles of the article
+        """
+        offsets = self.keyword_offsets
+        return self.keywords[offsets[index] : offsets[index + 1]]
+
+    def row(self, index: int) -> dict:
+        """Return one article in the format_results output format.
+
+        Args:
+            index (int): Position of the article in the page
+
+        Returns:
+            dict: Formatted article
+        """
+        return {
+            "webPublicationDate": self.dates[index],
+            "webTitle": self.titles[index],
+            "webUrl": self.urls[index],
+            "content_preview": self.previews[index],
+            "keywords": self.article_keywords(index),
+        }
+
+    def to_rows(self) -> list[dict]:
+        """Return every article in the format_results output format.
+
+        Returns:
+            list[dict]: Formatted articles, equal to format_results output
+        """
+        offsets = self.keyword_offsets
+        keywords = self.keywords
+        return [
+            {
+                "webPublicationDate": date,
+                "webTitle": title,
+                "webUrl": url,
+                "content_preview": preview,
+                "keywords": keywords[start:end],
+            }
+            for date, title, url, preview, start, end in zip(
+                self.dates,
+                self.titles,
+                self.urls,
+                self.previews,
+                offsets[:-1],
+                offsets[1:],
+                strict=True,
+            )
+        ]
+
+
+def format_results_columnar(
+    search_results: list[dict],
+    preview_length: int | None = 500,
+    projection: Projection | None = None,
+) -> ColumnarResults:
+    """Format the Guardian search content into columns in a single pass.
+
+    Equivalent to format_results without building a dict per article, each
+    required field is read directly instead of scanning every response key.
+
+    Args:
+        search_results (list[dict]): List of dictionaries containing the search
+        results from Guardian API
+        preview_length (int | None): Characters of body text kept as the content
+        preview, None keeps the full body text. Defaults to 500.
+        projection (Projection | None): Preview field, length and keywords to
+        keep, overriding preview_length. Defaults to None.
+
+    Raises:
+        KeyError: Error raised when the search results do not contain the
+        expected keys
+
+    Returns:
+        ColumnarResults: Formatted search results, one list per field
+    """
+    projection = projection or Projection(preview_length=preview_length)
+    preview = projection.preview
+    article_keywords = projection.keywords
+    columns = ColumnarResults()
+    add_date = columns.dates.append
+    add_title = columns.titles.append
+    add_url = columns.urls.append
+    add_preview = columns.previews.append
+    keywords = columns.keywords
+    add_offset = columns.keyword_offsets.append
+
+    try:
+        for response in search_results:
+            add_date(response["webPublicationDate"])
+            add_title(response["webTitle"])
+            add_url(response["webUrl"])
+            add_preview(preview(response))
+            keywords.extend(article_keywords(response))
+            add_offset(len(keywords))
+
+    except KeyError as i_exc:
+        raise KeyError(
+            f"Error formatting search results: {str(i_exc)}"
+        ) from None
+
+    return columns
@@ -0,0 +1,253 @@
+"""Long running polling of many queries at intervals adapted to each query"""
+
+import time
+import heapq
+import signal
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from src.utils import logger
+    from src.lambda_main import guardian_lambda
+except ImportError:
+    from utils import logger
+    from lambda_main import guardian_lambda
+
+
+class AdaptiveInterval:
+    """Poll interval following a query's observed article arrival rate.
+
+    The arrival rate is an exponentially weighted moving average of articles
+    per second over recent polls, and the interval is the time expected for
+    target_articles to arrive, kept between min_interval and max_interval. A
+    hot topic is polled as often as min_interval allows, while each empty poll
+    of a quiet one lowers its rate and stretches its interval towards
+    max_interval.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 60,
+        max_interval: float = 3600,
+        target_articles: float = 5,
+        smoothing: float = 0.3,
+    ):
+        """
+        Args:
+            min_interval (float): Shortest seconds between polls. Defaults
+            to 60.
+            max_interval (float): Longest seconds between polls. Defaults to
+            3600.
+            target_articles (float): Articles each poll should find. Defaults
+            to 5.
+            smoothing (float): Weight of the latest poll in the arrival rate,
+            between 0 and 1. Defaults to 0.3.
+
+        Raises:
+            ValueError: Raised for an empty interval range or a smoothing
+            outside of (0, 1]
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError(
+                "min_interval must be positive and at most max_interval, got "
+                f"{min_interval} and {max_interval}"
+            )
+        if not 0 < smoothing <= 1:
+            raise ValueError(f"smoothing must be in (0, 1], got {smoothing}")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_articles = target_articles
+        self.smoothing = smoothing
+        self.rate = None
+        self.interval = min_interval
+
+    def observe(self, articles: int, elapsed: float) -> float:
+        """Update the arrival rate with the result of a poll.
+
+        Args:
+            articles (int): New articles the poll found
+            elapsed (float): Seconds since the previous poll
+
+        Returns:
+            float: Seconds until the next poll
+        """
+        sample = articles / max(elapsed, 1e-9)
+        if self.rate is None:
+            self.rate = sample
+        else:
+            self.rate += self.smoothing * (sample - self.rate)
+        if self.rate > 0:
+            interval = self.target_articles / self.rate
+        else:
+            interval = self.interval * 2
+        self.interval = min(max(interval, self.min_interval), self.max_interval)
+        return self.interval
+
+
+class PollDaemon:
+    """Polls queries on a schedule until stopped.
+
+    Every query has its own AdaptiveInterval. Due queries are polled on a
+    thread pool of max_concurrency workers, shared by every query, so no more
+    than max_concurrency polls run at once however many queries are due.
+    stop() lets the polls in flight finish and returns from run().
+    """
+
+    def __init__(
+        self,
+        queries: list[str],
+        poll: Callable[[str], int],
+        max_concurrency: int = 4,
+        min_interval: float = 60,
+        max_interval: float = 3600,
+        target_articles: float = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            queries (list[str]): Queries to poll, duplicates are polled once
+            poll (Callable[[str], int]): Polls a query, returning the number
+            of new articles found
+            max_concurrency (int): Maximum polls running at once. Defaults
+            to 4.
+            min_interval (float): Shortest seconds between polls of a query.
+            Defaults to 60.
+            max_interval (float): Longest seconds between polls of a query.
+            Defaults to 3600.
+            target_articles (float): Articles each poll should find. Defaults
+            to 5.
+            clock (Callable[[], float]): Monotonic time in seconds. Defaults
+            to time.monotonic.
+
+        Raises:
+            ValueError: Raised when max_concurrency is less than 1
+        """
+        if max_concurrency < 1:
+            raise ValueError(
+                f"max_concurrency must be at least 1, got {max_concurrency}"
+            )
+        self.poll = poll
+        self.max_concurrency = max_concurrency
+        self.clock = clock
+        self.intervals = {
+            query: AdaptiveInterval(
+                min_interval=min_interval,
+                max_interval=max_interval,
+                target_articles=target_articles,
+            )
+            for query in dict.fromkeys(queries)
+        }
+        now = clock()
+        # (due time, query) of every query not being polled, soonest first
+        self.schedule = [(now, query) for query in self.intervals]
+        self.last_polled = dict.fromkeys(self.intervals)
+        self.in_flight = 0
+        self.stopped = False
+        self.condition = threading.Condition()
+
+    def stop(self) -> None:
+        """Stop scheduling polls, run() returns once those in flight finish."""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def poll_query(self, query: str) -> None:
+        """Poll a query and schedule its next poll from the articles found."""
+        started = self.clock()
+        try:
+            articles = self.poll(query)
+        except Exception as exc:
+            logger.error("Polling %s failed: %s", query, exc)
+            articles = 0
+        with self.condition:
+            adaptive = self.intervals[query]
+            if self.last_polled[query] is None:
+                # The first poll finds the backlog rather than new arrivals
+                interval = adaptive.interval
+            else:
+                interval = adaptive.observe(
+                    articles, started - self.last_polled[query]
+                )
+            self.last_polled[query] = started
+            heapq.heappush(self.schedule, (self.clock() + interval, query))
+            self.in_flight -= 1
+            self.condition.notify_all()
+        logger.info(
+            "Polled %(query)s, %(articles)s new articles, next poll in "
+            "%(interval).0fs",
+            {"query": query, "articles": articles, "interval": interval},
+        )
+
+    def run(self) -> None:
+        """Poll due queries until stop() is called."""
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="guardian-poll"
+        ) as executor:
+            with self.condition:
+                while not self.stopped:
+                    timeout = None
+                    if self.in_flight < self.max_concurrency and self.schedule:
+                        due, query = self.schedule[0]
+                        timeout = due - self.clock()
+                        if timeout <= 0:
+                            heapq.heappop(self.schedule)
+                            self.in_flight += 1
+                            executor.submit(self.poll_query, query)
+                            continue
+                    self.condition.wait(timeout)
+        logger.info("Poll daemon stopped")
+
+
+def poll_incremental(
+    query: str, queue_url: str, lookback_days: float | None = None
+) -> int:
+    """Send a query's articles published since its last poll to SQS.
+
+    Runs guardian_lambda in incremental mode, which reuses the process's
+    shared HTTP and SQS clients between polls. The first poll of a query
+    without a stored watermark only looks back lookback_days.
+
+    Args:
+        query (str): Terms to search for
+        queue_url (str): AWS SQS queue URL
+        lookback_days (float | None): Days searched by a first poll. Defaults
+        to GUARDIAN_INCREMENTAL_LOOKBACK_DAYS or 1.
+
+    Raises:
+        RuntimeError: Raised when the run fails
+
+    Returns:
+        int: Number of new articles sent
+    """
+    event = {"query": query, "queue_url": queue_url, "incremental": True}
+    if lookback_days is not None:
+        event["lookback_days"] = lookback_days
+    response = guardian_lambda(event, {})
+    if response["statusCode"] >= 400:
+        raise RuntimeError(response["body"]["message"])
+    return response["body"].get("data", {}).get("article_count", 0)
+
+
+def stop_on_signals(
+    daemon: PollDaemon,
+    signals: tuple[int, ...] = (signal.SIGTERM, signal.SIGINT),
+) -> dict:
+    """Stop the daemon gracefully when the process receives a signal.
+
+    Must be called from the main thread.
+
+    Args:
+        daemon (PollDaemon): Daemon to stop
+        signals (tuple[int, ...]): Signals to handle. Defaults to SIGTERM and
+        SIGINT.
+
+    Returns:
+        dict: Previous handler of each signal
+    """
+
+    def handle(signum, frame):
+        logger.info("Received %s, stopping", signal.Signals(signum).name)
+        daemon.stop()
+
+    return {signum: signal.signal(signum, handle) for signum in signals}
@@ -0,0 +1,385 @@
+"""Cross-run article de-duplication backed by rotating Bloom filters"""
+
+from __future__ import annotations
+
+import os
+import math
+import time
+import struct
+import hashlib
+import tempfile
+import threading
+from botocore.exceptions import ClientError
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import boto3
+
+try:
+    from src.utils import get_boto3_client, logger
+except ImportError:
+    from utils import get_boto3_client, logger
+
+HEADER = struct.Struct("<4sQIdQ")
+MAGIC = b"GBF1"
+
+
+class BloomFilter:
+    """Fixed size Bloom filter of string ids.
+
+    Sized for capacity ids at the given false positive rate, e.g. one million
+    ids at 0.1% takes about 1.8MB.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        created_at: float | None = None,
+    ):
+        """
+        Args:
+            capacity (int): Number of ids the filter is sized for
+            error_rate (float): False positive rate at capacity, between 0 and 1
+            created_at (float | None): Creation timestamp. Defaults to now.
+
+        Raises:
+            ValueError: Raised for a non-positive capacity or invalid error_rate
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        if not 0 < error_rate < 1:
+            raise ValueError(
+                f"error_rate must be between 0 and 1, got {error_rate}"
+            )
+        self.num_bits = math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.created_at = time.time() if created_at is None else created_at
+        self.count = 0
+
+    def positions(self, item: str) -> list[int]:
+        """Return the bit positions of item using double hashing."""
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        hash_1 = int.from_bytes(digest[:8], "little")
+        hash_2 = int.from_bytes(digest[8:], "little") | 1
+        return [
+            (hash_1 + i * hash_2) % self.num_bits
+            for i in range(self.num_hashes)
+        ]
+
+    def add(self, item: str) -> None:
+        """Add item to the filter."""
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def merge(self, other: "BloomFilter") -> bool:
+        """Add every id of another filter of the same size to this one.
+
+        The merged filter keeps the earlier creation time of the two.
+
+        Args:
+            other (BloomFilter): Filter to merge
+
+        Returns:
+            bool: True when the filters were compatible and merged
+        """
+        if (
+            other.num_bits != self.num_bits
+            or other.num_hashes != self.num_hashes
+        ):
+            return False
+        self.bits = bytearray(
+            (
+                int.from_bytes(self.bits, "little")
+                | int.from_bytes(other.bits, "little")
+            ).to_bytes(len(self.bits), "little")
+        )
+        self.count = max(self.count, other.count)
+        self.created_at = min(self.created_at, other.created_at)
+        return True
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(item)
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialise the filter to bytes."""
+        header = HEADER.pack(
+            MAGIC, self.num_bits, self.num_hashes, self.created_at, self.count
+        )
+        return header + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        """Deserialise a filter created by to_bytes.
+
+        Raises:
+            ValueError: Raised when data is not a serialised Bloom filter
+        """
+        magic, num_bits, num_hashes, created_at, count = HEADER.unpack_from(
+            data
+        )
+        if magic != MAGIC:
+            raise ValueError("Data is not a serialised Bloom filter")
+        bloom_filter = cls.__new__(cls)
+        bloom_filter.num_bits = num_bits
+        bloom_filter.num_hashes = num_hashes
+        bloom_filter.created_at = created_at
+        bloom_filter.count = count
+        bloom_filter.bits = bytearray(data[HEADER.size :])
+        return bloom_filter
+
+
+class ArticleDeduplicator:
+    """Remembers sent article ids across runs in two rotating Bloom filters.
+
+    Ids are checked against the current and previous filter. Time is split
+    into rotation periods of rotation_seconds, and each filter belongs to the
+    period it was created in, its generation. Once a new period starts the
+    current filter becomes the previous filter and a new one is started, so
+    ids are remembered for between one and two rotation periods and memory
+    use stays fixed. Filters of the same generation hold ids of the same
+    period, so those written by other processes can always be merged.
+    """
+
+    def __init__(
+        self,
+        location: str,
+        capacity: int = 1_000_000,
+        error_rate: float = 0.001,
+        rotation_seconds: float = 7 * 24 * 60 * 60,
+        s3_client: boto3.client = None,
+        clock=time.time,
+    ):
+        """
+        Args:
+            location (str): File path or s3://bucket/key the filters persist to
+            capacity (int): Ids each filter is sized for. Defaults to 1,000,000.
+            error_rate (float): False positive rate at capacity. Defaults to 0.001.
+            rotation_seconds (float): Age at which the current filter is
+            rotated. Defaults to 7 days.
+            s3_client (boto3.client): Boto3 S3 client used for s3:// locations.
+            Defaults to the shared client.
+            clock (Callable): Clock in seconds. Defaults to time.time.
+        """
+        self.location = location
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rotation_seconds = rotation_seconds
+        self.s3_client = s3_client
+        self.clock = clock
+        self.lock = threading.Lock()
+        # Whether ids were marked since the filters were last saved
+        self.dirty = False
+        self.current, self.previous = self.load()
+
+    def new_filter(self) -> BloomFilter:
+        """Create an empty filter sized for the deduplicator."""
+        return BloomFilter(
+            capacity=self.capacity,
+            error_rate=self.error_rate,
+            created_at=self.clock(),
+        )
+
+    def read(self) -> bytes | None:
+        """Read the persisted filters, None when nothing has been saved."""
+        if self.location.startswith("s3://"):
+            bucket, _, key = self.location[5:].partition("/")
+            self.s3_client = self.s3_client or get_boto3_client("s3")
+            try:
+                response = self.s3_client.get_object(Bucket=bucket, Key=key)
+            except ClientError as c_exc:
+                if c_exc.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                    return None
+                raise
+            return response["Body"].read()
+        try:
+            with open(self.location, "rb") as dedup_file:
+                return dedup_file.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, data: bytes) -> None:
+        """Persist serialised filters."""
+        if self.location.startswith("s3://"):
+            bucket, _, key = self.location[5:].partition("/")
+            self.s3_client = self.s3_client or get_boto3_client("s3")
+            self.s3_client.put_object(Bucket=bucket, Key=key, Body=data)
+            return
+        directory = os.path.dirname(os.path.abspath(self.location))
+        with tempfile.NamedTemporaryFile(
+            dir=directory, suffix=".tmp", delete=False
+        ) as temp_file:
+            temp_file.write(data)
+        os.replace(temp_file.name, self.location)
+
+    def read_filters(self) -> list[BloomFilter]:
+        """Read the persisted filters, current first, empty if none exist."""
+        data = self.read()
+        if not data:
+            return []
+        (current_size,) = struct.unpack_from("<Q", data)
+        filters = [BloomFilter.from_bytes(data[8 : 8 + current_size])]
+        if data[8 + current_size :]:
+            filters.append(BloomFilter.from_bytes(data[8 + current_size :]))
+        return filters
+
+    def load(self) -> tuple[BloomFilter, BloomFilter | None]:
+        """Load the current and previous filters, starting fresh if none exist."""
+        filters = self.read_filters()
+        if not filters:
+            return self.new_filter(), None
+        return self.combine(filters)
+
+    def generation(self, bloom_filter: BloomFilter) -> int:
+        """Return the rotation period a filter was created in."""
+        return int(bloom_filter.created_at // self.rotation_seconds)
+
+    def combine(
+        self, filters: list[BloomFilter | None]
+    ) -> tuple[BloomFilter, BloomFilter | None]:
+        """Merge filters of the same generation and keep the newest two.
+
+        Args:
+            filters (list[BloomFilter | None]): Filters to combine, the first
+            of each generation is merged into and kept when sizes differ
+
+        Returns:
+            tuple[BloomFilter, BloomFilter | None]: Current filter and the
+            previous one, None when there is no filter of the period before
+        """
+        generations = {}
+        for bloom_filter in filters:
+            if bloom_filter is None:
+                continue
+            generation = self.generation(bloom_filter)
+            kept = generations.setdefault(generation, bloom_filter)
+            if kept is not bloom_filter and not kept.merge(bloom_filter):
+                logger.warning(
+                    "Dropping a de-duplication filter of a different size, "
+                    "was GUARDIAN_DEDUP_CAPACITY or _ERROR_RATE changed?"
+                )
+        newest = max(generations)
+        return generations[newest], generations.get(newest - 1)
+
+    def save(self) -> None:
+        """Persist the current and previous filters, if ids were marked.
+
+        Filters saved by other processes since this one loaded are merged in
+        first by generation, so concurrent Lambda containers keep each other's
+        ids, even when they started without a stored file or one of them has
+        rotated. Only a save landing between this one's read and write can
+        still be overwritten. Nothing is read or written when no ids were
+        marked since the last save.
+        """
+        if not self.dirty:
+            return
+        stored = self.read_filters()
+        with self.lock:
+            self.current, self.previous = self.combine(
+                [self.current, self.previous, *stored]
+            )
+            current = self.current.to_bytes()
+            previous = self.previous.to_bytes() if self.previous else b""
+            self.dirty = False
+        try:
+            self.write(struct.pack("<Q", len(current)) + current + previous)
+        except BaseException:
+            self.dirty = True
+            raise
+
+    def rotate(self) -> None:
+        """Start a new filter once the current one's rotation period is over."""
+        now = int(self.clock() // self.rotation_seconds)
+        generation = self.generation(self.current)
+        if generation < now:
+            self.previous = self.current if generation == now - 1 else None
+            self.current = self.new_filter()
+
+    def seen(self, article_id: str) -> bool:
+        """Check whether an article id has probably been sent before."""
+        return article_id in self.current or (
+            self.previous is not None and article_id in self.previous
+        )
+
+    def filter_unseen(self, articles: list[dict]) -> list[dict]:
+        """Return the articles whose id has not been sent before.
+
+        Args:
+            articles (list[dict]): Guardian articles containing an id
+
+        Returns:
+            list[dict]: Articles not seen before, duplicates within articles
+            are also removed
+        """
+        with self.lock:
+            unseen_ids = set()
+            unseen = []
+            for article in articles:
+                article_id = article["id"]
+                if article_id in unseen_ids or self.seen(article_id):
+                    continue
+                unseen_ids.add(article_id)
+                unseen.append(article)
+            return unseen
+
+    def mark_seen(self, articles: list[dict]) -> None:
+        """Record article ids as sent.
+
+        Args:
+            articles (list[dict]): Guardian articles containing an id
+        """
+        with self.lock:
+            self.rotate()
+            for article in articles:
+                if not self.seen(article["id"]):
+                    self.current.add(article["id"])
+                    self.dirty = True
+
+
+# Reused across warm Lambda invocations, see get_deduplicator
+DEDUPLICATOR = None
+DEDUPLICATOR_LOCK = threading.Lock()
+
+
+def create_deduplicator_from_env() -> ArticleDeduplicator | None:
+    """Create the article deduplicator configured by environment variables.
+
+    GUARDIAN_DEDUP_LOCATION enables de-duplication, persisting to a file path
+    or s3://bucket/key. GUARDIAN_DEDUP_CAPACITY, GUARDIAN_DEDUP_ERROR_RATE and
+    GUARDIAN_DEDUP_ROTATION_DAYS size the filters and set their lifetime.
+
+    Returns:
+        ArticleDeduplicator | None: Configured deduplicator, None when disabled
+    """
+    location = os.getenv("GUARDIAN_DEDUP_LOCATION")
+    if not location:
+        return None
+    return ArticleDeduplicator(
+        location=location,
+        capacity=int(os.getenv("GUARDIAN_DEDUP_CAPACITY", "1000000")),
+        error_rate=float(os.getenv("GUARDIAN_DEDUP_ERROR_RATE", "0.001")),
+        rotation_seconds=float(os.getenv("GUARDIAN_DEDUP_ROTATION_DAYS", "7"))
+        * 24
+        * 60
+        * 60,
+    )
+
+
+def get_deduplicator() -> ArticleDeduplicator | None:
+    """Return the shared article deduplicator, creating it on first use.
+
+    Returns:
+        ArticleDeduplicator | None: Shared deduplicator, None when disabled
+    """
+    global DEDUPLICATOR
+    with DEDUPLICATOR_LOCK:
+        if DEDUPLICATOR is None:
+            DEDUPLICATOR = create_deduplicator_from_env()
+        return DEDUPLICATOR
@@ -4,6 +4,16 @@
 class APIError(BaseException):
     """Exception raised when an issue occurs with Guardian API interaction."""
 
+    def __init__(self, *args, retry_after: float | None = None):
+        """
+        Args:
+            *args: Exception message arguments.
+            retry_after (float | None): Seconds the server asked clients to wait
+            before retrying, from the Retry-After header. Defaults to None.
+        """
+        super().__init__(*args)
+        self.retry_after = retry_after
+
 
 class RateLimitExceededError(APIError):
     """Exception raised when the API rate limit has been exceeded."""
@@ -17,5 +27,9 @@ class ServerRequestError(APIError):
     """Exception raised for 5XX response status codes."""
 
 
+class TransportRequestError(APIError):
+    """Exception raised when a connection to the Guardian API fails."""
+
+
 class BotocoreError(BaseException):
     """Exception raised when an issue occurs with Boto3 interaction."""
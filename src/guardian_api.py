@@ -1,30 +1,74 @@
 """Functions to interact with the Guardian API"""
 
 import os
+import time
+import asyncio
+import inspect
+import threading
+import importlib.util
 import httpx
-from dotenv import load_dotenv
 from types import FunctionType
-from functools import wraps
+from contextlib import contextmanager
+from functools import cache, wraps
+from collections import deque
+from collections.abc import Callable, Generator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 
 try:
     from src.utils import logger
+    from src.projection import Projection
+    from src.response_decoder import SearchResponseDecoder, streaming_available
+    from src.singleflight import SingleFlight
+    from src.cache import cache_key, create_cache_from_env
+    from src.watermark import is_new_article
+    from src.rate_limiter import TokenBucket, backoff_delay, parse_retry_after
     from src.exceptions import (
         RateLimitExceededError,
         ServerRequestError,
         ClientRequestError,
+        TransportRequestError,
         APIError,
     )
 except ImportError:
     from utils import logger
+    from projection import Projection
+    from response_decoder import SearchResponseDecoder, streaming_available
+    from singleflight import SingleFlight
+    from cache import cache_key, create_cache_from_env
+    from watermark import is_new_article
+    from rate_limiter import TokenBucket, backoff_delay, parse_retry_after
     from exceptions import (
         RateLimitExceededError,
         ServerRequestError,
         ClientRequestError,
+        TransportRequestError,
         APIError,
     )
 
-# Load Enviroment Varaibles
-load_dotenv()
+# Load Enviroment Varaibles, Lambda provides them directly
+if not os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+SEARCH_URL = "https://content.guardianapis.com/search"
+MAX_PAGE_SIZE = 200
+
+# Shared by every request in this process, sized to the API key's quota
+GUARDIAN_RATE_LIMITER = TokenBucket.from_env()
+
+# Disabled unless GUARDIAN_CACHE_BACKEND is set, see create_cache_from_env
+RESPONSE_CACHE = create_cache_from_env()
+
+# Identical searches in flight at once share one request, see fetch_search
+SEARCH_FLIGHTS = SingleFlight()
+
+# Reused across warm Lambda invocations, see get_http_client
+HTTP_CLIENT = None
+# Number of callers using each client, see lease_http_client
+HTTP_CLIENT_LEASES = {}
+HTTP_CLIENT_LOCK = threading.Lock()
 
 
 def raise_on_status_error(response: httpx.Response) -> None:
@@ -40,23 +84,110 @@ def raise_on_status_error(response: httpx.Response) -> None:
     """
     status_code = response.status_code
     url = response.url
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
     if status_code == 429:
-        raise RateLimitExceededError(f"Rate Limit Exceeded - URL: {url}")
+        raise RateLimitExceededError(
+            f"Rate Limit Exceeded - URL: {url}", retry_after=retry_after
+        )
     if 400 <= status_code < 500:
         raise ClientRequestError(
             f"Client Side Error {status_code} - URL: {url}"
         )
     if 500 <= status_code < 600:
         raise ServerRequestError(
-            f"Server Side Error {status_code} - URL: {url}"
+            f"Server Side Error {status_code} - URL: {url}",
+            retry_after=retry_after,
+        )
+
+
+async def async_raise_on_status_error(response: httpx.Response) -> None:
+    """Async HTTPX Middleware equivalent of raise_on_status_error.
+
+    Args:
+        response (httpx.Response): httpx response object
+    """
+    raise_on_status_error(response)
+
+
+def check_retry(exc: BaseException, retries: int, max_retries: int) -> None:
+    """Log a failed request attempt and re-raise unless it should be retried.
+
+    Args:
+        exc (BaseException): Exception raised by the request attempt
+        retries (int): Number of attempts made so far
+        max_retries (int): Maximum number of attempts
+
+    Raises:
+        RateLimitExceededError: Re-raised when max_retries is reached
+        ServerRequestError: Re-raised when max_retries is reached
+        TransportRequestError: Raised for connection failures when max_retries
+        is reached
+        ClientRequestError: Re-raised immediately
+        APIError: Raised when an unexpected error occurs
+    """
+    retriable = (
+        ServerRequestError,
+        RateLimitExceededError,
+        httpx.TransportError,
+    )
+    if isinstance(exc, retriable):
+        if retries >= max_retries:
+            logger.error("Max retries reached: %s", str(exc))
+            if isinstance(exc, httpx.TransportError):
+                raise TransportRequestError(
+                    f"Connection error: {str(exc)}"
+                ) from None
+            raise exc
+        logger.warning(
+            "Retry %(retries)s/%(max_retries)s failed: %(exc)s",
+            {
+                "retries": retries,
+                "max_retries": max_retries,
+                "exc": str(exc),
+            },
         )
+        return
+    if isinstance(exc, ClientRequestError):
+        logger.error("Client error: %s", str(exc))
+        raise exc
+    if isinstance(exc, APIError):
+        raise exc
+    logger.error("Unexpected error: %s", str(exc))
+    raise APIError(f"Unexpected error: {str(exc)}") from None
+
 
+def retry_guardian_api(
+    func: FunctionType | None = None,
+    *,
+    max_retries: int = 3,
+    base_delay: float = 0.5,
+    max_delay: float = 30.0,
+    rate_limiter: TokenBucket | None = None,
+    retry_budget: float | None = None,
+) -> FunctionType:
+    """Decorator to rate limit requests, attempt retries and handle exceptions.
 
-def retry_guardian_api(func: FunctionType) -> FunctionType:
-    """Decorator to attempt retries and handle exceptions.
+    Every attempt first takes a token from the rate limiter. Retriable errors,
+    including dropped or stale connections,
+    are retried after an exponential backoff with jitter, or after the
+    Retry-After delay when the server provided one, and a rate limited
+    response slows the shared rate limiter for every caller. A call that would
+    have to wait past its retry budget, counted from its first attempt, raises
+    the error straight away rather than retrying before the server is ready.
+    Both regular and coroutine functions are supported, a coroutine function
+    is wrapped in a coroutine function. Can be applied bare or called with
+    options.
 
     Args:
-        func (FunctionType): guardian_get_articles function
+        func (FunctionType | None): guardian_get_articles function
+        max_retries (int): Maximum number of attempts. Defaults to 3.
+        base_delay (float): Backoff in seconds before the first retry. Defaults to 0.5.
+        max_delay (float): Maximum backoff in seconds. Defaults to 30.
+        rate_limiter (TokenBucket | None): Rate limiter to use. Defaults to
+        the shared GUARDIAN_RATE_LIMITER.
+        retry_budget (float | None): Seconds a call may spend from its first
+        attempt before giving up on retries. Defaults to GUARDIAN_RETRY_BUDGET
+        or 60.
 
     Raises:
         MaxRetriesExceededError: Raised when max_retries is exceeded
@@ -64,6 +195,68 @@ def retry_guardian_api(func: FunctionType) -> FunctionType:
     Returns:
         FunctionType: wrapped guardian_get_articles function
     """
+    if func is None:
+        return lambda decorated: retry_guardian_api(
+            decorated,
+            max_retries=max_retries,
+            base_delay=base_delay,
+            max_delay=max_delay,
+            rate_limiter=rate_limiter,
+            retry_budget=retry_budget,
+        )
+
+    def retry_deadline() -> float:
+        """Return the monotonic time after which a call stops retrying."""
+        budget = retry_budget
+        if budget is None:
+            budget = float(os.getenv("GUARDIAN_RETRY_BUDGET", "60"))
+        return time.monotonic() + budget
+
+    def handle_failure(
+        exc: BaseException, retries: int, deadline: float
+    ) -> float:
+        """Check a failed attempt, returning the delay before retrying."""
+        check_retry(exc, retries, max_retries)
+        delay = backoff_delay(
+            attempt=retries,
+            base_delay=base_delay,
+            max_delay=max_delay,
+            retry_after=getattr(exc, "retry_after", None),
+        )
+        if isinstance(exc, RateLimitExceededError):
+            (rate_limiter or GUARDIAN_RATE_LIMITER).on_rate_limited(delay)
+        if time.monotonic() + delay > deadline:
+            logger.error("Retry in %.1fs would exceed the retry budget", delay)
+            check_retry(exc, max_retries, max_retries)
+        return delay
+
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_request_wrapper(**kwargs) -> list[dict]:
+            """Async wrapper function to handle retries and exceptions.
+
+            Args:
+                **kwargs: Arguments to pass to the function.
+
+            Returns:
+                list[dict]: Search results from the Guardian API.
+            """
+            limiter = rate_limiter or GUARDIAN_RATE_LIMITER
+            deadline = retry_deadline()
+            retries = 0
+            while True:
+                await limiter.acquire_async()
+                try:
+                    search_results = await func(**kwargs)
+                except (APIError, Exception) as exc:
+                    retries += 1
+                    await asyncio.sleep(handle_failure(exc, retries, deadline))
+                    continue
+                limiter.on_success()
+                return search_results
+
+        return async_request_wrapper
 
     @wraps(func)
     def request_wrapper(**kwargs) -> list[dict]:
@@ -78,36 +271,445 @@ def retry_guardian_api(func: FunctionType) -> FunctionType:
         Returns:
             list[dict]: Search results from the Guardian API.
         """
+        limiter = rate_limiter or GUARDIAN_RATE_LIMITER
+        deadline = retry_deadline()
         retries = 0
-        max_retries = 3
-        while retries < max_retries:
+        while True:
+            limiter.acquire()
             try:
                 search_results = func(**kwargs)
-                return search_results
-            except (ServerRequestError, RateLimitExceededError) as retry_exc:
+            except (APIError, Exception) as exc:
                 retries += 1
-                if retries >= max_retries:
-                    logger.error("Max retries reached: %s", str(retry_exc))
-                    raise
-                logger.warning(
-                    "Retry %(retries)s/%(max_retries)s failed: %(exc)s",
-                    {
-                        "retries": retries,
-                        "max_retries": max_retries,
-                        "exc": str(retry_exc),
-                    },
-                )
-            except ClientRequestError as c_exc:
-                logger.error("Client error: %s", str(c_exc))
-                raise
-            except Exception as exc:
-                logger.error("Unexpected error: %s", str(exc))
-                raise APIError(f"Unexpected error: {str(exc)}") from None
+                time.sleep(handle_failure(exc, retries, deadline))
+                continue
+            limiter.on_success()
+            return search_results
 
     return request_wrapper
 
 
+def create_http_client() -> httpx.Client:
+    """Create an HTTPX Client configured from environment variables.
+
+    GUARDIAN_HTTP2 enables HTTP/2 when the optional h2 package is installed,
+    GUARDIAN_MAX_CONNECTIONS and GUARDIAN_MAX_KEEPALIVE size the connection pool,
+    GUARDIAN_KEEPALIVE_EXPIRY sets how long idle connections are kept open and
+    GUARDIAN_TIMEOUT / GUARDIAN_CONNECT_TIMEOUT set request timeouts in seconds.
+
+    Returns:
+        httpx.Client: Client raising custom exceptions for error status codes
+    """
+    http2 = os.getenv("GUARDIAN_HTTP2", "false").lower() in ("1", "true", "yes")
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning(
+            "GUARDIAN_HTTP2 is set but h2 is not installed, using HTTP/1.1"
+        )
+        http2 = False
+
+    return httpx.Client(
+        event_hooks={"response": [raise_on_status_error]},
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=int(os.getenv("GUARDIAN_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(
+                os.getenv("GUARDIAN_MAX_KEEPALIVE", "10")
+            ),
+            keepalive_expiry=float(
+                os.getenv("GUARDIAN_KEEPALIVE_EXPIRY", "60")
+            ),
+        ),
+        timeout=httpx.Timeout(
+            float(os.getenv("GUARDIAN_TIMEOUT", "10")),
+            connect=float(os.getenv("GUARDIAN_CONNECT_TIMEOUT", "5")),
+        ),
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """Return the shared HTTPX Client, creating it on first use.
+
+    The client is kept at module level so keep-alive connections to the
+    Guardian API survive between warm Lambda invocations. A closed client is
+    replaced with a new one. Callers sharing the client with other threads
+    should hold it with lease_http_client, so a reset cannot close it while
+    they use it.
+
+    Returns:
+        httpx.Client: Shared HTTPX Client object
+    """
+    global HTTP_CLIENT
+    with HTTP_CLIENT_LOCK:
+        if HTTP_CLIENT is None or HTTP_CLIENT.is_closed:
+            HTTP_CLIENT = create_http_client()
+        return HTTP_CLIENT
+
+
+@contextmanager
+def lease_http_client() -> Generator[httpx.Client, None, None]:
+    """Lend the shared HTTPX Client, keeping it open until it is returned.
+
+    A client replaced by reset_http_client while leased is closed when its
+    last lease is returned, rather than under the requests using it.
+
+    Yields:
+        httpx.Client: Shared HTTPX Client object
+    """
+    global HTTP_CLIENT
+    with HTTP_CLIENT_LOCK:
+        if HTTP_CLIENT is None or HTTP_CLIENT.is_closed:
+            HTTP_CLIENT = create_http_client()
+        client = HTTP_CLIENT
+        HTTP_CLIENT_LEASES[client] = HTTP_CLIENT_LEASES.get(client, 0) + 1
+    try:
+        yield client
+    finally:
+        with HTTP_CLIENT_LOCK:
+            HTTP_CLIENT_LEASES[client] -= 1
+            retired = False
+            if not HTTP_CLIENT_LEASES[client]:
+                del HTTP_CLIENT_LEASES[client]
+                retired = client is not HTTP_CLIENT
+        if retired:
+            client.close()
+
+
+def reset_http_client() -> None:
+    """Replace the shared HTTPX Client so the next request opens fresh connections.
+
+    The replaced client is closed straight away when no caller holds a lease
+    on it, otherwise when its last lease is returned.
+    """
+    global HTTP_CLIENT
+    with HTTP_CLIENT_LOCK:
+        client, HTTP_CLIENT = HTTP_CLIENT, None
+        unused = client is not None and client not in HTTP_CLIENT_LEASES
+    if unused:
+        client.close()
+
+
+def build_search_params(
+    query: str,
+    from_date: str | None = None,
+    page: int | None = None,
+    page_size: int | None = None,
+    projection: Projection | None = None,
+    to_date: str | None = None,
+    order_by: str = "newest",
+) -> dict:
+    """Build the query parameters for a Guardian /search request.
+
+    Only the fields and tags the formatted output needs are requested, see
+    Projection.
+
+    Args:
+        query (str): Terms to search for.
+        from_date (str | None): Date to search from YYYY-MM-DD format. Defaults to None.
+        page (int | None): Page of results to request. Defaults to None.
+        page_size (int | None): Number of results per page, maximum 200.
+        Defaults to None (API default of 10).
+        projection (Projection | None): Output schema deciding the show-fields
+        and show-tags parameters. Defaults to the one set by environment
+        variables.
+        to_date (str | None): Date to search to YYYY-MM-DD format, inclusive.
+        Defaults to None.
+        order_by (str): "newest", "oldest" or "relevance". Defaults to
+        "newest".
+
+    Raises:
+        ValueError: Raised when page_size is outside of 1-200.
+
+    Returns:
+        dict: Query parameters for the /search endpoint.
+    """
+    if page_size is not None and not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(
+            f"page_size must be between 1 and {MAX_PAGE_SIZE}, got {page_size}"
+        )
+    projected = (projection or Projection.from_env()).request_params()
+    params = {
+        "api-key": os.getenv("GUARDIAN_API_KEY"),
+        "q": query,
+        "from-date": from_date,
+        "to-date": to_date,
+        "show-fields": projected["show-fields"],
+        "order-by": order_by,
+        "show-tags": projected["show-tags"],
+        "page": page,
+        "page-size": page_size,
+    }
+    return {key: value for key, value in params.items() if value is not None}
+
+
+def stream_decode_enabled() -> bool:
+    """Return whether GUARDIAN_STREAM_DECODE enables streamed decoding.
+
+    Streamed responses keep only the fields format_results needs and cut the
+    preview field to GUARDIAN_PREVIEW_LENGTH while parsing, see
+    SearchResponseDecoder. Requires ijson, without it a warning is logged and
+    responses are decoded whole.
+    """
+    if os.getenv("GUARDIAN_STREAM_DECODE", "false").lower() not in (
+        "1",
+        "true",
+        "yes",
+    ):
+        return False
+    if not streaming_available():
+        warn_streaming_unavailable()
+        return False
+    return True
+
+
+@cache
+def warn_streaming_unavailable() -> None:
+    """Log once that GUARDIAN_STREAM_DECODE is set without ijson installed."""
+    logger.warning(
+        "GUARDIAN_STREAM_DECODE is set but ijson is not installed, search "
+        "responses are decoded whole"
+    )
+
+
+def search_cache_key(params: dict, trim_preview: bool = True) -> str:
+    """Return the response cache key of a search.
+
+    Streamed responses are trimmed to the preview length, which is part of
+    the key so differently trimmed responses are never shared.
+
+    Args:
+        params (dict): Query parameters from build_search_params.
+        trim_preview (bool): Whether streamed responses are trimmed to the
+        preview length. Defaults to True.
+
+    Returns:
+        str: Response cache key
+    """
+    if stream_decode_enabled() and trim_preview:
+        params = {
+            **params,
+            "preview-length": Projection.from_env().preview_length,
+        }
+    return cache_key(SEARCH_URL, params)
+
+
+def create_search_decoder(trim_preview: bool = True) -> SearchResponseDecoder:
+    """Create a streamed response decoder trimming to the configured preview.
+
+    Args:
+        trim_preview (bool): Whether to cut the preview field to the preview
+        length, otherwise every field is kept whole. Defaults to True.
+    """
+    projection = Projection.from_env()
+    return SearchResponseDecoder(
+        preview_length=projection.preview_length if trim_preview else None,
+        preview_field=projection.preview_field,
+    )
+
+
 @retry_guardian_api
+def request_search(
+    client: httpx.Client, params: dict, trim_preview: bool = True
+) -> dict:
+    """Send a /search request, retrying on failure.
+
+    With GUARDIAN_STREAM_DECODE set the response body is decoded as it is
+    received and trimmed while parsing, see SearchResponseDecoder.
+
+    Args:
+        client (httpx.Client): HTTPX Client object.
+        params (dict): Query parameters from build_search_params.
+        trim_preview (bool): Whether a streamed response has its preview field
+        cut to the preview length. Defaults to True.
+
+    Returns:
+        dict: The "response" object of the search.
+    """
+    if not stream_decode_enabled():
+        response = client.get(url=SEARCH_URL, params=params)
+        response.raise_for_status()
+        return response.json()["response"]
+    decoder = create_search_decoder(trim_preview=trim_preview)
+    with client.stream("GET", SEARCH_URL, params=params) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            decoder.feed(chunk)
+    return decoder.close()
+
+
+@retry_guardian_api
+async def request_search_async(
+    client: httpx.AsyncClient, params: dict, trim_preview: bool = True
+) -> dict:
+    """Async equivalent of request_search.
+
+    Args:
+        client (httpx.AsyncClient): HTTPX AsyncClient object.
+        params (dict): Query parameters from build_search_params.
+        trim_preview (bool): Whether a streamed response has its preview field
+        cut to the preview length. Defaults to True.
+
+    Returns:
+        dict: The "response" object of the search.
+    """
+    if not stream_decode_enabled():
+        response = await client.get(url=SEARCH_URL, params=params)
+        response.raise_for_status()
+        return response.json()["response"]
+    decoder = create_search_decoder(trim_preview=trim_preview)
+    async with client.stream("GET", SEARCH_URL, params=params) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            decoder.feed(chunk)
+    return decoder.close()
+
+
+def singleflight_enabled() -> bool:
+    """Return whether identical searches in flight share one request.
+
+    Enabled unless GUARDIAN_SINGLEFLIGHT is set to false.
+    """
+    return os.getenv("GUARDIAN_SINGLEFLIGHT", "true").lower() not in (
+        "0",
+        "false",
+        "no",
+    )
+
+
+def fetch_search(
+    client: httpx.Client, params: dict, trim_preview: bool = True
+) -> dict:
+    """Send a /search request, or wait for the identical one in flight.
+
+    Concurrent callers with the same parameters share one request, including
+    its retries, and all receive its response or its exception, see
+    SingleFlight.
+
+    Args:
+        client (httpx.Client): HTTPX Client object.
+        params (dict): Query parameters from build_search_params.
+        trim_preview (bool): Whether a streamed response has its preview field
+        cut to the preview length. Defaults to True.
+
+    Returns:
+        dict: The "response" object of the search.
+    """
+    if not singleflight_enabled():
+        return request_search(
+            client=client, params=params, trim_preview=trim_preview
+        )
+    return SEARCH_FLIGHTS.do(
+        search_cache_key(params, trim_preview=trim_preview),
+        request_search,
+        client=client,
+        params=params,
+        trim_preview=trim_preview,
+    )
+
+
+async def fetch_search_async(
+    client: httpx.AsyncClient, params: dict, trim_preview: bool = True
+) -> dict:
+    """Async equivalent of fetch_search.
+
+    Args:
+        client (httpx.AsyncClient): HTTPX AsyncClient object.
+        params (dict): Query parameters from build_search_params.
+        trim_preview (bool): Whether a streamed response has its preview field
+        cut to the preview length. Defaults to True.
+
+    Returns:
+        dict: The "response" object of the search.
+    """
+    if not singleflight_enabled():
+        return await request_search_async(
+            client=client, params=params, trim_preview=trim_preview
+        )
+    return await SEARCH_FLIGHTS.do_async(
+        search_cache_key(params, trim_preview=trim_preview),
+        request_search_async,
+        client=client,
+        params=params,
+        trim_preview=trim_preview,
+    )
+
+
+def search(
+    client: httpx.Client,
+    params: dict,
+    trim_preview: bool = True,
+    use_cache: bool = True,
+) -> dict:
+    """Retrieve a /search response, from the response cache when available.
+
+    On a cache miss identical searches in flight share one request, see
+    fetch_search.
+
+    Args:
+        client (httpx.Client): HTTPX Client object.
+        params (dict): Query parameters from build_search_params.
+        trim_preview (bool): Whether a streamed response has its preview field
+        cut to the preview length. Defaults to True.
+        use_cache (bool): Whether the response cache is read and written,
+        False for searches that must see newly published articles. Defaults
+        to True.
+
+    Returns:
+        dict: The "response" object of the search.
+    """
+    if RESPONSE_CACHE is None or not use_cache:
+        return fetch_search(
+            client=client, params=params, trim_preview=trim_preview
+        )
+    key = search_cache_key(params, trim_preview=trim_preview)
+    search_response = RESPONSE_CACHE.get(key)
+    if search_response is None:
+        search_response = fetch_search(
+            client=client, params=params, trim_preview=trim_preview
+        )
+        RESPONSE_CACHE.set(key, search_response)
+    return search_response
+
+
+async def search_async(
+    client: httpx.AsyncClient, params: dict, trim_preview: bool = True
+) -> dict:
+    """Async equivalent of search.
+
+    Args:
+        client (httpx.AsyncClient): HTTPX AsyncClient object.
+        params (dict): Query parameters from build_search_params.
+        trim_preview (bool): Whether a streamed response has its preview field
+        cut to the preview length. Defaults to True.
+
+    Returns:
+        dict: The "response" object of the search.
+    """
+    if RESPONSE_CACHE is None:
+        return await fetch_search_async(
+            client=client, params=params, trim_preview=trim_preview
+        )
+    key = search_cache_key(params, trim_preview=trim_preview)
+    search_response = RESPONSE_CACHE.get(key)
+    if search_response is None:
+        search_response = await fetch_search_async(
+            client=client, params=params, trim_preview=trim_preview
+        )
+        RESPONSE_CACHE.set(key, search_response)
+    return search_response
+
+
+def get_cache_stats() -> dict | None:
+    """Return the response cache hit and miss counts, None when disabled."""
+    if RESPONSE_CACHE is None:
+        return None
+    return RESPONSE_CACHE.stats()
+
+
+def reset_cache_stats() -> None:
+    """Reset the response cache hit and miss counts."""
+    if RESPONSE_CACHE is not None:
+        RESPONSE_CACHE.reset_stats()
+
+
 def get_articles(
     query: str, client: httpx.Client, from_date: str | None = None
 ) -> list[dict]:
@@ -122,27 +724,438 @@ def get_articles(
         list[dict]: List of Guardian articles matching the search query.
     """
 
-    url = "https://content.guardianapis.com/search"
-    api_key = os.getenv("GUARDIAN_API_KEY")
-    params = {
-        "api-key": api_key,
-        "q": query,
-        "from-date": from_date,
-        "show-fields": "bodyText",
-        "order-by": "newest",
-        "show-tags": "keyword",
-    }
-    if from_date is None:
-        params.pop("from-date")
+    params = build_search_params(query=query, from_date=from_date)
 
-    response = client.get(url=url, params=params)
-    response.raise_for_status()
-    if response.json()["response"]["total"] == 0:
+    search_response = search(client=client, params=params)
+    if search_response["total"] == 0:
         logger.warning("No articles found mentioning %s", query)
         return None
-    search_results = response.json()["response"]["results"]
+    search_results = search_response["results"]
     logger.info(
         "Successfully retrieved %(amount)s latest articles mentioning %(query)s",
         {"amount": len(search_results), "query": query},
     )
     return search_results
+
+
+async def get_articles_async(
+    query: str, client: httpx.AsyncClient, from_date: str | None = None
+) -> list[dict]:
+    """Async equivalent of get_articles, maximum 10 articles.
+
+    Args:
+        query (str): Terms to search for.
+        client (httpx.AsyncClient): HTTPX AsyncClient object.
+        from_date (str | None): Date to search from YYYY-MM-DD format. Defaults to None.
+
+    Returns:
+        list[dict]: List of Guardian articles matching the search query.
+    """
+
+    params = build_search_params(query=query, from_date=from_date)
+
+    search_response = await search_async(client=client, params=params)
+    if search_response["total"] == 0:
+        logger.warning("No articles found mentioning %s", query)
+        return None
+    search_results = search_response["results"]
+    logger.info(
+        "Successfully retrieved %(amount)s latest articles mentioning %(query)s",
+        {"amount": len(search_results), "query": query},
+    )
+    return search_results
+
+
+async def get_articles_for_queries(
+    queries: list[str],
+    client: httpx.AsyncClient,
+    from_date: str | None = None,
+    max_concurrency: int = 10,
+) -> dict[str, dict]:
+    """Retrieve the newest Guardian articles for many queries concurrently.
+
+    A failure for one query is recorded against that query and does not
+    affect the others.
+
+    Args:
+        queries (list[str]): Search terms to retrieve articles for.
+        client (httpx.AsyncClient): HTTPX AsyncClient object shared by all queries.
+        from_date (str | None): Date to search from YYYY-MM-DD format. Defaults to None.
+        max_concurrency (int): Maximum number of requests in flight. Defaults to 10.
+
+    Returns:
+        dict[str, dict]: Outcome for each unique query, a dictionary with the
+        "results" (list[dict] or None when empty) or the "error" message.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def get_query_articles(query: str) -> dict:
+        async with semaphore:
+            try:
+                search_results = await get_articles_async(
+                    query=query, client=client, from_date=from_date
+                )
+                return {"results": search_results, "error": None}
+            except APIError as api_exc:
+                return {"results": None, "error": str(api_exc)}
+
+    unique_queries = list(dict.fromkeys(queries))
+    outcomes = await asyncio.gather(
+        *(get_query_articles(query) for query in unique_queries)
+    )
+    return dict(zip(unique_queries, outcomes, strict=True))
+
+
+def search_queries(
+    queries: list[str],
+    from_date: str | None = None,
+    max_concurrency: int = 10,
+) -> dict[str, dict]:
+    """Retrieve articles for many queries over one shared HTTPX AsyncClient.
+
+    Args:
+        queries (list[str]): Search terms to retrieve articles for.
+        from_date (str | None): Date to search from YYYY-MM-DD format. Defaults to None.
+        max_concurrency (int): Maximum number of requests in flight. Defaults to 10.
+
+    Returns:
+        dict[str, dict]: Outcome for each unique query, see get_articles_for_queries.
+    """
+
+    async def run() -> dict[str, dict]:
+        async with httpx.AsyncClient(
+            event_hooks={"response": [async_raise_on_status_error]},
+            limits=httpx.Limits(max_connections=max_concurrency),
+        ) as client:
+            return await get_articles_for_queries(
+                queries=queries,
+                client=client,
+                from_date=from_date,
+                max_concurrency=max_concurrency,
+            )
+
+    return asyncio.run(run())
+
+
+def get_search_page(
+    query: str,
+    client: httpx.Client,
+    from_date: str | None = None,
+    page: int = 1,
+    page_size: int = MAX_PAGE_SIZE,
+    to_date: str | None = None,
+    order_by: str = "newest",
+    use_cache: bool = True,
+) -> dict:
+    """Retrieve a single page of Guardian search results.
+
+    Args:
+        query (str): Terms to search for.
+        client (httpx.Client): HTTPX Client object.
+        from_date (str | None): Date to search from YYYY-MM-DD format. Defaults to None.
+        page (int): Page of results to request. Defaults to 1.
+        page_size (int): Number of results per page. Defaults to 200.
+        to_date (str | None): Date to search to YYYY-MM-DD format. Defaults to None.
+        order_by (str): Order of the results. Defaults to "newest".
+        use_cache (bool): Whether the response cache is used. Defaults to True.
+
+    Returns:
+        dict: The "response" object of the search, including total, pages,
+        currentPage and results.
+    """
+    params = build_search_params(
+        query=query,
+        from_date=from_date,
+        page=page,
+        page_size=page_size,
+        to_date=to_date,
+        order_by=order_by,
+    )
+    return search(client=client, params=params, use_cache=use_cache)
+
+
+def get_article_pages(
+    query: str,
+    client: httpx.Client,
+    from_date: str | None = None,
+    page_size: int = MAX_PAGE_SIZE,
+    max_pages: int | None = None,
+    max_articles: int | None = None,
+    start_page: int = 1,
+    should_stop: Callable[[], bool] | None = None,
+    to_date: str | None = None,
+    order_by: str = "newest",
+    use_cache: bool = True,
+) -> Generator[list[dict], None, int | None]:
+    """Lazily retrieve Guardian articles referencing query, one page at a time.
+
+    Pages are requested only as the generator is consumed, so at most one page
+    of results is held in memory. Iteration stops on the final page reported by
+    the API or when max_pages or max_articles is reached, whichever is first.
+
+    Args:
+        query (str): Terms to search for.
+        client (httpx.Client): HTTPX Client object.
+        from_date (str | None): Date to search from YYYY-MM-DD format. Defaults to None.
+        page_size (int): Number of results per page, maximum 200. Defaults to 200.
+        max_pages (int | None): Maximum number of pages to retrieve. Defaults to None.
+        max_articles (int | None): Maximum number of articles to yield. Defaults to None.
+        start_page (int): First page to retrieve. Defaults to 1.
+        should_stop (Callable[[], bool] | None): Checked before each further
+        page is requested, returning True stops iteration early. Defaults to None.
+        to_date (str | None): Date to search to YYYY-MM-DD format. Defaults to None.
+        order_by (str): Order of the results. Defaults to "newest".
+        use_cache (bool): Whether the response cache is used. Defaults to True.
+
+    Yields:
+        list[dict]: Guardian articles for each page of search results.
+
+    Returns:
+        int | None: Page to resume from when stopped early by should_stop,
+        otherwise None.
+    """
+    if max_articles is not None:
+        page_size = max(1, min(page_size, max_articles))
+
+    page = start_page
+    article_count = 0
+    while True:
+        search_response = get_search_page(
+            query=query,
+            client=client,
+            from_date=from_date,
+            page=page,
+            page_size=page_size,
+            to_date=to_date,
+            order_by=order_by,
+            use_cache=use_cache,
+        )
+        if search_response["total"] == 0:
+            logger.warning("No articles found mentioning %s", query)
+            return None
+
+        search_results = search_response["results"]
+        if max_articles is not None:
+            search_results = search_results[: max_articles - article_count]
+        article_count += len(search_results)
+        logger.info(
+            "Successfully retrieved page %(page)s/%(pages)s of articles "
+            "mentioning %(query)s",
+            {
+                "page": search_response["currentPage"],
+                "pages": search_response["pages"],
+                "query": query,
+            },
+        )
+        yield search_results
+
+        if search_response["currentPage"] >= search_response["pages"]:
+            return None
+        if max_pages is not None and page - start_page + 1 >= max_pages:
+            return None
+        if max_articles is not None and article_count >= max_articles:
+            return None
+        page += 1
+        if should_stop is not None and should_stop():
+            return page
+
+
+def get_new_article_pages(
+    query: str,
+    client: httpx.Client,
+    watermark: dict | None,
+    from_date: str | None = None,
+    page_size: int = MAX_PAGE_SIZE,
+    max_pages: int | None = None,
+    start_page: int = 1,
+    should_stop: Callable[[], bool] | None = None,
+    to_date: str | None = None,
+) -> Generator[list[dict], None, int | None]:
+    """Retrieve only the Guardian articles published after a watermark.
+
+    The search starts from the watermark's publication date and, as results
+    are ordered newest first, paging stops at the first page reaching articles
+    older than the watermark. Articles already seen at the watermark are dropped.
+    Searches bypass the response cache, which would serve a poll the pages an
+    earlier poll saw and hide the articles published since.
+
+    Args:
+        query (str): Terms to search for.
+        client (httpx.Client): HTTPX Client object.
+        watermark (dict | None): {published, ids} of the previous run, None to
+        retrieve everything from from_date.
+        from_date (str | None): Date to search from when there is no watermark.
+        Defaults to None.
+        page_size (int): Number of results per page, maximum 200. Defaults to 200.
+        max_pages (int | None): Maximum number of pages to retrieve. Defaults to None.
+        start_page (int): First page to retrieve. Defaults to 1.
+        should_stop (Callable[[], bool] | None): Checked before each further
+        page is requested, returning True stops iteration early. Defaults to None.
+        to_date (str | None): Latest publication date or time to search to.
+        Defaults to None.
+
+    Yields:
+        list[dict]: New Guardian articles for each page of search results.
+
+    Returns:
+        int | None: Page to resume from when stopped early by should_stop,
+        otherwise None.
+    """
+    if watermark is not None:
+        from_date = watermark["published"][:10]
+
+    pages = get_article_pages(
+        query=query,
+        client=client,
+        from_date=from_date,
+        page_size=page_size,
+        max_pages=max_pages,
+        start_page=start_page,
+        should_stop=should_stop,
+        to_date=to_date,
+        use_cache=False,
+    )
+    while True:
+        try:
+            search_results = next(pages)
+        except StopIteration as stop:
+            return stop.value
+        new_results = [
+            article
+            for article in search_results
+            if is_new_article(article, watermark)
+        ]
+        if new_results:
+            yield new_results
+        if watermark is not None and any(
+            article["webPublicationDate"] < watermark["published"]
+            for article in search_results
+        ):
+            pages.close()
+            return None
+
+
+def get_article_pages_concurrently(
+    query: str,
+    client: httpx.Client,
+    from_date: str | None = None,
+    page_size: int = MAX_PAGE_SIZE,
+    max_pages: int | None = None,
+    max_articles: int | None = None,
+    max_in_flight: int = 4,
+    start_page: int = 1,
+    should_stop: Callable[[], bool] | None = None,
+    to_date: str | None = None,
+) -> Generator[list[dict], None, int | None]:
+    """Retrieve Guardian articles referencing query, fetching pages in parallel.
+
+    The first page is fetched to discover the total number of pages, the
+    remaining pages are then requested on a thread pool with at most
+    max_in_flight requests outstanding. Pages are yielded in page order and
+    each request passes through the same retry handling as get_search_page.
+
+    Args:
+        query (str): Terms to search for.
+        client (httpx.Client): HTTPX Client object, shared between threads.
+        from_date (str | None): Date to search from YYYY-MM-DD format. Defaults to None.
+        page_size (int): Number of results per page, maximum 200. Defaults to 200.
+        max_pages (int | None): Maximum number of pages to retrieve. Defaults to None.
+        max_articles (int | None): Maximum number of articles to yield. Defaults to None.
+        max_in_flight (int): Maximum number of concurrent requests. Defaults to 4.
+        start_page (int): First page to retrieve. Defaults to 1.
+        should_stop (Callable[[], bool] | None): Checked before each further
+        page is requested, returning True stops requesting pages and yields
+        those already in flight. Defaults to None.
+        to_date (str | None): Latest publication date or time to search to.
+        Defaults to None.
+
+    Raises:
+        ValueError: Raised when max_in_flight is less than 1.
+
+    Yields:
+        list[dict]: Guardian articles for each page of search results.
+
+    Returns:
+        int | None: Page to resume from when stopped early by should_stop,
+        otherwise None.
+    """
+    if max_in_flight < 1:
+        raise ValueError(
+            f"max_in_flight must be at least 1, got {max_in_flight}"
+        )
+    if max_articles is not None:
+        page_size = max(1, min(page_size, max_articles))
+
+    search_response = get_search_page(
+        query=query,
+        client=client,
+        from_date=from_date,
+        page=start_page,
+        page_size=page_size,
+        to_date=to_date,
+    )
+    if search_response["total"] == 0:
+        logger.warning("No articles found mentioning %s", query)
+        return None
+
+    last_page = search_response["pages"]
+    if max_pages is not None:
+        last_page = min(last_page, start_page + max_pages - 1)
+    if max_articles is not None:
+        last_page = min(
+            last_page, start_page - 1 + -(-max_articles // page_size)
+        )
+    logger.info(
+        "Retrieving %(pages)s pages of articles mentioning %(query)s with "
+        "%(max_in_flight)s requests in flight",
+        {"pages": last_page, "query": query, "max_in_flight": max_in_flight},
+    )
+
+    article_count = 0
+
+    def limit_articles(search_results: list[dict]) -> list[dict]:
+        nonlocal article_count
+        if max_articles is not None:
+            search_results = search_results[: max_articles - article_count]
+        article_count += len(search_results)
+        return search_results
+
+    yield limit_articles(search_response["results"])
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_in_flight, thread_name_prefix="guardian-page"
+    )
+
+    def submit(page: int):
+        return executor.submit(
+            get_search_page,
+            query=query,
+            client=client,
+            from_date=from_date,
+            page=page,
+            page_size=page_size,
+            to_date=to_date,
+        )
+
+    try:
+        pending_pages = iter(range(start_page + 1, last_page + 1))
+        resume_page = None
+        in_flight = deque()
+        if should_stop is None or not should_stop():
+            in_flight.extend(
+                submit(page) for page in islice(pending_pages, max_in_flight)
+            )
+        while in_flight:
+            search_response = in_flight.popleft().result()
+            if resume_page is None:
+                next_page = next(pending_pages, None)
+                if next_page is not None and should_stop and should_stop():
+                    resume_page = next_page
+                elif next_page is not None:
+                    in_flight.append(submit(next_page))
+            yield limit_articles(search_response["results"])
+        if resume_page is None:
+            resume_page = next(pending_pages, None)
+        return resume_page
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
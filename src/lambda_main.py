@@ -1,104 +1,855 @@
 """AWS Lambda function to retrieve Guardian articles, format the response and send to SQS Queue"""
 
-import boto3
-import httpx
+from __future__ import annotations
+
+import os
 from botocore.exceptions import ClientError
+from collections.abc import Callable, Generator, Iterator
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import boto3
 
 try:
-    from src.guardian_api import get_articles, raise_on_status_error
+    from src.guardian_api import (
+        get_articles,
+        search_queries,
+        get_article_pages,
+        get_article_pages_concurrently,
+        get_new_article_pages,
+        lease_http_client,
+        reset_http_client,
+        get_cache_stats,
+        reset_cache_stats,
+        MAX_PAGE_SIZE,
+    )
     from src.utils import (
         format_results,
-        update_message_retention,
-        send_queue_message,
+        send_queue_messages,
+        get_boto3_client,
+        DEFAULT_MESSAGE_BUDGET,
+    )
+    from src.multiplex import search_queries_multiplexed
+    from src.backfill import (
+        run_backfill,
+        BackfillCheckpoint,
+        Shard,
+        DEFAULT_PAGE_BUDGET,
     )
+    from src.serializers import get_serializer
+    from src.projection import Projection
+    from src.queue_config import ensure_queue_config
+    from src.pipeline import run_pipeline, SKIP
+    from src.watermark import (
+        advance_watermark,
+        first_run_from_date,
+        get_watermark_store,
+    )
+    from src.dedup import get_deduplicator
     from src.exceptions import (
         APIError,
         ClientRequestError,
         ServerRequestError,
+        TransportRequestError,
         BotocoreError,
         RateLimitExceededError,
     )
 except ImportError:
-    from guardian_api import get_articles, raise_on_status_error
+    from guardian_api import (
+        get_articles,
+        search_queries,
+        get_article_pages,
+        get_article_pages_concurrently,
+        get_new_article_pages,
+        lease_http_client,
+        reset_http_client,
+        get_cache_stats,
+        reset_cache_stats,
+        MAX_PAGE_SIZE,
+    )
     from utils import (
         format_results,
-        update_message_retention,
-        send_queue_message,
+        send_queue_messages,
+        get_boto3_client,
+        DEFAULT_MESSAGE_BUDGET,
+    )
+    from multiplex import search_queries_multiplexed
+    from backfill import (
+        run_backfill,
+        BackfillCheckpoint,
+        Shard,
+        DEFAULT_PAGE_BUDGET,
     )
+    from serializers import get_serializer
+    from projection import Projection
+    from queue_config import ensure_queue_config
+    from pipeline import run_pipeline, SKIP
+    from watermark import (
+        advance_watermark,
+        first_run_from_date,
+        get_watermark_store,
+    )
+    from dedup import get_deduplicator
     from exceptions import (
         APIError,
         ClientRequestError,
         ServerRequestError,
+        TransportRequestError,
         BotocoreError,
         RateLimitExceededError,
     )
 
+# Pages waiting between the fetch, format and send stages of a pipeline
+PIPELINE_BUFFER = int(os.getenv("GUARDIAN_PIPELINE_BUFFER", "2"))
+
 
-def guardian_lambda(event: dict, context: dict) -> dict:
-    """_summary_
+def drop_sent_articles(search_results: list[dict]) -> list[dict]:
+    """Remove articles already sent by a previous run, if de-duplication is enabled.
 
     Args:
-        event (dict): {query, date_from, queue_url}
-        context (dict): _description_
+        search_results (list[dict]): Search results from Guardian API
 
     Returns:
-        dict: _description_
+        list[dict]: Search results not sent before
     """
+    deduplicator = get_deduplicator()
+    if deduplicator is None:
+        return search_results
+    return deduplicator.filter_unseen(search_results)
 
-    try:
-        # Retrieve Guardian articles
-        with httpx.Client(
-            event_hooks={"response": [raise_on_status_error]}
-        ) as client:
-            search_results = get_articles(
-                query=event["query"],
-                from_date=event["from_date"],
-                client=client,
+
+def mark_articles_sent(search_results: list[dict]) -> None:
+    """Record articles as sent, if de-duplication is enabled.
+
+    Args:
+        search_results (list[dict]): Search results sent to the SQS queue
+    """
+    deduplicator = get_deduplicator()
+    if deduplicator is not None:
+        deduplicator.mark_seen(search_results)
+
+
+def send_articles(
+    queue_url: str, formatted_results: list[dict], sqs_client: boto3.client
+) -> list[str]:
+    """Send formatted articles to the SQS queue with the configured encoding.
+
+    GUARDIAN_MESSAGE_COMPRESSION selects "gzip" or "zstd" message compression
+    and GUARDIAN_COMPRESSION_THRESHOLD the minimum message size to compress.
+    GUARDIAN_CLAIM_CHECK_BUCKET stores messages larger than
+    GUARDIAN_CLAIM_CHECK_THRESHOLD bytes in S3, sending a pointer instead.
+    GUARDIAN_MESSAGE_SERIALIZER selects "json", "orjson", "msgpack" or "auto"
+    serialization of the articles.
+
+    Args:
+        queue_url (str): AWS SQS queue URL
+        formatted_results (list[dict]): Formatted search results
+        sqs_client (boto3.client): Boto3 SQS client
+
+    Returns:
+        list[str]: Message IDs of the sent messages
+    """
+    compression = os.getenv("GUARDIAN_MESSAGE_COMPRESSION", "none").lower()
+    return send_queue_messages(
+        queue_url=queue_url,
+        message_id="guardian_content",
+        message_body=formatted_results,
+        sqs_client=sqs_client,
+        compression=None if compression == "none" else compression,
+        compression_threshold=int(
+            os.getenv("GUARDIAN_COMPRESSION_THRESHOLD", "1024")
+        ),
+        claim_check_bucket=os.getenv("GUARDIAN_CLAIM_CHECK_BUCKET") or None,
+        claim_check_threshold=int(
+            os.getenv(
+                "GUARDIAN_CLAIM_CHECK_THRESHOLD", str(DEFAULT_MESSAGE_BUDGET)
             )
+        ),
+        serializer=get_serializer(
+            os.getenv("GUARDIAN_MESSAGE_SERIALIZER", "json")
+        ),
+    )
+
+
+def deadline_from_context(context) -> Callable[[], bool] | None:
+    """Build a check for whether the invocation is about to time out.
 
-        if search_results is None:
-            return {
-                "statusCode": 204,
-                "body": {
-                    "message": f"No articles found mentioning {event['query']}"
-                },
-            }
-
-        # Format search results
-        formatted_results = format_results(search_results=search_results)
-
-        # Message Broker
-        sqs_client = boto3.client("sqs")
-        # Update SQS Queue message retention if required
-        update_message_retention(
-            queue_url=event["queue_url"], sqs_client=sqs_client
+    GUARDIAN_TIME_RESERVE_MS sets how many milliseconds before the deadline to
+    stop requesting pages, leaving time to send those already fetched.
+
+    Args:
+        context (LambdaContext | dict): Lambda context object
+
+    Returns:
+        Callable[[], bool] | None: Returns True once the remaining time is
+        below the reserve, None when context has no deadline
+    """
+    get_remaining_time = getattr(context, "get_remaining_time_in_millis", None)
+    if get_remaining_time is None:
+        return None
+    reserve_ms = float(os.getenv("GUARDIAN_TIME_RESERVE_MS", "2000"))
+    return lambda: get_remaining_time() < reserve_ms
+
+
+def track_resume_page(
+    pages: Generator[list[dict], None, int | None], progress: dict
+) -> Iterator[list[dict]]:
+    """Pass pages through, recording the page to resume from in progress."""
+    progress["resume_page"] = yield from pages
+
+
+def pinned_to_date(event: dict) -> str:
+    """Return the publication time every invocation of a paged run searches to.
+
+    Results are ordered newest first, so an article published between two
+    invocations would shift every page after it and a continuation would
+    resume at the wrong article. The first invocation pins the time it
+    started, which its continuation carries as to_date.
+
+    Args:
+        event (dict): Lambda event, or continuation carrying to_date
+
+    Returns:
+        str: ISO 8601 publication time to search to
+    """
+    return event.get("to_date") or datetime.now(timezone.utc).strftime(
+        "%Y-%m-%dT%H:%M:%SZ"
+    )
+
+
+def send_article_pages(
+    pages: Iterator[list[dict]], queue_url: str, sqs_client: boto3.client
+) -> tuple[list[str], int]:
+    """Format each page of search results and send it to the SQS queue.
+
+    Fetching, formatting and sending run as a pipeline, so the next page is
+    fetched while earlier pages are formatted and sent. At most
+    PIPELINE_BUFFER pages wait between stages.
+
+    Args:
+        pages (Iterator[list[dict]]): Pages of search results from Guardian API
+        queue_url (str): AWS SQS queue URL
+        sqs_client (boto3.client): Boto3 SQS client
+
+    Returns:
+        tuple[list[str], int]: Message IDs of the sent messages and the number
+        of articles sent
+    """
+    # Articles queued to send but not yet recorded by the deduplicator
+    queued_ids = set()
+    deduplicating = get_deduplicator() is not None
+    projection = Projection.from_env()
+
+    def prepare(search_results: list[dict]) -> tuple:
+        search_results = drop_sent_articles(search_results)
+        if deduplicating:
+            search_results = [
+                article
+                for article in search_results
+                if article["id"] not in queued_ids
+            ]
+            queued_ids.update(article["id"] for article in search_results)
+        if not search_results:
+            return SKIP
+        formatted_results = format_results(
+            search_results=search_results, projection=projection
+        )
+        return search_results, formatted_results
+
+    def send(prepared: tuple) -> tuple[list[str], int]:
+        search_results, formatted_results = prepared
+        message_ids = send_articles(
+            queue_url=queue_url,
+            formatted_results=formatted_results,
+            sqs_client=sqs_client,
+        )
+        mark_articles_sent(search_results)
+        return message_ids, len(formatted_results)
+
+    sent = run_pipeline(
+        source=pages, stages=[prepare, send], max_buffered=PIPELINE_BUFFER
+    )
+    message_ids = [message_id for ids, _ in sent for message_id in ids]
+    return message_ids, sum(count for _, count in sent)
+
+
+def guardian_paginated_lambda(
+    event: dict, should_stop: Callable[[], bool] | None = None
+) -> dict:
+    """Stream every page of Guardian search results to the SQS queue.
+
+    When should_stop signals the invocation is running out of time no further
+    pages are requested, pages already fetched are sent and a 206 response
+    returns a continuation to resume from.
+
+    Args:
+        event (dict): {query, from_date, queue_url, max_pages, max_articles,
+        page_size, max_in_flight} or a continuation's {start_page, to_date}
+        should_stop (Callable[[], bool] | None): Deadline check. Defaults to None.
+
+    Returns:
+        dict: Lambda response containing the sent message IDs
+    """
+    sqs_client = get_boto3_client("sqs")
+    ensure_queue_config(queue_url=event["queue_url"], sqs_client=sqs_client)
+
+    start_page = event.get("start_page", 1)
+    with lease_http_client() as client:
+        page_kwargs = {
+            "query": event["query"],
+            "from_date": event.get("from_date"),
+            "to_date": pinned_to_date(event),
+            "client": client,
+            "page_size": event.get("page_size", MAX_PAGE_SIZE),
+            "max_pages": event.get("max_pages"),
+            "max_articles": event.get("max_articles"),
+            "start_page": start_page,
+            "should_stop": should_stop,
+        }
+        if event.get("max_in_flight", 1) > 1:
+            pages = get_article_pages_concurrently(
+                **page_kwargs, max_in_flight=event["max_in_flight"]
+            )
+        else:
+            pages = get_article_pages(**page_kwargs)
+        progress = {"resume_page": None}
+        message_ids, article_count = send_article_pages(
+            pages=track_resume_page(pages, progress),
+            queue_url=event["queue_url"],
+            sqs_client=sqs_client,
+        )
+
+    if progress["resume_page"] is not None:
+        resume_page = progress["resume_page"]
+        continuation = {
+            key: event[key]
+            for key in ("query", "from_date", "page_size", "max_in_flight")
+            if event.get(key) is not None
+        }
+        continuation.update(
+            start_page=resume_page, to_date=page_kwargs["to_date"]
         )
+        if event.get("max_pages") is not None:
+            continuation["max_pages"] = event["max_pages"] - (
+                resume_page - start_page
+            )
+        if event.get("max_articles") is not None:
+            fetched_page_size = max(
+                1, min(page_kwargs["page_size"], event["max_articles"])
+            )
+            continuation["max_articles"] = event["max_articles"] - (
+                (resume_page - start_page) * fetched_page_size
+            )
+        return partial_response(event, message_ids, article_count, continuation)
+
+    if not message_ids:
+        return {
+            "statusCode": 204,
+            "body": {
+                "message": f"No articles found mentioning {event['query']}"
+            },
+        }
+
+    return {
+        "statusCode": 200,
+        "body": {
+            "message": f"Succesfully sent {article_count} articles from "
+            f"'{event['query']}' query to {event['queue_url'].split('/')[-1]}",
+            "data": {
+                "message_ids": message_ids,
+                "article_count": article_count,
+            },
+        },
+    }
+
+
+def partial_response(
+    event: dict, message_ids: list[str], article_count: int, continuation: dict
+) -> dict:
+    """Build the response of a run stopped early by the time limit.
+
+    Args:
+        event (dict): Lambda event
+        message_ids (list[str]): Message IDs sent so far
+        article_count (int): Number of articles sent so far
+        continuation (dict): Event fields to resume from
+
+    Returns:
+        dict: 206 Lambda response containing the continuation
+    """
+    return {
+        "statusCode": 206,
+        "body": {
+            "message": f"Sent {article_count} articles from '{event['query']}'"
+            f" query to {event['queue_url'].split('/')[-1]} before the time "
+            "limit, invoke again with the continuation to resume",
+            "data": {
+                "message_ids": message_ids,
+                "article_count": article_count,
+                "continuation": continuation,
+            },
+        },
+    }
+
+
+def guardian_incremental_lambda(
+    event: dict, should_stop: Callable[[], bool] | None = None
+) -> dict:
+    """Send only the articles published since the query's previous run to SQS.
+
+    The query's watermark, its latest publication time and the ids seen at
+    that time, is read from the watermark store and only advanced once every
+    new article has been sent. A run stopped early by should_stop leaves the
+    stored watermark unchanged and returns a continuation carrying both the
+    watermark being filtered against and the one reached so far.
+
+    The first run of a query, without a stored watermark, searches from
+    from_date or, when it is not given, the last lookback_days days, see
+    first_run_from_date, rather than the query's whole archive.
+
+    Args:
+        event (dict): {query, queue_url, incremental} with optional
+        {from_date, lookback_days, page_size, max_pages}, from_date and
+        lookback_days are only used on the first run, or a continuation's
+        {start_page, to_date, watermark, next_watermark}
+        should_stop (Callable[[], bool] | None): Deadline check. Defaults to None.
+
+    Returns:
+        dict: Lambda response containing the sent message IDs and new watermark
+    """
+    watermark_store = get_watermark_store()
+    if "start_page" in event:
+        watermark = event.get("watermark")
+        latest_watermark = event.get("next_watermark", watermark)
+    else:
+        watermark = watermark_store.get(event["query"])
+        latest_watermark = watermark
+    from_date = event.get("from_date")
+    if watermark is None and from_date is None:
+        from_date = first_run_from_date(event.get("lookback_days"))
+
+    def track_watermark(pages: Iterator[list[dict]]) -> Iterator[list[dict]]:
+        nonlocal latest_watermark
+        for search_results in pages:
+            latest_watermark = advance_watermark(
+                latest_watermark, search_results
+            )
+            yield search_results
 
-        # Send formatted data to SQS Queue
-        message_id = send_queue_message(
+    sqs_client = get_boto3_client("sqs")
+    ensure_queue_config(queue_url=event["queue_url"], sqs_client=sqs_client)
+
+    start_page = event.get("start_page", 1)
+    to_date = pinned_to_date(event)
+    with lease_http_client() as client:
+        pages = get_new_article_pages(
+            query=event["query"],
+            client=client,
+            watermark=watermark,
+            from_date=from_date,
+            page_size=event.get("page_size", MAX_PAGE_SIZE),
+            max_pages=event.get("max_pages"),
+            start_page=start_page,
+            should_stop=should_stop,
+            to_date=to_date,
+        )
+        progress = {"resume_page": None}
+        message_ids, article_count = send_article_pages(
+            pages=track_watermark(track_resume_page(pages, progress)),
             queue_url=event["queue_url"],
-            message_id="guardian_content",
-            message_body=formatted_results,
             sqs_client=sqs_client,
         )
 
+    if progress["resume_page"] is not None:
+        resume_page = progress["resume_page"]
+        continuation = {
+            key: event[key]
+            for key in ("query", "page_size")
+            if event.get(key) is not None
+        }
+        if from_date is not None:
+            continuation["from_date"] = from_date
+        continuation.update(
+            incremental=True,
+            start_page=resume_page,
+            to_date=to_date,
+            watermark=watermark,
+            next_watermark=latest_watermark,
+        )
+        if event.get("max_pages") is not None:
+            continuation["max_pages"] = event["max_pages"] - (
+                resume_page - start_page
+            )
+        return partial_response(event, message_ids, article_count, continuation)
+
+    if latest_watermark != watermark:
+        watermark_store.set(event["query"], latest_watermark)
+
+    if not message_ids:
         return {
-            "statusCode": 200,
+            "statusCode": 204,
             "body": {
-                "message": f"Succesfully sent articles from '{event['query']}'"
-                f" query to {event['queue_url'].split('/')[-1]}",
-                "data": {
-                    "message_id": message_id,
-                },
+                "message": f"No new articles found mentioning {event['query']}"
             },
         }
 
+    return {
+        "statusCode": 200,
+        "body": {
+            "message": f"Succesfully sent {article_count} new articles from "
+            f"'{event['query']}' query to {event['queue_url'].split('/')[-1]}",
+            "data": {
+                "message_ids": message_ids,
+                "article_count": article_count,
+                "watermark": latest_watermark,
+            },
+        },
+    }
+
+
+def guardian_batch_lambda(event: dict) -> dict:
+    """Retrieve articles for many queries concurrently and send each to SQS.
+
+    Each query is reported individually as succeeded, empty or failed so that
+    a single bad query does not fail the batch. With multiplex set, queries
+    are packed into combined OR searches and the results routed back to each
+    query locally, see search_queries_multiplexed.
+
+    Args:
+        event (dict): {queries, from_date, queue_url, max_concurrency,
+        multiplex, max_url_length, max_pages}
+
+    Returns:
+        dict: Lambda response containing the outcome of every query
+    """
+    if event.get("multiplex"):
+        outcomes = search_queries_multiplexed(
+            queries=event["queries"],
+            from_date=event.get("from_date"),
+            max_url_length=event.get("max_url_length"),
+            max_pages=event.get("max_pages", 1),
+            max_concurrency=event.get("max_concurrency", 10),
+        )
+    else:
+        outcomes = search_queries(
+            queries=event["queries"],
+            from_date=event.get("from_date"),
+            max_concurrency=event.get("max_concurrency", 10),
+        )
+
+    succeeded = {}
+    empty = []
+    failed = {}
+    sqs_client = None
+    for query, outcome in outcomes.items():
+        if outcome["error"] is not None:
+            failed[query] = (
+                f"Error retrieving data from Guardian API: {outcome['error']}"
+            )
+            continue
+        search_results = drop_sent_articles(outcome["results"] or [])
+        if not search_results:
+            empty.append(query)
+            continue
+        try:
+            formatted_results = format_results(
+                search_results=search_results,
+                projection=Projection.from_env(),
+            )
+            if sqs_client is None:
+                sqs_client = get_boto3_client("sqs")
+                ensure_queue_config(
+                    queue_url=event["queue_url"], sqs_client=sqs_client
+                )
+            succeeded[query] = send_articles(
+                queue_url=event["queue_url"],
+                formatted_results=formatted_results,
+                sqs_client=sqs_client,
+            )
+            mark_articles_sent(search_results)
+        except KeyError as format_exc:
+            failed[query] = (
+                f"Error formatting search results: {str(format_exc)}"
+            )
+        except (ClientError, BotocoreError) as boto_exc:
+            failed[query] = (
+                f"Error interacting with AWS services: {str(boto_exc)}"
+            )
+
+    if not failed:
+        status_code = 200
+    elif succeeded or empty:
+        status_code = 207
+    else:
+        status_code = 500
+
+    return {
+        "statusCode": status_code,
+        "body": {
+            "message": f"Processed {len(outcomes)} queries: {len(succeeded)} "
+            f"succeeded, {len(empty)} empty, {len(failed)} failed",
+            "data": {
+                "succeeded": succeeded,
+                "empty": empty,
+                "failed": failed,
+                "truncated": [
+                    query
+                    for query, outcome in outcomes.items()
+                    if outcome.get("truncated")
+                ],
+            },
+        },
+    }
+
+
+def guardian_backfill_lambda(
+    event: dict, should_stop: Callable[[], bool] | None = None
+) -> dict:
+    """Send every article matching a query between two dates to SQS.
+
+    The date range is split into shards fetched in parallel and sent in date
+    order, see run_backfill. Progress is saved to the checkpoint file when
+    one is given. A run stopped by the time limit returns the shards left to
+    send and the page to resume the first of them from as a continuation.
+
+    Args:
+        event (dict): {query, from_date, to_date, queue_url, backfill} with
+        optional {checkpoint, page_budget, page_size, max_workers, shards,
+        page}
+        should_stop (Callable[[], bool] | None): Returns True once the run
+        should stop requesting pages. Defaults to None.
+
+    Returns:
+        dict: Lambda response containing the sent message IDs
+    """
+    sqs_client = get_boto3_client("sqs")
+    ensure_queue_config(queue_url=event["queue_url"], sqs_client=sqs_client)
+    projection = Projection.from_env()
+    message_ids = []
+
+    def send(shard: Shard, search_results: list[dict]) -> None:
+        search_results = drop_sent_articles(search_results)
+        if not search_results:
+            return
+        message_ids.extend(
+            send_articles(
+                queue_url=event["queue_url"],
+                formatted_results=format_results(
+                    search_results=search_results, projection=projection
+                ),
+                sqs_client=sqs_client,
+            )
+        )
+        mark_articles_sent(search_results)
+
+    with lease_http_client() as client:
+        summary = run_backfill(
+            query=event["query"],
+            from_date=event["from_date"],
+            to_date=event["to_date"],
+            send=send,
+            client=client,
+            checkpoint=BackfillCheckpoint(event["checkpoint"])
+            if event.get("checkpoint")
+            else None,
+            shards=[Shard(*shard) for shard in event["shards"]]
+            if event.get("shards") is not None
+            else None,
+            page_budget=event.get("page_budget", DEFAULT_PAGE_BUDGET),
+            page_size=event.get("page_size", MAX_PAGE_SIZE),
+            max_workers=event.get("max_workers", 4),
+            should_stop=should_stop,
+            start_page=event.get("page", 1),
+        )
+
+    if summary["remaining"]:
+        continuation = {
+            key: event[key]
+            for key in (
+                "query",
+                "from_date",
+                "to_date",
+                "checkpoint",
+                "page_budget",
+                "page_size",
+                "max_workers",
+            )
+            if event.get(key) is not None
+        }
+        continuation.update(
+            backfill=True, shards=summary["remaining"], page=summary["page"]
+        )
+        return partial_response(
+            event, message_ids, summary["articles"], continuation
+        )
+
+    return {
+        "statusCode": 200,
+        "body": {
+            "message": f"Backfilled {summary['articles']} articles from "
+            f"'{event['query']}' query in {summary['shards']} shards to "
+            f"{event['queue_url'].split('/')[-1]}",
+            "data": {
+                "message_ids": message_ids,
+                "article_count": summary["articles"],
+                "shards": summary["shards"],
+            },
+        },
+    }
+
+
+def guardian_query_lambda(event: dict) -> dict:
+    """Retrieve the newest Guardian articles for a query and send them to SQS.
+
+    Args:
+        event (dict): {query, from_date, queue_url}
+
+    Returns:
+        dict: Lambda response containing the sent message ID
+    """
+    # Retrieve Guardian articles over the warm container's shared client
+    with lease_http_client() as client:
+        search_results = get_articles(
+            query=event["query"],
+            from_date=event["from_date"],
+            client=client,
+        )
+
+    if search_results is None:
+        return {
+            "statusCode": 204,
+            "body": {
+                "message": f"No articles found mentioning {event['query']}"
+            },
+        }
+
+    # Drop articles already sent by previous runs
+    search_results = drop_sent_articles(search_results)
+    if not search_results:
+        return {
+            "statusCode": 204,
+            "body": {
+                "message": "No unsent articles found mentioning "
+                f"{event['query']}"
+            },
+        }
+
+    # Format search results
+    formatted_results = format_results(
+        search_results=search_results, projection=Projection.from_env()
+    )
+
+    # Message Broker
+    sqs_client = get_boto3_client("sqs")
+    # Reconcile SQS Queue attributes if not recently verified
+    ensure_queue_config(queue_url=event["queue_url"], sqs_client=sqs_client)
+
+    # Send formatted data to SQS Queue
+    message_ids = send_articles(
+        queue_url=event["queue_url"],
+        formatted_results=formatted_results,
+        sqs_client=sqs_client,
+    )
+    mark_articles_sent(search_results)
+
+    return {
+        "statusCode": 200,
+        "body": {
+            "message": f"Succesfully sent articles from '{event['query']}'"
+            f" query to {event['queue_url'].split('/')[-1]}",
+            "data": {
+                "message_id": message_ids[0],
+                "message_ids": message_ids,
+            },
+        },
+    }
+
+
+def add_cache_stats(response: dict) -> dict:
+    """Add the response cache hit and miss counts to a Lambda response.
+
+    Args:
+        response (dict): Lambda response
+
+    Returns:
+        dict: Lambda response, with cache counts in its data when caching is enabled
+    """
+    cache_stats = get_cache_stats()
+    if cache_stats is not None:
+        response["body"].setdefault("data", {})["cache"] = cache_stats
+    return response
+
+
+def guardian_lambda(event: dict, context) -> dict:
+    """Retrieve Guardian articles matching a query and send them to SQS.
+
+    Providing max_pages or max_articles switches to paginated mode, where every
+    page of results up to those caps is streamed to the queue as its own
+    message. Providing a list of queries instead of a single query fetches
+    every query concurrently over one shared connection pool, or with
+    multiplex set packs them into as few combined searches as fit. Setting
+    incremental sends only articles newer than the query's previous run. When
+    de-duplication is enabled, articles sent by any earlier run or query are
+    dropped before sending. When the
+    response cache is enabled its hit and miss counts for the invocation are
+    returned in the response data.
+
+    Setting backfill sends every article between from_date and to_date,
+    fetching date range shards in parallel.
+
+    Paginated, incremental and backfill runs stop requesting pages shortly
+    before the Lambda deadline and return a 206 response with a continuation.
+    Passing it back as the event's continuation resumes from the next page or
+    shard.
+
+    Args:
+        event (dict): {query, from_date, queue_url} with optional
+        {max_pages, max_articles, page_size, max_in_flight} for paginated mode,
+        or {queries, from_date, queue_url, max_concurrency, multiplex} for
+        batch mode,
+        or {query, queue_url, incremental} for incremental mode, or
+        {query, from_date, to_date, queue_url, backfill} for backfill mode, or
+        {queue_url, continuation} to resume a run stopped by the time limit
+        context (LambdaContext | dict): Lambda context object
+
+    Returns:
+        dict: Lambda response containing a status code and body
+    """
+
+    try:
+        reset_cache_stats()
+        if "continuation" in event:
+            event = {**event, **event["continuation"]}
+            del event["continuation"]
+        should_stop = deadline_from_context(context)
+        if "queries" in event:
+            response = guardian_batch_lambda(event)
+        elif event.get("incremental"):
+            response = guardian_incremental_lambda(event, should_stop)
+        elif event.get("backfill"):
+            response = guardian_backfill_lambda(event, should_stop)
+        elif any(
+            key in event for key in ("max_pages", "max_articles", "start_page")
+        ):
+            response = guardian_paginated_lambda(event, should_stop)
+        else:
+            response = guardian_query_lambda(event)
+
+        deduplicator = get_deduplicator()
+        if deduplicator is not None:
+            deduplicator.save()
+        return add_cache_stats(response)
+
     except (
         ServerRequestError,
         RateLimitExceededError,
         ClientRequestError,
         APIError,
     ) as api_exc:
+        if isinstance(api_exc, TransportRequestError):
+            # Drop pooled connections so the next invocation reconnects
+            reset_http_client()
         return {
             "statusCode": 500,
             "body": {
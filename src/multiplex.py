@@ -0,0 +1,590 @@
+"""Multiplexing many narrow search terms into combined OR searches"""
+
+import os
+import re
+import asyncio
+import httpx
+from collections.abc import Callable
+
+try:
+    from src.utils import logger
+    from src.projection import Projection
+    from src.exceptions import APIError
+    from src.guardian_api import (
+        SEARCH_URL,
+        MAX_PAGE_SIZE,
+        build_search_params,
+        search_async,
+        async_raise_on_status_error,
+    )
+except ImportError:
+    from utils import logger
+    from projection import Projection
+    from exceptions import APIError
+    from guardian_api import (
+        SEARCH_URL,
+        MAX_PAGE_SIZE,
+        build_search_params,
+        search_async,
+        async_raise_on_status_error,
+    )
+
+# Kept under the 2048 character URL limit of common proxies and CDNs
+DEFAULT_MAX_URL_LENGTH = 2000
+
+# Quoted phrases, parentheses and words of a search term
+TERM_TOKEN = re.compile(r'"([^"]*)"|([()])|([^\s()"]+)')
+BOOLEAN_OPERATORS = frozenset({"AND", "OR", "NOT"})
+WORD = re.compile(r"\w+")
+
+# Fields requested by combined searches so articles are routed on the text
+# the API searched, not only on the configured preview field
+MATCH_FIELDS = ("trailText", "bodyText")
+
+
+def max_url_length_from_env() -> int:
+    """Return the URL length limit set by GUARDIAN_MAX_URL_LENGTH.
+
+    Returns:
+        int: Maximum length of a combined search URL
+    """
+    return int(os.getenv("GUARDIAN_MAX_URL_LENGTH", DEFAULT_MAX_URL_LENGTH))
+
+
+def combine_terms(terms: list[str]) -> str:
+    """Combine search terms into one query matching any of them.
+
+    Args:
+        terms (list[str]): Search terms
+
+    Returns:
+        str: Boolean query, each term grouped and joined with OR
+    """
+    if len(terms) == 1:
+        return terms[0]
+    return " OR ".join(f"({term})" for term in terms)
+
+
+def search_url_length(params: dict) -> int:
+    """Return the length of the /search URL sent for params."""
+    return len(str(httpx.URL(SEARCH_URL, params=params)))
+
+
+def group_search_params(
+    terms: list[str],
+    from_date: str | None = None,
+    page: int = 1,
+    projection: Projection | None = None,
+) -> dict:
+    """Build the /search parameters of a group of terms.
+
+    A combined search also requests every field in MATCH_FIELDS, so its
+    articles can be routed back to their terms, see TermMatcher.
+
+    Args:
+        terms (list[str]): Search terms searched together
+        from_date (str | None): Date to search from YYYY-MM-DD format.
+        Defaults to None.
+        page (int): Page of results to request. Defaults to 1.
+        projection (Projection | None): Output schema deciding the requested
+        fields and tags. Defaults to the one set by environment variables.
+
+    Returns:
+        dict: Query parameters for the /search endpoint
+    """
+    params = build_search_params(
+        query=combine_terms(terms),
+        from_date=from_date,
+        page=page,
+        page_size=MAX_PAGE_SIZE,
+        projection=projection,
+    )
+    if len(terms) > 1:
+        fields = params.get("show-fields", "").split(",")
+        params["show-fields"] = ",".join(
+            field for field in dict.fromkeys([*fields, *MATCH_FIELDS]) if field
+        )
+    return params
+
+
+def is_combinable(term: str) -> bool:
+    """Return whether a term can share a combined search.
+
+    Terms whose boolean query cannot be parsed could not be routed reliably,
+    so they are searched on their own.
+    """
+    try:
+        BooleanTerm(term)
+    except ValueError:
+        return False
+    return True
+
+
+def pack_terms(
+    terms: list[str],
+    from_date: str | None = None,
+    max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+    projection: Projection | None = None,
+) -> list[list[str]]:
+    """Pack search terms into groups whose combined search fits in a URL.
+
+    Terms are added to the current group in order until the next one would
+    take the search URL over max_url_length. A term too long to share a URL,
+    or whose boolean query cannot be parsed, is searched on its own.
+
+    Args:
+        terms (list[str]): Search terms, duplicates are searched once
+        from_date (str | None): Date to search from YYYY-MM-DD format.
+        Defaults to None.
+        max_url_length (int): Maximum length of a search URL. Defaults to
+        2000.
+        projection (Projection | None): Output schema deciding the requested
+        fields and tags. Defaults to the one set by environment variables.
+
+    Returns:
+        list[list[str]]: Groups of terms to search together
+    """
+    projection = projection or Projection.from_env()
+
+    def url_length(group: list[str]) -> int:
+        return search_url_length(
+            group_search_params(
+                group, from_date=from_date, projection=projection
+            )
+        )
+
+    groups = []
+    group = []
+    for term in dict.fromkeys(terms):
+        if not is_combinable(term):
+            logger.info("Searching %s on its own, it cannot be parsed", term)
+            groups.append([term])
+            continue
+        if group and url_length([*group, term]) > max_url_length:
+            groups.append(group)
+            group = []
+        group.append(term)
+    if group:
+        groups.append(group)
+    return groups
+
+
+def normalise_word(word: str) -> str:
+    """Lower case a word and drop a plural "s".
+
+    A rough stand in for the API's stemming, so "election" matches
+    "elections".
+    """
+    word = word.lower()
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenise_term(term: str) -> list[tuple[str, str]]:
+    """Split a search term into its phrases, parentheses, operators and words.
+
+    Args:
+        term (str): Search term
+
+    Raises:
+        ValueError: Raised when a quoted phrase is not closed
+
+    Returns:
+        list[tuple[str, str]]: (kind, value) of each token, kind is one of
+        "phrase", "paren", "operator" or "word"
+    """
+    if term.count('"') % 2:
+        raise ValueError(f"Unclosed quote in {term}")
+    tokens = []
+    for phrase, paren, token in TERM_TOKEN.findall(term):
+        if paren:
+            tokens.append(("paren", paren))
+        elif token in BOOLEAN_OPERATORS:
+            tokens.append(("operator", token))
+        elif token:
+            tokens.append(("word", token))
+        else:
+            tokens.append(("phrase", phrase))
+    return tokens
+
+
+def phrase_pattern(phrase: str) -> str:
+    """Return a regex matching a phrase whatever the whitespace or case."""
+    words = WORD.findall(phrase)
+    return r"\b" + r"\W+".join(re.escape(word) for word in words) + r"s?\b"
+
+
+class BooleanTerm:
+    """A search term compiled into a test of an article's words and text.
+
+    Follows the API's query syntax: words, quoted phrases, AND, OR, NOT and
+    parentheses. Adjacent words are joined with AND, AND binds tighter than
+    OR and NOT excludes the word, phrase or group after it, so
+    "brexit NOT football" matches articles about brexit that do not mention
+    football and "cats OR dogs" articles mentioning either.
+    """
+
+    def __init__(self, term: str):
+        """
+        Args:
+            term (str): Search term
+
+        Raises:
+            ValueError: Raised when the term is not a valid boolean query
+        """
+        self.term = term
+        self.tokens = tokenise_term(term)
+        self.position = 0
+        self.test = self.parse_or()
+        if self.position < len(self.tokens):
+            raise ValueError(
+                f"Unexpected {self.tokens[self.position][1]} in {term}"
+            )
+
+    def matches(self, words: set[str], text: str) -> bool:
+        """Return whether an article matches the term.
+
+        Args:
+            words (set[str]): Normalised words of the article
+            text (str): Text of the article, for phrases
+        """
+        return self.test(words, text)
+
+    def peek(self) -> tuple[str, str] | None:
+        """Return the next token, None at the end of the term."""
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def parse_or(self) -> Callable[[set[str], str], bool]:
+        """Parse operands joined with OR, matching when any of them does."""
+        tests = [self.parse_and()]
+        while self.peek() == ("operator", "OR"):
+            self.position += 1
+            tests.append(self.parse_and())
+        if len(tests) == 1:
+            return tests[0]
+        return lambda words, text: any(test(words, text) for test in tests)
+
+    def parse_and(self) -> Callable[[set[str], str], bool]:
+        """Parse operands joined with AND or adjacent, matching all of them."""
+        tests = [self.parse_not()]
+        while self.peek() not in (None, ("operator", "OR"), ("paren", ")")):
+            if self.peek() == ("operator", "AND"):
+                self.position += 1
+            tests.append(self.parse_not())
+        if len(tests) == 1:
+            return tests[0]
+        return lambda words, text: all(test(words, text) for test in tests)
+
+    def parse_not(self) -> Callable[[set[str], str], bool]:
+        """Parse an operand, negated when it follows NOT."""
+        if self.peek() == ("operator", "NOT"):
+            self.position += 1
+            test = self.parse_not()
+            return lambda words, text: not test(words, text)
+        return self.parse_operand()
+
+    def parse_operand(self) -> Callable[[set[str], str], bool]:
+        """Parse a word, a quoted phrase or a parenthesised group."""
+        token = self.peek()
+        if token is None:
+            raise ValueError(f"Missing operand at the end of {self.term}")
+        self.position += 1
+        kind, value = token
+        if token == ("paren", "("):
+            test = self.parse_or()
+            if self.peek() != ("paren", ")"):
+                raise ValueError(f"Unclosed parenthesis in {self.term}")
+            self.position += 1
+            return test
+        if kind == "word":
+            required = frozenset(map(normalise_word, WORD.findall(value)))
+            return lambda words, text: required <= words
+        if kind == "phrase":
+            if not WORD.search(value):
+                return lambda words, text: True
+            pattern = re.compile(phrase_pattern(value), re.IGNORECASE)
+            return lambda words, text: pattern.search(text) is not None
+        raise ValueError(f"Unexpected {value} in {self.term}")
+
+
+class TermMatcher:
+    """Routes articles from a combined search back to the terms they match.
+
+    Each term is compiled once into a BooleanTerm, evaluated against the
+    title, every returned field and the tag titles of an article. Words are
+    matched case and plural insensitively, a rough stand in for the API's
+    stemming.
+    """
+
+    def __init__(self, terms: list[str]):
+        """
+        Args:
+            terms (list[str]): Search terms to match articles against
+
+        Raises:
+            ValueError: Raised when a term is not a valid boolean query
+        """
+        self.terms = {term: BooleanTerm(term) for term in dict.fromkeys(terms)}
+
+    @staticmethod
+    def article_text(article: dict) -> str:
+        """Return the title, text fields and tag titles of an article."""
+        parts = [article.get("webTitle", "")]
+        parts.extend(
+            value
+            for value in article.get("fields", {}).values()
+            if isinstance(value, str)
+        )
+        parts.extend(tag.get("webTitle", "") for tag in article.get("tags", []))
+        return "\n".join(parts)
+
+    def match(self, article: dict) -> list[str]:
+        """Return the terms an article matches.
+
+        Args:
+            article (dict): Search result from the Guardian API
+
+        Returns:
+            list[str]: Matching terms, in the order they were given
+        """
+        text = self.article_text(article)
+        words = {normalise_word(word) for word in WORD.findall(text)}
+        return [
+            term
+            for term, boolean_term in self.terms.items()
+            if boolean_term.matches(words, text)
+        ]
+
+    def route(self, articles: list[dict]) -> tuple[dict[str, list], list]:
+        """Split articles between the terms they match.
+
+        Args:
+            articles (list[dict]): Search results from a combined search
+
+        Returns:
+            tuple[dict[str, list], list]: Articles for each term, an article
+            can belong to several terms, and the articles no term matched
+        """
+        routed = {term: [] for term in self.terms}
+        unmatched = []
+        for article in articles:
+            terms = self.match(article)
+            for term in terms:
+                routed[term].append(article)
+            if not terms:
+                unmatched.append(article)
+        return routed, unmatched
+
+
+async def get_group_articles(
+    terms: list[str],
+    client: httpx.AsyncClient,
+    from_date: str | None = None,
+    max_pages: int = 1,
+    projection: Projection | None = None,
+) -> tuple[list[dict], bool]:
+    """Retrieve the newest articles matching any of a group of terms.
+
+    The preview field of a combined search is kept whole, even when streamed
+    responses are trimmed, so articles matched deep in their body text can
+    still be routed to their terms. A search stopped by max_pages before its
+    last page is truncated: a busy term can fill the pages and leave out the
+    older articles of the other terms.
+
+    Args:
+        terms (list[str]): Search terms combined into one query
+        client (httpx.AsyncClient): HTTPX AsyncClient object
+        from_date (str | None): Date to search from YYYY-MM-DD format.
+        Defaults to None.
+        max_pages (int): Maximum pages of 200 results to retrieve. Defaults
+        to 1.
+        projection (Projection | None): Output schema deciding the requested
+        fields and tags. Defaults to the one set by environment variables.
+
+    Raises:
+        ValueError: Raised when max_pages is less than 1
+
+    Returns:
+        tuple[list[dict], bool]: Guardian articles matching the combined query
+        and whether results were left unretrieved
+    """
+    if max_pages < 1:
+        raise ValueError(f"max_pages must be at least 1, got {max_pages}")
+    search_results = []
+    for page in range(1, max_pages + 1):
+        search_response = await search_async(
+            client=client,
+            params=group_search_params(
+                terms, from_date=from_date, page=page, projection=projection
+            ),
+            trim_preview=len(terms) == 1,
+        )
+        if search_response["total"] == 0:
+            break
+        search_results.extend(search_response["results"])
+        if page >= search_response["pages"]:
+            break
+    else:
+        logger.warning(
+            "Combined search of %(terms)s terms stopped after %(pages)s pages"
+            " of %(total)s results, use fewer terms per search",
+            {
+                "terms": len(terms),
+                "pages": max_pages,
+                "total": search_response["total"],
+            },
+        )
+        return search_results, True
+    return search_results, False
+
+
+async def get_multiplexed_articles(
+    terms: list[str],
+    client: httpx.AsyncClient,
+    from_date: str | None = None,
+    max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+    max_pages: int = 1,
+    max_concurrency: int = 10,
+) -> dict[str, dict]:
+    """Retrieve articles for many terms with as few searches as fit the URL.
+
+    Terms are packed into combined OR searches, see pack_terms, and each
+    article returned is routed back to the terms it matches, see TermMatcher.
+    A failed search is recorded against every term in it.
+
+    Args:
+        terms (list[str]): Search terms to retrieve articles for
+        client (httpx.AsyncClient): HTTPX AsyncClient object shared by all
+        searches
+        from_date (str | None): Date to search from YYYY-MM-DD format.
+        Defaults to None.
+        max_url_length (int): Maximum length of a search URL. Defaults to
+        2000.
+        max_pages (int): Maximum pages of 200 results retrieved per combined
+        search. Defaults to 1.
+        max_concurrency (int): Maximum number of requests in flight.
+        Defaults to 10.
+
+    Raises:
+        ValueError: Raised when max_pages is less than 1
+
+    Returns:
+        dict[str, dict]: Outcome for each unique term, a dictionary with the
+        "results" (list[dict] or None when empty) or the "error" message, as
+        returned by get_articles_for_queries, the number of "matches" and
+        whether its combined search was "truncated" by max_pages
+    """
+    if max_pages < 1:
+        raise ValueError(f"max_pages must be at least 1, got {max_pages}")
+    projection = Projection.from_env()
+    groups = pack_terms(
+        terms,
+        from_date=from_date,
+        max_url_length=max_url_length,
+        projection=projection,
+    )
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def get_group_outcomes(group: list[str]) -> dict[str, dict]:
+        async with semaphore:
+            try:
+                search_results, truncated = await get_group_articles(
+                    terms=group,
+                    client=client,
+                    from_date=from_date,
+                    max_pages=max_pages,
+                    projection=projection,
+                )
+            except APIError as api_exc:
+                return {
+                    term: {
+                        "results": None,
+                        "error": str(api_exc),
+                        "matches": 0,
+                        "truncated": False,
+                    }
+                    for term in group
+                }
+        if len(group) == 1:
+            # A search of one term needs no routing
+            routed = {group[0]: search_results}
+            unmatched = []
+        else:
+            routed, unmatched = TermMatcher(group).route(search_results)
+        if unmatched:
+            logger.warning(
+                "%(amount)s articles from a combined search matched none of"
+                " its terms: %(terms)s",
+                {"amount": len(unmatched), "terms": ", ".join(group)},
+            )
+        return {
+            term: {
+                "results": articles or None,
+                "error": None,
+                "matches": len(articles),
+                "truncated": truncated,
+            }
+            for term, articles in routed.items()
+        }
+
+    group_outcomes = await asyncio.gather(
+        *(get_group_outcomes(group) for group in groups)
+    )
+    logger.info(
+        "Searched %(terms)s terms with %(searches)s combined searches",
+        {"terms": sum(map(len, groups)), "searches": len(groups)},
+    )
+    outcomes = {}
+    for group_outcome in group_outcomes:
+        outcomes.update(group_outcome)
+    return {term: outcomes[term] for term in dict.fromkeys(terms)}
+
+
+def search_queries_multiplexed(
+    queries: list[str],
+    from_date: str | None = None,
+    max_url_length: int | None = None,
+    max_pages: int = 1,
+    max_concurrency: int = 10,
+) -> dict[str, dict]:
+    """Retrieve articles for many queries with combined searches.
+
+    Args:
+        queries (list[str]): Search terms to retrieve articles for.
+        from_date (str | None): Date to search from YYYY-MM-DD format.
+        Defaults to None.
+        max_url_length (int | None): Maximum length of a search URL.
+        Defaults to GUARDIAN_MAX_URL_LENGTH or 2000.
+        max_pages (int): Maximum pages of 200 results retrieved per combined
+        search. Defaults to 1.
+        max_concurrency (int): Maximum number of requests in flight.
+        Defaults to 10.
+
+    Raises:
+        ValueError: Raised when max_pages is less than 1
+
+    Returns:
+        dict[str, dict]: Outcome for each unique query, see
+        get_multiplexed_articles.
+    """
+    if max_url_length is None:
+        max_url_length = max_url_length_from_env()
+
+    async def run() -> dict[str, dict]:
+        async with httpx.AsyncClient(
+            event_hooks={"response": [async_raise_on_status_error]},
+            limits=httpx.Limits(max_connections=max_concurrency),
+        ) as client:
+            return await get_multiplexed_articles(
+                terms=queries,
+                client=client,
+                from_date=from_date,
+                max_url_length=max_url_length,
+                max_pages=max_pages,
+                max_concurrency=max_concurrency,
+            )
+
+    return asyncio.run(run())
@@ -0,0 +1,118 @@
+"""Bounded producer/consumer pipeline overlapping fetch, format and send"""
+
+import queue
+import threading
+from collections.abc import Callable, Iterable, Sequence
+
+# Marks the end of the stream, passed through every stage
+END = object()
+# Returned by a stage to drop an item instead of passing it on
+SKIP = object()
+
+
+def run_pipeline(
+    source: Iterable,
+    stages: Sequence[Callable],
+    max_buffered: int = 2,
+) -> list:
+    """Run items from source through each stage, every stage in its own thread.
+
+    Stages are connected by queues holding at most max_buffered items, so a
+    slow stage applies backpressure and memory stays bounded, while the
+    stages overlap, e.g. page N+1 is fetched while page N is formatted and
+    page N-1 is sent. Each stage handles items one at a time and in order.
+
+    When the source fails, items it already produced still pass through
+    every stage, matching a sequential loop. When a stage fails the source
+    stops being read and items already queued are discarded. Either way
+    every thread is joined before the first error is re-raised.
+
+    Args:
+        source (Iterable): Items to process, iterated in its own thread. A
+        generator source is closed from that thread on shutdown.
+        stages (Sequence[Callable]): Functions applied to each item in turn,
+        returning SKIP drops the item
+        max_buffered (int): Maximum items waiting between two stages.
+        Defaults to 2.
+
+    Raises:
+        ValueError: Raised when there are no stages or max_buffered is not
+        positive
+
+    Returns:
+        list: Results of the final stage, in source order
+    """
+    if not stages:
+        raise ValueError("run_pipeline requires at least one stage")
+    if max_buffered < 1:
+        raise ValueError(f"max_buffered must be positive, got {max_buffered}")
+
+    queues = [queue.Queue(maxsize=max_buffered) for _ in stages]
+    results = []
+    errors = []
+    errors_lock = threading.Lock()
+    stopped = threading.Event()
+
+    def fail(exc: BaseException, stop: bool = True) -> None:
+        with errors_lock:
+            if not errors:
+                errors.append(exc)
+        if stop:
+            stopped.set()
+
+    def produce() -> None:
+        iterator = iter(source)
+        try:
+            while not stopped.is_set():
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                queues[0].put(item)
+        except BaseException as exc:
+            fail(exc, stop=False)
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+            queues[0].put(END)
+
+    def consume(index: int) -> None:
+        stage = stages[index]
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(stages) else None
+        while True:
+            item = inbox.get()
+            if item is END:
+                break
+            # Keep draining after a failure so upstream threads never block
+            if stopped.is_set():
+                continue
+            try:
+                output = stage(item)
+            except BaseException as exc:
+                fail(exc)
+                continue
+            if output is SKIP:
+                continue
+            if outbox is None:
+                results.append(output)
+            else:
+                outbox.put(output)
+        if outbox is not None:
+            outbox.put(END)
+
+    threads = [threading.Thread(target=produce, name="pipeline-source")]
+    threads.extend(
+        threading.Thread(
+            target=consume, args=(index,), name=f"pipeline-{index}"
+        )
+        for index in range(len(stages))
+    )
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    return results
@@ -0,0 +1,116 @@
+"""Output schema of formatted articles, driving what is requested from the API"""
+
+import os
+from dataclasses import dataclass
+
+# Article fields a content preview can be taken from, bodyText is the full
+# article text and trailText its short standfirst
+PREVIEW_FIELDS = ("bodyText", "trailText")
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Plans the search request from the formatted output that is wanted.
+
+    Only the field the preview is taken from and the tag types that make up
+    the keywords are requested, so a disabled preview requests no fields and
+    a trailText preview avoids downloading the full body text. The keywords
+    field holds the titles of every requested tag type, so with
+    tag_types=("keyword", "contributor") it lists contributor names as well.
+    """
+
+    preview_length: int | None = 500
+    preview_field: str = "bodyText"
+    tag_types: tuple[str, ...] = ("keyword",)
+
+    def __post_init__(self):
+        if self.preview_field not in PREVIEW_FIELDS:
+            raise ValueError(
+                f"preview_field must be one of {', '.join(PREVIEW_FIELDS)}, "
+                f"got {self.preview_field}"
+            )
+        if self.preview_length is not None and self.preview_length < 0:
+            raise ValueError(
+                f"preview_length must not be negative, got {self.preview_length}"
+            )
+
+    @classmethod
+    def from_env(cls) -> "Projection":
+        """Create the projection set by environment variables.
+
+        GUARDIAN_PREVIEW_LENGTH sets the preview length, "full" for the whole
+        field or 0 to disable the preview, GUARDIAN_PREVIEW_FIELD the field it
+        is taken from and GUARDIAN_TAG_TYPES a comma separated list of tag
+        types whose titles are the keywords, "none" for no keywords.
+
+        Raises:
+            ValueError: Raised for an unknown preview field
+
+        Returns:
+            Projection: Configured projection
+        """
+        preview_field = os.getenv("GUARDIAN_PREVIEW_FIELD", "bodyText")
+        fields = {field.lower(): field for field in PREVIEW_FIELDS}
+        tag_types = os.getenv("GUARDIAN_TAG_TYPES", "keyword").lower()
+        return cls(
+            preview_length=preview_length_from_env(),
+            preview_field=fields.get(preview_field.lower(), preview_field),
+            tag_types=tuple(
+                tag_type.strip()
+                for tag_type in tag_types.split(",")
+                if tag_type.strip() and tag_type.strip() != "none"
+            ),
+        )
+
+    @property
+    def includes_preview(self) -> bool:
+        """Whether formatted articles carry a content preview."""
+        return self.preview_length != 0
+
+    def request_params(self) -> dict:
+        """Return the show-fields and show-tags search parameters.
+
+        Returns:
+            dict: Parameters to request, None for those not needed
+        """
+        return {
+            "show-fields": self.preview_field
+            if self.includes_preview
+            else None,
+            "show-tags": ",".join(self.tag_types) or None,
+        }
+
+    def preview(self, response: dict) -> str:
+        """Return the content preview of a search result.
+
+        Raises:
+            KeyError: Raised when the preview field was not returned
+        """
+        if not self.includes_preview:
+            return ""
+        return response["fields"][self.preview_field][: self.preview_length]
+
+    def keywords(self, response: dict) -> list[str]:
+        """Return the titles of a search result's tags of every tag type.
+
+        Raises:
+            KeyError: Raised when tags were requested but not returned
+        """
+        if not self.tag_types:
+            return []
+        return [tag["webTitle"] for tag in response["tags"]]
+
+
+def preview_length_from_env() -> int | None:
+    """Return the content preview length set by GUARDIAN_PREVIEW_LENGTH.
+
+    Returns:
+        int | None: Characters of the preview field to keep, None for "full"
+        and 0 for "none"
+    """
+    length = os.getenv("GUARDIAN_PREVIEW_LENGTH", "500").lower()
+    if length == "full":
+        return None
+    if length == "none":
+        return 0
+    return int(length)
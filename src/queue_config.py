@@ -0,0 +1,234 @@
+"""Declared SQS queue attributes, verified once per queue per warm container"""
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import threading
+from botocore.exceptions import ClientError
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import boto3
+
+try:
+    from src.utils import logger
+    from src.exceptions import BotocoreError
+except ImportError:
+    from utils import logger
+    from exceptions import BotocoreError
+
+# Message retention of 3 days
+DEFAULT_QUEUE_ATTRIBUTES = {"MessageRetentionPeriod": "259200"}
+
+
+class QueueConfigManager:
+    """Reconciles SQS queue attributes with their declared values.
+
+    Each queue is checked with one get_queue_attributes call and corrected
+    with at most one set_queue_attributes call. Verified queues are not
+    checked again until ttl seconds have passed or their declaration changes.
+    """
+
+    def __init__(
+        self,
+        attributes: dict | None = None,
+        ttl: float = 3600,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            attributes (dict | None): Attributes declared for every queue.
+            Defaults to a 3 day MessageRetentionPeriod.
+            ttl (float): Seconds a verified queue is trusted. Defaults to 3600.
+            clock (Callable): Monotonic clock in seconds. Defaults to
+            time.monotonic.
+        """
+        self.default_attributes = normalise_attributes(
+            DEFAULT_QUEUE_ATTRIBUTES if attributes is None else attributes
+        )
+        self.ttl = ttl
+        self.clock = clock
+        self.declared = {}
+        self.verified = {}
+        self.lock = threading.Lock()
+
+    def declare(self, queue: str, attributes: dict) -> None:
+        """Declare attributes for one queue, overriding the defaults.
+
+        Args:
+            queue (str): Queue URL or queue name
+            attributes (dict): SQS attribute names and values
+        """
+        with self.lock:
+            self.declared[queue] = normalise_attributes(attributes)
+
+    def desired_attributes(self, queue_url: str) -> dict:
+        """Return the attributes declared for a queue URL.
+
+        Args:
+            queue_url (str): AWS SQS queue URL
+
+        Returns:
+            dict: Attribute names and string values the queue should have
+        """
+        queue_name = queue_url.split("/")[-1]
+        with self.lock:
+            return {
+                **self.default_attributes,
+                **self.declared.get(queue_name, {}),
+                **self.declared.get(queue_url, {}),
+            }
+
+    def ensure(self, queue_url: str, sqs_client: boto3.client) -> dict:
+        """Bring a queue's attributes in line with its declaration.
+
+        Args:
+            queue_url (str): AWS SQS queue URL
+            sqs_client (boto3.client): Boto3 SQS client
+
+        Raises:
+            ClientError: Error raised when Boto3 encounters an client issue
+            BotocoreError: Error raised when function encounters an unexpected
+            issue
+
+        Returns:
+            dict: Attributes that were changed, empty when the queue already
+            matched or was verified recently
+        """
+        desired = self.desired_attributes(queue_url)
+        with self.lock:
+            verified = self.verified.get(queue_url)
+        if (
+            verified is not None
+            and verified[0] > self.clock()
+            and verified[1] == desired
+        ):
+            return {}
+
+        try:
+            current = sqs_client.get_queue_attributes(
+                QueueUrl=queue_url, AttributeNames=list(desired)
+            ).get("Attributes", {})
+            changes = {
+                name: value
+                for name, value in desired.items()
+                if current.get(name) != value
+            }
+            if changes:
+                sqs_client.set_queue_attributes(
+                    QueueUrl=queue_url, Attributes=changes
+                )
+                logger.info(
+                    "Successfully updated %(attributes)s of %(queue_name)s",
+                    {
+                        "attributes": ", ".join(changes),
+                        "queue_name": queue_url.split("/")[-1],
+                    },
+                )
+
+        except ClientError as c_exc:
+            error_response = {
+                "Error": {
+                    "Code": c_exc.response["Error"]["Code"],
+                    "Message": "Boto3 error updating queue attributes:"
+                    f" {c_exc.response['Error']['Message']}",
+                }
+            }
+            raise ClientError(
+                error_response=error_response,
+                operation_name=c_exc.operation_name,
+            ) from None
+        except Exception as e_exc:
+            raise BotocoreError(
+                f"Unexpected error when updating queue attributes: {str(e_exc)}"
+            ) from None
+
+        with self.lock:
+            self.verified[queue_url] = (self.clock() + self.ttl, desired)
+        return changes
+
+    def invalidate(self, queue_url: str | None = None) -> None:
+        """Forget verified queues so they are checked on next use.
+
+        Args:
+            queue_url (str | None): Queue to forget, None forgets every queue.
+            Defaults to None.
+        """
+        with self.lock:
+            if queue_url is None:
+                self.verified.clear()
+            else:
+                self.verified.pop(queue_url, None)
+
+
+def normalise_attributes(attributes: dict) -> dict:
+    """Convert attribute values to the strings SQS returns."""
+    return {name: str(value) for name, value in attributes.items()}
+
+
+# Reused across warm Lambda invocations, see get_queue_config
+QUEUE_CONFIG = None
+QUEUE_CONFIG_LOCK = threading.Lock()
+
+
+def create_queue_config_from_env() -> QueueConfigManager:
+    """Create the queue configuration manager from environment variables.
+
+    GUARDIAN_QUEUE_RETENTION, GUARDIAN_QUEUE_VISIBILITY_TIMEOUT and
+    GUARDIAN_QUEUE_MAX_MESSAGE_SIZE declare attributes for every queue.
+    GUARDIAN_QUEUE_ATTRIBUTES declares per queue attributes as JSON keyed by
+    queue name or URL and GUARDIAN_QUEUE_CONFIG_TTL sets how long a verified
+    queue is trusted.
+
+    Returns:
+        QueueConfigManager: Configured queue configuration manager
+    """
+    attributes = {
+        "MessageRetentionPeriod": os.getenv(
+            "GUARDIAN_QUEUE_RETENTION",
+            DEFAULT_QUEUE_ATTRIBUTES["MessageRetentionPeriod"],
+        )
+    }
+    optional_attributes = {
+        "VisibilityTimeout": "GUARDIAN_QUEUE_VISIBILITY_TIMEOUT",
+        "MaximumMessageSize": "GUARDIAN_QUEUE_MAX_MESSAGE_SIZE",
+    }
+    for name, variable in optional_attributes.items():
+        if os.getenv(variable):
+            attributes[name] = os.getenv(variable)
+    queue_config = QueueConfigManager(
+        attributes=attributes,
+        ttl=float(os.getenv("GUARDIAN_QUEUE_CONFIG_TTL", "3600")),
+    )
+    declared = json.loads(os.getenv("GUARDIAN_QUEUE_ATTRIBUTES", "{}"))
+    for queue, queue_attributes in declared.items():
+        queue_config.declare(queue, queue_attributes)
+    return queue_config
+
+
+def get_queue_config() -> QueueConfigManager:
+    """Return the shared queue configuration manager, creating it on first use.
+
+    Returns:
+        QueueConfigManager: Shared queue configuration manager
+    """
+    global QUEUE_CONFIG
+    with QUEUE_CONFIG_LOCK:
+        if QUEUE_CONFIG is None:
+            QUEUE_CONFIG = create_queue_config_from_env()
+        return QUEUE_CONFIG
+
+
+def ensure_queue_config(queue_url: str, sqs_client: boto3.client) -> dict:
+    """Reconcile a queue with its declared attributes using the shared manager.
+
+    Args:
+        queue_url (str): AWS SQS queue URL
+        sqs_client (boto3.client): Boto3 SQS client
+
+    Returns:
+        dict: Attributes that were changed
+    """
+    return get_queue_config().ensure(queue_url, sqs_client)
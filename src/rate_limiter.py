@@ -0,0 +1,159 @@
+"""Shared rate limiting and backoff for Guardian API requests"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header into a number of seconds to wait.
+
+    Args:
+        value (str | None): Retry-After header value, either delay-seconds or
+        an HTTP-date
+
+    Returns:
+        float | None: Seconds to wait, None when the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float,
+    max_delay: float,
+    retry_after: float | None = None,
+) -> float:
+    """Calculate the delay before the next retry attempt.
+
+    Uses exponential backoff with full jitter, unless the server supplied a
+    Retry-After delay which is honoured as given, even beyond max_delay.
+
+    Args:
+        attempt (int): Number of failed attempts so far, starting at 1
+        base_delay (float): Delay in seconds for the first retry
+        max_delay (float): Maximum exponential backoff delay in seconds
+        retry_after (float | None): Delay requested by the server. Defaults to None.
+
+    Returns:
+        float: Seconds to wait before the next attempt
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base_delay)
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+class TokenBucket:
+    """Thread-safe adaptive token bucket shared by sync and async callers.
+
+    Tokens refill at rate per second up to capacity and each request takes one.
+    A rate limited response halves the rate and pauses every caller for the
+    Retry-After period, each successful response then recovers the rate
+    additively towards its configured maximum. A rate of None disables the
+    token bucket while still honouring pauses.
+    """
+
+    def __init__(
+        self,
+        rate: float | None,
+        capacity: float | None = None,
+        min_rate: float | None = None,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            rate (float | None): Maximum sustained requests per second
+            capacity (float | None): Maximum burst size. Defaults to max(1, rate).
+            min_rate (float | None): Lowest rate after backing off. Defaults to
+            a tenth of rate.
+            clock (Callable): Monotonic clock in seconds. Defaults to time.monotonic.
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate or 1.0)
+        self.min_rate = min_rate or (rate / 10 if rate else None)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated_at = clock()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TokenBucket":
+        """Create a token bucket sized by GUARDIAN_RATE_LIMIT and GUARDIAN_RATE_BURST.
+
+        Returns:
+            TokenBucket: Token bucket, unlimited when GUARDIAN_RATE_LIMIT is unset
+        """
+        rate = os.getenv("GUARDIAN_RATE_LIMIT")
+        burst = os.getenv("GUARDIAN_RATE_BURST")
+        return cls(
+            rate=float(rate) if rate else None,
+            capacity=float(burst) if burst else None,
+        )
+
+    def reserve(self) -> float:
+        """Take a token, returning how long the caller must wait before using it.
+
+        Returns:
+            float: Seconds to wait before sending the request
+        """
+        with self.lock:
+            now = self.clock()
+            wait = max(0.0, self.paused_until - now)
+            if self.rate is None:
+                return wait
+            elapsed = now - self.updated_at
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+            return wait
+
+    def acquire(self) -> None:
+        """Block the calling thread until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Suspend the calling task until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_rate_limited(self, pause: float) -> None:
+        """Back off after a rate limited response.
+
+        Args:
+            pause (float): Seconds every caller should wait before the next request
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, self.clock() + pause)
+            if self.rate is not None:
+                self.rate = max(self.min_rate, self.rate / 2)
+
+    def on_success(self) -> None:
+        """Recover the rate towards its maximum after a successful response."""
+        with self.lock:
+            if self.rate is not None and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
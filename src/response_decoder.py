@@ -0,0 +1,188 @@
+"""Incremental decoding of Guardian /search responses, trimmed while parsing"""
+
+import json
+from collections.abc import Iterable
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Article and tag keys kept from each search result, everything else is
+# dropped while parsing
+ARTICLE_KEYS = ("id", "webPublicationDate", "webTitle", "webUrl")
+TAG_KEYS = ("id", "type", "webTitle")
+SCALAR_EVENTS = ("string", "number", "boolean", "null")
+
+RESULT_PREFIX = "response.results.item"
+FIELDS_PREFIX = f"{RESULT_PREFIX}.fields"
+TAGS_PREFIX = f"{RESULT_PREFIX}.tags"
+TAG_PREFIX = f"{TAGS_PREFIX}.item"
+
+
+def streaming_available() -> bool:
+    """Return whether ijson is installed to parse responses as they arrive."""
+    return ijson is not None
+
+
+class SearchResponseDecoder:
+    """Decodes a /search response body fed in chunks.
+
+    Keeps the response metadata (total, pages, currentPage...) and, for each
+    result, its id, date, title, url, scalar fields and the id, type and title
+    of its tags. The preview field is cut to preview_length as soon as it is
+    parsed.
+
+    With ijson the body is parsed as it arrives and the full document is
+    never held in memory. Without it the body is buffered and parsed with
+    json.loads, trimming each object as soon as it is built, which saves no
+    memory over decoding the whole response, so search requests only stream
+    when ijson is installed, see streaming_available.
+    """
+
+    def __init__(
+        self, preview_length: int | None = 500, preview_field: str = "bodyText"
+    ):
+        """
+        Args:
+            preview_length (int | None): Characters of the preview field to
+            keep, None keeps the full field. Defaults to 500.
+            preview_field (str): Field the content preview is taken from.
+            Defaults to "bodyText".
+        """
+        self.preview_length = preview_length
+        self.preview_field = preview_field
+        self.response = {}
+        self.results = []
+        self.article = None
+        self.tag = None
+        if ijson is not None:
+            self.events = ijson.sendable_list()
+            self.parser = ijson.parse_coro(self.events, use_float=True)
+        else:
+            self.buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse the next chunk of the response body.
+
+        Args:
+            chunk (bytes): Part of the response body
+        """
+        if ijson is None:
+            self.buffer += chunk
+            return
+        self.parser.send(chunk)
+        self.handle_events(self.events)
+        del self.events[:]
+
+    def close(self) -> dict:
+        """Finish parsing and return the trimmed "response" object.
+
+        Raises:
+            ValueError: Raised when the body is not a complete JSON document
+
+        Returns:
+            dict: The "response" object of the search
+        """
+        if ijson is None:
+            text = self.buffer.decode()
+            self.buffer = bytearray()
+            document = json.loads(text, object_hook=self.trim_object)
+            del text
+            response = {
+                key: value
+                for key, value in document["response"].items()
+                if not isinstance(value, dict | list)
+            }
+            response["results"] = [
+                self.trim_article(article)
+                for article in document["response"].get("results", [])
+            ]
+            return response
+        try:
+            self.parser.close()
+        except ijson.JSONError as j_exc:
+            raise ValueError(f"Incomplete search response: {j_exc}") from None
+        self.handle_events(self.events)
+        del self.events[:]
+        return {**self.response, "results": self.results}
+
+    def handle_events(self, events: Iterable[tuple[str, str, object]]) -> None:
+        """Build the trimmed response from ijson parse events.
+
+        Args:
+            events (Iterable[tuple[str, str, object]]): ijson (prefix, event,
+            value) events
+        """
+        for prefix, event, value in events:
+            if prefix == RESULT_PREFIX:
+                if event == "start_map":
+                    self.article = {}
+                elif event == "end_map":
+                    self.results.append(self.article)
+                    self.article = None
+            elif event in SCALAR_EVENTS:
+                self.handle_scalar(prefix, value)
+            elif prefix == FIELDS_PREFIX and event == "start_map":
+                self.article["fields"] = {}
+            elif prefix == TAGS_PREFIX and event == "start_array":
+                self.article["tags"] = []
+            elif prefix == TAG_PREFIX and event == "start_map":
+                self.tag = {}
+                self.article["tags"].append(self.tag)
+
+    def handle_scalar(self, prefix: str, value: object) -> None:
+        """Store a scalar value when its path is one that is kept."""
+        parent, _, key = prefix.rpartition(".")
+        if parent == "response":
+            self.response[key] = value
+        elif parent == RESULT_PREFIX and key in ARTICLE_KEYS:
+            self.article[key] = value
+        elif parent == FIELDS_PREFIX:
+            if key == self.preview_field and isinstance(value, str):
+                value = value[: self.preview_length]
+            self.article["fields"][key] = value
+        elif parent == TAG_PREFIX and key in TAG_KEYS:
+            self.tag[key] = value
+
+    def trim_object(self, obj: dict) -> dict:
+        """json.loads object_hook cutting the preview as each object is built."""
+        preview = obj.get(self.preview_field)
+        if isinstance(preview, str):
+            obj[self.preview_field] = preview[: self.preview_length]
+        return obj
+
+    def trim_article(self, article: dict) -> dict:
+        """Keep only the article keys the ijson path keeps."""
+        trimmed = {key: article[key] for key in ARTICLE_KEYS if key in article}
+        if "fields" in article:
+            trimmed["fields"] = {
+                key: value
+                for key, value in article["fields"].items()
+                if not isinstance(value, dict | list)
+            }
+        if "tags" in article:
+            trimmed["tags"] = [
+                {key: tag[key] for key in TAG_KEYS if key in tag}
+                for tag in article["tags"]
+            ]
+        return trimmed
+
+
+def decode_search_response(
+    chunks: Iterable[bytes], preview_length: int | None = 500
+) -> dict:
+    """Decode a /search response body, trimming it while parsing.
+
+    Args:
+        chunks (Iterable[bytes]): Response body in chunks
+        preview_length (int | None): Characters of bodyText to keep, None keeps
+        the full body text. Defaults to 500.
+
+    Returns:
+        dict: The trimmed "response" object of the search
+    """
+    decoder = SearchResponseDecoder(preview_length=preview_length)
+    for chunk in chunks:
+        decoder.feed(chunk)
+    return decoder.close()
@@ -0,0 +1,198 @@
+"""Serializers for the article payloads of queue messages"""
+
+import json
+import logging
+import struct
+from abc import ABC, abstractmethod
+
+try:
+    from src.article import json_default
+except ImportError:
+    from article import json_default
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(name="Guardian Search Content")
+
+# Message attribute naming the serialization of a message body
+CONTENT_TYPE_ATTRIBUTE = "ContentType"
+MESSAGE_SERIALIZERS = ("json", "orjson", "msgpack", "auto")
+
+
+class Serializer(ABC):
+    """Base class encoding articles one at a time and joining them into arrays.
+
+    Articles are encoded once, their encoded sizes are used to pack messages
+    and the encoded bytes are joined into each message without re-encoding.
+    """
+
+    name = ""
+    content_type = ""
+    # Binary payloads are base64 encoded in message bodies
+    binary = False
+    # Bytes between two items of an array and most bytes around its items
+    separator_bytes = 0
+    array_bytes = 0
+
+    @abstractmethod
+    def encode(self, item) -> bytes:
+        """Encode a single article."""
+
+    @abstractmethod
+    def join(self, encoded_items: list[bytes]) -> bytes:
+        """Join encoded articles into an encoded array."""
+
+    @abstractmethod
+    def decode(self, data: bytes) -> list:
+        """Decode an encoded array of articles."""
+
+    def dumps(self, items: list) -> bytes:
+        """Encode a list of articles as an array."""
+        return self.join([self.encode(item) for item in items])
+
+
+class JsonSerializer(Serializer):
+    """Standard library json, the default."""
+
+    name = "json"
+    content_type = "application/json"
+    separator_bytes = 1
+    array_bytes = 2
+
+    def encode(self, item) -> bytes:
+        return json.dumps(item, default=json_default).encode()
+
+    def join(self, encoded_items: list[bytes]) -> bytes:
+        return b"[" + b",".join(encoded_items) + b"]"
+
+    def decode(self, data: bytes) -> list:
+        return json.loads(data)
+
+
+class OrjsonSerializer(JsonSerializer):
+    """JSON encoded with the optional orjson package."""
+
+    name = "orjson"
+
+    def encode(self, item) -> bytes:
+        # orjson serialises dataclasses itself, Articles must use their keys
+        return orjson.dumps(
+            item,
+            default=json_default,
+            option=orjson.OPT_PASSTHROUGH_DATACLASS,
+        )
+
+    def decode(self, data: bytes) -> list:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer(Serializer):
+    """MessagePack encoded with the optional msgpack package."""
+
+    name = "msgpack"
+    content_type = "application/msgpack"
+    binary = True
+    separator_bytes = 0
+    array_bytes = 5
+
+    def encode(self, item) -> bytes:
+        return msgpack.packb(item, default=json_default)
+
+    def join(self, encoded_items: list[bytes]) -> bytes:
+        count = len(encoded_items)
+        if count < 16:
+            header = bytes([0x90 | count])
+        elif count < 2**16:
+            header = b"\xdc" + struct.pack(">H", count)
+        else:
+            header = b"\xdd" + struct.pack(">I", count)
+        return header + b"".join(encoded_items)
+
+    def decode(self, data: bytes) -> list:
+        return msgpack.unpackb(data, raw=False)
+
+
+SERIALIZERS = {
+    "json": JsonSerializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+# Optional package each serializer needs, None when it is not installed
+SERIALIZER_PACKAGES = {"orjson": orjson, "msgpack": msgpack}
+CONTENT_TYPES = {
+    "application/json": JsonSerializer,
+    "application/msgpack": MsgpackSerializer,
+}
+
+
+def available_serializers() -> list[str]:
+    """Return the names of the serializers that can be used.
+
+    Returns:
+        list[str]: Serializer names whose optional packages are installed
+    """
+    return [
+        name
+        for name in SERIALIZERS
+        if SERIALIZER_PACKAGES.get(name, json) is not None
+    ]
+
+
+def get_serializer(name: str | None = "json") -> Serializer:
+    """Return a serializer by name, falling back to json when unavailable.
+
+    "auto" selects orjson when it is installed, otherwise json. Both produce
+    standard JSON, msgpack changes the message format and is never chosen
+    automatically.
+
+    Args:
+        name (str | None): "json", "orjson", "msgpack" or "auto". None selects
+        json. Defaults to "json".
+
+    Raises:
+        ValueError: Raised for an unknown serializer
+
+    Returns:
+        Serializer: Serializer instance
+    """
+    name = (name or "json").lower()
+    if name not in MESSAGE_SERIALIZERS:
+        raise ValueError(f"Unknown message serializer: {name}")
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name not in available_serializers():
+        logger.warning("%s is not installed, using json serialization", name)
+        name = "json"
+    return SERIALIZERS[name]()
+
+
+def serializer_for_content_type(content_type: str | None) -> Serializer:
+    """Return a serializer able to decode a message content type.
+
+    Args:
+        content_type (str | None): ContentType attribute of a message, None
+        for messages sent before it was recorded
+
+    Raises:
+        ValueError: Raised for an unsupported content type or when the package
+        needed to decode it is not installed
+
+    Returns:
+        Serializer: Serializer decoding the content type
+    """
+    serializer = CONTENT_TYPES.get(content_type or "application/json")
+    if serializer is None:
+        raise ValueError(f"Unsupported message content type: {content_type}")
+    if serializer.name not in available_serializers():
+        raise ValueError(
+            f"{serializer.name} is required to decode {content_type} messages"
+        )
+    return serializer()
@@ -0,0 +1,117 @@
+"""Coalescing of identical calls made while one is already in flight"""
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+
+# Result handed to waiting coroutines when the caller making the call was
+# cancelled, so one of them makes the call again
+LEADER_CANCELLED = object()
+
+
+class Call:
+    """A call in flight, shared by the caller making it and those waiting."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Shares one call between every caller asking for the same key at once.
+
+    The first caller for a key makes the call, callers arriving while it is
+    in flight wait for it and receive the same result, or have the same
+    exception raised. Once the call returns the key is released, so later
+    callers make a new call: results are shared, not cached. Threads use do
+    and coroutines do_async, coroutines only share calls made on their own
+    event loop. A coroutine making the call that is cancelled hands it over to
+    the coroutines waiting for it, one of which makes the call again. Shared
+    results are the same object for every caller and must not be modified.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.async_calls = {}
+
+    def do(self, key: Hashable, func: Callable, **kwargs):
+        """Call func(**kwargs), or wait for the identical call in flight.
+
+        Args:
+            key (Hashable): Identifies calls that return the same result
+            func (Callable): Function to call
+            **kwargs: Arguments to pass to func
+
+        Raises:
+            BaseException: Raised when the shared call raised it
+
+        Returns:
+            Result of the shared call
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            in_flight = call is not None
+            if not in_flight:
+                call = self.calls[key] = Call()
+        if in_flight:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(**kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+    async def do_async(
+        self, key: Hashable, func: Callable[..., Awaitable], **kwargs
+    ):
+        """Await func(**kwargs), or wait for the identical call in flight.
+
+        Args:
+            key (Hashable): Identifies calls that return the same result
+            func (Callable[..., Awaitable]): Coroutine function to await
+            **kwargs: Arguments to pass to func
+
+        Raises:
+            BaseException: Raised when the shared call raised it
+
+        Returns:
+            Result of the shared call
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        while (future := self.async_calls.get(flight_key)) is not None:
+            # Shielded so a cancelled waiter does not cancel the shared call
+            result = await asyncio.shield(future)
+            if result is not LEADER_CANCELLED:
+                return result
+
+        future = loop.create_future()
+        self.async_calls[flight_key] = future
+        try:
+            result = await func(**kwargs)
+        except asyncio.CancelledError:
+            future.set_result(LEADER_CANCELLED)
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Marks the exception retrieved when no caller was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.async_calls[flight_key]
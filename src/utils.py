@@ -1,14 +1,69 @@
 """Utility functions to assist guardian_api and lambda_main files"""
 
-import boto3
+from __future__ import annotations
+
+import os
 import json
+import gzip
+import time
+import threading
+import base64
+import hashlib
 import logging
+from functools import cache
 from botocore.exceptions import ClientError
+from typing import TYPE_CHECKING
+
+# boto3 and botocore.config are imported on first use, see get_boto3_client
+if TYPE_CHECKING:
+    import boto3
+    from botocore.config import Config
 
 try:
     from src.exceptions import BotocoreError
+    from src.rate_limiter import backoff_delay
+    from src.article import Article, json_default
+    from src.projection import Projection
+    from src.serializers import (
+        Serializer,
+        get_serializer,
+        serializer_for_content_type,
+        CONTENT_TYPE_ATTRIBUTE,
+    )
 except ImportError:
     from exceptions import BotocoreError
+    from rate_limiter import backoff_delay
+    from article import Article, json_default
+    from projection import Projection
+    from serializers import (
+        Serializer,
+        get_serializer,
+        serializer_for_content_type,
+        CONTENT_TYPE_ATTRIBUTE,
+    )
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# SQS limits for a single message and for a SendMessageBatch request
+MAX_MESSAGE_BYTES = 256 * 1024
+MAX_BATCH_ENTRIES = 10
+# Leaves room for message attributes within MAX_MESSAGE_BYTES
+DEFAULT_MESSAGE_BUDGET = 250 * 1024
+
+# Message attribute naming the compression of an encoded message body
+CONTENT_ENCODING_ATTRIBUTE = "ContentEncoding"
+MESSAGE_COMPRESSIONS = (None, "gzip", "zstd")
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+# Uncompressed bytes packed per message budget before compressing, messages
+# that still do not fit are split
+COMPRESSED_PACKING_FACTOR = 4
+
+# Message attribute marking a body stored in S3, the message carries a pointer
+CLAIM_CHECK_ATTRIBUTE = "ClaimCheck"
+CLAIM_CHECK_PREFIX = "guardian-messages/"
 
 logger = logging.getLogger(name="Guardian Search Content")
 logger.setLevel(logging.INFO)
@@ -18,40 +73,101 @@ handler.setFormatter(
 )
 logger.addHandler(handler)
 
+# Reused across warm Lambda invocations, see get_boto3_client
+BOTO3_SESSION = None
+BOTO3_CLIENTS = {}
+BOTO3_CLIENTS_LOCK = threading.Lock()
+
+
+def create_boto3_config() -> Config:
+    """Create the botocore client configuration from environment variables.
+
+    GUARDIAN_BOTO_MAX_POOL sets the connection pool size of each client,
+    GUARDIAN_BOTO_RETRY_MODE the botocore retry mode and
+    GUARDIAN_BOTO_MAX_ATTEMPTS the maximum attempts per request.
+
+    Returns:
+        Config: Botocore client configuration
+    """
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=int(os.getenv("GUARDIAN_BOTO_MAX_POOL", "10")),
+        retries={
+            "mode": os.getenv("GUARDIAN_BOTO_RETRY_MODE", "standard"),
+            "max_attempts": int(os.getenv("GUARDIAN_BOTO_MAX_ATTEMPTS", "3")),
+        },
+    )
+
+
+def get_boto3_client(service: str, region: str | None = None) -> boto3.client:
+    """Return a shared Boto3 client, creating it on first use.
+
+    Clients are created from one session and kept per service and region, so
+    endpoint and credential resolution happen once per warm container. Boto3
+    clients are thread-safe and may be shared by concurrent senders.
+
+    Args:
+        service (str): AWS service name, e.g. "sqs"
+        region (str | None): AWS region. Defaults to the session region.
+
+    Returns:
+        boto3.client: Shared Boto3 client
+    """
+    global BOTO3_SESSION
+    import boto3
+
+    key = (service, region)
+    with BOTO3_CLIENTS_LOCK:
+        client = BOTO3_CLIENTS.get(key)
+        if client is None:
+            if BOTO3_SESSION is None:
+                BOTO3_SESSION = boto3.session.Session()
+            client = BOTO3_SESSION.client(
+                service, region_name=region, config=create_boto3_config()
+            )
+            BOTO3_CLIENTS[key] = client
+        return client
+
+
+def reset_boto3_clients() -> None:
+    """Discard shared Boto3 clients so they are rebuilt on next use."""
+    global BOTO3_SESSION
+    with BOTO3_CLIENTS_LOCK:
+        BOTO3_CLIENTS.clear()
+        BOTO3_SESSION = None
+
 
-def format_results(search_results: list[dict]) -> list[dict]:
+def format_results(
+    search_results: list[dict],
+    preview_length: int | None = 500,
+    projection: Projection | None = None,
+) -> list[Article]:
     """Format the Guardian search content, keeping only information required.
 
     Args:
         search_results (list[dict]): List of dictionaries containing the search results
         from Guardian API
+        preview_length (int | None): Characters of body text kept as the content
+        preview, None keeps the full body text. Defaults to 500.
+        projection (Projection | None): Preview field, length and keywords to
+        keep, overriding preview_length. Defaults to None.
 
     Raises:
         KeyError: Error raised when the search results do not contain the expected keys
         or when the format of the search results is incorrect.
 
     Returns:
-        list[dict]: List of dictionaries containing the formatted search results
+        list[Article]: Formatted search results, read only mappings with the
+        keys webPublicationDate, webTitle, webUrl, content_preview and keywords
     """
 
+    projection = projection or Projection(preview_length=preview_length)
     try:
-        keys_required = ["webPublicationDate", "webTitle", "webUrl"]
-        filtered_data = []
-        for response in search_results:
-            updated_response = {
-                key: value
-                for key, value in response.items()
-                if key in keys_required
-            }
-            updated_response["content_preview"] = response["fields"][
-                "bodyText"
-            ][:500]
-            updated_response["keywords"] = [
-                item["webTitle"] for item in response["tags"]
-            ]
-            filtered_data.append(updated_response)
-
-        return filtered_data
+        return [
+            Article.from_response(response, projection=projection)
+            for response in search_results
+        ]
 
     except KeyError as i_exc:
         raise KeyError(
@@ -127,7 +243,7 @@ def send_queue_message(
     try:
         response = sqs_client.send_message(
             QueueUrl=queue_url,
-            MessageBody=json.dumps(message_body),
+            MessageBody=json.dumps(message_body, default=json_default),
             MessageAttributes={
                 "ID": {"DataType": "String", "StringValue": message_id},
             },
@@ -156,3 +272,538 @@ def send_queue_message(
         raise BotocoreError(
             f"Unexpected error when sending message to {queue_name}: {str(e_exc)}"
         ) from None
+
+
+def pack_articles(
+    encoded_articles: list[str] | list[bytes],
+    max_message_bytes: int = DEFAULT_MESSAGE_BUDGET,
+    allow_oversized: bool = False,
+    sizes: list[int] | None = None,
+    separator_bytes: int = 1,
+    array_bytes: int = 2,
+) -> list[list[str]] | list[list[bytes]]:
+    """Group serialised articles into arrays within a size budget.
+
+    Articles are kept in order, a new group is started whenever the next
+    article would take the array over the budget.
+
+    Args:
+        encoded_articles (list[str] | list[bytes]): Serialised articles
+        max_message_bytes (int): Maximum size of each array in bytes.
+        Defaults to 250KB.
+        allow_oversized (bool): Place articles larger than max_message_bytes
+        in a group of their own instead of raising. Defaults to False.
+        sizes (list[int] | None): Size in bytes of each serialised article,
+        computed from encoded_articles when None. Defaults to None.
+        separator_bytes (int): Bytes between two items of an array. Defaults
+        to 1, the comma of a JSON array.
+        array_bytes (int): Bytes around the items of an array. Defaults to 2,
+        the brackets of a JSON array.
+
+    Raises:
+        ValueError: Raised when a single article exceeds max_message_bytes
+        and allow_oversized is False
+
+    Returns:
+        list[list[str]] | list[list[bytes]]: Serialised articles of each
+        message
+    """
+    if sizes is None:
+        sizes = [
+            len(encoded.encode() if isinstance(encoded, str) else encoded)
+            for encoded in encoded_articles
+        ]
+    groups = []
+    current = []
+    current_size = array_bytes
+    for encoded, size in zip(encoded_articles, sizes, strict=True):
+        if size + array_bytes > max_message_bytes and allow_oversized:
+            if current:
+                groups.append(current)
+            groups.append([encoded])
+            current = []
+            current_size = array_bytes
+            continue
+        if size + array_bytes > max_message_bytes:
+            raise ValueError(
+                f"Article of {size} bytes exceeds the {max_message_bytes} byte "
+                "message budget"
+            )
+        # Items after the first are preceded by a separator
+        if (
+            current
+            and current_size + separator_bytes + size > max_message_bytes
+        ):
+            groups.append(current)
+            current = []
+            current_size = array_bytes
+        current_size += size + (separator_bytes if current else 0)
+        current.append(encoded)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def compress_payload(
+    data: bytes,
+    compression: str | None,
+    compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+    binary: bool = False,
+) -> tuple[bytes, str | None]:
+    """Compress a serialised payload above a size threshold.
+
+    zstd requires the optional zstandard package, gzip is used when it is not
+    installed. Compressed payloads are base64 encoded in message bodies, so a
+    text payload is only compressed when that still makes it smaller.
+
+    Args:
+        data (bytes): Serialised payload
+        compression (str | None): "gzip", "zstd" or None to disable compression
+        compression_threshold (int): Minimum payload size in bytes to compress.
+        Defaults to 1KB.
+        binary (bool): The payload is base64 encoded even when uncompressed.
+        Defaults to False.
+
+    Raises:
+        ValueError: Raised for an unknown compression
+
+    Returns:
+        tuple[bytes, str | None]: Payload and its content encoding, None when
+        it was not compressed
+    """
+    if compression not in MESSAGE_COMPRESSIONS:
+        raise ValueError(f"Unknown message compression: {compression}")
+    if compression is None or len(data) < compression_threshold:
+        return data, None
+    if compression == "zstd" and zstandard is None:
+        warn_zstd_unavailable()
+        compression = "gzip"
+    if compression == "zstd":
+        compressed = zstandard.ZstdCompressor().compress(data)
+    else:
+        compressed = gzip.compress(data, mtime=0)
+    compressed_size = len(compressed) if binary else base64_size(compressed)
+    # Compression does not pay off for small or incompressible payloads
+    if compressed_size >= len(data):
+        return data, None
+    return compressed, compression
+
+
+@cache
+def warn_zstd_unavailable() -> None:
+    """Log once that zstd compression is set without zstandard installed."""
+    logger.warning("zstandard is not installed, using gzip compression")
+
+
+def base64_size(data: bytes) -> int:
+    """Return the size in bytes of data once base64 encoded."""
+    return 4 * -(-len(data) // 3)
+
+
+def store_claim_check(
+    body: str,
+    bucket: str,
+    s3_client: boto3.client,
+    prefix: str = CLAIM_CHECK_PREFIX,
+) -> str:
+    """Store a message body in S3 and return a pointer to send in its place.
+
+    Objects are keyed by the SHA-256 of the body, so resending the same
+    message does not store it twice.
+
+    Args:
+        body (str): Message body
+        bucket (str): S3 bucket name
+        s3_client (boto3.client): Boto3 S3 client
+        prefix (str): Object key prefix. Defaults to "guardian-messages/".
+
+    Returns:
+        str: JSON pointer containing the bucket, key, size and sha256 of the body
+    """
+    data = body.encode()
+    checksum = hashlib.sha256(data).hexdigest()
+    key = f"{prefix}{checksum}.json"
+    s3_client.put_object(
+        Bucket=bucket, Key=key, Body=data, ContentType="application/json"
+    )
+    return json.dumps(
+        {"bucket": bucket, "key": key, "size": len(data), "sha256": checksum}
+    )
+
+
+def read_claim_check(pointer: str, s3_client: boto3.client) -> str:
+    """Fetch a message body stored by store_claim_check and verify it.
+
+    Args:
+        pointer (str): JSON pointer sent as the message body
+        s3_client (boto3.client): Boto3 S3 client
+
+    Raises:
+        ValueError: Raised when the stored body does not match its checksum
+
+    Returns:
+        str: Original message body
+    """
+    claim_check = json.loads(pointer)
+    response = s3_client.get_object(
+        Bucket=claim_check["bucket"], Key=claim_check["key"]
+    )
+    data = response["Body"].read()
+    if hashlib.sha256(data).hexdigest() != claim_check["sha256"]:
+        raise ValueError(
+            f"Checksum mismatch for s3://{claim_check['bucket']}/"
+            f"{claim_check['key']}"
+        )
+    return data.decode()
+
+
+def decode_message_body(
+    body: str,
+    message_attributes: dict | None = None,
+    s3_client: boto3.client = None,
+) -> list[dict]:
+    """Decode a message body sent by send_queue_messages.
+
+    Args:
+        body (str): Message body received from SQS
+        message_attributes (dict | None): MessageAttributes received with the
+        message. Defaults to None.
+        s3_client (boto3.client): Boto3 S3 client used to fetch claim-checked
+        bodies. Defaults to the shared client.
+
+    Raises:
+        ValueError: Raised for an unsupported content type or encoding, or a
+        claim-checked body failing checksum verification
+
+    Returns:
+        list[dict]: Articles contained in the message
+    """
+    message_attributes = message_attributes or {}
+    if CLAIM_CHECK_ATTRIBUTE in message_attributes:
+        body = read_claim_check(body, s3_client or get_boto3_client("s3"))
+    encoding = message_attributes.get(CONTENT_ENCODING_ATTRIBUTE, {}).get(
+        "StringValue"
+    )
+    serializer = serializer_for_content_type(
+        message_attributes.get(CONTENT_TYPE_ATTRIBUTE, {}).get("StringValue")
+    )
+    if encoding is None and not serializer.binary:
+        return serializer.decode(body.encode())
+    data = base64.b64decode(body)
+    if encoding == "gzip":
+        data = gzip.decompress(data)
+    elif encoding == "zstd":
+        if zstandard is None:
+            raise ValueError("zstandard is required to decode zstd messages")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif encoding is not None:
+        raise ValueError(f"Unsupported message content encoding: {encoding}")
+    return serializer.decode(data)
+
+
+def encode_messages(
+    message_body: list[dict],
+    max_message_bytes: int = DEFAULT_MESSAGE_BUDGET,
+    compression: str | None = None,
+    compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+    allow_oversized: bool = False,
+    serializer: Serializer | None = None,
+) -> list[tuple[str, str | None]]:
+    """Pack articles into message bodies, compressing them when enabled.
+
+    Each article is serialised once and packed by its encoded size, messages
+    are joined from the encoded articles. With compression, articles are
+    packed against a larger uncompressed budget and any message still over
+    max_message_bytes once compressed is split in half until it fits. Binary
+    and compressed payloads are base64 encoded.
+
+    Args:
+        message_body (list[dict]): List of dictionaries containing search results
+        from Guardian API
+        max_message_bytes (int): Maximum size of each message in bytes.
+        Defaults to 250KB.
+        compression (str | None): "gzip", "zstd" or None. Defaults to None.
+        compression_threshold (int): Minimum body size in bytes to compress.
+        Defaults to 1KB.
+        allow_oversized (bool): Return single articles that cannot fit in a
+        message on their own instead of raising. Defaults to False.
+        serializer (Serializer | None): Article serializer, None uses json.
+        Defaults to None.
+
+    Raises:
+        ValueError: Raised when a single article cannot fit in a message and
+        allow_oversized is False
+
+    Returns:
+        list[tuple[str, str | None]]: Message bodies, in article order, and
+        their content encoding
+    """
+    serializer = serializer or get_serializer()
+    encoded = [serializer.encode(item) for item in message_body]
+    packing_bytes = max_message_bytes
+    if serializer.binary:
+        packing_bytes = packing_bytes * 3 // 4
+    if compression is not None:
+        packing_bytes *= COMPRESSED_PACKING_FACTOR
+    groups = pack_articles(
+        encoded,
+        packing_bytes,
+        allow_oversized=allow_oversized,
+        sizes=[len(item) for item in encoded],
+        separator_bytes=serializer.separator_bytes,
+        array_bytes=serializer.array_bytes,
+    )
+    messages = []
+    pending = groups[::-1]
+    while pending:
+        group = pending.pop()
+        data, encoding = compress_payload(
+            serializer.join(group),
+            compression,
+            compression_threshold,
+            binary=serializer.binary,
+        )
+        if encoding is None and not serializer.binary:
+            body, body_size = data.decode(), len(data)
+        else:
+            body = base64.b64encode(data).decode("ascii")
+            body_size = len(body)
+        if body_size <= max_message_bytes or (
+            len(group) == 1 and allow_oversized
+        ):
+            messages.append((body, encoding))
+        elif len(group) == 1:
+            raise ValueError(
+                f"Article exceeds the {max_message_bytes} byte message budget"
+            )
+        else:
+            middle = len(group) // 2
+            pending.extend([group[middle:], group[:middle]])
+    return messages
+
+
+def message_attributes_size(message_attributes: dict) -> int:
+    """Return the bytes SQS counts for message attributes.
+
+    Each attribute's name, data type and value count towards the message and
+    batch size limits, along with the body.
+
+    Args:
+        message_attributes (dict): MessageAttributes of a message
+
+    Returns:
+        int: Size of the attributes in bytes
+    """
+    return sum(
+        len(name.encode())
+        + len(attribute["DataType"].encode())
+        + len(attribute["StringValue"].encode())
+        for name, attribute in message_attributes.items()
+    )
+
+
+def group_batches(
+    messages: list[str],
+    max_batch_bytes: int = MAX_MESSAGE_BYTES,
+    sizes: list[int] | None = None,
+) -> list[list[int]]:
+    """Group messages into SendMessageBatch requests.
+
+    Args:
+        messages (list[str]): Message bodies
+        max_batch_bytes (int): Maximum total size of a batch request. Defaults
+        to 256KB.
+        sizes (list[int] | None): Size in bytes of each message, including its
+        attributes, computed from the bodies alone when None. Defaults to None.
+
+    Returns:
+        list[list[int]]: Indexes of the messages in each batch, at most 10 per
+        batch
+    """
+    if sizes is None:
+        sizes = [len(message.encode()) for message in messages]
+    batches = []
+    current = []
+    current_size = 0
+    for index, size in enumerate(sizes):
+        if current and (
+            len(current) >= MAX_BATCH_ENTRIES
+            or current_size + size > max_batch_bytes
+        ):
+            batches.append(current)
+            current = []
+            current_size = 0
+        current.append(index)
+        current_size += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def send_queue_messages(
+    queue_url: str,
+    message_id: str,
+    message_body: list[dict],
+    sqs_client: boto3.client,
+    max_message_bytes: int = DEFAULT_MESSAGE_BUDGET,
+    max_retries: int = 3,
+    base_delay: float = 0.2,
+    compression: str | None = None,
+    compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+    claim_check_bucket: str | None = None,
+    claim_check_threshold: int = DEFAULT_MESSAGE_BUDGET,
+    s3_client: boto3.client = None,
+    serializer: Serializer | None = None,
+) -> list[str]:
+    """Send a list of articles to the SQS queue in size-limited batches.
+
+    Articles are packed into messages within max_message_bytes, which are sent
+    up to 10 at a time with SendMessageBatch. Entries reported as failed are
+    retried with exponential backoff, failures caused by the request itself
+    are not retried. Every message carries a ContentType attribute naming its
+    serialization and compressed messages a ContentEncoding attribute, both
+    are read back with decode_message_body.
+
+    With a claim check bucket, articles are packed within claim_check_threshold
+    and any single article still too large is stored in S3, the queue message
+    then carries a pointer and checksum flagged by a ClaimCheck attribute.
+
+    Args:
+        queue_url (str): AWS SQS queue URL
+        message_id (str): Message ID to be used as a message attribute
+        message_body (list[dict]): List of dictionaries containing search results
+        from Guardian API
+        sqs_client (boto3.client): Boto3 SQS client
+        max_message_bytes (int): Maximum size of each message in bytes.
+        Defaults to 250KB.
+        max_retries (int): Maximum attempts for failed entries. Defaults to 3.
+        base_delay (float): Backoff in seconds before the first retry.
+        Defaults to 0.2.
+        compression (str | None): "gzip", "zstd" or None to send plain JSON.
+        Defaults to None.
+        compression_threshold (int): Minimum message size in bytes to compress.
+        Defaults to 1KB.
+        claim_check_bucket (str | None): S3 bucket for oversized messages, None
+        disables the claim check. Defaults to None.
+        claim_check_threshold (int): Message size in bytes above which bodies
+        are stored in S3. Defaults to 250KB.
+        s3_client (boto3.client): Boto3 S3 client used for the claim check.
+        Defaults to the shared client.
+        serializer (Serializer | None): Article serializer, None uses json.
+        Defaults to None.
+
+    Raises:
+        ClientError: Error raised when Boto3 encounters an client issue
+        BotocoreError: Error raised when messages fail to send or the function
+        encounters an unexpected issue
+
+    Returns:
+        list[str]: Message IDs of the sent messages, in article order
+    """
+    queue_name = queue_url.split("/")[-1]
+    try:
+        serializer = serializer or get_serializer()
+        if claim_check_bucket is not None:
+            max_message_bytes = min(max_message_bytes, claim_check_threshold)
+        messages = encode_messages(
+            message_body,
+            max_message_bytes=max_message_bytes,
+            compression=compression,
+            compression_threshold=compression_threshold,
+            allow_oversized=claim_check_bucket is not None,
+            serializer=serializer,
+        )
+        message_ids = [None] * len(messages)
+        bodies = []
+        sizes = []
+        attributes = []
+        for body, encoding in messages:
+            message_attributes = {
+                "ID": {"DataType": "String", "StringValue": message_id},
+                CONTENT_TYPE_ATTRIBUTE: {
+                    "DataType": "String",
+                    "StringValue": serializer.content_type,
+                },
+            }
+            if encoding is not None:
+                message_attributes[CONTENT_ENCODING_ATTRIBUTE] = {
+                    "DataType": "String",
+                    "StringValue": encoding,
+                }
+            size = len(body.encode())
+            if size > max_message_bytes:
+                s3_client = s3_client or get_boto3_client("s3")
+                body = store_claim_check(body, claim_check_bucket, s3_client)
+                size = len(body)
+                message_attributes[CLAIM_CHECK_ATTRIBUTE] = {
+                    "DataType": "String",
+                    "StringValue": "s3",
+                }
+            bodies.append(body)
+            sizes.append(size + message_attributes_size(message_attributes))
+            attributes.append(message_attributes)
+
+        for batch in group_batches(bodies, sizes=sizes):
+            pending = batch
+            attempt = 0
+            while pending:
+                attempt += 1
+                response = sqs_client.send_message_batch(
+                    QueueUrl=queue_url,
+                    Entries=[
+                        {
+                            "Id": str(index),
+                            "MessageBody": bodies[index],
+                            "MessageAttributes": attributes[index],
+                        }
+                        for index in pending
+                    ],
+                )
+                for entry in response.get("Successful", []):
+                    message_ids[int(entry["Id"])] = entry["MessageId"]
+
+                failed = response.get("Failed", [])
+                permanent = [entry for entry in failed if entry["SenderFault"]]
+                if permanent or (failed and attempt >= max_retries):
+                    raise BotocoreError(
+                        f"Failed to send {len(failed)} messages to {queue_name}: "
+                        + "; ".join(
+                            f"{entry['Code']} {entry.get('Message', '')}".strip()
+                            for entry in failed
+                        )
+                    )
+                pending = [int(entry["Id"]) for entry in failed]
+                if pending:
+                    logger.warning(
+                        "Retrying %(amount)s failed messages to %(queue_name)s",
+                        {"amount": len(pending), "queue_name": queue_name},
+                    )
+                    time.sleep(
+                        backoff_delay(
+                            attempt=attempt, base_delay=base_delay, max_delay=5
+                        )
+                    )
+
+        logger.info(
+            "Successfully sent %(amount)s messages to %(queue_name)s",
+            {"amount": len(message_ids), "queue_name": queue_name},
+        )
+        return message_ids
+
+    except ClientError as c_exc:
+        error_response = {
+            "Error": {
+                "Code": c_exc.response["Error"]["Code"],
+                "Message": f"Boto3 error when sending messages to {queue_name}:"
+                f" {c_exc.response['Error']['Message']}",
+            }
+        }
+        raise ClientError(
+            error_response=error_response, operation_name=c_exc.operation_name
+        ) from None
+    except BotocoreError:
+        raise
+    except Exception as e_exc:
+        raise BotocoreError(
+            f"Unexpected error when sending messages to {queue_name}: {str(e_exc)}"
+        ) from None
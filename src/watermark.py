@@ -0,0 +1,221 @@
+"""Per-query high-water marks for incremental Guardian article retrieval"""
+
+from __future__ import annotations
+
+import os
+import json
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import boto3
+
+try:
+    from src.utils import get_boto3_client
+except ImportError:
+    from utils import get_boto3_client
+
+# Days searched by the first incremental run of a query, see first_run_from_date
+DEFAULT_LOOKBACK_DAYS = 1
+
+
+def is_new_article(article: dict, watermark: dict | None) -> bool:
+    """Check whether an article was published after the watermark.
+
+    Articles published at exactly the watermark time are new unless their id
+    was already seen, so boundary duplicates are dropped.
+
+    Args:
+        article (dict): Guardian article containing id and webPublicationDate
+        watermark (dict | None): {published, ids} of the previous run
+
+    Returns:
+        bool: True when the article has not been retrieved before
+    """
+    if watermark is None:
+        return True
+    published = article["webPublicationDate"]
+    if published != watermark["published"]:
+        return published > watermark["published"]
+    return article["id"] not in watermark["ids"]
+
+
+def first_run_from_date(
+    lookback_days: float | None = None, now: datetime | None = None
+) -> str:
+    """Return the date the first incremental run of a query searches from.
+
+    Without a watermark or a from_date a run would page through the query's
+    whole archive, so first runs only look back a bounded number of days.
+
+    Args:
+        lookback_days (float | None): Days to look back. Defaults to
+        GUARDIAN_INCREMENTAL_LOOKBACK_DAYS or 1.
+        now (datetime | None): Current time. Defaults to now in UTC.
+
+    Returns:
+        str: Date to search from in YYYY-MM-DD format
+    """
+    if lookback_days is None:
+        lookback_days = float(
+            os.getenv(
+                "GUARDIAN_INCREMENTAL_LOOKBACK_DAYS", DEFAULT_LOOKBACK_DAYS
+            )
+        )
+    now = now or datetime.now(timezone.utc)
+    return (now - timedelta(days=lookback_days)).date().isoformat()
+
+
+def advance_watermark(
+    watermark: dict | None, articles: list[dict]
+) -> dict | None:
+    """Move the watermark forward to the latest of the given articles.
+
+    Args:
+        watermark (dict | None): Current {published, ids} watermark
+        articles (list[dict]): Guardian articles containing id and
+        webPublicationDate
+
+    Returns:
+        dict | None: Watermark of the latest publication time seen and the ids
+        published at that time
+    """
+    for article in articles:
+        published = article["webPublicationDate"]
+        if watermark is None or published > watermark["published"]:
+            watermark = {"published": published, "ids": [article["id"]]}
+        elif (
+            published == watermark["published"]
+            and article["id"] not in watermark["ids"]
+        ):
+            watermark = {
+                "published": published,
+                "ids": [*watermark["ids"], article["id"]],
+            }
+    return watermark
+
+
+class WatermarkStore(ABC):
+    """Base class for persisting a watermark per query."""
+
+    @abstractmethod
+    def get(self, query: str) -> dict | None:
+        """Return the stored {published, ids} watermark for query, if any."""
+
+    @abstractmethod
+    def set(self, query: str, watermark: dict) -> None:
+        """Store the {published, ids} watermark for query."""
+
+
+class SQLiteWatermarkStore(WatermarkStore):
+    """Watermark store backed by a local SQLite database file."""
+
+    def __init__(self, path: str | None = None):
+        """
+        Args:
+            path (str | None): Database file path. Defaults to
+            guardian_watermarks.db in the system temporary directory.
+        """
+        self.path = path or os.path.join(
+            tempfile.gettempdir(), "guardian_watermarks.db"
+        )
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks "
+                "(query TEXT PRIMARY KEY, published TEXT, ids TEXT)"
+            )
+
+    def get(self, query: str) -> dict | None:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT published, ids FROM watermarks WHERE query = ?",
+                (query,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"published": row[0], "ids": json.loads(row[1])}
+
+    def set(self, query: str, watermark: dict) -> None:
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?)",
+                (query, watermark["published"], json.dumps(watermark["ids"])),
+            )
+
+
+class DynamoDBWatermarkStore(WatermarkStore):
+    """Watermark store backed by a DynamoDB table with a "query" string key."""
+
+    def __init__(self, table_name: str, dynamodb_client: boto3.client):
+        """
+        Args:
+            table_name (str): DynamoDB table name
+            dynamodb_client (boto3.client): Boto3 DynamoDB client
+        """
+        self.table_name = table_name
+        self.dynamodb_client = dynamodb_client
+
+    def get(self, query: str) -> dict | None:
+        response = self.dynamodb_client.get_item(
+            TableName=self.table_name,
+            Key={"query": {"S": query}},
+            ConsistentRead=True,
+        )
+        item = response.get("Item")
+        if item is None:
+            return None
+        return {
+            "published": item["published"]["S"],
+            "ids": [value["S"] for value in item["ids"]["L"]],
+        }
+
+    def set(self, query: str, watermark: dict) -> None:
+        self.dynamodb_client.put_item(
+            TableName=self.table_name,
+            Item={
+                "query": {"S": query},
+                "published": {"S": watermark["published"]},
+                "ids": {"L": [{"S": value} for value in watermark["ids"]]},
+            },
+        )
+
+
+# Reused across warm Lambda invocations, see get_watermark_store
+WATERMARK_STORE = None
+WATERMARK_STORE_LOCK = threading.Lock()
+
+
+def create_watermark_store_from_env() -> WatermarkStore:
+    """Create the watermark store configured by environment variables.
+
+    GUARDIAN_STATE_TABLE selects a DynamoDB table, otherwise a SQLite database
+    at GUARDIAN_STATE_PATH is used.
+
+    Returns:
+        WatermarkStore: Configured watermark store
+    """
+    table_name = os.getenv("GUARDIAN_STATE_TABLE")
+    if table_name:
+        return DynamoDBWatermarkStore(
+            table_name=table_name, dynamodb_client=get_boto3_client("dynamodb")
+        )
+    return SQLiteWatermarkStore(path=os.getenv("GUARDIAN_STATE_PATH"))
+
+
+def get_watermark_store() -> WatermarkStore:
+    """Return the shared watermark store, creating it on first use.
+
+    Returns:
+        WatermarkStore: Shared watermark store
+    """
+    global WATERMARK_STORE
+    with WATERMARK_STORE_LOCK:
+        if WATERMARK_STORE is None:
+            WATERMARK_STORE = create_watermark_store_from_env()
+        return WATERMARK_STORE
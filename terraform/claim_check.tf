@@ -0,0 +1,26 @@
+resource "aws_s3_bucket" "claim_check" {
+  bucket_prefix = "guardian-claim-check-"
+  force_destroy = true
+
+  tags = {
+    tag-key = "de-data-streaming-guardian"
+  }
+}
+
+# Stored bodies only need to outlive the 3 day queue retention period
+resource "aws_s3_bucket_lifecycle_configuration" "claim_check" {
+  bucket = aws_s3_bucket.claim_check.id
+
+  rule {
+    id     = "expire-claim-checks"
+    status = "Enabled"
+
+    filter {
+      prefix = "guardian-messages/"
+    }
+
+    expiration {
+      days = 4
+    }
+  }
+}
@@ -11,9 +11,16 @@ resource "aws_lambda_function" "guardian_lambda_api" {
   role = aws_iam_role.lambda_role.arn
   handler = "lambda_main.guardian_lambda"
   runtime = "python3.12"
-  timeout = 5
+  timeout = 30
   layers = [aws_lambda_layer_version.dependencies.arn]
   environment {
-    variables = {GUARDIAN_API_KEY=var.api_key}
+    variables = {
+      GUARDIAN_API_KEY=var.api_key
+      GUARDIAN_RATE_LIMIT=var.rate_limit
+      GUARDIAN_CACHE_BACKEND="file"
+      GUARDIAN_STATE_TABLE=aws_dynamodb_table.guardian_state.name
+      GUARDIAN_CLAIM_CHECK_BUCKET=aws_s3_bucket.claim_check.bucket
+      GUARDIAN_STREAM_DECODE="true"
+    }
   }
 }
\ No newline at end of file
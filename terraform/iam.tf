@@ -33,7 +33,10 @@ resource "aws_iam_policy" "lambda_access" {
                 "logs:PutLogEvents",
                 "sqs:SetQueueAttributes",
                 "sqs:GetQueueAttributes",
-                "sqs:SendMessage"
+                "sqs:SendMessage",
+                "dynamodb:GetItem",
+                "dynamodb:PutItem",
+                "s3:PutObject"
             ],
             "Resource": "*"
         } 
@@ -0,0 +1,14 @@
+resource "aws_dynamodb_table" "guardian_state" {
+  name         = "guardian_watermarks"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "query"
+
+  attribute {
+    name = "query"
+    type = "S"
+  }
+
+  tags = {
+    tag-key = "de-data-streaming-guardian"
+  }
+}
@@ -2,4 +2,10 @@ variable "api_key" {
   description = "Guardian API Key"
   type        = string
   sensitive   = true  # Marks as sensitive
-}
\ No newline at end of file
+}
+
+variable "rate_limit" {
+  description = "Guardian API requests per second permitted by the API key"
+  type        = number
+  default     = 1
+}
@@ -0,0 +1,92 @@
+import json
+import pytest
+import dataclasses
+from src.article import Article, json_default
+from tests.test_data import unformated_results
+from benchmarks.article_memory_report import report
+
+
+def expected_dict(response, preview_length=500):
+    return {
+        "webPublicationDate": response["webPublicationDate"],
+        "webTitle": response["webTitle"],
+        "webUrl": response["webUrl"],
+        "content_preview": response["fields"]["bodyText"][:preview_length],
+        "keywords": [tag["webTitle"] for tag in response["tags"]],
+    }
+
+
+class TestArticle:
+    @pytest.mark.it("Confirm an article reads like the formatted dict")
+    def test_mapping(self):
+        article = Article.from_response(unformated_results[0])
+        expected = expected_dict(unformated_results[0])
+
+        assert list(article) == list(expected)
+        assert len(article) == 5
+        assert dict(article) == expected
+        assert article["webTitle"] == expected["webTitle"]
+        assert article.get("missing") is None
+        assert "content_preview" in article
+
+    @pytest.mark.it("Confirm an article compares equal to the formatted dict")
+    def test_equality(self):
+        article = Article.from_response(unformated_results[0])
+        expected = expected_dict(unformated_results[0])
+
+        assert article == expected
+        assert expected == article
+        assert article != expected_dict(unformated_results[1])
+
+    @pytest.mark.it("Confirm keywords are interned and read back as a list")
+    def test_keywords(self):
+        first = Article.from_response(unformated_results[0])
+        copy = Article.from_response(
+            json.loads(json.dumps(unformated_results[0]))
+        )
+
+        assert isinstance(first.keywords, tuple)
+        assert isinstance(first["keywords"], list)
+        assert all(
+            keyword is copied
+            for keyword, copied in zip(
+                first.keywords, copy.keywords, strict=True
+            )
+        )
+
+    @pytest.mark.it("Confirm articles are read only and have no instance dict")
+    def test_frozen_slots(self):
+        article = Article.from_response(unformated_results[0])
+
+        assert not hasattr(article, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            article.title = "test"
+
+    @pytest.mark.it("Confirm to_dict and json_default match the dict JSON")
+    def test_serialisation(self):
+        articles = [Article.from_response(item) for item in unformated_results]
+        expected = [expected_dict(item) for item in unformated_results]
+
+        assert [article.to_dict() for article in articles] == expected
+        assert json.dumps(articles, default=json_default) == json.dumps(
+            expected
+        )
+
+    @pytest.mark.it("Confirm json_default rejects other objects")
+    def test_json_default_type_error(self):
+        with pytest.raises(TypeError):
+            json.dumps({"test": object()}, default=json_default)
+
+    @pytest.mark.it("Confirm a missing key raises a KeyError")
+    def test_key_error(self):
+        with pytest.raises(KeyError):
+            Article.from_response({"webTitle": "test"})
+        with pytest.raises(KeyError):
+            Article.from_response(unformated_results[0])["id"]
+
+
+class TestArticleMemoryReport:
+    @pytest.mark.it("Confirm articles use less memory than dicts")
+    def test_report(self):
+        result = report(articles=2000)
+        assert result["Article"] < result["dict"]
@@ -0,0 +1,488 @@
+import time
+import threading
+from datetime import date, timedelta
+import pytest
+import httpx
+import respx
+from src.backfill import (
+    Shard,
+    plan_shards,
+    fetch_shards,
+    run_backfill,
+    BackfillCheckpoint,
+)
+from src.rate_limiter import TokenBucket
+from run_guardian import parse_arguments, build_event
+
+SEARCH_URL = "https://content.guardianapis.com/search"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Isolate tests from the shared rate limiter and skip backoff delays."""
+    monkeypatch.setattr(
+        "src.guardian_api.GUARDIAN_RATE_LIMITER", TokenBucket(rate=None)
+    )
+    monkeypatch.setattr("src.guardian_api.backoff_delay", lambda **kwargs: 0)
+
+
+def make_corpus(days: int = 31) -> list[dict]:
+    """Articles published through January 2023, more on later days."""
+    corpus = []
+    for day in range(days):
+        published = date(2023, 1, 1) + timedelta(days=day)
+        for index in range(day + 1):
+            corpus.append(
+                {
+                    "id": f"{published}/{index}",
+                    "webPublicationDate": f"{published}T{index % 24:02d}:00:00Z",
+                }
+            )
+    return corpus
+
+
+CORPUS = make_corpus()
+
+
+def corpus_side_effect(request):
+    """respx side effect searching CORPUS by date range in order-by order."""
+    params = request.url.params
+    matching = sorted(
+        (
+            article
+            for article in CORPUS
+            if params.get("from-date", "0000")
+            <= article["webPublicationDate"][:10]
+            <= params.get("to-date", "9999")
+        ),
+        key=lambda article: article["webPublicationDate"],
+        reverse=params.get("order-by", "newest") == "newest",
+    )
+    page = int(params.get("page", 1))
+    page_size = int(params.get("page-size", 10))
+    return httpx.Response(
+        200,
+        json={
+            "response": {
+                "total": len(matching),
+                "pages": max(1, -(-len(matching) // page_size)),
+                "currentPage": page,
+                "results": matching[(page - 1) * page_size : page * page_size],
+            }
+        },
+    )
+
+
+def count_requests(route) -> int:
+    """Number of requests made to count articles, with a page size of 1."""
+    return sum(
+        call.request.url.params["page-size"] == "1" for call in route.calls
+    )
+
+
+class TestShard:
+    @pytest.mark.it("Confirm a shard is split into two halves of whole days")
+    def test_bisect(self):
+        shard = Shard("2023-01-01", "2023-01-31")
+
+        assert shard.days == 31
+        assert shard.bisect() == (
+            Shard("2023-01-01", "2023-01-15"),
+            Shard("2023-01-16", "2023-01-31"),
+        )
+        assert Shard("2023-01-01", "2023-01-02").bisect() == (
+            Shard("2023-01-01", "2023-01-01"),
+            Shard("2023-01-02", "2023-01-02"),
+        )
+
+    @pytest.mark.it("Confirm a single day cannot be split")
+    def test_single_day(self):
+        with pytest.raises(ValueError):
+            Shard("2023-01-01", "2023-01-01").bisect()
+
+
+class TestPlanShards:
+    @respx.mock
+    @pytest.mark.it("Confirm shards are bisected until they fit the budget")
+    def test_budget(self):
+        route = respx.get(SEARCH_URL).mock(side_effect=corpus_side_effect)
+
+        with httpx.Client() as client:
+            shards = plan_shards(
+                "test",
+                client,
+                "2023-01-01",
+                "2023-01-31",
+                page_budget=2,
+                page_size=20,
+            )
+
+        totals = [
+            sum(
+                shard.from_date
+                <= article["webPublicationDate"][:10]
+                <= shard.to_date
+                for article in CORPUS
+            )
+            for shard in shards
+        ]
+        assert len(shards) > 1
+        assert all(total <= 40 for total in totals)
+        assert sum(totals) == len(CORPUS)
+        assert shards == sorted(shards, key=lambda shard: shard.from_date)
+        assert all(
+            earlier.to_date < later.from_date
+            for earlier, later in zip(shards, shards[1:], strict=False)
+        )
+        assert "show-fields" not in route.calls[0].request.url.params
+
+    @respx.mock
+    @pytest.mark.it("Confirm a single day over budget is kept whole")
+    def test_single_day_over_budget(self):
+        respx.get(SEARCH_URL).mock(side_effect=corpus_side_effect)
+
+        with httpx.Client() as client:
+            shards = plan_shards(
+                "test",
+                client,
+                "2023-01-30",
+                "2023-01-31",
+                page_budget=1,
+                page_size=10,
+            )
+
+        assert shards == [
+            Shard("2023-01-30", "2023-01-30"),
+            Shard("2023-01-31", "2023-01-31"),
+        ]
+
+    @respx.mock
+    @pytest.mark.it("Confirm empty shards are dropped")
+    def test_empty(self):
+        respx.get(SEARCH_URL).mock(
+            return_value=httpx.Response(200, json={"response": {"total": 0}})
+        )
+
+        with httpx.Client() as client:
+            assert plan_shards("test", client, "2023-01-01", "2023-12-31") == []
+
+    @pytest.mark.it("Confirm a ValueError is raised for a reversed range")
+    def test_reversed(self):
+        with pytest.raises(ValueError):
+            plan_shards("test", None, "2023-02-01", "2023-01-01")
+
+
+class TestFetchShards:
+    @respx.mock
+    @pytest.mark.it(
+        "Confirm shards are yielded in date order however they finish"
+    )
+    def test_order(self):
+        def slow_early_shards(request):
+            if request.url.params["from-date"] < "2023-01-10":
+                time.sleep(0.05)
+            return corpus_side_effect(request)
+
+        respx.get(SEARCH_URL).mock(side_effect=slow_early_shards)
+        shards = [
+            Shard("2023-01-01", "2023-01-05"),
+            Shard("2023-01-06", "2023-01-15"),
+            Shard("2023-01-16", "2023-01-31"),
+        ]
+
+        with httpx.Client() as client:
+            fetched = list(
+                fetch_shards(
+                    "test", client, shards, page_size=50, max_workers=3
+                )
+            )
+
+        assert list(dict.fromkeys(shard for shard, _, _ in fetched)) == shards
+        articles = [article for _, page, _ in fetched for article in page]
+        assert articles == sorted(
+            CORPUS, key=lambda article: article["webPublicationDate"]
+        )
+
+    @respx.mock
+    @pytest.mark.it(
+        "Confirm no more than max_workers shards are fetched at once"
+    )
+    def test_max_workers(self):
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def side_effect(request):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            return corpus_side_effect(request)
+
+        respx.get(SEARCH_URL).mock(side_effect=side_effect)
+        shards = [
+            Shard(day.isoformat(), day.isoformat())
+            for day in (date(2023, 1, 1) + timedelta(days=n) for n in range(12))
+        ]
+
+        with httpx.Client() as client:
+            list(fetch_shards("test", client, shards, max_workers=3))
+
+        assert 1 < peak <= 3
+
+    @pytest.mark.it(
+        "Confirm a ValueError is raised when max_workers is below 1"
+    )
+    def test_invalid_max_workers(self):
+        with pytest.raises(ValueError):
+            list(fetch_shards("test", None, [], max_workers=0))
+
+
+class TestRunBackfill:
+    @respx.mock
+    @pytest.mark.it("Confirm every article is sent once in publication order")
+    def test_publication_order(self, tmp_path):
+        respx.get(SEARCH_URL).mock(side_effect=corpus_side_effect)
+        checkpoint = BackfillCheckpoint(str(tmp_path / "backfill.json"))
+        sent = []
+
+        with httpx.Client() as client:
+            summary = run_backfill(
+                "test",
+                "2023-01-01",
+                "2023-01-31",
+                send=lambda shard, articles: sent.extend(articles),
+                client=client,
+                checkpoint=checkpoint,
+                page_budget=2,
+                page_size=20,
+            )
+
+        assert sent == sorted(
+            CORPUS, key=lambda article: article["webPublicationDate"]
+        )
+        assert summary["articles"] == len(CORPUS)
+        assert summary["completed"] == summary["shards"] > 1
+        assert summary["remaining"] == []
+        assert checkpoint.load() is None
+
+    @respx.mock
+    @pytest.mark.it("Confirm a crashed backfill resumes from its checkpoint")
+    def test_resume(self, tmp_path):
+        route = respx.get(SEARCH_URL).mock(side_effect=corpus_side_effect)
+        checkpoint = BackfillCheckpoint(str(tmp_path / "backfill.json"))
+        sent = []
+
+        def crash_on_third_shard(shard, articles):
+            if len(sent) == 2:
+                raise RuntimeError("crashed")
+            sent.append(articles)
+
+        with httpx.Client() as client:
+            with pytest.raises(RuntimeError):
+                run_backfill(
+                    "test",
+                    "2023-01-01",
+                    "2023-01-31",
+                    send=crash_on_third_shard,
+                    client=client,
+                    checkpoint=checkpoint,
+                    page_budget=2,
+                    page_size=20,
+                )
+            saved = checkpoint.load()
+            assert saved["articles"] == sum(len(page) for page in sent)
+            assert (saved["completed"], saved["page"]) > (0, 1)
+            planning_requests = count_requests(route)
+
+            summary = run_backfill(
+                "test",
+                "2023-01-01",
+                "2023-01-31",
+                send=lambda shard, articles: sent.append(articles),
+                client=client,
+                checkpoint=checkpoint,
+                page_budget=2,
+                page_size=20,
+            )
+
+        assert count_requests(route) == planning_requests
+        articles = [article for page in sent for article in page]
+        assert articles == sorted(
+            CORPUS, key=lambda article: article["webPublicationDate"]
+        )
+        assert summary["articles"] == len(CORPUS)
+        assert checkpoint.load() is None
+
+    @respx.mock
+    @pytest.mark.it("Confirm the checkpoint of a different backfill is ignored")
+    def test_other_checkpoint(self, tmp_path):
+        respx.get(SEARCH_URL).mock(side_effect=corpus_side_effect)
+        checkpoint = BackfillCheckpoint(str(tmp_path / "backfill.json"))
+        checkpoint.save(
+            {
+                "query": "other",
+                "from_date": "2023-01-01",
+                "to_date": "2023-01-31",
+                "shards": [["2023-01-01", "2023-01-31"]],
+                "completed": 1,
+                "articles": 0,
+            }
+        )
+        sent = []
+
+        with httpx.Client() as client:
+            summary = run_backfill(
+                "test",
+                "2023-01-01",
+                "2023-01-31",
+                send=lambda shard, articles: sent.extend(articles),
+                client=client,
+                checkpoint=checkpoint,
+            )
+
+        assert summary["articles"] == len(sent) == len(CORPUS)
+
+    @respx.mock
+    @pytest.mark.it("Confirm a stopped backfill returns the remaining shards")
+    def test_should_stop(self):
+        respx.get(SEARCH_URL).mock(side_effect=corpus_side_effect)
+        shards = [
+            Shard("2023-01-01", "2023-01-10"),
+            Shard("2023-01-11", "2023-01-20"),
+            Shard("2023-01-21", "2023-01-31"),
+        ]
+        sent = []
+
+        with httpx.Client() as client:
+            summary = run_backfill(
+                "test",
+                "2023-01-01",
+                "2023-01-31",
+                send=lambda shard, articles: sent.append(shard),
+                client=client,
+                shards=shards,
+                max_workers=1,
+                should_stop=lambda: bool(sent),
+            )
+
+        # The second shard was requested before the first was sent
+        assert sent == shards[:2]
+        assert summary["completed"] == 2
+        assert summary["remaining"] == [["2023-01-21", "2023-01-31"]]
+        assert summary["page"] == 1
+
+    @respx.mock
+    @pytest.mark.it(
+        "Confirm a backfill stopped within a shard resumes its page"
+    )
+    def test_should_stop_within_shard(self):
+        route = respx.get(SEARCH_URL).mock(side_effect=corpus_side_effect)
+        shards = [Shard("2023-01-01", "2023-01-31")]
+        sent = []
+
+        with httpx.Client() as client:
+            stopped = run_backfill(
+                "test",
+                "2023-01-01",
+                "2023-01-31",
+                send=lambda shard, articles: sent.append(articles),
+                client=client,
+                shards=shards,
+                page_size=50,
+                should_stop=lambda: len(route.calls) >= 2,
+            )
+            # Only the first 2 of the shard's 10 pages were requested
+            assert len(route.calls) == 2
+            assert all(
+                call.request.url.params["order-by"] == "oldest"
+                for call in route.calls
+            )
+            summary = run_backfill(
+                "test",
+                "2023-01-01",
+                "2023-01-31",
+                send=lambda shard, articles: sent.append(articles),
+                client=client,
+                shards=[Shard(*shard) for shard in stopped["remaining"]],
+                page_size=50,
+                start_page=stopped["page"],
+            )
+
+        assert stopped["remaining"] == [["2023-01-01", "2023-01-31"]]
+        assert stopped["page"] == 3
+        assert stopped["articles"] == 100
+        assert summary["remaining"] == []
+        articles = [article for page in sent for article in page]
+        assert articles == sorted(
+            CORPUS, key=lambda article: article["webPublicationDate"]
+        )
+
+
+class TestBackfillCommand:
+    @pytest.mark.it("Confirm the backfill subcommand builds a backfill event")
+    def test_backfill_event(self):
+        args = parse_arguments(
+            [
+                "backfill",
+                "--query",
+                "test",
+                "--from-date",
+                "2023-01-01",
+                "--to-date",
+                "2023-12-31",
+                "--queue-url",
+                "https://sqs.test.com/test_queue",
+                "--max-workers",
+                "8",
+            ]
+        )
+
+        assert build_event(args) == {
+            "query": "test",
+            "from_date": "2023-01-01",
+            "to_date": "2023-12-31",
+            "queue_url": "https://sqs.test.com/test_queue",
+            "backfill": True,
+            "checkpoint": "guardian_backfill.json",
+            "page_budget": 10,
+            "max_workers": 8,
+        }
+
+    @pytest.mark.it("Confirm arguments without a subcommand run a query")
+    def test_default_command(self):
+        args = parse_arguments(
+            ["--query", "test", "--queue-url", "https://sqs.test.com/q"]
+        )
+
+        assert args.command == "run"
+        assert build_event(args) == {
+            "query": "test",
+            "queue_url": "https://sqs.test.com/q",
+            "from_date": None,
+        }
+
+    @pytest.mark.it("Confirm incremental runs accept a first run lookback")
+    def test_incremental_lookback(self):
+        args = parse_arguments(
+            [
+                "--query",
+                "test",
+                "--queue-url",
+                "https://sqs.test.com/q",
+                "--incremental",
+                "--lookback-days",
+                "3",
+            ]
+        )
+
+        assert build_event(args) == {
+            "query": "test",
+            "queue_url": "https://sqs.test.com/q",
+            "from_date": None,
+            "incremental": True,
+            "lookback_days": 3,
+        }
@@ -0,0 +1,171 @@
+import os
+import pytest
+from src.cache import (
+    cache_key,
+    ResponseCache,
+    MemoryCache,
+    FileCache,
+    create_cache_from_env,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope="function", params=["memory", "file"])
+def cache_factory(request, tmp_path):
+    """Create caches of each backend sharing a fake clock."""
+    clock = FakeClock()
+
+    def factory(**kwargs):
+        if request.param == "memory":
+            return MemoryCache(clock=clock, **kwargs)
+        return FileCache(directory=str(tmp_path), clock=clock, **kwargs)
+
+    return factory, clock
+
+
+class TestCacheKey:
+    @pytest.mark.it("Confirm the API key is excluded from the cache key")
+    def test_api_key_excluded(self):
+        key_1 = cache_key("url", {"q": "test", "api-key": "key_1"})
+        key_2 = cache_key("url", {"q": "test", "api-key": "key_2"})
+        assert key_1 == key_2
+        assert "key_1" not in key_1
+
+    @pytest.mark.it("Confirm equivalent parameters produce the same key")
+    def test_normalised(self):
+        key_1 = cache_key("url", {"q": " test ", "page": 1})
+        key_2 = cache_key("url", {"page": "1", "q": "test", "from-date": None})
+        assert key_1 == key_2
+
+    @pytest.mark.it("Confirm different parameters produce different keys")
+    def test_different_params(self):
+        assert cache_key("url", {"q": "test"}) != cache_key(
+            "url", {"q": "other"}
+        )
+
+
+class TestResponseCache:
+    @pytest.mark.it(
+        "Confirm a stored response is returned and counted as a hit"
+    )
+    def test_hit(self, cache_factory):
+        factory, _ = cache_factory
+        cache = factory()
+        cache.set("key", {"total": 1})
+
+        assert cache.get("key") == {"total": 1}
+        assert cache.stats() == {"hits": 1, "misses": 0}
+
+    @pytest.mark.it("Confirm a missing response is counted as a miss")
+    def test_miss(self, cache_factory):
+        factory, _ = cache_factory
+        cache = factory()
+
+        assert cache.get("key") is None
+        assert cache.stats() == {"hits": 0, "misses": 1}
+
+    @pytest.mark.it("Confirm responses expire after the TTL")
+    def test_ttl(self, cache_factory):
+        factory, clock = cache_factory
+        cache = factory(ttl=60)
+        cache.set("key", {"total": 1})
+
+        clock.now += 59
+        assert cache.get("key") == {"total": 1}
+        clock.now += 1
+        assert cache.get("key") is None
+
+    @pytest.mark.it("Confirm the least recently used response is evicted")
+    def test_lru_eviction(self, cache_factory):
+        factory, _ = cache_factory
+        cache = factory(max_entries=2)
+        cache.set("key_1", {"total": 1})
+        cache.set("key_2", {"total": 2})
+        cache.get("key_1")
+        # Ensure distinct access times for the file backend
+        if isinstance(cache, FileCache):
+            os.utime(cache.path("key_2"), (1, 1))
+        cache.set("key_3", {"total": 3})
+
+        assert cache.get("key_1") == {"total": 1}
+        assert cache.get("key_2") is None
+        assert cache.get("key_3") == {"total": 3}
+
+    @pytest.mark.it(
+        "Confirm a cache missing a storage method cannot be created"
+    )
+    def test_abstract(self):
+        class IncompleteCache(ResponseCache):
+            def load(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            ResponseCache()
+        with pytest.raises(TypeError):
+            IncompleteCache()
+
+    @pytest.mark.it("Confirm reset_stats clears the counters")
+    def test_reset_stats(self, cache_factory):
+        factory, _ = cache_factory
+        cache = factory()
+        cache.get("key")
+        cache.reset_stats()
+        assert cache.stats() == {"hits": 0, "misses": 0}
+
+
+class TestFileCache:
+    @pytest.mark.it("Confirm responses persist between cache instances")
+    def test_persistence(self, tmp_path):
+        FileCache(directory=str(tmp_path)).set("key", {"total": 1})
+        assert FileCache(directory=str(tmp_path)).get("key") == {"total": 1}
+
+    @pytest.mark.it("Confirm files are evicted once max_bytes is exceeded")
+    def test_max_bytes(self, tmp_path):
+        cache = FileCache(directory=str(tmp_path), max_bytes=300)
+        for i in range(10):
+            cache.set(f"key_{i}", {"body": "x" * 50})
+
+        total_bytes = sum(
+            entry.stat().st_size for entry in os.scandir(tmp_path)
+        )
+        assert total_bytes <= 300
+        assert cache.get("key_9") == {"body": "x" * 50}
+
+    @pytest.mark.it("Confirm a corrupt file is treated as a miss")
+    def test_corrupt_file(self, tmp_path):
+        cache = FileCache(directory=str(tmp_path))
+        with open(cache.path("key"), "w") as cache_file:
+            cache_file.write("not json")
+        assert cache.get("key") is None
+
+
+class TestCreateCacheFromEnv:
+    @pytest.mark.it("Confirm caching is disabled by default")
+    def test_disabled(self, monkeypatch):
+        monkeypatch.delenv("GUARDIAN_CACHE_BACKEND", raising=False)
+        assert create_cache_from_env() is None
+
+    @pytest.mark.it("Confirm the configured backend is created")
+    def test_backends(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("GUARDIAN_CACHE_TTL", "30")
+        monkeypatch.setenv("GUARDIAN_CACHE_DIR", str(tmp_path))
+        monkeypatch.setenv("GUARDIAN_CACHE_BACKEND", "memory")
+        assert isinstance(create_cache_from_env(), MemoryCache)
+        monkeypatch.setenv("GUARDIAN_CACHE_BACKEND", "file")
+        cache = create_cache_from_env()
+        assert isinstance(cache, FileCache)
+        assert cache.ttl == 30
+        assert cache.directory == str(tmp_path)
+
+    @pytest.mark.it("Confirm a ValueError is raised for an unknown backend")
+    def test_unknown_backend(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_CACHE_BACKEND", "redis")
+        with pytest.raises(ValueError):
+            create_cache_from_env()
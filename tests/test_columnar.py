@@ -0,0 +1,116 @@
+import json
+import pytest
+from copy import deepcopy
+from src.utils import format_results
+from src.article import json_default
+from src.columnar import format_results_columnar, ColumnarResults
+from src.projection import Projection
+from benchmarks.format_results_report import report, make_page
+from tests.test_data import unformated_results
+
+
+class TestFormatResultsColumnar:
+    @pytest.mark.it("Confirm a ColumnarResults with one entry per article")
+    def test_columns(self):
+        columns = format_results_columnar(unformated_results)
+
+        assert isinstance(columns, ColumnarResults)
+        assert len(columns) == len(unformated_results)
+        assert columns.titles == [
+            article["webTitle"] for article in unformated_results
+        ]
+        assert len(columns.keyword_offsets) == len(unformated_results) + 1
+        assert columns.keyword_offsets[-1] == len(columns.keywords)
+
+    @pytest.mark.it("Confirm keyword offsets index each article's keywords")
+    def test_keyword_offsets(self):
+        columns = format_results_columnar(unformated_results)
+
+        for index, article in enumerate(unformated_results):
+            assert columns.article_keywords(index) == [
+                tag["webTitle"] for tag in article["tags"]
+            ]
+
+    @pytest.mark.it("Confirm the row view matches format_results output")
+    def test_rows_match(self):
+        columns = format_results_columnar(unformated_results)
+        expected = format_results(unformated_results)
+
+        assert columns.to_rows() == expected
+        assert list(columns) == expected
+        assert columns.row(3) == expected[3]
+        assert json.dumps(columns.to_rows()) == json.dumps(
+            expected, default=json_default
+        )
+
+    @pytest.mark.it("Confirm previews follow preview_length")
+    def test_preview_length(self):
+        for preview_length in (10, None):
+            columns = format_results_columnar(
+                unformated_results, preview_length=preview_length
+            )
+            assert columns.to_rows() == format_results(
+                unformated_results, preview_length=preview_length
+            )
+
+    @pytest.mark.parametrize(
+        "projection",
+        [
+            Projection(preview_length=0, tag_types=()),
+            Projection(preview_length=20, preview_field="trailText"),
+            Projection(preview_length=None, tag_types=("keyword", "type")),
+        ],
+    )
+    @pytest.mark.it("Confirm rows match format_results under a projection")
+    def test_projection(self, projection):
+        # Only what the projection requests is returned by the API
+        results = deepcopy(unformated_results)
+        for article in results:
+            article["fields"]["trailText"] = article["webTitle"]
+            field = article["fields"].pop(projection.preview_field)
+            article["fields"] = (
+                {projection.preview_field: field}
+                if projection.includes_preview
+                else {}
+            )
+            if not projection.tag_types:
+                del article["tags"]
+
+        columns = format_results_columnar(results, projection=projection)
+        assert columns.to_rows() == format_results(
+            results, projection=projection
+        )
+
+    @pytest.mark.it("Confirm the input list object is not mutated")
+    def test_non_mutation(self):
+        unused_data = deepcopy(unformated_results)
+        format_results_columnar(unformated_results)
+        assert unused_data == unformated_results
+
+    @pytest.mark.it("Confirm an empty page gives empty columns")
+    def test_empty(self):
+        columns = format_results_columnar([])
+        assert len(columns) == 0
+        assert columns.to_rows() == []
+
+    @pytest.mark.it("Confirm a KeyError is re-raised with context message")
+    def test_key_error(self):
+        with pytest.raises(KeyError) as i_exc:
+            format_results_columnar([{"bad_key_1": 1, "bad_key_2": 2}])
+        assert "Error formatting search results" in str(i_exc.value)
+
+
+class TestFormatResultsReport:
+    @pytest.mark.it("Confirm pages are built to the requested size")
+    def test_make_page(self):
+        assert len(make_page(25)) == 25
+
+    @pytest.mark.it("Confirm every formatter is timed")
+    def test_report(self):
+        result = report(page_size=20, pages=2, repeat=1)
+        assert set(result) == {
+            "format_results",
+            "format_results_columnar",
+            "format_results_columnar rows",
+        }
+        assert all(page_ms > 0 for page_ms in result.values())
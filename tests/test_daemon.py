@@ -0,0 +1,273 @@
+import os
+import time
+import signal
+import threading
+import pytest
+from unittest.mock import patch
+from src.daemon import (
+    AdaptiveInterval,
+    PollDaemon,
+    poll_incremental,
+    stop_on_signals,
+)
+from run_guardian import parse_arguments
+
+
+def run_in_thread(daemon: PollDaemon) -> threading.Thread:
+    thread = threading.Thread(target=daemon.run, daemon=True)
+    thread.start()
+    return thread
+
+
+class TestAdaptiveInterval:
+    @pytest.mark.it("Confirm the interval is the time for the target to arrive")
+    def test_target_interval(self):
+        interval = AdaptiveInterval(
+            min_interval=10, max_interval=1000, target_articles=5
+        )
+
+        assert interval.observe(articles=10, elapsed=100) == 50
+
+    @pytest.mark.it("Confirm the interval is kept between its bounds")
+    def test_bounds(self):
+        interval = AdaptiveInterval(
+            min_interval=10, max_interval=1000, target_articles=5
+        )
+
+        assert interval.observe(articles=1000, elapsed=100) == 10
+        quiet = AdaptiveInterval(
+            min_interval=10, max_interval=1000, target_articles=5
+        )
+        assert quiet.observe(articles=1, elapsed=1000) == 1000
+
+    @pytest.mark.it("Confirm empty polls back a query off gradually")
+    def test_back_off(self):
+        interval = AdaptiveInterval(
+            min_interval=10, max_interval=10_000, target_articles=5
+        )
+        intervals = [interval.observe(articles=10, elapsed=100)]
+        for _ in range(5):
+            intervals.append(
+                interval.observe(articles=0, elapsed=intervals[-1])
+            )
+
+        assert intervals == sorted(intervals)
+        assert intervals[0] < intervals[-1] < 10_000
+
+    @pytest.mark.it(
+        "Confirm a query that never finds articles doubles its interval"
+    )
+    def test_never_found(self):
+        interval = AdaptiveInterval(min_interval=10, max_interval=100)
+
+        assert [interval.observe(0, 10) for _ in range(4)] == [20, 40, 80, 100]
+
+    @pytest.mark.it("Confirm a ValueError is raised for invalid settings")
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            AdaptiveInterval(min_interval=10, max_interval=5)
+        with pytest.raises(ValueError):
+            AdaptiveInterval(min_interval=0)
+        with pytest.raises(ValueError):
+            AdaptiveInterval(smoothing=0)
+
+
+class TestPollDaemon:
+    @pytest.mark.it("Confirm every query is polled repeatedly until stopped")
+    def test_polls_until_stopped(self):
+        polls = []
+        lock = threading.Lock()
+
+        def poll(query):
+            with lock:
+                polls.append(query)
+                if len(polls) >= 6:
+                    daemon.stop()
+            return 1
+
+        daemon = PollDaemon(
+            ["a", "b", "a"], poll, min_interval=0.001, max_interval=0.01
+        )
+        thread = run_in_thread(daemon)
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert set(polls) == {"a", "b"}
+        assert polls.count("a") >= 2 and polls.count("b") >= 2
+        assert daemon.in_flight == 0
+
+    @pytest.mark.it("Confirm no more than max_concurrency polls run at once")
+    def test_max_concurrency(self):
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def poll(query):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            return 0
+
+        daemon = PollDaemon(
+            [f"query_{i}" for i in range(10)],
+            poll,
+            max_concurrency=3,
+            min_interval=0.001,
+            max_interval=0.001,
+        )
+        thread = run_in_thread(daemon)
+        time.sleep(0.2)
+        daemon.stop()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert 1 < peak <= 3
+
+    @pytest.mark.it("Confirm hot queries are polled more often than quiet ones")
+    def test_adaptive(self):
+        counts = {"hot": 0, "quiet": 0}
+
+        def poll(query):
+            counts[query] += 1
+            return 10 if query == "hot" else 0
+
+        daemon = PollDaemon(
+            ["hot", "quiet"],
+            poll,
+            min_interval=0.005,
+            max_interval=0.1,
+            target_articles=1,
+        )
+        thread = run_in_thread(daemon)
+        time.sleep(0.5)
+        daemon.stop()
+        thread.join(timeout=5)
+
+        assert counts["hot"] > 3 * counts["quiet"]
+        assert daemon.intervals["hot"].interval == 0.005
+        assert daemon.intervals["quiet"].interval == 0.1
+
+    @pytest.mark.it("Confirm polls in flight finish before run returns")
+    def test_graceful_stop(self):
+        started = threading.Event()
+        finished = []
+
+        def poll(query):
+            started.set()
+            time.sleep(0.05)
+            finished.append(query)
+            return 0
+
+        daemon = PollDaemon(["a"], poll)
+        thread = run_in_thread(daemon)
+        started.wait(timeout=5)
+        daemon.stop()
+        thread.join(timeout=5)
+
+        assert finished == ["a"]
+
+    @pytest.mark.it("Confirm a failed poll is rescheduled")
+    def test_failed_poll(self):
+        polls = []
+
+        def poll(query):
+            polls.append(query)
+            if len(polls) >= 2:
+                daemon.stop()
+            raise RuntimeError("test_error")
+
+        daemon = PollDaemon(["a"], poll, min_interval=0.001)
+        thread = run_in_thread(daemon)
+        thread.join(timeout=5)
+
+        assert polls == ["a", "a"]
+
+    @pytest.mark.it("Confirm SIGTERM stops the daemon")
+    def test_sigterm(self):
+        daemon = PollDaemon(["a"], lambda query: 0)
+        previous = stop_on_signals(daemon)
+        try:
+            os.kill(os.getpid(), signal.SIGTERM)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+        assert daemon.stopped
+        daemon.run()
+
+
+class TestPollIncremental:
+    @patch(
+        "src.daemon.guardian_lambda",
+        return_value={
+            "statusCode": 200,
+            "body": {"data": {"article_count": 4}},
+        },
+    )
+    @pytest.mark.it(
+        "Confirm an incremental run is made and its articles counted"
+    )
+    def test_article_count(self, mock_lambda):
+        assert poll_incremental("test", "https://sqs.test.com/q") == 4
+        assert mock_lambda.call_args.args[0] == {
+            "query": "test",
+            "queue_url": "https://sqs.test.com/q",
+            "incremental": True,
+        }
+
+    @patch(
+        "src.daemon.guardian_lambda",
+        return_value={"statusCode": 204, "body": {"message": "none"}},
+    )
+    @pytest.mark.it("Confirm the first poll lookback is passed to the run")
+    def test_lookback(self, mock_lambda):
+        poll_incremental("test", "https://sqs.test.com/q", lookback_days=2)
+
+        assert mock_lambda.call_args.args[0]["lookback_days"] == 2
+
+    @patch(
+        "src.daemon.guardian_lambda",
+        return_value={"statusCode": 204, "body": {"message": "none"}},
+    )
+    @pytest.mark.it("Confirm a run without new articles counts none")
+    def test_no_articles(self, mock_lambda):
+        assert poll_incremental("test", "https://sqs.test.com/q") == 0
+
+    @patch(
+        "src.daemon.guardian_lambda",
+        return_value={"statusCode": 500, "body": {"message": "test_error"}},
+    )
+    @pytest.mark.it("Confirm a failed run raises a RuntimeError")
+    def test_failure(self, mock_lambda):
+        with pytest.raises(RuntimeError, match="test_error"):
+            poll_incremental("test", "https://sqs.test.com/q")
+
+
+class TestDaemonCommand:
+    @pytest.mark.it("Confirm the daemon subcommand accepts repeated queries")
+    def test_arguments(self):
+        args = parse_arguments(
+            [
+                "daemon",
+                "--query",
+                "a",
+                "--query",
+                "b",
+                "--queue-url",
+                "https://sqs.test.com/q",
+                "--max-concurrency",
+                "2",
+                "--lookback-days",
+                "7",
+            ]
+        )
+
+        assert args.command == "daemon"
+        assert args.queries == ["a", "b"]
+        assert args.max_concurrency == 2
+        assert args.min_interval == 60
+        assert args.lookback_days == 7
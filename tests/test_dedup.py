@@ -0,0 +1,265 @@
+import os
+import boto3
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from moto import mock_aws
+from src.dedup import (
+    BloomFilter,
+    ArticleDeduplicator,
+    create_deduplicator_from_env,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def articles(*article_ids: str) -> list[dict]:
+    return [{"id": article_id} for article_id in article_ids]
+
+
+@pytest.fixture(scope="module")
+def aws_credentials():
+    """Mocked AWS Credentials for moto."""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture(scope="function")
+def s3_fixture(aws_credentials):
+    with mock_aws():
+        test_client = boto3.client("s3")
+        test_client.create_bucket(
+            Bucket="test-bucket",
+            CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+        )
+        yield test_client
+
+
+class TestBloomFilter:
+    @pytest.mark.it("Confirm added ids are always found")
+    def test_no_false_negatives(self):
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+        ids = [f"article_{i}" for i in range(1000)]
+        for article_id in ids:
+            bloom_filter.add(article_id)
+        assert all(article_id in bloom_filter for article_id in ids)
+
+    @pytest.mark.it("Confirm the false positive rate is close to the target")
+    def test_false_positive_rate(self):
+        bloom_filter = BloomFilter(capacity=5000, error_rate=0.01)
+        for i in range(5000):
+            bloom_filter.add(f"article_{i}")
+        false_positives = sum(
+            f"other_{i}" in bloom_filter for i in range(20000)
+        )
+        assert false_positives / 20000 < 0.02
+
+    @pytest.mark.it("Confirm a million ids at 0.1% fit in under 2MB")
+    def test_size(self):
+        bloom_filter = BloomFilter(capacity=1_000_000, error_rate=0.001)
+        assert len(bloom_filter.bits) < 2 * 1024 * 1024
+
+    @pytest.mark.it("Confirm a filter survives serialisation")
+    def test_round_trip(self):
+        bloom_filter = BloomFilter(capacity=100, error_rate=0.01)
+        bloom_filter.add("article_1")
+        restored = BloomFilter.from_bytes(bloom_filter.to_bytes())
+        assert "article_1" in restored
+        assert restored.created_at == bloom_filter.created_at
+        assert restored.count == 1
+
+    @pytest.mark.it("Confirm a ValueError is raised for invalid data")
+    def test_invalid_data(self):
+        with pytest.raises(ValueError):
+            BloomFilter.from_bytes(b"\x00" * 64)
+
+    @pytest.mark.it("Confirm filters of the same size can be merged")
+    def test_merge(self):
+        filter_1 = BloomFilter(capacity=100, error_rate=0.01, created_at=2)
+        filter_2 = BloomFilter(capacity=100, error_rate=0.01, created_at=1)
+        filter_1.add("article_1")
+        filter_2.add("article_2")
+        assert filter_1.merge(filter_2)
+        assert "article_1" in filter_1 and "article_2" in filter_1
+        assert filter_1.created_at == 1
+        other_size = BloomFilter(capacity=200, error_rate=0.01, created_at=1)
+        assert not filter_1.merge(other_size)
+
+    @pytest.mark.parametrize(
+        "capacity,error_rate", [(0, 0.01), (100, 0), (100, 1)]
+    )
+    @pytest.mark.it("Confirm a ValueError is raised for invalid sizing")
+    def test_invalid_sizing(self, capacity, error_rate):
+        with pytest.raises(ValueError):
+            BloomFilter(capacity=capacity, error_rate=error_rate)
+
+
+class TestArticleDeduplicator:
+    @pytest.mark.it("Confirm sent articles are dropped from later batches")
+    def test_filter_unseen(self, tmp_path):
+        deduplicator = ArticleDeduplicator(
+            location=str(tmp_path / "dedup.bin"), capacity=1000
+        )
+        first = deduplicator.filter_unseen(articles("a", "b", "a"))
+        assert first == articles("a", "b")
+        deduplicator.mark_seen(first)
+        assert deduplicator.filter_unseen(articles("a", "c")) == articles("c")
+
+    @pytest.mark.it("Confirm unsent articles are not remembered")
+    def test_filter_without_mark(self, tmp_path):
+        deduplicator = ArticleDeduplicator(
+            location=str(tmp_path / "dedup.bin"), capacity=1000
+        )
+        deduplicator.filter_unseen(articles("a"))
+        assert deduplicator.filter_unseen(articles("a")) == articles("a")
+
+    @pytest.mark.it("Confirm sent ids persist to a file between runs")
+    def test_file_persistence(self, tmp_path):
+        location = str(tmp_path / "dedup.bin")
+        deduplicator = ArticleDeduplicator(location=location, capacity=1000)
+        deduplicator.mark_seen(articles("a"))
+        deduplicator.save()
+
+        restored = ArticleDeduplicator(location=location, capacity=1000)
+        assert restored.filter_unseen(articles("a", "b")) == articles("b")
+
+    @pytest.mark.it("Confirm sent ids persist to S3 between runs")
+    def test_s3_persistence(self, s3_fixture):
+        location = "s3://test-bucket/dedup.bin"
+        deduplicator = ArticleDeduplicator(
+            location=location, capacity=1000, s3_client=s3_fixture
+        )
+        deduplicator.mark_seen(articles("a"))
+        deduplicator.save()
+
+        restored = ArticleDeduplicator(
+            location=location, capacity=1000, s3_client=s3_fixture
+        )
+        assert restored.filter_unseen(articles("a", "b")) == articles("b")
+
+    @pytest.mark.it("Confirm concurrent savers do not overwrite each other")
+    def test_concurrent_save(self, tmp_path):
+        location = str(tmp_path / "dedup.bin")
+        clock = FakeClock()
+        deduplicator_1 = ArticleDeduplicator(
+            location=location, capacity=1000, clock=clock
+        )
+        clock.now += 1
+        deduplicator_2 = ArticleDeduplicator(
+            location=location, capacity=1000, clock=clock
+        )
+        deduplicator_1.mark_seen(articles("a"))
+        deduplicator_1.save()
+        deduplicator_2.mark_seen(articles("b"))
+        deduplicator_2.save()
+
+        restored = ArticleDeduplicator(
+            location=location, capacity=1000, clock=clock
+        )
+        assert restored.filter_unseen(articles("a", "b")) == []
+
+    @pytest.mark.it("Confirm a saver that has rotated keeps the others' ids")
+    def test_concurrent_rotated_save(self, tmp_path):
+        location = str(tmp_path / "dedup.bin")
+        clock = FakeClock()
+        stale = ArticleDeduplicator(
+            location=location, capacity=1000, rotation_seconds=100, clock=clock
+        )
+        rotated = ArticleDeduplicator(
+            location=location, capacity=1000, rotation_seconds=100, clock=clock
+        )
+        rotated.mark_seen(articles("a"))
+        stale.mark_seen(articles("c"))
+        clock.now += 100
+        rotated.mark_seen(articles("b"))
+        rotated.save()
+        stale.save()
+
+        restored = ArticleDeduplicator(
+            location=location, capacity=1000, rotation_seconds=100, clock=clock
+        )
+        assert restored.filter_unseen(articles("a", "b", "c")) == []
+        assert "b" in restored.current and "c" in restored.previous
+
+    @pytest.mark.it("Confirm concurrent threads saving leave a complete file")
+    def test_concurrent_thread_save(self, tmp_path):
+        location = str(tmp_path / "dedup.bin")
+        deduplicators = [
+            ArticleDeduplicator(location=location, capacity=100_000)
+            for _ in range(8)
+        ]
+
+        def save(index):
+            deduplicators[index].mark_seen(articles(str(index)))
+            deduplicators[index].save()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(save, range(8)))
+
+        restored = ArticleDeduplicator(location=location, capacity=100_000)
+        assert restored.current.num_bits == deduplicators[0].current.num_bits
+        assert os.listdir(tmp_path) == ["dedup.bin"]
+
+    @pytest.mark.it("Confirm nothing is read or written without marked ids")
+    def test_save_unchanged(self, tmp_path):
+        location = str(tmp_path / "dedup.bin")
+        deduplicator = ArticleDeduplicator(location=location, capacity=1000)
+        deduplicator.filter_unseen(articles("a"))
+        deduplicator.save()
+        assert not os.path.exists(location)
+
+        deduplicator.mark_seen(articles("a"))
+        deduplicator.save()
+        modified = os.stat(location).st_mtime_ns
+        deduplicator.mark_seen(articles("a"))
+        with patch.object(deduplicator, "read") as mock_read:
+            deduplicator.save()
+
+        mock_read.assert_not_called()
+        assert os.stat(location).st_mtime_ns == modified
+
+    @pytest.mark.it("Confirm ids are forgotten after two rotation periods")
+    def test_rotation(self, tmp_path):
+        clock = FakeClock()
+        deduplicator = ArticleDeduplicator(
+            location=str(tmp_path / "dedup.bin"),
+            capacity=1000,
+            rotation_seconds=100,
+            clock=clock,
+        )
+        deduplicator.mark_seen(articles("a"))
+
+        clock.now += 100
+        deduplicator.mark_seen(articles("b"))
+        assert deduplicator.filter_unseen(articles("a", "b")) == []
+
+        clock.now += 100
+        deduplicator.mark_seen(articles("c"))
+        assert deduplicator.filter_unseen(articles("a", "b")) == articles("a")
+
+
+class TestCreateDeduplicatorFromEnv:
+    @pytest.mark.it("Confirm de-duplication is disabled by default")
+    def test_disabled(self, monkeypatch):
+        monkeypatch.delenv("GUARDIAN_DEDUP_LOCATION", raising=False)
+        assert create_deduplicator_from_env() is None
+
+    @pytest.mark.it(
+        "Confirm the deduplicator is configured from the environment"
+    )
+    def test_configured(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("GUARDIAN_DEDUP_LOCATION", str(tmp_path / "d.bin"))
+        monkeypatch.setenv("GUARDIAN_DEDUP_CAPACITY", "5000")
+        monkeypatch.setenv("GUARDIAN_DEDUP_ROTATION_DAYS", "1")
+        deduplicator = create_deduplicator_from_env()
+        assert deduplicator.capacity == 5000
+        assert deduplicator.rotation_seconds == 24 * 60 * 60
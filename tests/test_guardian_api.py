@@ -1,3 +1,6 @@
+import time
+import asyncio
+import threading
 import pytest
 import httpx
 import respx
@@ -5,14 +8,49 @@ from src.exceptions import (
     RateLimitExceededError,
     ServerRequestError,
     ClientRequestError,
+    TransportRequestError,
     APIError,
 )
 from src.guardian_api import (
     raise_on_status_error,
     retry_guardian_api,
     get_articles,
+    build_search_params,
+    get_article_pages,
+    get_article_pages_concurrently,
+    get_articles_async,
+    get_articles_for_queries,
+    search_queries,
+    async_raise_on_status_error,
+    create_http_client,
+    get_http_client,
+    reset_http_client,
+    lease_http_client,
+    get_search_page,
+    get_cache_stats,
+    get_new_article_pages,
+    stream_decode_enabled,
+    warn_streaming_unavailable,
+    SEARCH_FLIGHTS,
 )
+from src.rate_limiter import TokenBucket
+from src.utils import format_results
+from tests.test_data import unformated_results
+from tests.test_singleflight import CountingCall
+from src.cache import MemoryCache
+from src.projection import Projection
 from types import FunctionType
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Isolate tests from the shared rate limiter and skip backoff delays."""
+    monkeypatch.setattr(
+        "src.guardian_api.GUARDIAN_RATE_LIMITER", TokenBucket(rate=None)
+    )
+    monkeypatch.setattr("src.guardian_api.backoff_delay", lambda **kwargs: 0)
 
 
 class TestRaiseStatusError:
@@ -52,6 +90,20 @@ class TestRaiseStatusError:
             )
             raise_on_status_error(response=mock_response)
 
+    @pytest.mark.parametrize("status_code", [429, 503])
+    @pytest.mark.it(
+        "Confirm the Retry-After header is attached to the exception"
+    )
+    def test_retry_after(self, status_code):
+        mock_response = httpx.Response(
+            status_code=status_code,
+            headers={"Retry-After": "7"},
+            request=httpx.Request(method="GET", url="https://test.com"),
+        )
+        with pytest.raises((RateLimitExceededError, ServerRequestError)) as exc:
+            raise_on_status_error(response=mock_response)
+        assert exc.value.retry_after == 7.0
+
 
 class TestRetryDecorator:
     @pytest.mark.it("Confirm the decorator returns a function")
@@ -133,6 +185,171 @@ class TestRetryDecorator:
 
         assert test_func() == [1, 2, 3]
 
+    @pytest.mark.it("Confirm coroutine functions are wrapped as coroutines")
+    def test_async_function_wrapped(self):
+        @retry_guardian_api
+        async def test_func():
+            return [1, 2, 3]
+
+        assert asyncio.iscoroutinefunction(test_func)
+        assert asyncio.run(test_func()) == [1, 2, 3]
+
+    @pytest.mark.it("Confirm dropped connections are retried")
+    def test_transport_error_retried(self):
+        call_count = 0
+
+        @retry_guardian_api
+        def test_func():
+            nonlocal call_count
+            call_count += 1
+            if call_count < 3:
+                raise httpx.RemoteProtocolError("Server disconnected")
+            return [1]
+
+        assert test_func() == [1]
+        assert call_count == 3
+
+    @pytest.mark.it(
+        "Confirm a TransportRequestError is raised when connections keep failing"
+    )
+    def test_transport_error_max_retries(self):
+        @retry_guardian_api
+        def test_func():
+            raise httpx.ConnectError("Connection refused")
+
+        with pytest.raises(TransportRequestError):
+            test_func()
+
+    @pytest.mark.it("Confirm retry options can be passed to the decorator")
+    def test_decorator_options(self):
+        call_count = 0
+
+        @retry_guardian_api(max_retries=5)
+        def test_func():
+            nonlocal call_count
+            call_count += 1
+            raise ServerRequestError
+
+        with pytest.raises(ServerRequestError):
+            test_func()
+        assert call_count == 5
+
+    @patch("src.guardian_api.time.sleep")
+    @pytest.mark.it("Confirm the backoff delay is slept between retries")
+    def test_backoff_sleep(self, mock_sleep, monkeypatch):
+        monkeypatch.setattr(
+            "src.guardian_api.backoff_delay",
+            lambda attempt, **kwargs: attempt * 10,
+        )
+
+        @retry_guardian_api
+        def test_func():
+            raise ServerRequestError
+
+        with pytest.raises(ServerRequestError):
+            test_func()
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [10, 20]
+
+    @patch("src.guardian_api.time.sleep")
+    @pytest.mark.it("Confirm a Retry-After delay is honoured")
+    def test_retry_after_honoured(self, mock_sleep, monkeypatch):
+        from src.rate_limiter import backoff_delay
+
+        monkeypatch.setattr("src.guardian_api.backoff_delay", backoff_delay)
+
+        @retry_guardian_api(max_retries=2, base_delay=0)
+        def test_func():
+            raise RateLimitExceededError(retry_after=12)
+
+        with pytest.raises(RateLimitExceededError):
+            test_func()
+        assert mock_sleep.call_args_list[0].args[0] == 12
+
+    @patch("src.guardian_api.time.sleep")
+    @pytest.mark.it(
+        "Confirm a Retry-After beyond the retry budget is raised without retrying"
+    )
+    def test_retry_after_over_budget(self, mock_sleep, monkeypatch):
+        from src.rate_limiter import backoff_delay
+
+        monkeypatch.setattr("src.guardian_api.backoff_delay", backoff_delay)
+        limiter = TokenBucket(rate=None)
+        call_count = 0
+
+        @retry_guardian_api(base_delay=0, rate_limiter=limiter, retry_budget=60)
+        def test_func():
+            nonlocal call_count
+            call_count += 1
+            raise RateLimitExceededError(retry_after=120)
+
+        with pytest.raises(RateLimitExceededError) as exc:
+            test_func()
+        assert exc.value.retry_after == 120
+        assert call_count == 1
+        mock_sleep.assert_not_called()
+        assert limiter.paused_until >= limiter.clock() + 119
+
+    @patch("src.guardian_api.time.sleep")
+    @pytest.mark.it(
+        "Confirm the retry budget defaults to GUARDIAN_RETRY_BUDGET"
+    )
+    def test_retry_budget_env(self, mock_sleep, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_RETRY_BUDGET", "5")
+        monkeypatch.setattr(
+            "src.guardian_api.backoff_delay", lambda **kwargs: 10
+        )
+        call_count = 0
+
+        @retry_guardian_api(rate_limiter=TokenBucket(rate=None))
+        def test_func():
+            nonlocal call_count
+            call_count += 1
+            raise ServerRequestError
+
+        with pytest.raises(ServerRequestError):
+            test_func()
+        assert call_count == 1
+        mock_sleep.assert_not_called()
+
+    @pytest.mark.it("Confirm every attempt takes a token from the rate limiter")
+    def test_rate_limiter_acquired(self):
+        limiter = TokenBucket(rate=None)
+        call_count = 0
+
+        @retry_guardian_api(rate_limiter=limiter)
+        def test_func():
+            nonlocal call_count
+            call_count += 1
+            if call_count < 2:
+                raise RateLimitExceededError(retry_after=0)
+            return [1]
+
+        with (
+            patch.object(limiter, "acquire") as mock_acquire,
+            patch.object(limiter, "on_rate_limited") as mock_rate_limited,
+            patch.object(limiter, "on_success") as mock_success,
+        ):
+            assert test_func() == [1]
+        assert mock_acquire.call_count == 2
+        mock_rate_limited.assert_called_once()
+        mock_success.assert_called_once()
+
+    @pytest.mark.it(
+        "Confirm coroutine functions are retried until max retries are reached"
+    )
+    def test_async_max_retries(self):
+        call_count = 0
+
+        @retry_guardian_api
+        async def test_func():
+            nonlocal call_count
+            call_count += 1
+            raise ServerRequestError
+
+        with pytest.raises(ServerRequestError):
+            asyncio.run(test_func())
+        assert call_count == 3
+
 
 class TestGetArticles:
     @respx.mock
@@ -177,3 +394,1078 @@ class TestGetArticles:
         respx.get().mock(return_value=mock_response)
         with httpx.Client() as client:
             assert get_articles(query="test_query", client=client) == [1, 2, 3]
+
+
+def search_page(page: int, pages: int, page_size: int = 2, total=None) -> dict:
+    """Build a mock /search response body for the given page."""
+    start = (page - 1) * page_size
+    return {
+        "response": {
+            "total": pages * page_size if total is None else total,
+            "currentPage": page,
+            "pages": pages,
+            "results": [{"id": start + i} for i in range(page_size)],
+        }
+    }
+
+
+def paged_side_effect(pages: int, page_size: int = 2):
+    """respx side effect returning the requested page of a mock result set."""
+
+    def side_effect(request):
+        page = int(request.url.params["page"])
+        return httpx.Response(200, json=search_page(page, pages, page_size))
+
+    return side_effect
+
+
+class TestBuildSearchParams:
+    @pytest.mark.it("Confirm unset optional parameters are omitted")
+    def test_optional_params_omitted(self):
+        params = build_search_params(query="test_query")
+        assert "from-date" not in params
+        assert "to-date" not in params
+        assert "page" not in params
+        assert "page-size" not in params
+
+    @pytest.mark.it("Confirm page and page-size are included when provided")
+    def test_page_params(self):
+        params = build_search_params(query="test_query", page=3, page_size=200)
+        assert params["page"] == 3
+        assert params["page-size"] == 200
+
+    @pytest.mark.it("Confirm to-date is included when provided")
+    def test_to_date(self):
+        params = build_search_params(
+            query="test_query", from_date="2023-01-01", to_date="2023-12-31"
+        )
+        assert params["from-date"] == "2023-01-01"
+        assert params["to-date"] == "2023-12-31"
+
+    @pytest.mark.parametrize("page_size", [0, 201])
+    @pytest.mark.it("Confirm a ValueError is raised for an invalid page size")
+    def test_invalid_page_size(self, page_size):
+        with pytest.raises(ValueError):
+            build_search_params(query="test_query", page_size=page_size)
+
+    @pytest.mark.it("Confirm fields and tags follow the projection")
+    def test_projection_params(self):
+        params = build_search_params(
+            query="test_query",
+            projection=Projection(preview_field="trailText", tag_types=()),
+        )
+        assert params["show-fields"] == "trailText"
+        assert "show-tags" not in params
+
+    @pytest.mark.it("Confirm the projection is read from the environment")
+    def test_projection_from_env(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_PREVIEW_LENGTH", "0")
+        params = build_search_params(query="test_query")
+        assert "show-fields" not in params
+        assert params["show-tags"] == "keyword"
+
+
+class TestGetArticlePages:
+    @respx.mock
+    @pytest.mark.it("Confirm every page is yielded in order until the last")
+    def test_all_pages(self):
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=3)
+        )
+        with httpx.Client() as client:
+            pages = list(get_article_pages(query="test_query", client=client))
+
+        assert [[article["id"] for article in page] for page in pages] == [
+            [0, 1],
+            [2, 3],
+            [4, 5],
+        ]
+        assert route.call_count == 3
+
+    @respx.mock
+    @pytest.mark.it(
+        "Confirm pages are only requested as the generator is consumed"
+    )
+    def test_lazy_requests(self):
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=3)
+        )
+        with httpx.Client() as client:
+            pages = get_article_pages(query="test_query", client=client)
+            assert route.call_count == 0
+            next(pages)
+            assert route.call_count == 1
+
+    @respx.mock
+    @pytest.mark.it("Confirm iteration stops once max_pages is reached")
+    def test_max_pages(self):
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=5)
+        )
+        with httpx.Client() as client:
+            pages = list(
+                get_article_pages(
+                    query="test_query", client=client, max_pages=2
+                )
+            )
+
+        assert len(pages) == 2
+        assert route.call_count == 2
+
+    @respx.mock
+    @pytest.mark.it("Confirm no more than max_articles articles are yielded")
+    def test_max_articles(self):
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=5, page_size=3)
+        )
+        with httpx.Client() as client:
+            pages = list(
+                get_article_pages(
+                    query="test_query", client=client, max_articles=3
+                )
+            )
+
+        assert sum(len(page) for page in pages) == 3
+        assert route.calls.last.request.url.params["page-size"] == "3"
+
+    @respx.mock
+    @pytest.mark.it("Confirm the largest page size is requested by default")
+    def test_default_page_size(self):
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=1)
+        )
+        with httpx.Client() as client:
+            list(get_article_pages(query="test_query", client=client))
+
+        assert route.calls.last.request.url.params["page-size"] == "200"
+
+    @respx.mock
+    @pytest.mark.it("Confirm nothing is yielded when there are no results")
+    def test_zero_results(self):
+        respx.get("https://content.guardianapis.com/search").mock(
+            return_value=httpx.Response(
+                200, json={"response": {"total": 0, "pages": 0}}
+            )
+        )
+        with httpx.Client() as client:
+            assert (
+                list(get_article_pages(query="test_query", client=client)) == []
+            )
+
+
+class TestGetArticlePagesConcurrently:
+    @respx.mock
+    @pytest.mark.it("Confirm pages are yielded in page order")
+    def test_page_order(self):
+        def side_effect(request):
+            page = int(request.url.params["page"])
+            # Later pages respond first
+            time.sleep(0.05 * (6 - page))
+            return httpx.Response(200, json=search_page(page, pages=5))
+
+        respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=side_effect
+        )
+        with httpx.Client() as client:
+            pages = list(
+                get_article_pages_concurrently(
+                    query="test_query", client=client, max_in_flight=4
+                )
+            )
+
+        assert [page[0]["id"] for page in pages] == [0, 2, 4, 6, 8]
+
+    @respx.mock
+    @pytest.mark.it("Confirm no more than max_in_flight requests run at once")
+    def test_max_in_flight(self):
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def side_effect(request):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            page = int(request.url.params["page"])
+            return httpx.Response(200, json=search_page(page, pages=12))
+
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=side_effect
+        )
+        with httpx.Client() as client:
+            pages = list(
+                get_article_pages_concurrently(
+                    query="test_query", client=client, max_in_flight=3
+                )
+            )
+
+        assert len(pages) == 12
+        assert route.call_count == 12
+        assert 1 < peak <= 3
+
+    @respx.mock
+    @pytest.mark.it("Confirm wall-clock time scales with concurrency")
+    def test_concurrent_speedup(self):
+        def side_effect(request):
+            time.sleep(0.1)
+            page = int(request.url.params["page"])
+            return httpx.Response(200, json=search_page(page, pages=9))
+
+        respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=side_effect
+        )
+        start = time.perf_counter()
+        with httpx.Client() as client:
+            list(
+                get_article_pages_concurrently(
+                    query="test_query", client=client, max_in_flight=8
+                )
+            )
+
+        # 1 discovery request followed by 8 pages in parallel, not 9 serial
+        assert time.perf_counter() - start < 0.6
+
+    @respx.mock
+    @pytest.mark.it(
+        "Confirm max_pages and max_articles cap the pages requested"
+    )
+    def test_caps(self):
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=10)
+        )
+        with httpx.Client() as client:
+            capped_pages = list(
+                get_article_pages_concurrently(
+                    query="test_query", client=client, max_pages=3
+                )
+            )
+            assert len(capped_pages) == 3
+            assert route.call_count == 3
+
+            route.reset()
+            capped_articles = list(
+                get_article_pages_concurrently(
+                    query="test_query",
+                    client=client,
+                    page_size=2,
+                    max_articles=5,
+                )
+            )
+            assert sum(len(page) for page in capped_articles) == 5
+            assert route.call_count == 3
+
+    @respx.mock
+    @pytest.mark.it("Confirm errors from later pages are raised to the caller")
+    def test_page_error(self):
+        def side_effect(request):
+            page = int(request.url.params["page"])
+            if page == 3:
+                return httpx.Response(401)
+            return httpx.Response(200, json=search_page(page, pages=4))
+
+        respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=side_effect
+        )
+        with httpx.Client(
+            event_hooks={"response": [raise_on_status_error]}
+        ) as client:
+            pages = get_article_pages_concurrently(
+                query="test_query", client=client
+            )
+            next(pages)
+            next(pages)
+            with pytest.raises(ClientRequestError):
+                next(pages)
+
+    @pytest.mark.it("Confirm a ValueError is raised for max_in_flight below 1")
+    def test_invalid_max_in_flight(self):
+        with pytest.raises(ValueError):
+            next(
+                get_article_pages_concurrently(
+                    query="test_query", client=None, max_in_flight=0
+                )
+            )
+
+
+def query_side_effect(request):
+    """respx side effect returning results, no results or an error per query."""
+    query = request.url.params["q"]
+    if query == "bad_query":
+        return httpx.Response(401)
+    if query == "empty_query":
+        return httpx.Response(200, json={"response": {"total": 0}})
+    return httpx.Response(
+        200, json={"response": {"total": 1, "results": [{"id": query}]}}
+    )
+
+
+class TestGetArticlesForQueries:
+    @respx.mock
+    @pytest.mark.it("Confirm get_articles_async returns the search results")
+    def test_get_articles_async(self):
+        respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=query_side_effect
+        )
+
+        async def run():
+            async with httpx.AsyncClient() as client:
+                return await get_articles_async(
+                    query="test_query", client=client
+                )
+
+        assert asyncio.run(run()) == [{"id": "test_query"}]
+
+    @respx.mock
+    @pytest.mark.it(
+        "Confirm each query is reported as a success, empty or failure"
+    )
+    def test_per_query_outcomes(self):
+        respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=query_side_effect
+        )
+
+        async def run():
+            async with httpx.AsyncClient(
+                event_hooks={"response": [async_raise_on_status_error]}
+            ) as client:
+                return await get_articles_for_queries(
+                    queries=["good_query", "empty_query", "bad_query"],
+                    client=client,
+                )
+
+        outcomes = asyncio.run(run())
+
+        assert outcomes["good_query"] == {
+            "results": [{"id": "good_query"}],
+            "error": None,
+        }
+        assert outcomes["empty_query"] == {"results": None, "error": None}
+        assert outcomes["bad_query"]["results"] is None
+        assert "Client Side Error 401" in outcomes["bad_query"]["error"]
+
+    @respx.mock
+    @pytest.mark.it("Confirm no more than max_concurrency requests run at once")
+    def test_max_concurrency(self):
+        in_flight = 0
+        peak = 0
+
+        async def side_effect(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return query_side_effect(request)
+
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=side_effect
+        )
+        queries = [f"query_{i}" for i in range(20)]
+
+        async def run():
+            async with httpx.AsyncClient() as client:
+                return await get_articles_for_queries(
+                    queries=queries, client=client, max_concurrency=5
+                )
+
+        outcomes = asyncio.run(run())
+
+        assert list(outcomes) == queries
+        assert route.call_count == 20
+        assert 1 < peak <= 5
+
+    @respx.mock
+    @pytest.mark.it("Confirm duplicate queries are only requested once")
+    def test_duplicate_queries(self):
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=query_side_effect
+        )
+        outcomes = search_queries(queries=["query_1", "query_1", "query_2"])
+
+        assert list(outcomes) == ["query_1", "query_2"]
+        assert route.call_count == 2
+
+    @respx.mock
+    @pytest.mark.it("Confirm search_queries applies the status error hook")
+    def test_search_queries_hook(self):
+        respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=query_side_effect
+        )
+        outcomes = search_queries(queries=["bad_query"])
+
+        assert "Client Side Error 401" in outcomes["bad_query"]["error"]
+
+
+@pytest.fixture(scope="function")
+def http_client():
+    reset_http_client()
+    yield
+    reset_http_client()
+
+
+class TestHttpClient:
+    @pytest.mark.it("Confirm the same client is reused between calls")
+    def test_client_reused(self, http_client):
+        assert get_http_client() is get_http_client()
+
+    @pytest.mark.it("Confirm a closed client is replaced")
+    def test_closed_client_rebuilt(self, http_client):
+        client = get_http_client()
+        client.close()
+        new_client = get_http_client()
+        assert new_client is not client
+        assert not new_client.is_closed
+
+    @pytest.mark.it("Confirm reset_http_client closes the shared client")
+    def test_reset(self, http_client):
+        client = get_http_client()
+        reset_http_client()
+        assert client.is_closed
+        assert get_http_client() is not client
+
+    @pytest.mark.it(
+        "Confirm a leased client stays open until its last lease is returned"
+    )
+    def test_reset_leased(self, http_client):
+        with lease_http_client() as client:
+            with lease_http_client() as same_client:
+                reset_http_client()
+                assert same_client is client
+                assert not client.is_closed
+            assert not client.is_closed
+            with lease_http_client() as new_client:
+                assert new_client is not client
+        assert client.is_closed
+        assert not new_client.is_closed
+        assert new_client is get_http_client()
+
+    @pytest.mark.it(
+        "Confirm the client raises custom exceptions on error codes"
+    )
+    def test_status_hook(self):
+        client = create_http_client()
+        assert client.event_hooks["response"] == [raise_on_status_error]
+
+    @pytest.mark.it(
+        "Confirm timeouts and pool limits are read from the environment"
+    )
+    def test_env_config(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_TIMEOUT", "3")
+        monkeypatch.setenv("GUARDIAN_CONNECT_TIMEOUT", "1")
+        monkeypatch.setenv("GUARDIAN_MAX_CONNECTIONS", "7")
+        monkeypatch.setenv("GUARDIAN_KEEPALIVE_EXPIRY", "15")
+
+        with patch("src.guardian_api.httpx.Client") as mock_client:
+            create_http_client()
+
+        kwargs = mock_client.call_args.kwargs
+        assert kwargs["timeout"] == httpx.Timeout(3, connect=1)
+        assert kwargs["limits"].max_connections == 7
+        assert kwargs["limits"].keepalive_expiry == 15
+
+    @pytest.mark.it(
+        "Confirm HTTP/2 falls back to HTTP/1.1 without h2 installed"
+    )
+    def test_http2_fallback(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_HTTP2", "true")
+        monkeypatch.setattr(
+            "src.guardian_api.importlib.util.find_spec", lambda name: None
+        )
+
+        with patch("src.guardian_api.httpx.Client") as mock_client:
+            create_http_client()
+
+        assert mock_client.call_args.kwargs["http2"] is False
+
+    @respx.mock
+    @pytest.mark.it("Confirm the shared client can retrieve articles")
+    def test_get_articles(self, http_client):
+        respx.get("https://content.guardianapis.com/search").mock(
+            return_value=httpx.Response(
+                200, json={"response": {"total": 1, "results": [1]}}
+            )
+        )
+        assert get_articles(query="test_query", client=get_http_client()) == [1]
+
+
+class TestResponseCache:
+    @respx.mock
+    @pytest.mark.it("Confirm identical searches are served from the cache")
+    def test_cache_hit(self, monkeypatch):
+        monkeypatch.setattr("src.guardian_api.RESPONSE_CACHE", MemoryCache())
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            return_value=httpx.Response(
+                200, json={"response": {"total": 1, "results": [1]}}
+            )
+        )
+        with httpx.Client() as client:
+            for _ in range(3):
+                assert get_articles(query="test_query", client=client) == [1]
+
+        assert route.call_count == 1
+        assert get_cache_stats() == {"hits": 2, "misses": 1}
+
+    @respx.mock
+    @pytest.mark.it("Confirm different pages are cached separately")
+    def test_cache_pages(self, monkeypatch):
+        monkeypatch.setattr("src.guardian_api.RESPONSE_CACHE", MemoryCache())
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=3)
+        )
+        with httpx.Client() as client:
+            page_1 = get_search_page(query="test_query", client=client, page=1)
+            page_2 = get_search_page(query="test_query", client=client, page=2)
+
+        assert page_1 != page_2
+        assert route.call_count == 2
+
+    @respx.mock
+    @pytest.mark.it("Confirm failed requests are not cached")
+    def test_errors_not_cached(self, monkeypatch):
+        monkeypatch.setattr("src.guardian_api.RESPONSE_CACHE", MemoryCache())
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            return_value=httpx.Response(401)
+        )
+        with httpx.Client(
+            event_hooks={"response": [raise_on_status_error]}
+        ) as client:
+            for _ in range(2):
+                with pytest.raises(ClientRequestError):
+                    get_articles(query="test_query", client=client)
+
+        assert route.call_count == 2
+
+    @respx.mock
+    @pytest.mark.it("Confirm async searches share the cache")
+    def test_async_cache(self, monkeypatch):
+        monkeypatch.setattr("src.guardian_api.RESPONSE_CACHE", MemoryCache())
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=query_side_effect
+        )
+        search_queries(queries=["query_1"])
+        with httpx.Client() as client:
+            assert get_articles(query="query_1", client=client) == [
+                {"id": "query_1"}
+            ]
+
+        assert route.call_count == 1
+
+    @respx.mock
+    @pytest.mark.it("Confirm incremental searches bypass the cache")
+    def test_incremental_uncached(self, monkeypatch):
+        monkeypatch.setattr("src.guardian_api.RESPONSE_CACHE", MemoryCache())
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "response": {
+                        "total": 0,
+                        "currentPage": 1,
+                        "pages": 0,
+                        "results": [],
+                    }
+                },
+            )
+        )
+        with httpx.Client() as client:
+            for _ in range(2):
+                list(
+                    get_new_article_pages(
+                        query="test_query", client=client, watermark=None
+                    )
+                )
+
+        assert route.call_count == 2
+        assert get_cache_stats() == {"hits": 0, "misses": 0}
+
+    @pytest.mark.it("Confirm no cache statistics are reported when disabled")
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setattr("src.guardian_api.RESPONSE_CACHE", None)
+        assert get_cache_stats() is None
+
+
+class TestGetNewArticlePages:
+    @staticmethod
+    def dated_side_effect(request):
+        """Three pages of articles, one per day, newest first."""
+        page = int(request.url.params["page"])
+        results = [
+            {
+                "id": f"article_{day}",
+                "webPublicationDate": f"2025-01-{day:02}T00:00:00Z",
+            }
+            for day in range(31 - (page - 1) * 10, 21 - (page - 1) * 10, -1)
+        ]
+        return httpx.Response(
+            200,
+            json={
+                "response": {
+                    "total": 30,
+                    "currentPage": page,
+                    "pages": 3,
+                    "results": results,
+                }
+            },
+        )
+
+    @respx.mock
+    @pytest.mark.it("Confirm every article is returned without a watermark")
+    def test_no_watermark(self):
+        respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=self.dated_side_effect
+        )
+        with httpx.Client() as client:
+            pages = list(
+                get_new_article_pages(
+                    query="test_query", client=client, watermark=None
+                )
+            )
+        assert sum(len(page) for page in pages) == 30
+
+    @respx.mock
+    @pytest.mark.it("Confirm only articles after the watermark are returned")
+    def test_watermark(self):
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=self.dated_side_effect
+        )
+        watermark = {
+            "published": "2025-01-25T00:00:00Z",
+            "ids": ["article_25"],
+        }
+        with httpx.Client() as client:
+            pages = list(
+                get_new_article_pages(
+                    query="test_query", client=client, watermark=watermark
+                )
+            )
+
+        assert [article["id"] for article in pages[0]] == [
+            f"article_{day}" for day in range(31, 25, -1)
+        ]
+        assert len(pages) == 1
+        # Paging stops once older articles are reached
+        assert route.call_count == 1
+        assert route.calls.last.request.url.params["from-date"] == "2025-01-25"
+
+
+def drain(pages):
+    """Consume a page generator, returning its pages and return value."""
+    collected = []
+    while True:
+        try:
+            collected.append(next(pages))
+        except StopIteration as stop:
+            return collected, stop.value
+
+
+class TestResumablePages:
+    @respx.mock
+    @pytest.mark.it("Confirm retrieval starts from start_page")
+    def test_start_page(self):
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=4)
+        )
+        with httpx.Client() as client:
+            pages, resume_page = drain(
+                get_article_pages(
+                    query="test_query", client=client, start_page=3
+                )
+            )
+
+        assert [[article["id"] for article in page] for page in pages] == [
+            [4, 5],
+            [6, 7],
+        ]
+        assert resume_page is None
+        assert route.call_count == 2
+
+    @respx.mock
+    @pytest.mark.it("Confirm max_pages counts from start_page")
+    def test_max_pages_from_start(self):
+        respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=10)
+        )
+        with httpx.Client() as client:
+            pages, _ = drain(
+                get_article_pages(
+                    query="test_query",
+                    client=client,
+                    start_page=4,
+                    max_pages=2,
+                )
+            )
+
+        assert [page[0]["id"] for page in pages] == [6, 8]
+
+    @respx.mock
+    @pytest.mark.it("Confirm should_stop ends iteration with the resume page")
+    def test_should_stop(self):
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=5)
+        )
+        with httpx.Client() as client:
+            pages = get_article_pages(
+                query="test_query",
+                client=client,
+                should_stop=lambda: route.call_count >= 2,
+            )
+            pages, resume_page = drain(pages)
+
+        assert len(pages) == 2
+        assert resume_page == 3
+        assert route.call_count == 2
+
+    @respx.mock
+    @pytest.mark.it("Confirm the first page is retrieved before should_stop")
+    def test_should_stop_first_page(self):
+        respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=2)
+        )
+        with httpx.Client() as client:
+            pages, resume_page = drain(
+                get_article_pages(
+                    query="test_query", client=client, should_stop=lambda: True
+                )
+            )
+
+        assert len(pages) == 1
+        assert resume_page == 2
+
+    @respx.mock
+    @pytest.mark.it("Confirm no resume page is returned after the last page")
+    def test_should_stop_after_last_page(self):
+        respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=1)
+        )
+        with httpx.Client() as client:
+            _, resume_page = drain(
+                get_article_pages(
+                    query="test_query", client=client, should_stop=lambda: True
+                )
+            )
+
+        assert resume_page is None
+
+    @respx.mock
+    @pytest.mark.it(
+        "Confirm concurrent retrieval yields in-flight pages then resumes"
+    )
+    def test_concurrent_should_stop(self):
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=paged_side_effect(pages=10)
+        )
+        with httpx.Client() as client:
+            pages = get_article_pages_concurrently(
+                query="test_query",
+                client=client,
+                max_in_flight=2,
+                start_page=2,
+                should_stop=lambda: route.call_count >= 3,
+            )
+            pages, resume_page = drain(pages)
+
+        ids = [page[0]["id"] for page in pages]
+        assert ids == list(range(2, 2 + 2 * len(pages), 2))
+        assert resume_page == 2 + len(pages)
+        assert route.call_count == len(pages)
+
+    @respx.mock
+    @pytest.mark.it("Confirm new article pages pass on the resume page")
+    def test_new_article_pages_resume(self):
+        respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=TestGetNewArticlePages.dated_side_effect
+        )
+        with httpx.Client() as client:
+            pages, resume_page = drain(
+                get_new_article_pages(
+                    query="test_query",
+                    client=client,
+                    watermark=None,
+                    should_stop=lambda: True,
+                )
+            )
+
+        assert len(pages) == 1
+        assert resume_page == 2
+
+
+class TestStreamDecode:
+    @pytest.fixture(autouse=True)
+    def stream_decode(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_STREAM_DECODE", "true")
+        monkeypatch.setenv("GUARDIAN_PREVIEW_LENGTH", "20")
+
+    @respx.mock
+    @pytest.mark.it("Confirm streamed results are trimmed while decoding")
+    def test_trimmed_results(self):
+        respx.get("https://content.guardianapis.com/search").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "response": {
+                        "total": len(unformated_results),
+                        "results": unformated_results,
+                    }
+                },
+            )
+        )
+        with httpx.Client() as client:
+            results = get_articles(query="test_query", client=client)
+
+        assert [article["fields"]["bodyText"] for article in results] == [
+            article["fields"]["bodyText"][:20] for article in unformated_results
+        ]
+        assert all("apiUrl" not in article for article in results)
+        assert format_results(results) == format_results(
+            unformated_results, preview_length=20
+        )
+
+    @respx.mock
+    @pytest.mark.it("Confirm responses are decoded whole without ijson")
+    def test_without_ijson(self, monkeypatch, caplog):
+        monkeypatch.setattr("src.response_decoder.ijson", None)
+        warn_streaming_unavailable.cache_clear()
+        respx.get("https://content.guardianapis.com/search").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "response": {"total": 1, "results": unformated_results[:1]}
+                },
+            )
+        )
+        with httpx.Client() as client:
+            results = get_articles(query="test_query", client=client)
+
+        assert not stream_decode_enabled()
+        assert results == unformated_results[:1]
+        assert "ijson is not installed" in caplog.text
+
+    @respx.mock
+    @pytest.mark.it("Confirm async requests are decoded the same way")
+    def test_async(self):
+        respx.get("https://content.guardianapis.com/search").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "response": {"total": 1, "results": unformated_results[:1]}
+                },
+            )
+        )
+
+        async def run():
+            async with httpx.AsyncClient() as client:
+                return await get_articles_async(
+                    query="test_query", client=client
+                )
+
+        results = asyncio.run(run())
+        assert (
+            results[0]["fields"]["bodyText"]
+            == (unformated_results[0]["fields"]["bodyText"][:20])
+        )
+
+    @respx.mock
+    @pytest.mark.it("Confirm status errors are raised for streamed requests")
+    def test_status_error(self):
+        respx.get("https://content.guardianapis.com/search").mock(
+            return_value=httpx.Response(401)
+        )
+        with httpx.Client(
+            event_hooks={"response": [raise_on_status_error]}
+        ) as client:
+            with pytest.raises(ClientRequestError):
+                get_articles(query="test_query", client=client)
+
+    @respx.mock
+    @pytest.mark.it("Confirm cached responses are keyed by preview length")
+    def test_cache_key(self, monkeypatch):
+        monkeypatch.setattr("src.guardian_api.RESPONSE_CACHE", MemoryCache())
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "response": {"total": 1, "results": unformated_results[:1]}
+                },
+            )
+        )
+        with httpx.Client() as client:
+            get_articles(query="test_query", client=client)
+            get_articles(query="test_query", client=client)
+            monkeypatch.setenv("GUARDIAN_PREVIEW_LENGTH", "full")
+            results = get_articles(query="test_query", client=client)
+
+        assert route.call_count == 2
+        assert (
+            results[0]["fields"]["bodyText"]
+            == (unformated_results[0]["fields"]["bodyText"])
+        )
+
+
+def wait_for_waiting_searches(waiters: int) -> None:
+    """Hold the search in flight until waiters identical searches wait on it."""
+    deadline = time.monotonic() + 5
+    while not any(
+        call.done.waiters >= waiters
+        for call in list(SEARCH_FLIGHTS.calls.values())
+    ):
+        assert time.monotonic() < deadline, "searches did not arrive"
+        time.sleep(0.001)
+
+
+class TestSingleFlightSearch:
+    @pytest.fixture(autouse=True)
+    def counting_calls(self, monkeypatch):
+        monkeypatch.setattr("src.singleflight.Call", CountingCall)
+
+    @respx.mock
+    @pytest.mark.it("Confirm concurrent identical searches make one request")
+    def test_threads_one_request(self):
+        def side_effect(request):
+            wait_for_waiting_searches(7)
+            return query_side_effect(request)
+
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=side_effect
+        )
+
+        with httpx.Client() as client:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(
+                    executor.map(
+                        lambda _: get_articles(
+                            query="test_query", client=client
+                        ),
+                        range(8),
+                    )
+                )
+
+        assert route.call_count == 1
+        assert results == [[{"id": "test_query"}]] * 8
+
+    @respx.mock
+    @pytest.mark.it("Confirm every caller receives the shared request's error")
+    def test_threads_shared_error(self):
+        def side_effect(request):
+            wait_for_waiting_searches(3)
+            return httpx.Response(401)
+
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=side_effect
+        )
+
+        def get(_):
+            with pytest.raises(ClientRequestError):
+                get_articles(query="test_query", client=client)
+
+        with httpx.Client(
+            event_hooks={"response": [raise_on_status_error]}
+        ) as client:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(get, range(4)))
+
+        assert route.call_count == 1
+
+    @respx.mock
+    @pytest.mark.it("Confirm retries of a shared request are made once")
+    def test_shared_retries(self):
+        responses = iter([httpx.Response(500), httpx.Response(503)])
+
+        def side_effect(request):
+            wait_for_waiting_searches(3)
+            return next(responses, None) or query_side_effect(request)
+
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=side_effect
+        )
+
+        with httpx.Client(
+            event_hooks={"response": [raise_on_status_error]}
+        ) as client:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(
+                    executor.map(
+                        lambda _: get_articles(
+                            query="test_query", client=client
+                        ),
+                        range(4),
+                    )
+                )
+
+        assert route.call_count == 3
+        assert results == [[{"id": "test_query"}]] * 4
+
+    @respx.mock
+    @pytest.mark.it("Confirm different searches are not coalesced")
+    def test_different_params(self):
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=query_side_effect
+        )
+
+        with httpx.Client() as client:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(
+                    executor.map(
+                        lambda query: get_articles(query=query, client=client),
+                        ["a", "b", "c", "d"],
+                    )
+                )
+
+        assert route.call_count == 4
+        assert results == [[{"id": query}] for query in "abcd"]
+
+    @respx.mock
+    @pytest.mark.it(
+        "Confirm concurrent identical async searches make one request"
+    )
+    def test_async_one_request(self):
+        async def side_effect(request):
+            await asyncio.sleep(0.01)
+            return query_side_effect(request)
+
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=side_effect
+        )
+
+        async def run():
+            async with httpx.AsyncClient() as client:
+                return await asyncio.gather(
+                    *(
+                        get_articles_async(query="test_query", client=client)
+                        for _ in range(8)
+                    )
+                )
+
+        results = asyncio.run(run())
+
+        assert route.call_count == 1
+        assert results == [[{"id": "test_query"}]] * 8
+
+    @respx.mock
+    @pytest.mark.it("Confirm GUARDIAN_SINGLEFLIGHT=false disables coalescing")
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_SINGLEFLIGHT", "false")
+
+        async def side_effect(request):
+            await asyncio.sleep(0.01)
+            return query_side_effect(request)
+
+        route = respx.get("https://content.guardianapis.com/search").mock(
+            side_effect=side_effect
+        )
+
+        async def run():
+            async with httpx.AsyncClient() as client:
+                return await asyncio.gather(
+                    *(
+                        get_articles_async(query="test_query", client=client)
+                        for _ in range(4)
+                    )
+                )
+
+        asyncio.run(run())
+
+        assert route.call_count == 4
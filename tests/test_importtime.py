@@ -0,0 +1,34 @@
+import os
+import pytest
+from benchmarks.importtime_report import (
+    report,
+    measure_import,
+    measure_cold_start,
+    IMPORT_BUDGET_MS,
+    DEFERRED_MODULES,
+)
+
+
+class TestColdStartImports:
+    @pytest.mark.it("Confirm heavy modules are not imported with the handler")
+    def test_deferred_modules(self):
+        timings = measure_import("lambda_main")
+        assert "lambda_main" in timings
+        for module in DEFERRED_MODULES:
+            assert module not in timings
+
+    @pytest.mark.it("Confirm the first client creation imports boto3")
+    def test_first_client(self):
+        result = measure_cold_start("lambda_main", client="sqs")
+        assert "boto3" in result["client_imported"]
+        assert "boto3" not in result["imported"]
+        assert result["client_ms"] > 0
+
+    @pytest.mark.skipif(
+        not os.environ.get("RUN_BENCHMARKS"),
+        reason="Wall clock budget, set RUN_BENCHMARKS=1 to run",
+    )
+    @pytest.mark.it("Confirm the handler imports within the cold start budget")
+    def test_import_budget(self):
+        result = report("lambda_main", runs=3)
+        assert result["median_ms"] <= IMPORT_BUDGET_MS
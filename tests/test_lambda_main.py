@@ -1,5 +1,9 @@
 import os
 import pytest
+import httpx
+import respx
+from copy import deepcopy
+from datetime import datetime, timedelta
 from moto import mock_aws
 from botocore.exceptions import ClientError
 from src.exceptions import (
@@ -8,10 +12,15 @@ from src.exceptions import (
     ClientRequestError,
     ServerRequestError,
     RateLimitExceededError,
+    TransportRequestError,
 )
-from src.lambda_main import guardian_lambda
+from src.lambda_main import guardian_lambda, deadline_from_context
 from test_data import unformated_results
 from unittest.mock import patch
+from src.watermark import SQLiteWatermarkStore, first_run_from_date
+from src.dedup import ArticleDeduplicator
+from src.backfill import Shard
+from src.rate_limiter import TokenBucket
 
 
 @pytest.fixture(scope="module")
@@ -47,8 +56,10 @@ class TestLambdaFunction:
 
     @mock_aws
     @patch("src.lambda_main.get_articles", return_value=unformated_results)
-    @patch("src.lambda_main.update_message_retention", return_value=None)
-    @patch("src.lambda_main.send_queue_message", return_value="test_message_id")
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch(
+        "src.lambda_main.send_queue_messages", return_value=["test_message_id"]
+    )
     @pytest.mark.it("Confirm the return value is correct for successful run")
     def test_successful_run(
         self, mock_result, mock_update, mock_message, event
@@ -62,6 +73,32 @@ class TestLambdaFunction:
         )
         assert result["body"]["data"]["message_id"] == "test_message_id"
 
+    @mock_aws
+    @patch("src.lambda_main.get_articles", return_value=unformated_results)
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch(
+        "src.lambda_main.send_queue_messages", return_value=["test_message_id"]
+    )
+    @patch(
+        "src.lambda_main.get_cache_stats",
+        return_value={"hits": 1, "misses": 0},
+    )
+    @patch("src.lambda_main.reset_cache_stats")
+    @pytest.mark.it("Confirm cache hit and miss counts are returned")
+    def test_cache_stats(
+        self,
+        mock_reset,
+        mock_stats,
+        mock_message,
+        mock_update,
+        mock_result,
+        event,
+    ):
+        result = guardian_lambda(event, {})
+
+        assert result["body"]["data"]["cache"] == {"hits": 1, "misses": 0}
+        mock_reset.assert_called_once()
+
     @mock_aws
     @patch("src.lambda_main.get_articles", return_value=None)
     @pytest.mark.it("Confirm the return value is correct for no search results")
@@ -95,6 +132,19 @@ class TestLambdaFunction:
             == "Error retrieving data from Guardian API: test_error"
         )
 
+    @mock_aws
+    @patch("src.lambda_main.get_articles")
+    @patch("src.lambda_main.reset_http_client")
+    @pytest.mark.it(
+        "Confirm the shared HTTP client is reset after a connection error"
+    )
+    def test_transport_error(self, mock_reset, mock_result, event):
+        mock_result.side_effect = TransportRequestError("test_error")
+        result = guardian_lambda(event, {})
+
+        assert result["statusCode"] == 500
+        mock_reset.assert_called_once()
+
     @mock_aws
     @patch("src.lambda_main.get_articles", return_value=unformated_results)
     @patch("src.lambda_main.format_results", side_effect=KeyError("test_error"))
@@ -111,8 +161,8 @@ class TestLambdaFunction:
 
     @mock_aws
     @patch("src.lambda_main.get_articles", return_value=unformated_results)
-    @patch("src.lambda_main.update_message_retention", return_value=None)
-    @patch("src.lambda_main.send_queue_message")
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages")
     @pytest.mark.it("Confirm the return value is correct for ClientErrors")
     def test_client_error(self, mock_result, mock_update, mock_message, event):
         mock_message.side_effect = ClientError(
@@ -131,8 +181,8 @@ class TestLambdaFunction:
 
     @mock_aws
     @patch("src.lambda_main.get_articles", return_value=unformated_results)
-    @patch("src.lambda_main.update_message_retention", return_value=None)
-    @patch("src.lambda_main.send_queue_message")
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages")
     @pytest.mark.it("Confirm the return value is correct for BotocoreErrors")
     def test_boto_error(self, mock_result, mock_update, mock_message, event):
         mock_message.side_effect = BotocoreError("test_error")
@@ -146,8 +196,8 @@ class TestLambdaFunction:
 
     @mock_aws
     @patch("src.lambda_main.get_articles", return_value=unformated_results)
-    @patch("src.lambda_main.update_message_retention", return_value=None)
-    @patch("src.lambda_main.send_queue_message")
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages")
     @pytest.mark.it("Confirm the return value is correct for unexpected errors")
     def test_unexcepted_error(
         self, mock_result, mock_update, mock_message, event
@@ -159,3 +209,793 @@ class TestLambdaFunction:
             result["body"]["message"] == "Unexpected error occured: test_error"
         )
         assert result["statusCode"] == 500
+
+
+class TestPaginatedLambdaFunction:
+    @mock_aws
+    @patch(
+        "src.lambda_main.get_article_pages",
+        return_value=iter([unformated_results, unformated_results]),
+    )
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch(
+        "src.lambda_main.send_queue_messages",
+        side_effect=[["test_message_id_1"], ["test_message_id_2"]],
+    )
+    @pytest.mark.it("Confirm each page is sent as its own message")
+    def test_successful_run(self, mock_message, mock_update, mock_pages, event):
+        event["max_pages"] = 2
+        result = guardian_lambda(event, {})
+
+        assert result["statusCode"] == 200
+        assert result["body"]["data"]["message_ids"] == [
+            "test_message_id_1",
+            "test_message_id_2",
+        ]
+        assert result["body"]["data"]["article_count"] == 2 * len(
+            unformated_results
+        )
+        assert mock_pages.call_args.kwargs["max_pages"] == 2
+
+    @mock_aws
+    @patch("src.lambda_main.get_article_pages", return_value=iter([]))
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages")
+    @pytest.mark.it("Confirm the return value is correct for no search results")
+    def test_no_search_results(
+        self, mock_message, mock_update, mock_pages, event
+    ):
+        event["max_articles"] = 50
+        result = guardian_lambda(event, {})
+
+        assert result["statusCode"] == 204
+        assert result["body"]["message"] == "No articles found mentioning test"
+        mock_message.assert_not_called()
+
+    @mock_aws
+    @patch("src.lambda_main.get_article_pages")
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @pytest.mark.it("Confirm API errors while paging are handled")
+    def test_api_error(self, mock_update, mock_pages, event):
+        mock_pages.side_effect = ServerRequestError("test_error")
+        event["max_pages"] = 2
+        result = guardian_lambda(event, {})
+
+        assert result["statusCode"] == 500
+        assert (
+            result["body"]["message"]
+            == "Error retrieving data from Guardian API: test_error"
+        )
+
+    @mock_aws
+    @patch(
+        "src.lambda_main.get_article_pages_concurrently",
+        return_value=iter([unformated_results]),
+    )
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm pages are fetched concurrently when requested")
+    def test_concurrent_pages(
+        self, mock_message, mock_update, mock_pages, event
+    ):
+        event["max_pages"] = 10
+        event["max_in_flight"] = 4
+        result = guardian_lambda(event, {})
+
+        assert result["statusCode"] == 200
+        assert mock_pages.call_args.kwargs["max_in_flight"] == 4
+
+
+@pytest.fixture(scope="function")
+def batch_event():
+    test_event = {
+        "queries": ["good_query", "empty_query", "bad_query"],
+        "from_date": "2023-01-01",
+        "queue_url": "https://sqs.test.com/test_queue",
+    }
+    return test_event
+
+
+class TestBatchLambdaFunction:
+    @mock_aws
+    @patch(
+        "src.lambda_main.search_queries",
+        return_value={
+            "good_query": {"results": unformated_results, "error": None},
+            "empty_query": {"results": None, "error": None},
+            "bad_query": {"results": None, "error": "test_error"},
+        },
+    )
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm each query outcome is reported individually")
+    def test_partial_failure(
+        self, mock_message, mock_update, mock_search, batch_event
+    ):
+        result = guardian_lambda(batch_event, {})
+
+        assert result["statusCode"] == 207
+        assert result["body"]["data"] == {
+            "succeeded": {"good_query": ["test_id"]},
+            "empty": ["empty_query"],
+            "failed": {
+                "bad_query": "Error retrieving data from Guardian API: test_error"
+            },
+            "truncated": [],
+        }
+        assert mock_message.call_count == 1
+        assert mock_search.call_args.kwargs["queries"] == batch_event["queries"]
+
+    @mock_aws
+    @patch(
+        "src.lambda_main.search_queries",
+        return_value={
+            "query_1": {"results": unformated_results, "error": None},
+            "query_2": {"results": unformated_results, "error": None},
+        },
+    )
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages")
+    @pytest.mark.it("Confirm an SQS failure for one query does not fail others")
+    def test_send_failure(
+        self, mock_message, mock_update, mock_search, batch_event
+    ):
+        mock_message.side_effect = [BotocoreError("test_error"), ["test_id"]]
+        result = guardian_lambda(batch_event, {})
+
+        assert result["statusCode"] == 207
+        assert result["body"]["data"]["succeeded"] == {"query_2": ["test_id"]}
+        assert result["body"]["data"]["failed"] == {
+            "query_1": "Error interacting with AWS services: test_error"
+        }
+        mock_update.assert_called_once()
+
+    @mock_aws
+    @patch(
+        "src.lambda_main.search_queries",
+        return_value={"bad_query": {"results": None, "error": "test_error"}},
+    )
+    @pytest.mark.it(
+        "Confirm a 500 status code is returned when all queries fail"
+    )
+    def test_all_failed(self, mock_search, batch_event):
+        result = guardian_lambda(batch_event, {})
+
+        assert result["statusCode"] == 500
+        assert result["body"]["data"]["succeeded"] == {}
+
+    @mock_aws
+    @patch("src.lambda_main.search_queries")
+    @patch(
+        "src.lambda_main.search_queries_multiplexed",
+        return_value={
+            "good_query": {
+                "results": unformated_results,
+                "error": None,
+                "matches": 10,
+            },
+            "empty_query": {"results": None, "error": None, "matches": 0},
+        },
+    )
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm multiplex packs queries into combined searches")
+    def test_multiplex(
+        self,
+        mock_message,
+        mock_update,
+        mock_multiplexed,
+        mock_search,
+        batch_event,
+    ):
+        batch_event["multiplex"] = True
+        batch_event["max_url_length"] = 1000
+        result = guardian_lambda(batch_event, {})
+
+        assert result["statusCode"] == 200
+        assert result["body"]["data"]["succeeded"] == {
+            "good_query": ["test_id"]
+        }
+        assert result["body"]["data"]["empty"] == ["empty_query"]
+        mock_search.assert_not_called()
+        assert mock_multiplexed.call_args.kwargs["max_url_length"] == 1000
+        assert mock_multiplexed.call_args.kwargs["max_pages"] == 1
+
+
+@pytest.fixture(scope="function")
+def watermark_store(tmp_path):
+    store = SQLiteWatermarkStore(path=str(tmp_path / "state.db"))
+    with patch("src.lambda_main.get_watermark_store", return_value=store):
+        yield store
+
+
+class TestIncrementalLambdaFunction:
+    @mock_aws
+    @patch("src.lambda_main.get_new_article_pages")
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm the watermark is stored after a successful run")
+    def test_watermark_stored(
+        self, mock_message, mock_update, mock_pages, event, watermark_store
+    ):
+        mock_pages.return_value = iter([unformated_results])
+        event["incremental"] = True
+        result = guardian_lambda(event, {})
+
+        latest = max(
+            article["webPublicationDate"] for article in unformated_results
+        )
+        assert result["statusCode"] == 200
+        assert result["body"]["data"]["watermark"]["published"] == latest
+        assert watermark_store.get("test")["published"] == latest
+        assert mock_pages.call_args.kwargs["watermark"] is None
+
+    @mock_aws
+    @patch("src.lambda_main.get_new_article_pages")
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm the stored watermark is used for the next run")
+    def test_watermark_used(
+        self, mock_message, mock_update, mock_pages, event, watermark_store
+    ):
+        watermark = {"published": "2025-01-01T00:00:00Z", "ids": ["a"]}
+        watermark_store.set("test", watermark)
+        mock_pages.return_value = iter([])
+        event["incremental"] = True
+        result = guardian_lambda(event, {})
+
+        assert result["statusCode"] == 204
+        assert mock_pages.call_args.kwargs["watermark"] == watermark
+        assert watermark_store.get("test") == watermark
+
+    @mock_aws
+    @patch("src.lambda_main.get_new_article_pages")
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm a first run without from_date is bounded")
+    def test_first_run_lookback(
+        self, mock_message, mock_update, mock_pages, event, watermark_store
+    ):
+        mock_pages.return_value = iter([])
+        del event["from_date"]
+        event.update(incremental=True, lookback_days=3)
+        guardian_lambda(event, {})
+
+        assert mock_pages.call_args.kwargs["from_date"] == first_run_from_date(
+            3
+        )
+
+        event.update(from_date="2023-01-01")
+        guardian_lambda(event, {})
+
+        assert mock_pages.call_args.kwargs["from_date"] == "2023-01-01"
+
+    @mock_aws
+    @patch("src.lambda_main.get_new_article_pages")
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages")
+    @pytest.mark.it("Confirm the watermark is not advanced when sending fails")
+    def test_send_failure(
+        self, mock_message, mock_update, mock_pages, event, watermark_store
+    ):
+        mock_pages.return_value = iter([unformated_results])
+        mock_message.side_effect = BotocoreError("test_error")
+        event["incremental"] = True
+        result = guardian_lambda(event, {})
+
+        assert result["statusCode"] == 500
+        assert watermark_store.get("test") is None
+
+
+@pytest.fixture(scope="function")
+def deduplicator(tmp_path):
+    test_deduplicator = ArticleDeduplicator(
+        location=str(tmp_path / "dedup.bin"), capacity=1000
+    )
+    with patch(
+        "src.lambda_main.get_deduplicator", return_value=test_deduplicator
+    ):
+        yield test_deduplicator
+
+
+class TestDeduplication:
+    @mock_aws
+    @patch("src.lambda_main.get_articles", return_value=unformated_results)
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it(
+        "Confirm articles sent by a previous run are not sent again"
+    )
+    def test_repeat_run(
+        self, mock_message, mock_update, mock_result, event, deduplicator
+    ):
+        first = guardian_lambda(event, {})
+        second = guardian_lambda(event, {})
+
+        assert first["statusCode"] == 200
+        assert second["statusCode"] == 204
+        assert second["body"]["message"] == (
+            "No unsent articles found mentioning test"
+        )
+        assert mock_message.call_count == 1
+        assert os.path.exists(deduplicator.location)
+
+    @mock_aws
+    @patch(
+        "src.lambda_main.search_queries",
+        return_value={
+            "query_1": {"results": unformated_results, "error": None},
+            "query_2": {"results": unformated_results, "error": None},
+        },
+    )
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm an article matching several queries is sent once")
+    def test_batch_overlap(
+        self, mock_message, mock_update, mock_search, batch_event, deduplicator
+    ):
+        result = guardian_lambda(batch_event, {})
+
+        assert result["body"]["data"]["succeeded"] == {"query_1": ["test_id"]}
+        assert result["body"]["data"]["empty"] == ["query_2"]
+        assert mock_message.call_count == 1
+
+    @mock_aws
+    @patch("src.lambda_main.get_articles", return_value=unformated_results)
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages")
+    @pytest.mark.it("Confirm articles that failed to send are not remembered")
+    def test_send_failure(
+        self, mock_message, mock_update, mock_result, event, deduplicator
+    ):
+        mock_message.side_effect = BotocoreError("test_error")
+        guardian_lambda(event, {})
+
+        assert deduplicator.filter_unseen(unformated_results) == (
+            unformated_results
+        )
+
+
+class TestMessageCompression:
+    @mock_aws
+    @patch("src.lambda_main.get_articles", return_value=unformated_results)
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm messages are uncompressed by default")
+    def test_default_uncompressed(
+        self, mock_message, mock_update, mock_result, event, monkeypatch
+    ):
+        monkeypatch.delenv("GUARDIAN_MESSAGE_COMPRESSION", raising=False)
+        guardian_lambda(event, {})
+
+        assert mock_message.call_args.kwargs["compression"] is None
+
+    @mock_aws
+    @patch("src.lambda_main.get_articles", return_value=unformated_results)
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm GUARDIAN_MESSAGE_COMPRESSION enables compression")
+    def test_compression_from_env(
+        self, mock_message, mock_update, mock_result, event, monkeypatch
+    ):
+        monkeypatch.setenv("GUARDIAN_MESSAGE_COMPRESSION", "gzip")
+        monkeypatch.setenv("GUARDIAN_COMPRESSION_THRESHOLD", "2048")
+        guardian_lambda(event, {})
+
+        assert mock_message.call_args.kwargs["compression"] == "gzip"
+        assert mock_message.call_args.kwargs["compression_threshold"] == 2048
+
+
+class TestClaimCheckConfig:
+    @mock_aws
+    @patch("src.lambda_main.get_articles", return_value=unformated_results)
+    @patch("src.lambda_main.ensure_queue_config", return_value=None)
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it(
+        "Confirm full body text is sent through the configured claim check"
+    )
+    def test_claim_check_from_env(
+        self, mock_message, mock_update, mock_result, event, monkeypatch
+    ):
+        monkeypatch.setenv("GUARDIAN_PREVIEW_LENGTH", "full")
+        monkeypatch.setenv("GUARDIAN_CLAIM_CHECK_BUCKET", "test-bucket")
+        guardian_lambda(event, {})
+
+        kwargs = mock_message.call_args.kwargs
+        assert kwargs["claim_check_bucket"] == "test-bucket"
+        assert [
+            article["content_preview"] for article in kwargs["message_body"]
+        ] == [article["fields"]["bodyText"] for article in unformated_results]
+
+
+class TestSerializerConfig:
+    @mock_aws
+    @patch("src.lambda_main.get_articles", return_value=unformated_results)
+    @patch("src.lambda_main.ensure_queue_config", return_value={})
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm articles are serialised with json by default")
+    def test_default_serializer(
+        self, mock_message, mock_ensure, mock_result, event
+    ):
+        guardian_lambda(event, {})
+
+        assert mock_message.call_args.kwargs["serializer"].name == "json"
+
+    @mock_aws
+    @patch("src.lambda_main.get_articles", return_value=unformated_results)
+    @patch("src.lambda_main.ensure_queue_config", return_value={})
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm the serializer is read from the environment")
+    def test_serializer_from_env(
+        self, mock_message, mock_ensure, mock_result, event, monkeypatch
+    ):
+        monkeypatch.setenv("GUARDIAN_MESSAGE_SERIALIZER", "auto")
+        guardian_lambda(event, {})
+
+        serializer = mock_message.call_args.kwargs["serializer"]
+        assert serializer.content_type == "application/json"
+
+
+class TestClientReuse:
+    @mock_aws
+    @patch("src.lambda_main.get_articles", return_value=unformated_results)
+    @patch("src.lambda_main.ensure_queue_config", return_value={})
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm the SQS client is reused across invocations")
+    def test_sqs_client_reused(
+        self, mock_message, mock_ensure, mock_result, event, aws_credentials
+    ):
+        guardian_lambda(event, {})
+        guardian_lambda(event, {})
+
+        first, second = mock_message.call_args_list
+        assert first.kwargs["sqs_client"] is second.kwargs["sqs_client"]
+
+
+class TestPipelinedPages:
+    @mock_aws
+    @patch(
+        "src.lambda_main.get_article_pages",
+        return_value=iter([unformated_results, unformated_results]),
+    )
+    @patch("src.lambda_main.ensure_queue_config", return_value={})
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it(
+        "Confirm articles repeated on a later page are sent once with dedup"
+    )
+    def test_repeated_page(
+        self, mock_message, mock_ensure, mock_pages, event, deduplicator
+    ):
+        event["max_pages"] = 2
+        result = guardian_lambda(event, {})
+
+        assert result["body"]["data"]["message_ids"] == ["test_id"]
+        assert mock_message.call_count == 1
+
+    @mock_aws
+    @patch("src.lambda_main.get_article_pages")
+    @patch("src.lambda_main.ensure_queue_config", return_value={})
+    @patch("src.lambda_main.send_queue_messages")
+    @pytest.mark.it("Confirm a failed send stops the pipeline with a 500")
+    def test_send_error(self, mock_message, mock_ensure, mock_pages, event):
+        mock_pages.return_value = iter([unformated_results] * 5)
+        mock_message.side_effect = BotocoreError("test_error")
+        event["max_pages"] = 5
+        result = guardian_lambda(event, {})
+
+        assert result["statusCode"] == 500
+        assert mock_message.call_count == 1
+
+
+class FakeContext:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+def stopped_pages(resume_page):
+    """Page generator side effect that stops early at resume_page."""
+
+    def pages(**kwargs):
+        yield unformated_results
+        return resume_page
+
+    return pages
+
+
+class TestContinuation:
+    @pytest.mark.it("Confirm there is no deadline for a dict context")
+    def test_dict_context(self):
+        assert deadline_from_context({}) is None
+
+    @pytest.mark.it("Confirm the deadline is reached within the time reserve")
+    def test_deadline(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_TIME_RESERVE_MS", "1500")
+        context = FakeContext(remaining_ms=3000)
+        should_stop = deadline_from_context(context)
+
+        assert should_stop() is False
+        context.remaining_ms = 1000
+        assert should_stop() is True
+
+    @mock_aws
+    @patch("src.lambda_main.get_article_pages")
+    @patch("src.lambda_main.ensure_queue_config", return_value={})
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm a run stopped early returns a continuation")
+    def test_paginated_continuation(
+        self, mock_message, mock_ensure, mock_pages, event
+    ):
+        mock_pages.side_effect = stopped_pages(resume_page=3)
+        event.update(max_pages=10, page_size=5)
+        context = FakeContext(remaining_ms=100)
+        result = guardian_lambda(event, context)
+
+        assert result["statusCode"] == 206
+        assert result["body"]["data"]["message_ids"] == ["test_id"]
+        assert result["body"]["data"]["continuation"] == {
+            "query": "test",
+            "from_date": "2023-01-01",
+            "page_size": 5,
+            "start_page": 3,
+            "to_date": mock_pages.call_args.kwargs["to_date"],
+            "max_pages": 8,
+        }
+        assert mock_pages.call_args.kwargs["should_stop"]() is True
+
+    @mock_aws
+    @patch("src.lambda_main.get_article_pages")
+    @patch("src.lambda_main.ensure_queue_config", return_value={})
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm a continuation resumes from its start page")
+    def test_paginated_resume(self, mock_message, mock_ensure, mock_pages):
+        mock_pages.return_value = iter([unformated_results])
+        event = {
+            "queue_url": "https://sqs.test.com/test_queue",
+            "continuation": {
+                "query": "test",
+                "start_page": 3,
+                "to_date": "2023-02-01T12:00:00Z",
+                "max_pages": 8,
+            },
+        }
+        result = guardian_lambda(event, {})
+
+        assert result["statusCode"] == 200
+        assert mock_pages.call_args.kwargs["start_page"] == 3
+        assert mock_pages.call_args.kwargs["to_date"] == "2023-02-01T12:00:00Z"
+        assert mock_pages.call_args.kwargs["max_pages"] == 8
+
+    @mock_aws
+    @patch("src.lambda_main.get_new_article_pages")
+    @patch("src.lambda_main.ensure_queue_config", return_value={})
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it(
+        "Confirm incremental runs only store the watermark once complete"
+    )
+    def test_incremental_continuation(
+        self, mock_message, mock_ensure, mock_pages, watermark_store
+    ):
+        event = {
+            "query": "test",
+            "queue_url": "https://sqs.test.com/test_queue",
+            "incremental": True,
+        }
+        mock_pages.side_effect = stopped_pages(resume_page=2)
+        result = guardian_lambda(event, FakeContext(remaining_ms=100))
+
+        assert result["statusCode"] == 206
+        continuation = result["body"]["data"]["continuation"]
+        assert continuation["start_page"] == 2
+        assert continuation["from_date"] == first_run_from_date()
+        assert continuation["watermark"] is None
+        assert continuation["next_watermark"]["published"] == max(
+            article["webPublicationDate"] for article in unformated_results
+        )
+        assert watermark_store.get("test") is None
+
+        mock_pages.side_effect = None
+        mock_pages.return_value = iter([])
+        result = guardian_lambda(
+            {"queue_url": event["queue_url"], "continuation": continuation},
+            {},
+        )
+
+        assert mock_pages.call_args.kwargs["start_page"] == 2
+        assert mock_pages.call_args.kwargs["to_date"] == continuation["to_date"]
+        assert mock_pages.call_args.kwargs["watermark"] is None
+        assert watermark_store.get("test") == continuation["next_watermark"]
+
+
+SEARCH_URL = "https://content.guardianapis.com/search"
+
+
+def newest_first_side_effect(corpus: list[dict]):
+    """respx side effect paging corpus newest first up to any to-date."""
+
+    def side_effect(request):
+        params = request.url.params
+        matching = sorted(
+            (
+                article
+                for article in corpus
+                if article["webPublicationDate"]
+                <= params.get("to-date", "9999")
+            ),
+            key=lambda article: article["webPublicationDate"],
+            reverse=True,
+        )
+        page = int(params["page"])
+        page_size = int(params["page-size"])
+        return httpx.Response(
+            200,
+            json={
+                "response": {
+                    "total": len(matching),
+                    "pages": -(-len(matching) // page_size),
+                    "currentPage": page,
+                    "results": matching[
+                        (page - 1) * page_size : page * page_size
+                    ],
+                }
+            },
+        )
+
+    return side_effect
+
+
+class TestPinnedContinuation:
+    @mock_aws
+    @respx.mock
+    @patch("src.lambda_main.ensure_queue_config", return_value={})
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it(
+        "Confirm an article published between invocations does not shift the "
+        "resumed pages"
+    )
+    def test_new_article_between_invocations(
+        self, mock_message, mock_ensure, monkeypatch
+    ):
+        monkeypatch.setattr(
+            "src.guardian_api.GUARDIAN_RATE_LIMITER", TokenBucket(rate=None)
+        )
+        corpus = []
+        for hour, article in enumerate(deepcopy(unformated_results)):
+            article["webPublicationDate"] = f"2023-01-01T{hour:02d}:00:00Z"
+            corpus.append(article)
+        context = FakeContext(remaining_ms=60_000)
+        side_effect = newest_first_side_effect(corpus)
+
+        def first_page_then_deadline(request):
+            context.remaining_ms = 0
+            return side_effect(request)
+
+        route = respx.get(SEARCH_URL).mock(side_effect=first_page_then_deadline)
+        event = {
+            "query": "test",
+            "queue_url": "https://sqs.test.com/test_queue",
+            "page_size": 3,
+            "max_pages": 10,
+        }
+        stopped = guardian_lambda(event, context)
+
+        continuation = stopped["body"]["data"]["continuation"]
+        published = deepcopy(corpus[0])
+        published["webPublicationDate"] = (
+            datetime.fromisoformat(continuation["to_date"])
+            + timedelta(seconds=1)
+        ).strftime("%Y-%m-%dT%H:%M:%SZ")
+        corpus.append(published)
+        route.mock(side_effect=side_effect)
+        resumed = guardian_lambda(
+            {
+                "queue_url": event["queue_url"],
+                "continuation": continuation,
+            },
+            {},
+        )
+
+        assert stopped["statusCode"] == 206
+        assert resumed["statusCode"] == 200
+        sent = [
+            article["webPublicationDate"]
+            for call in mock_message.call_args_list
+            for article in call.kwargs["message_body"]
+        ]
+        assert sent == sorted(
+            (article["webPublicationDate"] for article in corpus[:-1]),
+            reverse=True,
+        )
+
+
+@pytest.fixture(scope="function")
+def backfill_event():
+    test_event = {
+        "query": "test",
+        "from_date": "2023-01-01",
+        "to_date": "2023-01-31",
+        "queue_url": "https://sqs.test.com/test_queue",
+        "backfill": True,
+    }
+    return test_event
+
+
+def fake_backfill(remaining: list, page: int = 1):
+    """run_backfill replacement sending the fixtures as one shard."""
+
+    def run_backfill(send, **kwargs):
+        send(Shard("2023-01-01", "2023-01-15"), unformated_results)
+        return {
+            "shards": 1 + len(remaining),
+            "completed": 1,
+            "articles": len(unformated_results),
+            "remaining": remaining,
+            "page": page,
+        }
+
+    return run_backfill
+
+
+class TestBackfillLambdaFunction:
+    @mock_aws
+    @patch("src.lambda_main.run_backfill")
+    @patch("src.lambda_main.ensure_queue_config", return_value={})
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm each backfilled shard is sent to the queue")
+    def test_backfill(
+        self, mock_message, mock_ensure, mock_backfill, backfill_event
+    ):
+        mock_backfill.side_effect = fake_backfill(remaining=[])
+        backfill_event["checkpoint"] = "backfill.json"
+        result = guardian_lambda(backfill_event, {})
+
+        assert result["statusCode"] == 200
+        assert result["body"]["data"] == {
+            "message_ids": ["test_id"],
+            "article_count": 10,
+            "shards": 1,
+        }
+        kwargs = mock_backfill.call_args.kwargs
+        assert kwargs["to_date"] == "2023-01-31"
+        assert kwargs["checkpoint"].path == "backfill.json"
+        assert kwargs["shards"] is None
+        assert len(mock_message.call_args.kwargs["message_body"]) == 10
+
+    @mock_aws
+    @patch("src.lambda_main.run_backfill")
+    @patch("src.lambda_main.ensure_queue_config", return_value={})
+    @patch("src.lambda_main.send_queue_messages", return_value=["test_id"])
+    @pytest.mark.it("Confirm a stopped backfill continues with its shards")
+    def test_backfill_continuation(
+        self, mock_message, mock_ensure, mock_backfill, backfill_event
+    ):
+        mock_backfill.side_effect = fake_backfill(
+            remaining=[["2023-01-16", "2023-01-31"]], page=3
+        )
+        result = guardian_lambda(backfill_event, FakeContext(remaining_ms=100))
+
+        assert result["statusCode"] == 206
+        continuation = result["body"]["data"]["continuation"]
+        assert continuation == {
+            "query": "test",
+            "from_date": "2023-01-01",
+            "to_date": "2023-01-31",
+            "backfill": True,
+            "shards": [["2023-01-16", "2023-01-31"]],
+            "page": 3,
+        }
+        assert mock_backfill.call_args.kwargs["should_stop"]() is True
+
+        guardian_lambda(
+            {
+                "queue_url": backfill_event["queue_url"],
+                "continuation": continuation,
+            },
+            {},
+        )
+        assert mock_backfill.call_args.kwargs["shards"] == [
+            Shard("2023-01-16", "2023-01-31")
+        ]
+        assert mock_backfill.call_args.kwargs["start_page"] == 3
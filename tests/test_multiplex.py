@@ -0,0 +1,381 @@
+import asyncio
+import pytest
+import httpx
+import respx
+from src.multiplex import (
+    combine_terms,
+    pack_terms,
+    group_search_params,
+    search_url_length,
+    TermMatcher,
+    get_group_articles,
+    get_multiplexed_articles,
+    search_queries_multiplexed,
+)
+from src.guardian_api import build_search_params, MAX_PAGE_SIZE
+from src.projection import Projection
+from src.rate_limiter import TokenBucket
+from tests.test_data import unformated_results
+from benchmarks.multiplex_report import report, make_terms
+
+SEARCH_URL = "https://content.guardianapis.com/search"
+
+
+def article(title: str) -> dict:
+    """Return a search result with only a title."""
+    return {"webTitle": title, "fields": {}, "tags": []}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Isolate tests from the shared rate limiter and skip backoff delays."""
+    monkeypatch.setattr(
+        "src.guardian_api.GUARDIAN_RATE_LIMITER", TokenBucket(rate=None)
+    )
+    monkeypatch.setattr("src.guardian_api.backoff_delay", lambda **kwargs: 0)
+
+
+def combined_side_effect(request):
+    """respx side effect returning every fixture for a combined search."""
+    if "bad_term" in request.url.params["q"]:
+        return httpx.Response(401)
+    return httpx.Response(
+        200,
+        json={
+            "response": {
+                "total": len(unformated_results),
+                "pages": 1,
+                "currentPage": 1,
+                "results": unformated_results,
+            }
+        },
+    )
+
+
+class TestPackTerms:
+    @pytest.mark.it("Confirm terms are grouped and joined with OR")
+    def test_combine_terms(self):
+        assert combine_terms(["a b", '"c d"']) == '(a b) OR ("c d")'
+        assert combine_terms(["a b"]) == "a b"
+
+    @pytest.mark.it("Confirm every combined search URL fits the limit")
+    def test_url_limit(self):
+        terms = [f"term number {i}" for i in range(100)]
+        projection = Projection()
+
+        groups = pack_terms(
+            terms,
+            from_date="2023-01-01",
+            max_url_length=500,
+            projection=projection,
+        )
+
+        assert [term for group in groups for term in group] == terms
+        assert 1 < len(groups) < len(terms)
+        for group in groups:
+            params = build_search_params(
+                query=combine_terms(group),
+                from_date="2023-01-01",
+                page=1,
+                page_size=MAX_PAGE_SIZE,
+                projection=projection,
+            )
+            assert search_url_length(params) <= 500
+
+    @pytest.mark.it("Confirm a term too long to share a URL is searched alone")
+    def test_oversized_term(self):
+        groups = pack_terms(
+            ["a", "x" * 600, "b"], max_url_length=500, projection=Projection()
+        )
+
+        assert groups == [["a"], ["x" * 600], ["b"]]
+
+    @pytest.mark.it("Confirm a term that cannot be parsed is searched alone")
+    def test_invalid_term(self):
+        groups = pack_terms(["a", "(b", "c"], projection=Projection())
+
+        assert groups == [["(b"], ["a", "c"]]
+
+    @pytest.mark.it("Confirm combined searches request the fields matched on")
+    def test_match_fields(self):
+        projection = Projection(preview_field="trailText", tag_types=())
+
+        combined = group_search_params(["a", "b"], projection=projection)
+        single = group_search_params(["a"], projection=projection)
+
+        assert combined["show-fields"] == "trailText,bodyText"
+        assert single["show-fields"] == "trailText"
+
+    @pytest.mark.it("Confirm duplicate terms are packed once")
+    def test_duplicates(self):
+        assert pack_terms(["a", "b", "a"], projection=Projection()) == [
+            ["a", "b"]
+        ]
+
+
+class TestTermMatcher:
+    @pytest.mark.it("Confirm articles are routed by title, body and tag words")
+    def test_route(self):
+        matcher = TermMatcher(
+            ["Chelsea", "crypto fraud", "Newcastle Leicester", "Massachusetts"]
+        )
+
+        routed, unmatched = matcher.route(unformated_results)
+
+        assert routed["Chelsea"] == [unformated_results[0]]
+        assert routed["crypto fraud"] == [unformated_results[2]]
+        assert routed["Newcastle Leicester"] == [
+            unformated_results[3],
+            unformated_results[9],
+        ]
+        assert routed["Massachusetts"] == [unformated_results[5]]
+        assert len(unmatched) == 5
+
+    @pytest.mark.it("Confirm words are matched case and plural insensitively")
+    def test_normalised_words(self):
+        matcher = TermMatcher(["nurse", "TUMOR"])
+
+        assert matcher.match(unformated_results[5]) == ["nurse", "TUMOR"]
+
+    @pytest.mark.it("Confirm quoted phrases must appear in order")
+    def test_phrases(self):
+        matcher = TermMatcher(['"justice department"', '"department justice"'])
+
+        assert matcher.match(unformated_results[2]) == ['"justice department"']
+
+    @pytest.mark.it("Confirm boolean operators are not matched as words")
+    def test_operators(self):
+        matcher = TermMatcher(["Chelsea AND Warsaw", "(Chelsea) AND (Warsaw)"])
+
+        assert matcher.match(unformated_results[0]) == [
+            "Chelsea AND Warsaw",
+            "(Chelsea) AND (Warsaw)",
+        ]
+
+    @pytest.mark.it("Confirm NOT excludes articles mentioning the next word")
+    def test_not(self):
+        matcher = TermMatcher(["brexit NOT football", "NOT brexit"])
+
+        assert matcher.match(article("Brexit talks resume")) == [
+            "brexit NOT football"
+        ]
+        assert matcher.match(article("Brexit hits football transfers")) == []
+        assert matcher.match(article("Football results")) == ["NOT brexit"]
+
+    @pytest.mark.it("Confirm OR matches articles mentioning either side")
+    def test_or(self):
+        matcher = TermMatcher(["cats OR dogs", "cats AND dogs"])
+
+        assert matcher.match(article("Cats are great")) == ["cats OR dogs"]
+        assert matcher.match(article("Dogs chase cats")) == [
+            "cats OR dogs",
+            "cats AND dogs",
+        ]
+        assert matcher.match(article("Birds sing")) == []
+
+    @pytest.mark.it("Confirm AND binds tighter than OR and groups nest")
+    def test_precedence(self):
+        matcher = TermMatcher(["a OR b c", "(a OR b) c", 'x NOT (y OR "z w")'])
+
+        assert matcher.match(article("a")) == ["a OR b c"]
+        assert matcher.match(article("b c")) == ["a OR b c", "(a OR b) c"]
+        assert matcher.match(article("x z")) == ['x NOT (y OR "z w")']
+        assert matcher.match(article("x w z")) == ['x NOT (y OR "z w")']
+        assert matcher.match(article("x z w")) == []
+
+    @pytest.mark.it("Confirm a ValueError is raised for an invalid query")
+    def test_invalid(self):
+        for term in ["(Chelsea", "Chelsea)", "Chelsea NOT", "a OR", '"a b']:
+            with pytest.raises(ValueError):
+                TermMatcher([term])
+
+    @pytest.mark.it("Confirm every returned field is matched on")
+    def test_fields(self):
+        matcher = TermMatcher(["Chelsea", "Warsaw"])
+        chelsea = {"webTitle": "", "fields": {"trailText": "Chelsea"}}
+        warsaw = {"webTitle": "", "fields": {"bodyText": "x " * 500 + "Warsaw"}}
+
+        assert matcher.match(chelsea) == ["Chelsea"]
+        assert matcher.match(warsaw) == ["Warsaw"]
+
+
+class TestMultiplexedArticles:
+    @respx.mock
+    @pytest.mark.it("Confirm many terms are retrieved with one search")
+    def test_one_search(self):
+        route = respx.get(SEARCH_URL).mock(side_effect=combined_side_effect)
+        terms = ["Chelsea", "crypto fraud", "no such term"]
+
+        async def run():
+            async with httpx.AsyncClient() as client:
+                return await get_multiplexed_articles(
+                    terms=terms, client=client
+                )
+
+        outcomes = asyncio.run(run())
+
+        assert route.call_count == 1
+        assert route.calls[0].request.url.params["q"] == (
+            "(Chelsea) OR (crypto fraud) OR (no such term)"
+        )
+        assert outcomes == {
+            "Chelsea": {
+                "results": [unformated_results[0]],
+                "error": None,
+                "matches": 1,
+                "truncated": False,
+            },
+            "crypto fraud": {
+                "results": [unformated_results[2]],
+                "error": None,
+                "matches": 1,
+                "truncated": False,
+            },
+            "no such term": {
+                "results": None,
+                "error": None,
+                "matches": 0,
+                "truncated": False,
+            },
+        }
+
+    @respx.mock
+    @pytest.mark.it(
+        "Confirm articles matched deep in a streamed body are still routed"
+    )
+    def test_untrimmed_body(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_STREAM_DECODE", "true")
+        monkeypatch.setenv("GUARDIAN_PREVIEW_LENGTH", "500")
+        results = [
+            {
+                "id": "deep",
+                "webTitle": "Long read",
+                "fields": {"bodyText": "x " * 500 + "Warsaw"},
+            },
+            {"id": "title", "webTitle": "Chelsea win", "fields": {}},
+        ]
+        route = respx.get(SEARCH_URL).mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "response": {
+                        "total": 2,
+                        "pages": 1,
+                        "currentPage": 1,
+                        "results": results,
+                    }
+                },
+            )
+        )
+
+        outcomes = search_queries_multiplexed(["Chelsea", "Warsaw NOT Chelsea"])
+
+        assert route.call_count == 1
+        assert outcomes["Chelsea"]["matches"] == 1
+        assert [a["id"] for a in outcomes["Warsaw NOT Chelsea"]["results"]] == [
+            "deep"
+        ]
+
+    @respx.mock
+    @pytest.mark.it("Confirm a single term search keeps every article")
+    def test_single_term(self):
+        route = respx.get(SEARCH_URL).mock(side_effect=combined_side_effect)
+
+        outcomes = search_queries_multiplexed(["no such term"])
+
+        assert route.call_count == 1
+        assert outcomes["no such term"]["results"] == unformated_results
+
+    @respx.mock
+    @pytest.mark.it("Confirm a failed search is recorded against each term")
+    def test_group_failure(self):
+        route = respx.get(SEARCH_URL).mock(side_effect=combined_side_effect)
+        terms = ["Chelsea", "bad_term", "x" * 600]
+
+        outcomes = search_queries_multiplexed(terms, max_url_length=500)
+
+        assert route.call_count == 2
+        assert outcomes["Chelsea"]["results"] is None
+        assert "Client Side Error 401" in outcomes["bad_term"]["error"]
+        assert outcomes["x" * 600] == {
+            "results": unformated_results,
+            "error": None,
+            "matches": len(unformated_results),
+            "truncated": False,
+        }
+
+    @respx.mock
+    @pytest.mark.it("Confirm further pages are requested up to max_pages")
+    def test_max_pages(self):
+        route = respx.get(SEARCH_URL).mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "response": {
+                        "total": 1000,
+                        "pages": 5,
+                        "currentPage": 1,
+                        "results": unformated_results[:1],
+                    }
+                },
+            )
+        )
+
+        outcomes = search_queries_multiplexed(["Chelsea"], max_pages=3)
+
+        assert route.call_count == 3
+        assert outcomes["Chelsea"]["matches"] == 3
+        assert outcomes["Chelsea"]["truncated"] is True
+
+    @pytest.mark.it("Confirm a ValueError is raised when max_pages is below 1")
+    def test_invalid_max_pages(self):
+        with pytest.raises(ValueError):
+            search_queries_multiplexed(["Chelsea", "Arsenal"], max_pages=0)
+
+        async def run():
+            async with httpx.AsyncClient() as client:
+                return await get_group_articles(
+                    ["Chelsea"], client, max_pages=0
+                )
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+
+    @respx.mock
+    @pytest.mark.it("Confirm an empty search leaves every term empty")
+    def test_empty(self):
+        respx.get(SEARCH_URL).mock(
+            return_value=httpx.Response(200, json={"response": {"total": 0}})
+        )
+
+        outcomes = search_queries_multiplexed(["a", "b"])
+
+        empty = {
+            "results": None,
+            "error": None,
+            "matches": 0,
+            "truncated": False,
+        }
+        assert outcomes == {"a": empty, "b": empty}
+
+    @respx.mock
+    @pytest.mark.it(
+        "Confirm the URL limit is read from GUARDIAN_MAX_URL_LENGTH"
+    )
+    def test_env_limit(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_MAX_URL_LENGTH", "10")
+        route = respx.get(SEARCH_URL).mock(side_effect=combined_side_effect)
+
+        search_queries_multiplexed(["a", "b", "c"])
+
+        assert route.call_count == 3
+
+
+class TestMultiplexReport:
+    @pytest.mark.it("Confirm the report packs terms into fewer requests")
+    def test_report(self):
+        result = report(terms=60, limits=(500, 4000), repeat=1)
+
+        assert len(set(make_terms(60))) == 60
+        assert result[4000]["requests"] < result[500]["requests"] < 60
+        assert result[4000]["packing_factor"] == 60 / result[4000]["requests"]
@@ -0,0 +1,128 @@
+import time
+import threading
+import pytest
+from src.exceptions import ServerRequestError
+from src.pipeline import run_pipeline, SKIP
+
+
+def slow(function, delay):
+    def stage(item):
+        time.sleep(delay)
+        return function(item)
+
+    return stage
+
+
+class TestRunPipeline:
+    @pytest.mark.it("Confirm every item passes through each stage in order")
+    def test_order(self):
+        results = run_pipeline(
+            source=range(20),
+            stages=[lambda item: item * 2, lambda item: item + 1],
+        )
+        assert results == [item * 2 + 1 for item in range(20)]
+
+    @pytest.mark.it("Confirm a stage returning SKIP drops the item")
+    def test_skip(self):
+        results = run_pipeline(
+            source=range(10),
+            stages=[lambda item: SKIP if item % 2 else item, str],
+        )
+        assert results == ["0", "2", "4", "6", "8"]
+
+    @pytest.mark.it("Confirm stages overlap instead of running in sequence")
+    def test_overlap(self):
+        def pages():
+            for page in range(5):
+                time.sleep(0.05)
+                yield page
+
+        start = time.perf_counter()
+        results = run_pipeline(
+            source=pages(),
+            stages=[slow(str, 0.05), slow(int, 0.05)],
+        )
+        elapsed = time.perf_counter() - start
+
+        assert results == list(range(5))
+        # Sequential would take 5 items * 3 stages * 0.05s = 0.75s
+        assert elapsed < 0.6
+
+    @pytest.mark.it(
+        "Confirm a slow stage limits how far the source reads ahead"
+    )
+    def test_backpressure(self):
+        produced = 0
+        max_ahead = 0
+        consumed = 0
+        lock = threading.Lock()
+
+        def source():
+            nonlocal produced, max_ahead
+            for item in range(30):
+                with lock:
+                    produced += 1
+                    max_ahead = max(max_ahead, produced - consumed)
+                yield item
+
+        def consume(item):
+            nonlocal consumed
+            time.sleep(0.01)
+            with lock:
+                consumed += 1
+            return item
+
+        run_pipeline(
+            source=source(),
+            stages=[lambda item: item, consume],
+            max_buffered=2,
+        )
+
+        # Two queues of two items plus one item held by each thread
+        assert max_ahead <= 2 * 2 + 3
+
+    @pytest.mark.it("Confirm a stage error stops the source and is re-raised")
+    def test_stage_error(self):
+        produced = []
+        closed = threading.Event()
+
+        def source():
+            try:
+                for item in range(100):
+                    produced.append(item)
+                    yield item
+            finally:
+                closed.set()
+
+        def send(item):
+            if item == 3:
+                raise ServerRequestError("test_error")
+            time.sleep(0.01)
+            return item
+
+        with pytest.raises(ServerRequestError):
+            run_pipeline(source=source(), stages=[lambda item: item, send])
+
+        assert len(produced) < 100
+        assert closed.is_set()
+
+    @pytest.mark.it("Confirm a source error is re-raised after shutdown")
+    def test_source_error(self):
+        processed = []
+
+        def source():
+            yield 1
+            yield 2
+            raise ValueError("test_error")
+
+        with pytest.raises(ValueError):
+            run_pipeline(source=source(), stages=[processed.append])
+
+        assert processed == [1, 2]
+
+    @pytest.mark.it("Confirm invalid arguments raise ValueError")
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            run_pipeline(source=[], stages=[])
+        with pytest.raises(ValueError):
+            run_pipeline(source=[], stages=[str], max_buffered=0)
@@ -0,0 +1,143 @@
+import json
+import pytest
+from copy import deepcopy
+from src.projection import Projection, preview_length_from_env
+from src.utils import format_results
+from src.response_decoder import SearchResponseDecoder
+from tests.test_data import unformated_results
+
+
+def with_trail_text(results):
+    results = deepcopy(results)
+    for article in results:
+        article["fields"]["trailText"] = f"Trail of {article['webTitle']}"
+    return results
+
+
+class TestProjection:
+    @pytest.mark.it("Confirm the default requests body text and keyword tags")
+    def test_default_params(self):
+        assert Projection().request_params() == {
+            "show-fields": "bodyText",
+            "show-tags": "keyword",
+        }
+
+    @pytest.mark.it("Confirm no fields are requested when the preview is off")
+    def test_preview_disabled(self):
+        projection = Projection(preview_length=0)
+        results = deepcopy(unformated_results)
+        for article in results:
+            del article["fields"]
+
+        formatted = format_results(results, projection=projection)
+
+        assert projection.request_params()["show-fields"] is None
+        assert all(article["content_preview"] == "" for article in formatted)
+
+    @pytest.mark.it("Confirm trailText is requested and used as the preview")
+    def test_trail_text(self):
+        projection = Projection(preview_length=10, preview_field="trailText")
+        results = with_trail_text(unformated_results)
+
+        formatted = format_results(results, projection=projection)
+
+        assert projection.request_params()["show-fields"] == "trailText"
+        assert [article["content_preview"] for article in formatted] == [
+            article["fields"]["trailText"][:10] for article in results
+        ]
+
+    @pytest.mark.it("Confirm tags are not requested without tag types")
+    def test_no_tags(self):
+        projection = Projection(tag_types=())
+        results = deepcopy(unformated_results)
+        for article in results:
+            del article["tags"]
+
+        formatted = format_results(results, projection=projection)
+
+        assert projection.request_params()["show-tags"] is None
+        assert all(article["keywords"] == [] for article in formatted)
+
+    @pytest.mark.it("Confirm several tag types are requested together")
+    def test_tag_types(self):
+        projection = Projection(tag_types=("keyword", "contributor"))
+        assert projection.request_params()["show-tags"] == "keyword,contributor"
+
+    @pytest.mark.it("Confirm keywords hold the titles of every tag type")
+    def test_tag_type_keywords(self):
+        projection = Projection(tag_types=("keyword", "contributor"))
+        response = deepcopy(unformated_results[0])
+        response["tags"].append(
+            {
+                "id": "profile/test",
+                "type": "contributor",
+                "webTitle": "Test Contributor",
+            }
+        )
+
+        keywords = projection.keywords(response)
+
+        assert keywords == [tag["webTitle"] for tag in response["tags"]]
+        assert keywords[-1] == "Test Contributor"
+
+    @pytest.mark.it("Confirm the default matches format_results without one")
+    def test_default_format(self):
+        assert format_results(
+            unformated_results, projection=Projection()
+        ) == format_results(unformated_results)
+
+    @pytest.mark.it("Confirm invalid projections raise ValueError")
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            Projection(preview_field="headline")
+        with pytest.raises(ValueError):
+            Projection(preview_length=-1)
+
+
+class TestProjectionFromEnv:
+    @pytest.mark.it("Confirm the projection is read from the environment")
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_PREVIEW_LENGTH", "200")
+        monkeypatch.setenv("GUARDIAN_PREVIEW_FIELD", "trailtext")
+        monkeypatch.setenv("GUARDIAN_TAG_TYPES", "keyword, series")
+
+        assert Projection.from_env() == Projection(
+            preview_length=200,
+            preview_field="trailText",
+            tag_types=("keyword", "series"),
+        )
+
+    @pytest.mark.it("Confirm previews and tags can be turned off")
+    def test_disabled_from_env(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_PREVIEW_LENGTH", "none")
+        monkeypatch.setenv("GUARDIAN_TAG_TYPES", "none")
+
+        assert Projection.from_env().request_params() == {
+            "show-fields": None,
+            "show-tags": None,
+        }
+
+    @pytest.mark.parametrize(
+        "value, expected", [("full", None), ("none", 0), ("0", 0), ("50", 50)]
+    )
+    @pytest.mark.it("Confirm preview lengths are parsed")
+    def test_preview_length(self, monkeypatch, value, expected):
+        monkeypatch.setenv("GUARDIAN_PREVIEW_LENGTH", value)
+        assert preview_length_from_env() == expected
+
+
+class TestProjectedDecoding:
+    @pytest.mark.it("Confirm the streamed decoder cuts the preview field")
+    def test_trail_text_decoding(self):
+        results = with_trail_text(unformated_results)
+        decoder = SearchResponseDecoder(
+            preview_length=5, preview_field="trailText"
+        )
+        decoder.feed(
+            json.dumps({"response": {"total": 1, "results": results}}).encode()
+        )
+        response = decoder.close()
+
+        assert [
+            article["fields"]["trailText"] for article in response["results"]
+        ] == [article["fields"]["trailText"][:5] for article in results]
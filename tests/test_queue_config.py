@@ -0,0 +1,169 @@
+import os
+import json
+import pytest
+import boto3
+from moto import mock_aws
+from unittest.mock import MagicMock
+from botocore.exceptions import ClientError
+from src.exceptions import BotocoreError
+from src.queue_config import QueueConfigManager, create_queue_config_from_env
+
+
+@pytest.fixture(scope="module")
+def aws_credentials():
+    """Mocked AWS Credentials for moto."""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture(scope="function")
+def sqs_fixture(aws_credentials):
+    with mock_aws():
+        sqs_client = boto3.client("sqs")
+        queue_url = sqs_client.create_queue(QueueName="test_queue")["QueueUrl"]
+        yield sqs_client, queue_url
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def queue_attributes(sqs_client, queue_url):
+    return sqs_client.get_queue_attributes(
+        QueueUrl=queue_url, AttributeNames=["All"]
+    )["Attributes"]
+
+
+class TestQueueConfigManager:
+    @pytest.mark.it("Confirm declared attributes are reconciled in one call")
+    def test_reconcile(self, sqs_fixture):
+        sqs_client, queue_url = sqs_fixture
+        queue_config = QueueConfigManager(
+            attributes={
+                "MessageRetentionPeriod": 259200,
+                "VisibilityTimeout": 60,
+            }
+        )
+
+        changes = queue_config.ensure(queue_url, sqs_client)
+
+        assert changes == {
+            "MessageRetentionPeriod": "259200",
+            "VisibilityTimeout": "60",
+        }
+        attributes = queue_attributes(sqs_client, queue_url)
+        assert attributes["MessageRetentionPeriod"] == "259200"
+        assert attributes["VisibilityTimeout"] == "60"
+
+    @pytest.mark.it("Confirm matching queues are not updated")
+    def test_no_changes(self, sqs_fixture):
+        sqs_client, queue_url = sqs_fixture
+        sqs_client.set_queue_attributes(
+            QueueUrl=queue_url,
+            Attributes={"MessageRetentionPeriod": "259200"},
+        )
+
+        assert QueueConfigManager().ensure(queue_url, sqs_client) == {}
+
+    @pytest.mark.it(
+        "Confirm a verified queue is not checked again within the TTL"
+    )
+    def test_cached_until_ttl(self):
+        sqs_client = MagicMock()
+        sqs_client.get_queue_attributes.return_value = {
+            "Attributes": {"MessageRetentionPeriod": "259200"}
+        }
+        clock = FakeClock()
+        queue_config = QueueConfigManager(ttl=60, clock=clock)
+
+        queue_config.ensure("test_url/test_queue", sqs_client)
+        queue_config.ensure("test_url/test_queue", sqs_client)
+        assert sqs_client.get_queue_attributes.call_count == 1
+
+        clock.now = 61
+        queue_config.ensure("test_url/test_queue", sqs_client)
+        assert sqs_client.get_queue_attributes.call_count == 2
+
+    @pytest.mark.it("Confirm queues are verified separately by URL")
+    def test_per_queue_cache(self):
+        sqs_client = MagicMock()
+        sqs_client.get_queue_attributes.return_value = {"Attributes": {}}
+        queue_config = QueueConfigManager()
+
+        queue_config.ensure("test_url/queue_1", sqs_client)
+        queue_config.ensure("test_url/queue_2", sqs_client)
+
+        assert sqs_client.get_queue_attributes.call_count == 2
+
+    @pytest.mark.it("Confirm per queue declarations override the defaults")
+    def test_declare(self, sqs_fixture):
+        sqs_client, queue_url = sqs_fixture
+        queue_config = QueueConfigManager()
+        queue_config.ensure(queue_url, sqs_client)
+        queue_config.declare("test_queue", {"MessageRetentionPeriod": 86400})
+
+        changes = queue_config.ensure(queue_url, sqs_client)
+
+        assert changes == {"MessageRetentionPeriod": "86400"}
+        attributes = queue_attributes(sqs_client, queue_url)
+        assert attributes["MessageRetentionPeriod"] == "86400"
+
+    @pytest.mark.it("Confirm an invalidated queue is checked again")
+    def test_invalidate(self):
+        sqs_client = MagicMock()
+        sqs_client.get_queue_attributes.return_value = {"Attributes": {}}
+        queue_config = QueueConfigManager()
+
+        queue_config.ensure("test_url/test_queue", sqs_client)
+        queue_config.invalidate("test_url/test_queue")
+        queue_config.ensure("test_url/test_queue", sqs_client)
+
+        assert sqs_client.get_queue_attributes.call_count == 2
+
+    @mock_aws
+    @pytest.mark.it("Confirm ClientError is re-raised and nothing is cached")
+    def test_client_error(self, aws_credentials):
+        sqs_client = boto3.client("sqs")
+        queue_config = QueueConfigManager()
+        with pytest.raises(ClientError) as c_exc:
+            queue_config.ensure("bad_url", sqs_client)
+        assert "Boto3 error updating queue attributes" in str(c_exc.value)
+        assert queue_config.verified == {}
+
+    @mock_aws
+    @pytest.mark.it("Confirm an unexpected error raises a BotocoreError")
+    def test_unexpected_error(self, aws_credentials):
+        with pytest.raises(BotocoreError):
+            QueueConfigManager().ensure("bad_url", boto3.client("s3"))
+
+
+class TestCreateQueueConfigFromEnv:
+    @pytest.mark.it(
+        "Confirm attributes are declared from environment variables"
+    )
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_QUEUE_RETENTION", "86400")
+        monkeypatch.setenv("GUARDIAN_QUEUE_VISIBILITY_TIMEOUT", "120")
+        monkeypatch.setenv(
+            "GUARDIAN_QUEUE_ATTRIBUTES",
+            json.dumps({"other_queue": {"MaximumMessageSize": 1024}}),
+        )
+
+        queue_config = create_queue_config_from_env()
+
+        assert queue_config.desired_attributes("test_url/test_queue") == {
+            "MessageRetentionPeriod": "86400",
+            "VisibilityTimeout": "120",
+        }
+        assert queue_config.desired_attributes("test_url/other_queue") == {
+            "MessageRetentionPeriod": "86400",
+            "VisibilityTimeout": "120",
+            "MaximumMessageSize": "1024",
+        }
@@ -0,0 +1,128 @@
+import asyncio
+import pytest
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from src.rate_limiter import parse_retry_after, backoff_delay, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestParseRetryAfter:
+    @pytest.mark.it("Confirm a delay in seconds is parsed")
+    def test_seconds(self):
+        assert parse_retry_after("30") == 30.0
+
+    @pytest.mark.it("Confirm an HTTP-date is converted to seconds from now")
+    def test_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+        delay = parse_retry_after(format_datetime(retry_at, usegmt=True))
+        assert 55 < delay <= 60
+
+    @pytest.mark.parametrize("value", [None, "", "not a date"])
+    @pytest.mark.it("Confirm None is returned for a missing or invalid header")
+    def test_invalid(self, value):
+        assert parse_retry_after(value) is None
+
+
+class TestBackoffDelay:
+    @pytest.mark.it("Confirm the delay grows exponentially up to max_delay")
+    def test_exponential(self):
+        for attempt in range(1, 10):
+            delay = backoff_delay(attempt=attempt, base_delay=1, max_delay=8)
+            assert 0 <= delay <= min(8, 2 ** (attempt - 1))
+
+    @pytest.mark.it("Confirm a Retry-After delay is always honoured")
+    def test_retry_after(self):
+        delay = backoff_delay(
+            attempt=1, base_delay=0.5, max_delay=60, retry_after=10
+        )
+        assert 10 <= delay <= 10.5
+
+    @pytest.mark.it("Confirm a Retry-After delay is not capped at max_delay")
+    def test_retry_after_uncapped(self):
+        delay = backoff_delay(
+            attempt=1, base_delay=0.5, max_delay=30, retry_after=120
+        )
+        assert 120 <= delay <= 120.5
+
+
+class TestTokenBucket:
+    @pytest.mark.it("Confirm a burst up to capacity does not wait")
+    def test_burst(self):
+        bucket = TokenBucket(rate=2, capacity=3, clock=FakeClock())
+        assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+
+    @pytest.mark.it("Confirm requests beyond capacity are spaced at the rate")
+    def test_sustained_rate(self):
+        bucket = TokenBucket(rate=2, capacity=1, clock=FakeClock())
+        assert [bucket.reserve() for _ in range(4)] == [0, 0.5, 1.0, 1.5]
+
+    @pytest.mark.it("Confirm tokens refill over time up to capacity")
+    def test_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+        clock.now = 100
+        assert bucket.tokens <= 2
+        assert [bucket.reserve() for _ in range(3)] == [0, 0, 1.0]
+
+    @pytest.mark.it("Confirm a rate limited response pauses every caller")
+    def test_pause(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=None, clock=clock)
+        bucket.on_rate_limited(5)
+        assert bucket.reserve() == 5
+        clock.now = 5
+        assert bucket.reserve() == 0
+
+    @pytest.mark.it(
+        "Confirm the rate halves on rate limiting and then recovers"
+    )
+    def test_adaptive_rate(self):
+        bucket = TokenBucket(rate=10, clock=FakeClock())
+        bucket.on_rate_limited(0)
+        assert bucket.rate == 5
+        bucket.on_rate_limited(0)
+        bucket.on_rate_limited(0)
+        bucket.on_rate_limited(0)
+        assert bucket.rate == 1
+        for _ in range(100):
+            bucket.on_success()
+        assert bucket.rate == 10
+
+    @pytest.mark.it("Confirm an unlimited bucket never waits")
+    def test_unlimited(self):
+        bucket = TokenBucket(rate=None)
+        assert all(bucket.reserve() == 0 for _ in range(1000))
+
+    @pytest.mark.it("Confirm async callers wait for their token")
+    def test_acquire_async(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await asyncio.gather(*(bucket.acquire_async() for _ in range(6)))
+            return loop.time() - start
+
+        assert asyncio.run(run()) >= 0.09
+
+    @pytest.mark.it("Confirm the bucket is configured from the environment")
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_RATE_LIMIT", "12")
+        monkeypatch.setenv("GUARDIAN_RATE_BURST", "4")
+        bucket = TokenBucket.from_env()
+        assert bucket.max_rate == 12
+        assert bucket.capacity == 4
+
+    @pytest.mark.it("Confirm a ValueError is raised for a non-positive rate")
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
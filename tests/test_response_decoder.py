@@ -0,0 +1,147 @@
+import json
+import pytest
+from src.response_decoder import (
+    SearchResponseDecoder,
+    decode_search_response,
+    streaming_available,
+)
+from src.utils import format_results
+from benchmarks.response_decode_report import report
+from tests.test_data import unformated_results
+
+
+def response_body(results=unformated_results):
+    return json.dumps(
+        {
+            "response": {
+                "status": "ok",
+                "total": len(results),
+                "pages": 1,
+                "currentPage": 1,
+                "edition": {"id": "test"},
+                "results": results,
+            }
+        }
+    ).encode()
+
+
+def chunked(data, size=1000):
+    return [data[start : start + size] for start in range(0, len(data), size)]
+
+
+def ijson_events(value, prefix=""):
+    """Generate the (prefix, event, value) events ijson emits for value."""
+    if isinstance(value, dict):
+        yield prefix, "start_map", None
+        for key, item in value.items():
+            yield prefix, "map_key", key
+            yield from ijson_events(item, f"{prefix}.{key}" if prefix else key)
+        yield prefix, "end_map", None
+    elif isinstance(value, list):
+        yield prefix, "start_array", None
+        for item in value:
+            yield from ijson_events(
+                item, f"{prefix}.item" if prefix else "item"
+            )
+        yield prefix, "end_array", None
+    elif isinstance(value, bool):
+        yield prefix, "boolean", value
+    elif value is None:
+        yield prefix, "null", None
+    elif isinstance(value, str):
+        yield prefix, "string", value
+    else:
+        yield prefix, "number", value
+
+
+def expected_article(article, preview_length=500):
+    return {
+        "id": article["id"],
+        "webPublicationDate": article["webPublicationDate"],
+        "webTitle": article["webTitle"],
+        "webUrl": article["webUrl"],
+        "fields": {"bodyText": article["fields"]["bodyText"][:preview_length]},
+        "tags": [
+            {"id": tag["id"], "type": tag["type"], "webTitle": tag["webTitle"]}
+            for tag in article["tags"]
+        ],
+    }
+
+
+class TestSearchResponseDecoder:
+    @pytest.mark.it("Confirm results are trimmed to the fields that are kept")
+    def test_trimmed_results(self):
+        response = decode_search_response(chunked(response_body()))
+
+        assert response["total"] == len(unformated_results)
+        assert response["currentPage"] == 1
+        assert "edition" not in response
+        assert response["results"] == [
+            expected_article(article) for article in unformated_results
+        ]
+
+    @pytest.mark.it("Confirm bodyText is cut to the preview length")
+    def test_preview_length(self):
+        for preview_length in (10, None):
+            response = decode_search_response(
+                chunked(response_body()), preview_length=preview_length
+            )
+            assert [
+                article["fields"]["bodyText"] for article in response["results"]
+            ] == [
+                article["fields"]["bodyText"][:preview_length]
+                for article in unformated_results
+            ]
+
+    @pytest.mark.it("Confirm decoded results format like full responses")
+    def test_format_results(self):
+        response = decode_search_response(chunked(response_body(), size=7))
+
+        assert format_results(response["results"]) == format_results(
+            unformated_results
+        )
+
+    @pytest.mark.it("Confirm parse events build the same trimmed response")
+    def test_handle_events(self):
+        decoder = SearchResponseDecoder(preview_length=500)
+        decoder.handle_events(ijson_events(json.loads(response_body())))
+        streamed = {**decoder.response, "results": decoder.results}
+
+        assert streamed == decode_search_response([response_body()])
+
+    @pytest.mark.it("Confirm an incomplete body raises ValueError")
+    def test_incomplete_body(self):
+        with pytest.raises(ValueError):
+            decode_search_response(chunked(response_body())[:-1])
+
+    @pytest.mark.it("Confirm ijson decodes chunks as they arrive")
+    def test_ijson(self):
+        assert streaming_available()
+        decoder = SearchResponseDecoder()
+        chunks = chunked(response_body())
+        decoder.feed(chunks[0])
+        assert decoder.response["status"] == "ok"
+        for chunk in chunks[1:]:
+            decoder.feed(chunk)
+
+        assert decoder.close()["results"] == [
+            expected_article(article) for article in unformated_results
+        ]
+
+    @pytest.mark.it("Confirm the buffered fallback builds the same response")
+    def test_buffered(self, monkeypatch):
+        streamed = decode_search_response(chunked(response_body()))
+        monkeypatch.setattr("src.response_decoder.ijson", None)
+
+        assert not streaming_available()
+        assert decode_search_response(chunked(response_body())) == streamed
+
+
+class TestResponseDecodeReport:
+    @pytest.mark.it("Confirm streamed decoding peaks below full decoding")
+    def test_report(self):
+        result = report(results=40, body_scale=4, repeat=1)
+        assert (
+            result["streamed"]["peak_bytes"]
+            < result["json.loads"]["peak_bytes"]
+        )
@@ -0,0 +1,143 @@
+import json
+import pytest
+import src.serializers as serializers
+from src.serializers import (
+    Serializer,
+    JsonSerializer,
+    MsgpackSerializer,
+    OrjsonSerializer,
+    get_serializer,
+    serializer_for_content_type,
+    available_serializers,
+)
+from src.utils import format_results, encode_messages
+from src.article import json_default
+from benchmarks.serializer_report import report
+from tests.test_data import unformated_results
+
+
+class TestSerializer:
+    @pytest.mark.it("Confirm a serializer missing a method cannot be created")
+    def test_abstract(self):
+        class IncompleteSerializer(Serializer):
+            def encode(self, item):
+                return b""
+
+            def join(self, encoded_items):
+                return b""
+
+        with pytest.raises(TypeError):
+            Serializer()
+        with pytest.raises(TypeError):
+            IncompleteSerializer()
+
+
+class TestJsonSerializer:
+    @pytest.mark.it("Confirm the output matches the packed JSON messages")
+    def test_dumps(self):
+        articles = format_results(unformated_results)
+        data = JsonSerializer().dumps(articles)
+
+        assert encode_messages(articles, serializer=JsonSerializer()) == [
+            (data.decode(), None)
+        ]
+        assert json.loads(data) == json.loads(
+            json.dumps(articles, default=json_default)
+        )
+
+    @pytest.mark.it("Confirm joined articles decode to the original list")
+    def test_round_trip(self):
+        serializer = JsonSerializer()
+        articles = format_results(unformated_results)
+        data = serializer.join([serializer.encode(item) for item in articles])
+
+        assert serializer.decode(data) == articles
+
+    @pytest.mark.it("Confirm the array size is the item sizes plus overhead")
+    def test_array_size(self):
+        serializer = JsonSerializer()
+        encoded = [serializer.encode(item) for item in unformated_results]
+
+        assert len(serializer.join(encoded)) == (
+            sum(len(item) for item in encoded)
+            + serializer.separator_bytes * (len(encoded) - 1)
+            + serializer.array_bytes
+        )
+
+
+class TestOptionalSerializers:
+    @pytest.mark.it("Confirm orjson output decodes to the formatted articles")
+    def test_orjson(self):
+        pytest.importorskip("orjson")
+        serializer = OrjsonSerializer()
+        articles = format_results(unformated_results)
+
+        assert json.loads(serializer.dumps(articles)) == articles
+
+    @pytest.mark.it("Confirm msgpack arrays of any length round trip")
+    def test_msgpack(self):
+        pytest.importorskip("msgpack")
+        serializer = MsgpackSerializer()
+        for count in (0, 3, 20, 70000):
+            items = [{"n": n} for n in range(count)]
+            encoded = [serializer.encode(item) for item in items]
+            data = serializer.join(encoded)
+            assert serializer.decode(data) == items
+            assert len(data) <= sum(map(len, encoded)) + serializer.array_bytes
+
+    @pytest.mark.it("Confirm json is used when a package is not installed")
+    def test_fallback(self, monkeypatch):
+        monkeypatch.setattr(serializers, "orjson", None)
+        monkeypatch.setitem(serializers.SERIALIZER_PACKAGES, "orjson", None)
+        monkeypatch.setitem(serializers.SERIALIZER_PACKAGES, "msgpack", None)
+
+        assert available_serializers() == ["json"]
+        assert get_serializer("orjson").name == "json"
+        assert get_serializer("msgpack").name == "json"
+        assert get_serializer("auto").name == "json"
+
+    @pytest.mark.it("Confirm auto prefers orjson when it is installed")
+    def test_auto(self, monkeypatch):
+        monkeypatch.setattr(serializers, "orjson", object())
+        monkeypatch.setitem(
+            serializers.SERIALIZER_PACKAGES, "orjson", serializers.orjson
+        )
+
+        assert get_serializer("auto").name == "orjson"
+
+
+class TestGetSerializer:
+    @pytest.mark.it("Confirm json is the default serializer")
+    def test_default(self):
+        assert get_serializer().name == "json"
+        assert get_serializer(None).name == "json"
+
+    @pytest.mark.it("Confirm an unknown serializer raises ValueError")
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            get_serializer("pickle")
+
+    @pytest.mark.it("Confirm content types select a decoding serializer")
+    def test_content_type(self):
+        assert serializer_for_content_type(None).name == "json"
+        assert serializer_for_content_type("application/json").name == "json"
+        with pytest.raises(ValueError):
+            serializer_for_content_type("text/plain")
+
+    @pytest.mark.it(
+        "Confirm decoding msgpack without the package raises ValueError"
+    )
+    def test_content_type_missing_package(self, monkeypatch):
+        monkeypatch.setitem(serializers.SERIALIZER_PACKAGES, "msgpack", None)
+        with pytest.raises(ValueError):
+            serializer_for_content_type("application/msgpack")
+
+
+class TestSerializerReport:
+    @pytest.mark.it("Confirm every available serializer is timed")
+    def test_report(self):
+        result = report(articles=50, repeat=1)
+        assert set(result) == set(available_serializers())
+        for timings in result.values():
+            assert timings["encode_ms"] > 0
+            assert timings["bytes"] > 0
@@ -0,0 +1,215 @@
+import time
+import asyncio
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.singleflight import SingleFlight, Call
+
+
+class CountingEvent(threading.Event):
+    """Event counting the callers waiting for it."""
+
+    def __init__(self):
+        super().__init__()
+        self.waiters = 0
+
+    def wait(self, timeout=None):
+        self.waiters += 1
+        return super().wait(timeout)
+
+
+class CountingCall(Call):
+    """Call whose callers waiting for it can be counted."""
+
+    def __init__(self):
+        super().__init__()
+        self.done = CountingEvent()
+
+
+@pytest.fixture(autouse=True)
+def counting_calls(monkeypatch):
+    monkeypatch.setattr("src.singleflight.Call", CountingCall)
+
+
+def wait_for_waiters(flights: SingleFlight, key, waiters: int) -> None:
+    """Block the call in flight until waiters callers are waiting for it."""
+    deadline = time.monotonic() + 5
+    while flights.calls[key].done.waiters < waiters:
+        assert time.monotonic() < deadline, "callers did not arrive"
+        time.sleep(0.001)
+
+
+class TestSingleFlight:
+    @pytest.mark.it("Confirm concurrent callers share one call and its result")
+    def test_threads_share_result(self):
+        flights = SingleFlight()
+        calls = []
+
+        def func(value):
+            calls.append(value)
+            wait_for_waiters(flights, "key", 7)
+            return {"value": value}
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [
+                executor.submit(flights.do, "key", func, value=1)
+                for _ in range(8)
+            ]
+            results = [future.result(timeout=5) for future in futures]
+
+        assert calls == [1]
+        assert results == [{"value": 1}] * 8
+        assert all(result is results[0] for result in results)
+        assert flights.calls == {}
+
+    @pytest.mark.it("Confirm every waiting caller receives the exception")
+    def test_threads_share_exception(self):
+        flights = SingleFlight()
+        calls = []
+
+        def func():
+            calls.append(1)
+            wait_for_waiters(flights, "key", 3)
+            raise ValueError("test_error")
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(flights.do, "key", func) for _ in range(4)
+            ]
+            for future in futures:
+                with pytest.raises(ValueError, match="test_error"):
+                    future.result(timeout=5)
+
+        assert calls == [1]
+        assert flights.calls == {}
+
+    @pytest.mark.it("Confirm different keys and later calls are not shared")
+    def test_not_cached(self):
+        flights = SingleFlight()
+        calls = []
+
+        def func(value):
+            calls.append(value)
+            return value
+
+        assert flights.do("a", func, value=1) == 1
+        assert flights.do("a", func, value=2) == 2
+        assert flights.do("b", func, value=3) == 3
+        assert calls == [1, 2, 3]
+
+    @pytest.mark.it("Confirm concurrent coroutines share one call")
+    def test_async_share_result(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def func(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return {"value": value}
+
+        async def run():
+            return await asyncio.gather(
+                *(flights.do_async("key", func, value=1) for _ in range(8))
+            )
+
+        results = asyncio.run(run())
+
+        assert calls == [1]
+        assert results == [{"value": 1}] * 8
+        assert flights.async_calls == {}
+
+    @pytest.mark.it("Confirm every waiting coroutine receives the exception")
+    def test_async_share_exception(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def func():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("test_error")
+
+        async def run():
+            return await asyncio.gather(
+                *(flights.do_async("key", func) for _ in range(4)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+
+        assert calls == [1]
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.it(
+        "Confirm a cancelled waiter does not cancel the shared call"
+    )
+    def test_async_cancelled_waiter(self):
+        flights = SingleFlight()
+
+        async def func():
+            await asyncio.sleep(0.02)
+            return "result"
+
+        async def run():
+            leader = asyncio.create_task(flights.do_async("key", func))
+            waiter = asyncio.create_task(flights.do_async("key", func))
+            await asyncio.sleep(0.005)
+            waiter.cancel()
+            return await leader, waiter
+
+        result, waiter = asyncio.run(run())
+
+        assert result == "result"
+        assert waiter.cancelled()
+
+    @pytest.mark.it(
+        "Confirm waiters make the call again when the caller making it is "
+        "cancelled"
+    )
+    def test_async_cancelled_leader(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def func():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return len(calls)
+
+        async def run():
+            leader = asyncio.create_task(flights.do_async("key", func))
+            await asyncio.sleep(0.005)
+            waiters = [
+                asyncio.create_task(flights.do_async("key", func))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0.005)
+            leader.cancel()
+            results = await asyncio.gather(*waiters)
+            return leader, results
+
+        leader, results = asyncio.run(run())
+
+        assert leader.cancelled()
+        assert results == [2, 2, 2]
+        assert len(calls) == 2
+        assert flights.async_calls == {}
+
+    @pytest.mark.it("Confirm calls on separate event loops are not shared")
+    def test_separate_loops(self):
+        flights = SingleFlight()
+        calls = []
+        barrier = threading.Barrier(2)
+
+        async def func():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return len(calls)
+
+        def run():
+            barrier.wait()
+            return asyncio.run(flights.do_async("key", func))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(lambda _: run(), range(2)))
+
+        assert len(calls) == 2
+        assert sorted(results) == [2, 2]
@@ -1,15 +1,32 @@
 import os
 import json
+import base64
 import pytest
 import boto3
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
 from moto import mock_aws
 from copy import deepcopy
 from botocore.exceptions import ClientError
 from src.exceptions import BotocoreError
+from src.article import Article
+from src.serializers import JsonSerializer
 from src.utils import (
     format_results,
     update_message_retention,
     send_queue_message,
+    pack_articles,
+    group_batches,
+    message_attributes_size,
+    send_queue_messages,
+    compress_payload,
+    decode_message_body,
+    encode_messages,
+    store_claim_check,
+    read_claim_check,
+    get_boto3_client,
+    reset_boto3_clients,
+    warn_zstd_unavailable,
 )
 from test_data import unformated_results
 
@@ -45,6 +62,36 @@ class TestFormatResults:
             for key, value in result.items():
                 assert isinstance(value, expected_types[key])
 
+    @pytest.mark.it(
+        "Confirm the content preview is truncated to preview_length"
+    )
+    def test_preview_length(self):
+        formatted_results = format_results(
+            unformated_results, preview_length=10
+        )
+        for result, original in zip(
+            formatted_results, unformated_results, strict=True
+        ):
+            assert (
+                result["content_preview"]
+                == (original["fields"]["bodyText"][:10])
+            )
+
+    @pytest.mark.it("Confirm a preview_length of None keeps the full body text")
+    def test_full_body_text(self):
+        formatted_results = format_results(
+            unformated_results, preview_length=None
+        )
+        for result, original in zip(
+            formatted_results, unformated_results, strict=True
+        ):
+            assert result["content_preview"] == original["fields"]["bodyText"]
+
+    @pytest.mark.it("Confirm articles are returned as Article records")
+    def test_article_records(self):
+        formatted_results = format_results(unformated_results)
+        assert all(isinstance(result, Article) for result in formatted_results)
+
     @pytest.mark.it("Confirm a KeyError is re-raised with context message")
     def test_key_error(self):
         incorrect_format_results = [{"bad_key_1": 1, "bad_key_2": 2}]
@@ -166,3 +213,576 @@ class TestSendQueueMessage:
         assert messages["Messages"][0]["MessageId"] == message_queue_id
         assert json.loads(messages["Messages"][0]["Body"]) == message_body
         assert messages["Messages"][0]["MessageAttributes"] == attributes
+
+    @mock_aws
+    @pytest.mark.it("Confirm formatted articles are sent as JSON objects")
+    def test_article_message(self, sqs_fixure):
+        sqs_client, queue_url = sqs_fixure
+        message_body = format_results(unformated_results)
+
+        send_queue_message(
+            queue_url=queue_url,
+            message_id="test_id",
+            message_body=message_body,
+            sqs_client=sqs_client,
+        )
+
+        messages = sqs_client.receive_message(QueueUrl=queue_url)
+        body = json.loads(messages["Messages"][0]["Body"])
+        assert body == [article.to_dict() for article in message_body]
+
+
+class TestEncodeMessages:
+    @pytest.mark.it("Confirm articles fitting the budget are packed together")
+    def test_single_message(self):
+        articles = [{"id": str(n)} for n in range(5)]
+        messages = encode_messages(articles, serializer=JsonSerializer())
+        assert len(messages) == 1
+        assert json.loads(messages[0][0]) == articles
+
+    @pytest.mark.it(
+        "Confirm articles are split in order without exceeding the budget"
+    )
+    def test_split_messages(self):
+        articles = [{"id": str(n), "text": "x" * 100} for n in range(20)]
+        messages = encode_messages(
+            articles, max_message_bytes=500, serializer=JsonSerializer()
+        )
+        assert len(messages) > 1
+        assert all(len(body.encode()) <= 500 for body, _ in messages)
+        unpacked = [item for body, _ in messages for item in json.loads(body)]
+        assert unpacked == articles
+
+    @pytest.mark.it(
+        "Confirm an article larger than the budget raises ValueError"
+    )
+    def test_oversized_article(self):
+        with pytest.raises(ValueError):
+            encode_messages([{"text": "x" * 1000}], max_message_bytes=500)
+
+
+class TestGroupBatches:
+    @pytest.mark.it("Confirm batches contain at most 10 messages")
+    def test_entry_limit(self):
+        batches = group_batches(["[]"] * 25)
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+
+    @pytest.mark.it("Confirm batches stay within the total size limit")
+    def test_size_limit(self):
+        batches = group_batches(["x" * 100] * 5, max_batch_bytes=250)
+        assert batches == [[0, 1], [2, 3], [4]]
+
+
+class TestSendQueueMessages:
+    @mock_aws
+    @pytest.mark.it(
+        "Confirm packed messages are sent to the SQS queue in order"
+    )
+    def test_success_messages(self, sqs_fixure):
+        sqs_client, queue_url = sqs_fixure
+        articles = [{"id": str(n), "text": "x" * 100} for n in range(60)]
+
+        message_ids = send_queue_messages(
+            queue_url=queue_url,
+            message_id="test_id",
+            message_body=articles,
+            sqs_client=sqs_client,
+            max_message_bytes=500,
+        )
+
+        received = {}
+        while True:
+            response = sqs_client.receive_message(
+                QueueUrl=queue_url,
+                MaxNumberOfMessages=10,
+                MessageAttributeNames=["ID"],
+            )
+            if not response.get("Messages"):
+                break
+            for message in response["Messages"]:
+                assert message["MessageAttributes"]["ID"]["StringValue"] == (
+                    "test_id"
+                )
+                received[message["MessageId"]] = json.loads(message["Body"])
+        assert len(message_ids) > 10
+        assert [
+            item for message_id in message_ids for item in received[message_id]
+        ] == articles
+
+    @pytest.mark.it("Confirm message attributes count towards the batch size")
+    def test_batch_attribute_bytes(self):
+        sqs_client = MagicMock()
+        sqs_client.send_message_batch.side_effect = lambda **kwargs: {
+            "Successful": [
+                {"Id": entry["Id"], "MessageId": entry["Id"]}
+                for entry in kwargs["Entries"]
+            ]
+        }
+        # Ten bodies just under 256KB in total, over it with attributes
+        articles = [{"text": "x" * 26_180} for _ in range(10)]
+
+        send_queue_messages(
+            queue_url="test_url/test_queue",
+            message_id="test_id",
+            message_body=articles,
+            sqs_client=sqs_client,
+            max_message_bytes=26_200,
+        )
+
+        batches = [
+            call.kwargs["Entries"]
+            for call in sqs_client.send_message_batch.call_args_list
+        ]
+        entries = batches[0] + batches[1]
+        assert sum(len(entry["MessageBody"]) for entry in entries) < 256 * 1024
+        assert (
+            sum(
+                len(entry["MessageBody"])
+                + message_attributes_size(entry["MessageAttributes"])
+                for entry in entries
+            )
+            > 256 * 1024
+        )
+        assert [len(batch) for batch in batches] == [9, 1]
+        for batch in batches:
+            assert (
+                sum(
+                    len(entry["MessageBody"])
+                    + message_attributes_size(entry["MessageAttributes"])
+                    for entry in batch
+                )
+                <= 256 * 1024
+            )
+
+    @pytest.mark.it("Confirm only failed entries are retried")
+    @patch("src.utils.time.sleep")
+    def test_retry_failed_entries(self, mock_sleep):
+        sqs_client = MagicMock()
+        sqs_client.send_message_batch.side_effect = [
+            {
+                "Successful": [{"Id": "0", "MessageId": "id_0"}],
+                "Failed": [
+                    {"Id": "1", "SenderFault": False, "Code": "InternalError"}
+                ],
+            },
+            {"Successful": [{"Id": "1", "MessageId": "id_1"}]},
+        ]
+
+        message_ids = send_queue_messages(
+            queue_url="test_url/test_queue",
+            message_id="test_id",
+            message_body=[{"text": "x" * 100}, {"text": "y" * 100}],
+            sqs_client=sqs_client,
+            max_message_bytes=150,
+        )
+
+        assert message_ids == ["id_0", "id_1"]
+        retried = sqs_client.send_message_batch.call_args_list[1]
+        assert [entry["Id"] for entry in retried.kwargs["Entries"]] == ["1"]
+        mock_sleep.assert_called_once()
+
+    @pytest.mark.it(
+        "Confirm sender faults raise BotocoreError without retrying"
+    )
+    def test_sender_fault(self):
+        sqs_client = MagicMock()
+        sqs_client.send_message_batch.return_value = {
+            "Failed": [
+                {
+                    "Id": "0",
+                    "SenderFault": True,
+                    "Code": "InvalidMessageContents",
+                }
+            ],
+        }
+
+        with pytest.raises(BotocoreError):
+            send_queue_messages(
+                queue_url="test_url/test_queue",
+                message_id="test_id",
+                message_body=[{"test": "test"}],
+                sqs_client=sqs_client,
+            )
+        assert sqs_client.send_message_batch.call_count == 1
+
+    @pytest.mark.it(
+        "Confirm BotocoreError is raised once retries are exhausted"
+    )
+    @patch("src.utils.time.sleep")
+    def test_retries_exhausted(self, mock_sleep):
+        sqs_client = MagicMock()
+        sqs_client.send_message_batch.return_value = {
+            "Failed": [
+                {"Id": "0", "SenderFault": False, "Code": "InternalError"}
+            ],
+        }
+
+        with pytest.raises(BotocoreError):
+            send_queue_messages(
+                queue_url="test_url/test_queue",
+                message_id="test_id",
+                message_body=[{"test": "test"}],
+                sqs_client=sqs_client,
+                max_retries=3,
+            )
+        assert sqs_client.send_message_batch.call_count == 3
+
+    @mock_aws
+    @pytest.mark.it("Confirm ClientError is re-raised with context")
+    def test_client_error(self):
+        sqs_client = boto3.client("sqs")
+        with pytest.raises(ClientError) as c_exc:
+            send_queue_messages(
+                queue_url="bad_url",
+                message_id="test",
+                message_body=[{"test": "test"}],
+                sqs_client=sqs_client,
+            )
+        assert "Boto3 error when sending messages to" in str(c_exc.value)
+
+
+class TestMessageCompression:
+    @pytest.mark.it("Confirm bodies below the threshold are not compressed")
+    def test_below_threshold(self):
+        data = json.dumps([{"id": "1"}]).encode()
+        assert compress_payload(data, "gzip", 1024) == (data, None)
+
+    @pytest.mark.it("Confirm compressed bodies decode to the original articles")
+    def test_gzip_round_trip(self):
+        articles = [{"id": str(n), "text": "guardian " * 50} for n in range(20)]
+        data = json.dumps(articles).encode()
+        compressed, encoding = compress_payload(data, "gzip", 1024)
+        encoded = base64.b64encode(compressed).decode("ascii")
+
+        assert encoding == "gzip"
+        assert len(encoded) < len(data)
+        attributes = {
+            "ContentEncoding": {"DataType": "String", "StringValue": encoding}
+        }
+        assert decode_message_body(encoded, attributes) == articles
+
+    @pytest.mark.it("Confirm zstd falls back to gzip without zstandard")
+    @patch("src.utils.zstandard", None)
+    def test_zstd_fallback(self):
+        data = json.dumps([{"text": "guardian " * 500}]).encode()
+        _, encoding = compress_payload(data, "zstd", 1024)
+        assert encoding == "gzip"
+
+    @pytest.mark.it("Confirm the zstd fallback is only logged once")
+    @patch("src.utils.zstandard", None)
+    def test_zstd_fallback_logged_once(self, caplog):
+        warn_zstd_unavailable.cache_clear()
+        data = json.dumps([{"text": "guardian " * 500}]).encode()
+        for _ in range(3):
+            compress_payload(data, "zstd", 1024)
+        assert caplog.text.count("zstandard is not installed") == 1
+
+    @pytest.mark.it("Confirm an unknown compression raises ValueError")
+    def test_unknown_compression(self):
+        with pytest.raises(ValueError):
+            compress_payload(b"[]", "brotli")
+
+    @pytest.mark.it("Confirm uncompressed bodies decode without attributes")
+    def test_decode_plain(self):
+        assert decode_message_body('[{"id": "1"}]') == [{"id": "1"}]
+
+    @pytest.mark.it(
+        "Confirm compression packs more articles per message within the budget"
+    )
+    def test_compressed_packing(self):
+        articles = [
+            {"id": str(n), "text": "guardian " * 50} for n in range(100)
+        ]
+        plain = encode_messages(articles, max_message_bytes=4096)
+        compressed = encode_messages(
+            articles, max_message_bytes=4096, compression="gzip"
+        )
+
+        assert len(compressed) < len(plain)
+        assert all(len(body) <= 4096 for body, _ in compressed)
+        decoded = [
+            item
+            for body, encoding in compressed
+            for item in decode_message_body(
+                body, {"ContentEncoding": {"StringValue": encoding}}
+            )
+        ]
+        assert decoded == articles
+
+    @pytest.mark.it("Confirm compressed messages too large are split in order")
+    def test_split_incompressible(self):
+        articles = [
+            {"id": str(n), "text": os.urandom(300).hex()} for n in range(20)
+        ]
+        messages = encode_messages(
+            articles, max_message_bytes=2048, compression="gzip"
+        )
+
+        assert all(len(body) <= 2048 for body, _ in messages)
+        decoded = [
+            item
+            for body, encoding in messages
+            for item in decode_message_body(
+                body,
+                {"ContentEncoding": {"StringValue": encoding}}
+                if encoding
+                else None,
+            )
+        ]
+        assert decoded == articles
+
+    @mock_aws
+    @pytest.mark.it(
+        "Confirm compressed messages are flagged with ContentEncoding"
+    )
+    def test_content_encoding_attribute(self, sqs_fixure):
+        sqs_client, queue_url = sqs_fixure
+        articles = [{"id": str(n), "text": "guardian " * 50} for n in range(20)]
+
+        send_queue_messages(
+            queue_url=queue_url,
+            message_id="test_id",
+            message_body=articles,
+            sqs_client=sqs_client,
+            compression="gzip",
+        )
+
+        message = sqs_client.receive_message(
+            QueueUrl=queue_url, MessageAttributeNames=["All"]
+        )["Messages"][0]
+        attributes = message["MessageAttributes"]
+        assert attributes["ContentEncoding"]["StringValue"] == "gzip"
+        assert decode_message_body(message["Body"], attributes) == articles
+
+
+class CountingSerializer(JsonSerializer):
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, item) -> bytes:
+        self.encoded += 1
+        return super().encode(item)
+
+
+class BinaryJsonSerializer(JsonSerializer):
+    binary = True
+
+
+class TestMessageSerializers:
+    @mock_aws
+    @pytest.mark.it("Confirm messages are flagged with their ContentType")
+    def test_content_type_attribute(self, sqs_fixure):
+        sqs_client, queue_url = sqs_fixure
+        articles = format_results(unformated_results)
+
+        send_queue_messages(
+            queue_url=queue_url,
+            message_id="test_id",
+            message_body=articles,
+            sqs_client=sqs_client,
+        )
+
+        message = sqs_client.receive_message(
+            QueueUrl=queue_url, MessageAttributeNames=["All"]
+        )["Messages"][0]
+        attributes = message["MessageAttributes"]
+        assert attributes["ContentType"]["StringValue"] == "application/json"
+        assert decode_message_body(message["Body"], attributes) == articles
+
+    @pytest.mark.it("Confirm each article is serialised once when splitting")
+    def test_articles_encoded_once(self):
+        serializer = CountingSerializer()
+        articles = [
+            {"id": str(n), "text": f"guardian {n} " * 400} for n in range(40)
+        ]
+
+        messages = encode_messages(
+            articles,
+            max_message_bytes=8192,
+            compression="gzip",
+            serializer=serializer,
+        )
+
+        assert len(messages) > 1
+        assert serializer.encoded == len(articles)
+
+    @pytest.mark.it("Confirm binary payloads are base64 encoded within budget")
+    def test_binary_payloads(self):
+        articles = [{"id": str(n), "text": "guardian " * 20} for n in range(50)]
+
+        messages = encode_messages(
+            articles, max_message_bytes=2048, serializer=BinaryJsonSerializer()
+        )
+
+        decoded = []
+        for body, encoding in messages:
+            assert encoding is None
+            assert len(body) <= 2048
+            decoded.extend(json.loads(base64.b64decode(body)))
+        assert decoded == articles
+
+    @pytest.mark.it("Confirm precomputed sizes are used to pack articles")
+    def test_pack_with_sizes(self):
+        groups = pack_articles(
+            [b"a", b"b", b"c"], max_message_bytes=11, sizes=[4, 4, 4]
+        )
+        assert groups == [[b"a", b"b"], [b"c"]]
+
+    @pytest.mark.it("Confirm attribute names, types and values are counted")
+    def test_message_attributes_size(self):
+        assert (
+            message_attributes_size(
+                {"ID": {"DataType": "String", "StringValue": "café"}}
+            )
+            == 2 + 6 + 5
+        )
+
+    @pytest.mark.it("Confirm precomputed sizes are used to group batches")
+    def test_group_batches_with_sizes(self):
+        batches = group_batches(
+            ["a", "b", "c"], max_batch_bytes=250, sizes=[100, 100, 100]
+        )
+        assert batches == [[0, 1], [2]]
+
+
+@pytest.fixture(scope="function")
+def claim_check_fixture(aws_credentials):
+    with mock_aws():
+        sqs_client = boto3.client("sqs")
+        queue_url = sqs_client.create_queue(QueueName="test_queue")["QueueUrl"]
+        s3_client = boto3.client("s3")
+        s3_client.create_bucket(
+            Bucket="test-claim-check",
+            CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+        )
+        yield sqs_client, queue_url, s3_client
+
+
+class TestClaimCheck:
+    @pytest.mark.it("Confirm a stored body is read back from its pointer")
+    def test_round_trip(self, claim_check_fixture):
+        _, _, s3_client = claim_check_fixture
+        body = json.dumps([{"text": "guardian " * 100}])
+
+        pointer = store_claim_check(body, "test-claim-check", s3_client)
+
+        assert json.loads(pointer)["size"] == len(body.encode())
+        assert read_claim_check(pointer, s3_client) == body
+
+    @pytest.mark.it("Confirm a body failing checksum verification raises")
+    def test_checksum_mismatch(self, claim_check_fixture):
+        _, _, s3_client = claim_check_fixture
+        pointer = store_claim_check("[]", "test-claim-check", s3_client)
+        key = json.loads(pointer)["key"]
+        s3_client.put_object(Bucket="test-claim-check", Key=key, Body=b"[{}]")
+
+        with pytest.raises(ValueError):
+            read_claim_check(pointer, s3_client)
+
+    @pytest.mark.it(
+        "Confirm oversized articles are sent through S3 and small ones inline"
+    )
+    def test_send_oversized(self, claim_check_fixture):
+        sqs_client, queue_url, s3_client = claim_check_fixture
+        articles = [
+            {"id": "small", "text": "x" * 100},
+            {"id": "large", "text": "x" * 5000},
+        ]
+
+        send_queue_messages(
+            queue_url=queue_url,
+            message_id="test_id",
+            message_body=articles,
+            sqs_client=sqs_client,
+            claim_check_bucket="test-claim-check",
+            claim_check_threshold=1024,
+            s3_client=s3_client,
+        )
+
+        messages = sqs_client.receive_message(
+            QueueUrl=queue_url,
+            MaxNumberOfMessages=10,
+            MessageAttributeNames=["All"],
+        )["Messages"]
+        assert len(messages) == 2
+        received = {}
+        for message in messages:
+            attributes = message["MessageAttributes"]
+            assert len(message["Body"]) <= 1024
+            articles_received = decode_message_body(
+                message["Body"], attributes, s3_client=s3_client
+            )
+            received[articles_received[0]["id"]] = (
+                "ClaimCheck" in attributes,
+                articles_received,
+            )
+        assert received["small"] == (False, [articles[0]])
+        assert received["large"] == (True, [articles[1]])
+
+    @pytest.mark.it("Confirm oversized articles fail without a claim check")
+    def test_oversized_without_claim_check(self, claim_check_fixture):
+        sqs_client, queue_url, _ = claim_check_fixture
+        with pytest.raises(BotocoreError):
+            send_queue_messages(
+                queue_url=queue_url,
+                message_id="test_id",
+                message_body=[{"text": "x" * 5000}],
+                sqs_client=sqs_client,
+                max_message_bytes=1024,
+            )
+
+
+@pytest.fixture(scope="function")
+def boto3_clients(aws_credentials):
+    reset_boto3_clients()
+    yield
+    reset_boto3_clients()
+
+
+class TestBoto3ClientRegistry:
+    @pytest.mark.it("Confirm the same client is returned for a service")
+    def test_reuse(self, boto3_clients):
+        assert get_boto3_client("sqs") is get_boto3_client("sqs")
+
+    @pytest.mark.it("Confirm clients are kept per service and region")
+    def test_keyed_by_service_and_region(self, boto3_clients):
+        sqs_client = get_boto3_client("sqs")
+        assert get_boto3_client("s3") is not sqs_client
+        us_client = get_boto3_client("sqs", "us-east-1")
+        assert us_client is not sqs_client
+        assert us_client.meta.region_name == "us-east-1"
+
+    @pytest.mark.it("Confirm concurrent callers share one client")
+    def test_thread_safe(self, boto3_clients):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(
+                executor.map(lambda _: get_boto3_client("sqs"), range(32))
+            )
+        assert all(client is clients[0] for client in clients)
+
+    @pytest.mark.it("Confirm the pool size and retry mode are configurable")
+    def test_config_from_env(self, boto3_clients, monkeypatch):
+        monkeypatch.setenv("GUARDIAN_BOTO_MAX_POOL", "25")
+        monkeypatch.setenv("GUARDIAN_BOTO_RETRY_MODE", "adaptive")
+        config = get_boto3_client("sqs").meta.config
+        assert config.max_pool_connections == 25
+        assert config.retries["mode"] == "adaptive"
+
+    @pytest.mark.it("Confirm reset discards shared clients")
+    def test_reset(self, boto3_clients):
+        sqs_client = get_boto3_client("sqs")
+        reset_boto3_clients()
+        assert get_boto3_client("sqs") is not sqs_client
+
+    @mock_aws
+    @pytest.mark.it("Confirm shared clients work with moto")
+    def test_moto(self, boto3_clients):
+        sqs_client = get_boto3_client("sqs")
+        queue_url = sqs_client.create_queue(QueueName="test_queue")["QueueUrl"]
+        message_ids = send_queue_messages(
+            queue_url=queue_url,
+            message_id="test_id",
+            message_body=[{"test": "test"}],
+            sqs_client=sqs_client,
+        )
+        assert len(message_ids) == 1
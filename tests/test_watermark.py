@@ -0,0 +1,178 @@
+import os
+import boto3
+import pytest
+from datetime import datetime, timezone
+from moto import mock_aws
+from src.watermark import (
+    is_new_article,
+    advance_watermark,
+    first_run_from_date,
+    WatermarkStore,
+    SQLiteWatermarkStore,
+    DynamoDBWatermarkStore,
+    create_watermark_store_from_env,
+)
+
+
+def article(article_id: str, published: str) -> dict:
+    return {"id": article_id, "webPublicationDate": published}
+
+
+@pytest.fixture(scope="module")
+def aws_credentials():
+    """Mocked AWS Credentials for moto."""
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+
+
+@pytest.fixture(scope="function")
+def dynamodb_fixture(aws_credentials):
+    with mock_aws():
+        test_client = boto3.client("dynamodb")
+        test_client.create_table(
+            TableName="test_table",
+            KeySchema=[{"AttributeName": "query", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "query", "AttributeType": "S"}
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield test_client
+
+
+class TestIsNewArticle:
+    @pytest.mark.it("Confirm every article is new without a watermark")
+    def test_no_watermark(self):
+        assert is_new_article(article("a", "2025-01-01T00:00:00Z"), None)
+
+    @pytest.mark.it("Confirm articles are compared with the watermark time")
+    def test_publication_time(self):
+        watermark = {"published": "2025-01-02T00:00:00Z", "ids": ["a"]}
+        assert is_new_article(article("b", "2025-01-03T00:00:00Z"), watermark)
+        assert not is_new_article(
+            article("c", "2025-01-01T00:00:00Z"), watermark
+        )
+
+    @pytest.mark.it("Confirm seen articles at the watermark time are dropped")
+    def test_boundary_duplicates(self):
+        watermark = {"published": "2025-01-02T00:00:00Z", "ids": ["a"]}
+        assert not is_new_article(
+            article("a", "2025-01-02T00:00:00Z"), watermark
+        )
+        assert is_new_article(article("b", "2025-01-02T00:00:00Z"), watermark)
+
+
+class TestAdvanceWatermark:
+    @pytest.mark.it("Confirm the watermark moves to the latest article")
+    def test_latest(self):
+        watermark = advance_watermark(
+            None,
+            [
+                article("b", "2025-01-02T00:00:00Z"),
+                article("a", "2025-01-01T00:00:00Z"),
+            ],
+        )
+        assert watermark == {"published": "2025-01-02T00:00:00Z", "ids": ["b"]}
+
+    @pytest.mark.it("Confirm every id at the latest time is recorded")
+    def test_boundary_ids(self):
+        watermark = advance_watermark(
+            {"published": "2025-01-02T00:00:00Z", "ids": ["a"]},
+            [
+                article("b", "2025-01-02T00:00:00Z"),
+                article("c", "2025-01-01T00:00:00Z"),
+            ],
+        )
+        assert watermark == {
+            "published": "2025-01-02T00:00:00Z",
+            "ids": ["a", "b"],
+        }
+
+    @pytest.mark.it("Confirm the watermark never moves backwards")
+    def test_older_articles(self):
+        watermark = {"published": "2025-01-02T00:00:00Z", "ids": ["a"]}
+        assert (
+            advance_watermark(watermark, [article("b", "2025-01-01T00:00:00Z")])
+            == watermark
+        )
+
+
+class TestFirstRunFromDate:
+    @pytest.mark.it("Confirm first runs look back a bounded number of days")
+    def test_lookback(self, monkeypatch):
+        now = datetime(2025, 3, 10, 12, tzinfo=timezone.utc)
+        monkeypatch.delenv("GUARDIAN_INCREMENTAL_LOOKBACK_DAYS", raising=False)
+
+        assert first_run_from_date(now=now) == "2025-03-09"
+        assert first_run_from_date(lookback_days=7, now=now) == "2025-03-03"
+        monkeypatch.setenv("GUARDIAN_INCREMENTAL_LOOKBACK_DAYS", "0.25")
+        assert first_run_from_date(now=now) == "2025-03-10"
+
+
+class TestWatermarkStore:
+    @pytest.mark.it("Confirm a store missing get or set cannot be created")
+    def test_abstract(self):
+        class IncompleteStore(WatermarkStore):
+            def get(self, query):
+                return None
+
+        with pytest.raises(TypeError):
+            WatermarkStore()
+        with pytest.raises(TypeError):
+            IncompleteStore()
+
+
+class TestSQLiteWatermarkStore:
+    @pytest.mark.it("Confirm None is returned for an unknown query")
+    def test_unknown_query(self, tmp_path):
+        store = SQLiteWatermarkStore(path=str(tmp_path / "state.db"))
+        assert store.get("test_query") is None
+
+    @pytest.mark.it("Confirm watermarks persist between store instances")
+    def test_persistence(self, tmp_path):
+        watermark = {"published": "2025-01-02T00:00:00Z", "ids": ["a", "b"]}
+        SQLiteWatermarkStore(path=str(tmp_path / "state.db")).set(
+            "test_query", watermark
+        )
+        store = SQLiteWatermarkStore(path=str(tmp_path / "state.db"))
+        assert store.get("test_query") == watermark
+
+    @pytest.mark.it("Confirm a watermark is replaced when set again")
+    def test_replace(self, tmp_path):
+        store = SQLiteWatermarkStore(path=str(tmp_path / "state.db"))
+        store.set("test_query", {"published": "1", "ids": ["a"]})
+        store.set("test_query", {"published": "2", "ids": ["b"]})
+        assert store.get("test_query") == {"published": "2", "ids": ["b"]}
+
+
+class TestDynamoDBWatermarkStore:
+    @pytest.mark.it("Confirm None is returned for an unknown query")
+    def test_unknown_query(self, dynamodb_fixture):
+        store = DynamoDBWatermarkStore("test_table", dynamodb_fixture)
+        assert store.get("test_query") is None
+
+    @pytest.mark.it("Confirm a stored watermark is retrieved")
+    def test_round_trip(self, dynamodb_fixture):
+        store = DynamoDBWatermarkStore("test_table", dynamodb_fixture)
+        watermark = {"published": "2025-01-02T00:00:00Z", "ids": ["a", "b"]}
+        store.set("test_query", watermark)
+        assert store.get("test_query") == watermark
+
+
+class TestCreateWatermarkStoreFromEnv:
+    @pytest.mark.it("Confirm SQLite is used without a DynamoDB table")
+    def test_sqlite(self, monkeypatch, tmp_path):
+        monkeypatch.delenv("GUARDIAN_STATE_TABLE", raising=False)
+        monkeypatch.setenv("GUARDIAN_STATE_PATH", str(tmp_path / "state.db"))
+        store = create_watermark_store_from_env()
+        assert isinstance(store, SQLiteWatermarkStore)
+
+    @pytest.mark.it("Confirm DynamoDB is used when a table is configured")
+    def test_dynamodb(self, monkeypatch, dynamodb_fixture):
+        monkeypatch.setenv("GUARDIAN_STATE_TABLE", "test_table")
+        store = create_watermark_store_from_env()
+        assert isinstance(store, DynamoDBWatermarkStore)
+        assert store.table_name == "test_table"